@@ -0,0 +1,82 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the conversion of the OEM state vectors to an Arrow table and
+writing them to Parquet and Arrow IPC files, with the data read in full and
+in lazy mode. Requires `pyarrow`.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_arrow.py [segments] [lines_per_segment]
+
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_arrow import (
+    from_arrow,
+    read_parquet,
+    to_arrow,
+    write_ipc,
+    write_parquet,
+)
+from ccsds_ndm.ndm_io import NdmIo
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(segments=5, lines_per_segment=2000):
+    print(f"OEM with {segments} x {lines_per_segment} lines")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        oem_path = Path(tmp_dir).joinpath("bench_oem.oem")
+        oem_path.write_text(oem_kvn(segments, lines_per_segment))
+        parquet_path = Path(tmp_dir).joinpath("bench_oem.parquet")
+        ipc_path = Path(tmp_dir).joinpath("bench_oem.arrows")
+
+        oem, parse_time = _timed(lambda: NdmIo().from_path(oem_path))
+        print(f"{'parse':<24}{parse_time:>8.3f}s")
+
+        table, to_time = _timed(lambda: to_arrow(oem, "oem_state_vector"))
+        print(f"{'to_arrow':<24}{to_time:>8.3f}s  ({table.num_rows} rows)")
+
+        _, from_time = _timed(lambda: from_arrow(table))
+        print(f"{'from_arrow':<24}{from_time:>8.3f}s")
+
+        _, parquet_time = _timed(
+            lambda: write_parquet(oem, parquet_path, "oem_state_vector")
+        )
+        size_mb = parquet_path.stat().st_size / 1e6
+        print(f"{'write_parquet':<24}{parquet_time:>8.3f}s  ({size_mb:.2f} MB)")
+
+        _, ipc_time = _timed(lambda: write_ipc(oem, ipc_path, "oem_state_vector"))
+        size_mb = ipc_path.stat().st_size / 1e6
+        print(f"{'write_ipc':<24}{ipc_time:>8.3f}s  ({size_mb:.2f} MB)")
+
+        _, lazy_time = _timed(
+            lambda: write_parquet(
+                NdmIo().from_path(oem_path, lazy=True),
+                parquet_path,
+                "oem_state_vector",
+            )
+        )
+        print(f"{'parse + write (lazy)':<24}{lazy_time:>8.3f}s")
+
+        _, read_time = _timed(lambda: read_parquet(parquet_path))
+        print(f"{'read_parquet':<24}{read_time:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,92 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the vectorised AEM attitude interpolation for each method and the
+Euler angle conversion, against a per-point SLERP loop.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_attitude.py [queries]
+
+"""
+
+import sys
+import timeit
+
+import numpy as np
+from synthetic import aem_kvn
+
+from ccsds_ndm.attitude import AemAttitude, quaternions_to_euler, segment_quaternions
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+
+
+def _slerp_loop(epochs_ns, quaternions, query_ns):
+    result = []
+    for epoch in query_ns:
+        index = min(max(int(np.searchsorted(epochs_ns, epoch)), 1), len(epochs_ns) - 1)
+        fraction = (epoch - epochs_ns[index - 1]) / (
+            epochs_ns[index] - epochs_ns[index - 1]
+        )
+        q0, q1 = quaternions[index - 1], quaternions[index]
+        angle = np.arccos(min(abs(np.dot(q0, q1)), 1.0))
+        if angle < 1e-12:
+            result.append(q0)
+            continue
+        result.append(
+            (np.sin((1 - fraction) * angle) * q0 + np.sin(fraction * angle) * q1)
+            / np.sin(angle)
+        )
+    return np.array(result)
+
+
+def main(n_queries=1_000_000, repeat=3):
+    aem = NdmKvnIo().from_string(aem_kvn(2, 500))
+    coverage = AemAttitude(aem).coverage
+    start_ns, stop_ns = coverage[0][0], coverage[-1][1]
+    query_ns = np.sort(np.random.default_rng(0).integers(start_ns, stop_ns, n_queries))
+
+    print(f"{n_queries} queries over 2 x 500 quaternions (best of {repeat} runs)")
+    for label, method, degree in [
+        ("SLERP", "SLERP", None),
+        ("SQUAD", "SQUAD", None),
+        ("Lagrange (degree 7)", "LAGRANGE", 7),
+        ("Hermite (degree 3)", "HERMITE", 3),
+    ]:
+        attitude = AemAttitude(aem, method, degree)
+        run_time = min(
+            timeit.repeat(lambda: attitude(query_ns), number=1, repeat=repeat)
+        )
+        print(f"{label:<24}{run_time:>9.3f}s  ({n_queries / run_time / 1e6:.1f} M/s)")
+
+    quaternions = AemAttitude(aem)(query_ns)
+    run_time = min(
+        timeit.repeat(
+            lambda: quaternions_to_euler(quaternions, "321"), number=1, repeat=repeat
+        )
+    )
+    print(
+        f"{'Euler 321 conversion':<24}{run_time:>9.3f}s  "
+        f"({n_queries / run_time / 1e6:.1f} M/s)"
+    )
+
+    # per-point loop on a subset
+    epochs_ns, quaternions = segment_quaternions(aem.body.segment[0])
+    subset = query_ns[query_ns < epochs_ns[-1]][:10_000]
+    run_time = min(
+        timeit.repeat(
+            lambda: _slerp_loop(epochs_ns, quaternions, subset),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    print(
+        f"{'per-point loop':<24}{run_time:>9.3f}s  "
+        f"({len(subset) / run_time / 1e6:.3f} M/s, {len(subset)} queries)"
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
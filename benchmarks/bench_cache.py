@@ -0,0 +1,54 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks reading an OEM file through the parse cache (miss and hit)
+against the plain parse.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_cache.py [segments] [lines_per_segment]
+
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_cache import ParseCache
+from ccsds_ndm.ndm_io import NdmIo
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(segments=5, lines_per_segment=2000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment))
+        cache = ParseCache(Path(tmp_dir).joinpath("cache"))
+
+        print(f"OEM with {segments} x {lines_per_segment} lines")
+
+        _, parse_time = _timed(lambda: NdmIo().from_path(path))
+        print(f"{'parse':<16}{parse_time:>9.3f}s")
+
+        _, miss_time = _timed(lambda: NdmIo().from_path(path, cache=cache))
+        print(f"{'cache miss':<16}{miss_time:>9.3f}s")
+
+        hit_time = min(
+            _timed(lambda: NdmIo().from_path(path, cache=cache))[1] for _ in range(3)
+        )
+        print(f"{'cache hit':<16}{hit_time:>9.3f}s ({parse_time / hit_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
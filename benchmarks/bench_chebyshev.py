@@ -0,0 +1,88 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the Chebyshev polynomial representation of a dense OEM (1 second
+steps) against the OEM itself: storage on disk, memory use, the evaluation
+speed against the Lagrange interpolation of the state vectors and the
+differences between the two.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_chebyshev.py [lines] [queries] [degree]
+
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from synthetic import oem_kvn
+
+from ccsds_ndm.chebyshev import ChebyshevEphemeris
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.interpolation import OemInterpolator
+from ccsds_ndm.ndm_io import NdmIo
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(lines=20000, queries=100000, degree=15):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(1, lines, 1.0))
+        oem = NdmIo().from_path(path)
+        columns = message_columns(oem)[0]
+
+        ephemeris, fit_time = _timed(
+            lambda: ChebyshevEphemeris.fit(oem, 1e-6, degree=degree)
+        )
+        cheb_path = Path(tmp_dir).joinpath("bench_oem.npz")
+        ephemeris.save(cheb_path)
+
+        print(
+            f"OEM with {lines} lines at 1 s, {ephemeris.interval_count} intervals "
+            f"of degree {degree} (fitted in {fit_time:.3f}s)"
+        )
+        print(
+            f"{'file size':<24}{path.stat().st_size / 1e3:>10.1f} kB  "
+            f"-> {cheb_path.stat().st_size / 1e3:.1f} kB"
+        )
+        print(
+            f"{'state arrays':<24}{columns.states.nbytes / 1e3:>10.1f} kB  "
+            f"-> {ephemeris.nbytes / 1e3:.1f} kB"
+        )
+
+        interpolator = OemInterpolator(oem, "LAGRANGE", 7)
+        rng = np.random.default_rng(42)
+        epochs_ns = np.sort(
+            rng.integers(columns.epochs_ns[0], columns.epochs_ns[-1], queries)
+        )
+
+        lagrange, lagrange_time = _timed(lambda: interpolator.states(epochs_ns))
+        chebyshev, chebyshev_time = _timed(lambda: ephemeris.states(epochs_ns))
+        for label, run_time in [
+            ("Lagrange (degree 7)", lagrange_time),
+            ("Chebyshev", chebyshev_time),
+        ]:
+            print(
+                f"{label:<24}{run_time:>10.3f}s  ({queries / run_time / 1e6:.2f} M/s)"
+            )
+
+        differences = np.abs(chebyshev - lagrange)
+        print(
+            f"{'max difference':<24}{differences[:, :3].max() * 1e6:>10.3f} mm"
+            f"  {differences[:, 3:].max() * 1e6:.6f} mm/s"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,70 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the batch collision probability computation over many CDMs,
+against computing them one CDM at a time.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_collision.py [cdms]
+
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from ccsds_ndm.collision import (
+    cdm_encounters,
+    collision_probabilities,
+    encounter_plane,
+    probability_2d,
+)
+from ccsds_ndm.ndm_io import NdmIo
+
+cdm_file_path = Path("ccsds_ndm", "tests", "data", "kvn", "cdm_example_section4.kvn")
+
+
+def main(n_cdms=10_000, repeat=3):
+    cdm = NdmIo().from_path(cdm_file_path)
+    cdms = [cdm] * n_cdms
+
+    # same CDM, but random encounter geometries for the probabilities
+    rng = np.random.default_rng(0)
+    factors = rng.normal(size=(n_cdms, 2, 2)) * rng.uniform(1.0, 300.0, (n_cdms, 1, 1))
+    covariances = factors @ factors.transpose(0, 2, 1)
+    miss_vectors = rng.normal(size=(n_cdms, 2)) * 300.0
+    radii = rng.uniform(1.0, 20.0, n_cdms)
+
+    print(f"{n_cdms} CDMs (best of {repeat} runs)")
+    for label, func in [
+        ("extract arrays", lambda: cdm_encounters(cdms)),
+        ("extract and compute", lambda: collision_probabilities(cdms)),
+        ("2D probabilities", lambda: probability_2d(miss_vectors, covariances, radii)),
+    ]:
+        run_time = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{label:<24}{run_time:>9.3f}s  ({n_cdms / run_time / 1e3:.1f} k/s)")
+
+    # one CDM at a time
+    def single_loop():
+        for single in cdms[:1000]:
+            encounters = cdm_encounters(single)
+            miss_vector, covariance = encounter_plane(
+                encounters.states1,
+                encounters.states2,
+                encounters.covariances1[:, :3, :3],
+                encounters.covariances2[:, :3, :3],
+            )
+            probability_2d(miss_vector, covariance, encounters.hard_body_radii)
+
+    run_time = min(timeit.repeat(single_loop, number=1, repeat=repeat))
+    print(f"{'one by one':<24}{run_time:>9.3f}s  ({1000 / run_time / 1e3:.1f} k/s)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,132 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the ingestion of CDMs into the conjunction event store and the
+indexed event queries, against a scan of all the events.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_conjunctions.py [cdms] [cdms per event]
+
+"""
+
+import sys
+import timeit
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+from ccsds_ndm.conjunctions import ConjunctionStore
+from ccsds_ndm.epochs import format_epochs_ns
+from ccsds_ndm.ndm_io import NdmIo
+
+cdm_file_path = Path("ccsds_ndm", "tests", "data", "kvn", "cdm_example_section4.kvn")
+
+_DAY_NS = 86400 * 10**9
+
+
+def _synthetic_cdms(template, n_cdms, cdms_per_event, rng):
+    """Updates of random events over 30 days, sharing the unchanged parts."""
+    n_events = max(n_cdms // cdms_per_event, 1)
+    event_tcas = rng.integers(0, 30 * _DAY_NS, n_events) + 1_600_000_000 * 10**9
+    events = rng.integers(0, n_events, n_cdms)
+    tcas = format_epochs_ns(
+        event_tcas[events] + rng.integers(-(10**10), 10**10, n_cdms)
+    ).tolist()
+    creations = format_epochs_ns(
+        event_tcas[events] - rng.integers(0, _DAY_NS, n_cdms)
+    ).tolist()
+    probabilities = 10.0 ** rng.uniform(-10.0, -2.0, n_cdms)
+    miss_distances = rng.uniform(10.0, 5000.0, n_cdms)
+
+    body = template.body
+    cdms = []
+    for n in range(n_cdms):
+        segments = [
+            replace(
+                segment,
+                metadata=replace(
+                    segment.metadata,
+                    object_designator=f"{events[n]}-{object_index}",
+                ),
+            )
+            for object_index, segment in enumerate(body.segment)
+        ]
+        relative = replace(
+            body.relative_metadata_data,
+            tca=tcas[n],
+            miss_distance=replace(
+                body.relative_metadata_data.miss_distance,
+                value=Decimal(f"{miss_distances[n]:.1f}"),
+            ),
+            collision_probability=Decimal(f"{probabilities[n]:.4e}"),
+        )
+        cdms.append(
+            replace(
+                template,
+                header=replace(template.header, creation_date=creations[n]),
+                body=replace(body, segment=segments, relative_metadata_data=relative),
+            )
+        )
+    return cdms
+
+
+def _scan(events, start_ns, stop_ns, min_probability):
+    return [
+        event
+        for event in events
+        if start_ns <= event.tca_ns <= stop_ns and event.probability >= min_probability
+    ]
+
+
+def main(n_cdms=20_000, cdms_per_event=5, repeat=3, n_queries=1000):
+    rng = np.random.default_rng(0)
+    template = NdmIo().from_path(cdm_file_path)
+    cdms = _synthetic_cdms(template, n_cdms, cdms_per_event, rng)
+    print(f"{n_cdms} CDMs (best of {repeat} runs)")
+
+    run_time = min(
+        timeit.repeat(lambda: ConjunctionStore().add(cdms), number=1, repeat=repeat)
+    )
+    print(f"{'ingest':<32}{run_time:>9.3f}s  ({n_cdms / run_time / 1e3:.1f} k/s)")
+
+    store = ConjunctionStore()
+    store.add(cdms)
+    events = store.events()
+    print(f"{len(store)} events")
+
+    # Pc >= 1e-4 within the next 72 hours
+    starts_ns = events[0].tca_ns + rng.integers(0, 27 * _DAY_NS, n_queries)
+    window_ns = 3 * _DAY_NS
+    store.events(starts_ns[0], starts_ns[0] + window_ns, min_probability=1e-4)
+
+    for label, func in [
+        (
+            "indexed queries",
+            lambda: [
+                store.events(start_ns, start_ns + window_ns, min_probability=1e-4)
+                for start_ns in starts_ns
+            ],
+        ),
+        (
+            "scan queries",
+            lambda: [
+                _scan(events, start_ns, start_ns + window_ns, 1e-4)
+                for start_ns in starts_ns
+            ],
+        ),
+    ]:
+        run_time = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{label:<32}{run_time / n_queries * 1e6:>9.1f}us per query")
+
+    run_time = min(timeit.repeat(lambda: store.event_cdms(0), number=1, repeat=repeat))
+    print(f"{'restore CDMs of an event':<32}{run_time * 1e3:>9.3f}ms")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,88 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the bulk conversion of the covariance blocks into stacked matrices
+and back, and the positive semi-definiteness check, against an element by
+element matrix build.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_covariance.py [matrices]
+
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from ccsds_ndm.covariance import (
+    covariance_blocks,
+    covariance_matrices,
+    is_positive_semidefinite,
+)
+from ccsds_ndm.models.ndmxml2 import CdmCovarianceMatrixType, OemCovarianceMatrixType
+
+
+def _element_loop(blocks, size):
+    names = [name for name in vars(blocks[0]) if name not in ("comment", "epoch")]
+    names = [name for name in names if name != "cov_ref_frame"]
+    result = []
+    for block in blocks:
+        matrix = np.zeros((size, size))
+        k = 0
+        for i in range(size):
+            for j in range(i + 1):
+                element = getattr(block, names[k])
+                value = np.nan if element is None else float(element.value)
+                matrix[i, j] = matrix[j, i] = value
+                k += 1
+        result.append(matrix)
+    return np.array(result)
+
+
+def _random_covariances(count, size, rng):
+    factors = rng.normal(size=(count, size, size))
+    return factors @ factors.transpose(0, 2, 1)
+
+
+def _report(label, run_time, count, note=""):
+    print(f"{label:<32}{run_time:>9.3f}s  ({count / run_time / 1e3:.0f} k/s{note})")
+
+
+def main(n_matrices=20_000, repeat=3):
+    rng = np.random.default_rng(0)
+    print(f"{n_matrices} matrices (best of {repeat} runs)")
+
+    for label, block_type, size in [
+        ("OEM 6x6", OemCovarianceMatrixType, 6),
+        ("CDM 9x9", CdmCovarianceMatrixType, 9),
+    ]:
+        matrices = _random_covariances(n_matrices, size, rng)
+
+        for numeric in ["decimal", "float"]:
+            blocks = covariance_blocks(matrices, block_type, numeric=numeric)
+            for name, func in [
+                ("to matrices", lambda: covariance_matrices(blocks)),
+                (
+                    "to blocks",
+                    lambda: covariance_blocks(matrices, block_type, numeric=numeric),
+                ),
+                ("element loop", lambda: _element_loop(blocks, size)),
+            ]:
+                run_time = min(timeit.repeat(func, number=1, repeat=repeat))
+                _report(f"{label} {name} ({numeric})", run_time, n_matrices)
+
+        run_time = min(
+            timeit.repeat(
+                lambda: is_positive_semidefinite(matrices), number=1, repeat=repeat
+            )
+        )
+        _report(f"{label} PSD check", run_time, n_matrices)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
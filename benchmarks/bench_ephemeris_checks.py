@@ -0,0 +1,88 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the ephemeris sanity checks of a large OEM (with a few duplicate
+epochs and gaps) against the same checks as a loop over the data lines. The
+checks run over the cached columnar view, the time to build it (epoch parsing
+and the state arrays) is given separately.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_ephemeris_checks.py [lines] [errors]
+
+"""
+
+import sys
+import time
+
+import numpy as np
+from synthetic import oem_kvn
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.ephemeris_checks import check_ephemeris
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.ndm_io import NdmIo
+
+
+def _loop_checks(columns, metadata):
+    epochs_ns = columns.epochs_ns.tolist()
+    start_ns, stop_ns = parse_epochs_ns([metadata.start_time, metadata.stop_time])
+    steps = [b - a for a, b in zip(epochs_ns, epochs_ns[1:])]
+    nominal = sorted(step for step in steps if step > 0)[len(steps) // 2]
+
+    rows = {}
+    for row, step in enumerate(steps, 1):
+        if step < 0:
+            rows.setdefault("non_increasing", []).append(row)
+        elif step == 0:
+            rows.setdefault("duplicate_epoch", []).append(row)
+        elif step > 2.0 * nominal:
+            rows.setdefault("gap", []).append(row)
+        elif abs(step - nominal) > 1e-6 * nominal:
+            rows.setdefault("irregular_step", []).append(row)
+    for row, epoch in enumerate(epochs_ns):
+        if epoch < start_ns or epoch > stop_ns:
+            rows.setdefault("outside_time_range", []).append(row)
+    return rows
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(lines=200000, errors=10):
+    oem = NdmIo().from_string(oem_kvn(1, lines, 1.0), numeric="float")
+    segment = oem.body.segment[0]
+    state_vectors = segment.data.state_vector
+    rng = np.random.default_rng(42)
+    for row in rng.choice(np.arange(1, lines - 1), errors, replace=False):
+        # duplicate of the previous epoch and a gap after it
+        state_vectors[row].epoch = state_vectors[row - 1].epoch
+        del state_vectors[row + 1]
+
+    columns = segment_columns(segment)
+    _, columns_time = _timed(lambda: (columns.epochs_ns, columns.states))
+
+    violations, checks_time = _timed(lambda: check_ephemeris(oem))
+    loop_rows, loop_time = _timed(lambda: _loop_checks(columns, segment.metadata))
+    assert {v.check: v.rows.tolist() for v in violations} == loop_rows
+
+    n_rows = len(columns)
+    print(f"OEM with {n_rows} lines, {errors} duplicate epochs and gaps")
+    print(f"{'columnar view':<24}{columns_time:>8.3f}s")
+    for label, run_time in [("checks", checks_time), ("loop", loop_time)]:
+        print(
+            f"{label:<24}{run_time:>8.3f}s  ({n_rows / run_time / 1e6:.1f} M lines/s,"
+            f" {columns.epochs_ns.nbytes / run_time / 1e9:.2f} GB/s of epochs)"
+        )
+    for violation in violations:
+        print(f"    {violation.check}: {violation.message}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,107 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the streaming split and splice of an OEM in KVN format, against
+reading the file in full and writing the products with `NdmIo`. The file copy
+speed is given as a reference, as well as the peak memory use (measured
+separately with `tracemalloc`).
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_ephemeris_stream.py [segments] [lines_per_segment] [products]
+
+"""
+
+import dataclasses
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from synthetic import oem_kvn
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.ephemeris_stream import splice_ephemerides, split_ephemeris
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+
+
+def _boundaries(path, products):
+    oem = NdmIo().from_path(path, lazy=True)
+    first = oem.body.segment[0].metadata.start_time
+    last = oem.body.segment[-1].metadata.stop_time
+    start_ns, stop_ns = np.array([first, last], dtype="datetime64[ns]").astype(np.int64)
+    return np.linspace(start_ns, stop_ns, products + 1).astype(np.int64)
+
+
+def _full_split(path, boundaries, out_paths):
+    oem = NdmIo().from_path(path)
+    for out_path, start_ns, stop_ns in zip(out_paths, boundaries[:-1], boundaries[1:]):
+        segments = []
+        for segment in oem.body.segment:
+            epochs_ns = segment_columns(segment).epochs_ns
+            rows = np.flatnonzero((epochs_ns >= start_ns) & (epochs_ns <= stop_ns))
+            if len(rows):
+                data = dataclasses.replace(
+                    segment.data,
+                    state_vector=segment.data.state_vector[rows[0] : rows[-1] + 1],
+                )
+                segments.append(dataclasses.replace(segment, data=data))
+        body = dataclasses.replace(oem.body, segment=segments)
+        NdmIo().to_file(
+            dataclasses.replace(oem, body=body), NDMFileFormats.KVN, out_path
+        )
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main(segments=4, lines_per_segment=5000, products=4):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment, 60.0))
+        size = path.stat().st_size / 1e6
+
+        boundaries = _boundaries(path, products)
+        out_paths = [
+            Path(tmp_dir).joinpath(f"product_{n}.kvn") for n in range(products)
+        ]
+        splice_path = Path(tmp_dir).joinpath("splice.kvn")
+
+        print(
+            f"OEM with {segments} x {lines_per_segment} lines ({size:.1f} MB), "
+            f"{products} products"
+        )
+
+        for label, func in [
+            ("file copy", lambda: shutil.copyfile(path, splice_path)),
+            ("streaming split", lambda: split_ephemeris(path, boundaries, out_paths)),
+            ("streaming splice", lambda: splice_ephemerides(out_paths, splice_path)),
+            ("full read and write", lambda: _full_split(path, boundaries, out_paths)),
+        ]:
+            run_time = _timed(func)
+            peak = _peak_memory(func)
+            print(
+                f"{label:<24}{run_time:>8.3f}s  ({size / run_time:.1f} MB/s,"
+                f" peak {peak:.1f} MB)"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,48 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the vectorised epoch parsing against a `datetime` loop.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_epochs.py [epochs]
+
+"""
+
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+
+from ccsds_ndm.epochs import format_epochs_ns, parse_epochs_ns
+
+
+def _datetime_loop(epochs):
+    return [datetime.strptime(epoch, "%Y-%m-%dT%H:%M:%S.%f") for epoch in epochs]
+
+
+def main(n_epochs=200_000, repeat=3):
+    epochs_ns = np.arange(n_epochs, dtype=np.int64) * 60_123_456_789 + 10**18
+    cal_epochs = format_epochs_ns(epochs_ns, 6).tolist()
+    doy_epochs = format_epochs_ns(epochs_ns, 6, day_of_year=True).tolist()
+
+    print(f"{n_epochs} epochs (best of {repeat} runs)")
+    for label, func in [
+        ("datetime loop (calendar)", lambda: _datetime_loop(cal_epochs)),
+        ("vectorised (calendar)", lambda: parse_epochs_ns(cal_epochs)),
+        ("vectorised (day-of-year)", lambda: parse_epochs_ns(doy_epochs)),
+        (
+            "vectorised (mixed)",
+            lambda: parse_epochs_ns(cal_epochs[::2] + doy_epochs[1::2]),
+        ),
+    ]:
+        run_time = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{label:<28}{run_time:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,72 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the cold-start cost of the package: importing the I/O module, the
+NDM classes and reading a single OMM, each in a fresh interpreter. The time of
+the interpreter start-up alone is given as reference, the other times include
+it. The number of generated NDM modules imported is given as well.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_imports.py [repeats]
+
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+omm_xml_file_path = "ccsds_ndm/tests/data/xml/ndmxml-1.0-omm-2.0.xml"
+omm_kvn_file_path = "ccsds_ndm/tests/data/kvn/omm1_st.kvn"
+
+_cases = {
+    "interpreter": "pass",
+    "import ndm_io": "import ccsds_ndm.ndm_io",
+    "import OmmType": "from ccsds_ndm.models.ndmxml2 import OmmType",
+    "import Omm": "from ccsds_ndm.models.ndmxml2 import Omm",
+    "import all classes": "from ccsds_ndm.models.ndmxml2 import *",
+    "read OMM (XML)": "from ccsds_ndm.ndm_io import NdmIo\n"
+    f"NdmIo().from_path({omm_xml_file_path!r})",
+    "read OMM (KVN)": "from ccsds_ndm.ndm_io import NdmIo\n"
+    f"NdmIo().from_path({omm_kvn_file_path!r})",
+}
+
+_count_modules = (
+    "\nimport sys\nprint(sum('.ndmxml2.ndmxml_' in name for name in sys.modules))"
+)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code + _count_modules],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def main(repeats=10):
+    print(f"Median of {repeats} runs")
+    for label, code in _cases.items():
+        run_times = []
+        for _ in range(repeats):
+            output, run_time = _timed(lambda: _run(code))
+            run_times.append(run_time)
+        print(
+            f"{label:<24}{statistics.median(run_times) * 1e3:>8.1f} ms  "
+            f"({output.strip()} NDM modules)"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,62 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks building the byte offset index of a large OEM file and reading
+a short epoch window through it, against reading the segment in full.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_index.py [segments] [lines_per_segment] [step]
+
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_index import open_index
+from ccsds_ndm.ndm_io import NdmIo
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(segments=10, lines_per_segment=50000, step=100):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment))
+        size_mb = path.stat().st_size / 1e6
+
+        print(f"OEM with {segments} x {lines_per_segment} lines ({size_mb:.1f} MB)")
+
+        index, build_time = _timed(lambda: open_index(path, step))
+        print(f"{'index build':<28}{build_time:>9.3f}s")
+
+        _, open_time = _timed(lambda: open_index(path, step))
+        print(f"{'index load and validate':<28}{open_time:>9.3f}s")
+
+        # one hour in the middle of the last segment
+        epochs = index.entry_epochs_ns[index.entry_segments == segments - 1]
+        start = epochs[len(epochs) // 2]
+        window, window_time = _timed(
+            lambda: index.read_window(start, start + 3600 * 10**9)
+        )
+        lines = len(window.body.segment[0].data.state_vector)
+        print(f"{f'window read ({lines} lines)':<28}{window_time:>9.3f}s")
+
+        oem = NdmIo().from_path(path, lazy=True)
+        _, segment_time = _timed(lambda: oem.body.segment[-1].data.state_vector)
+        print(f"{'full segment read':<28}{segment_time:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,80 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the vectorised OEM interpolation for each method, against a
+per-point Lagrange loop.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_interpolation.py [queries]
+
+"""
+
+import sys
+import timeit
+
+import numpy as np
+from synthetic import oem_kvn
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.interpolation import OemInterpolator
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+
+
+def _lagrange_loop(epochs_ns, states, query_ns, n_points=8):
+    result = []
+    for epoch in query_ns:
+        index = int(np.searchsorted(epochs_ns, epoch))
+        first = min(max(index - n_points // 2, 0), len(epochs_ns) - n_points)
+        times = (epochs_ns[first : first + n_points] - epoch) * 1e-9
+        state = np.zeros(6)
+        for j in range(n_points):
+            weight = 1.0
+            for k in range(n_points):
+                if k != j:
+                    weight *= times[k] / (times[k] - times[j])
+            state += weight * states[first + j]
+        result.append(state)
+    return np.array(result)
+
+
+def main(n_queries=1_000_000, repeat=3):
+    oem = NdmKvnIo().from_string(oem_kvn(5, 2000))
+    coverage = OemInterpolator(oem).coverage
+    start_ns, stop_ns = coverage[0][0], coverage[-1][1]
+    query_ns = np.sort(np.random.default_rng(0).integers(start_ns, stop_ns, n_queries))
+
+    print(f"{n_queries} queries over 5 x 2000 states (best of {repeat} runs)")
+    for label, method, degree in [
+        ("Lagrange (degree 7)", "LAGRANGE", 7),
+        ("Hermite (degree 7)", "HERMITE", 7),
+        ("Hermite (degree 3)", "HERMITE", 3),
+        ("linear", "LINEAR", 1),
+    ]:
+        interpolator = OemInterpolator(oem, method, degree)
+        run_time = min(
+            timeit.repeat(lambda: interpolator(query_ns), number=1, repeat=repeat)
+        )
+        print(f"{label:<24}{run_time:>9.3f}s  ({n_queries / run_time / 1e6:.1f} M/s)")
+
+    # per-point loop on a subset
+    columns = segment_columns(oem.body.segment[0])
+    subset = query_ns[query_ns < columns.epochs_ns[-1]][:10_000]
+    run_time = min(
+        timeit.repeat(
+            lambda: _lagrange_loop(columns.epochs_ns, columns.states, subset),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    print(
+        f"{'per-point loop':<24}{run_time:>9.3f}s  "
+        f"({len(subset) / run_time / 1e6:.3f} M/s, {len(subset)} queries)"
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,157 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the batch conversion of an OMM catalogue into Cartesian states
+and back, against a conversion one object at a time with the `math` module.
+The catalogue table is used if `pyarrow` is available.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_keplerian.py [objects]
+
+"""
+
+import math
+import sys
+import timeit
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+from ccsds_ndm.keplerian import (
+    DEFAULT_GM,
+    omm_elements,
+    to_cartesian,
+    to_keplerian,
+)
+from ccsds_ndm.ndm_io import NdmIo
+
+omm_file_path = Path("ccsds_ndm", "tests", "data", "kvn", "omm1_ct.kvn")
+
+
+def _synthetic_omms(template, count, rng):
+    """OMMs with random mean elements, sharing the unchanged parts."""
+    values = np.column_stack(
+        [
+            rng.uniform(1.0, 16.0, count),
+            rng.uniform(0.0, 0.3, count),
+            rng.uniform(0.0, 180.0, count),
+            rng.uniform(0.0, 360.0, count),
+            rng.uniform(0.0, 360.0, count),
+            rng.uniform(0.0, 360.0, count),
+        ]
+    )
+    data = template.body.segment.data
+    elements = data.mean_elements
+    omms = []
+    for row in values:
+        mean_motion, ecc, inc, raan, argp, mean_anomaly = (
+            Decimal(f"{value:.8f}") for value in row
+        )
+        mean_elements = replace(
+            elements,
+            mean_motion=replace(elements.mean_motion, value=mean_motion),
+            eccentricity=ecc,
+            inclination=replace(elements.inclination, value=inc),
+            ra_of_asc_node=replace(elements.ra_of_asc_node, value=raan),
+            arg_of_pericenter=replace(elements.arg_of_pericenter, value=argp),
+            mean_anomaly=replace(elements.mean_anomaly, value=mean_anomaly),
+        )
+        segment = replace(
+            template.body.segment, data=replace(data, mean_elements=mean_elements)
+        )
+        omms.append(replace(template, body=replace(template.body, segment=segment)))
+    return omms
+
+
+def _single_loop(omms):
+    states = []
+    for omm in omms:
+        elements = omm.body.segment.data.mean_elements
+        mean_motion = float(elements.mean_motion.value) * 2 * math.pi / 86400.0
+        sma = (DEFAULT_GM / mean_motion**2) ** (1 / 3)
+        ecc = float(elements.eccentricity)
+        inc = math.radians(elements.inclination.value)
+        raan = math.radians(elements.ra_of_asc_node.value)
+        argp = math.radians(elements.arg_of_pericenter.value)
+        mean_anomaly = math.radians(elements.mean_anomaly.value)
+
+        ecc_anomaly = mean_anomaly
+        for _ in range(50):
+            step = (ecc_anomaly - ecc * math.sin(ecc_anomaly) - mean_anomaly) / (
+                1 - ecc * math.cos(ecc_anomaly)
+            )
+            ecc_anomaly -= step
+            if abs(step) < 1e-14:
+                break
+        nu = 2 * math.atan2(
+            math.sqrt(1 + ecc) * math.sin(ecc_anomaly / 2),
+            math.sqrt(1 - ecc) * math.cos(ecc_anomaly / 2),
+        )
+
+        p = sma * (1 - ecc**2)
+        r = p / (1 + ecc * math.cos(nu))
+        speed = math.sqrt(DEFAULT_GM / p)
+        p_axis = (
+            math.cos(raan) * math.cos(argp)
+            - math.sin(raan) * math.sin(argp) * math.cos(inc),
+            math.sin(raan) * math.cos(argp)
+            + math.cos(raan) * math.sin(argp) * math.cos(inc),
+            math.sin(argp) * math.sin(inc),
+        )
+        q_axis = (
+            -math.cos(raan) * math.sin(argp)
+            - math.sin(raan) * math.cos(argp) * math.cos(inc),
+            -math.sin(raan) * math.sin(argp)
+            + math.cos(raan) * math.cos(argp) * math.cos(inc),
+            math.cos(argp) * math.sin(inc),
+        )
+        states.append(
+            [
+                r * math.cos(nu) * p + r * math.sin(nu) * q
+                for p, q in zip(p_axis, q_axis)
+            ]
+            + [
+                speed * (-math.sin(nu) * p + (ecc + math.cos(nu)) * q)
+                for p, q in zip(p_axis, q_axis)
+            ]
+        )
+    return np.array(states)
+
+
+def main(n_objects=100_000, repeat=3):
+    rng = np.random.default_rng(0)
+    omms = _synthetic_omms(NdmIo().from_path(omm_file_path), n_objects, rng)
+    elements = omm_elements(omms)
+    states = to_cartesian(elements)
+    print(f"{n_objects} objects (best of {repeat} runs)")
+
+    benchmarks = [
+        ("extract elements", lambda: omm_elements(omms)),
+        ("to_cartesian", lambda: to_cartesian(elements)),
+        ("to_keplerian", lambda: to_keplerian(states)),
+        ("extract + to_cartesian", lambda: to_cartesian(omm_elements(omms))),
+        ("one by one (math)", lambda: _single_loop(omms)),
+    ]
+    try:
+        from ccsds_ndm.ndm_arrow import to_arrow
+
+        table = to_arrow(omms, "omm")
+        benchmarks.append(
+            ("catalogue table", lambda: to_cartesian(omm_elements(table)))
+        )
+    except ImportError:
+        pass
+
+    for label, func in benchmarks:
+        run_time = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{label:<24}{run_time:>9.3f}s  ({n_objects / run_time / 1e3:.0f} k/s)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
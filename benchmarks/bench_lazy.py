@@ -0,0 +1,50 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks opening an OEM file in lazy mode against the full read.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_lazy.py [segments] [lines_per_segment]
+
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_io import NdmIo
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(segments=20, lines_per_segment=5000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment))
+        size_mb = path.stat().st_size / 1e6
+
+        print(f"OEM with {segments} x {lines_per_segment} lines ({size_mb:.1f} MB)")
+
+        oem, open_time = _timed(lambda: NdmIo().from_path(path, lazy=True))
+        print(f"{'lazy open (segment list)':<28}{open_time:>9.3f}s")
+
+        _, seg_time = _timed(lambda: oem.body.segment[-1].data.state_vector)
+        print(f"{'lazy, last segment data':<28}{seg_time:>9.3f}s")
+
+        _, full_time = _timed(lambda: NdmIo().from_path(path))
+        print(f"{'full read':<28}{full_time:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,53 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the parse and write times for each numeric backend.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_numeric_backend.py [lines]
+
+"""
+
+import sys
+import timeit
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+from ccsds_ndm.ndm_xml_io import NdmXmlIo
+
+
+def main(lines=2000, repeat=3):
+    kvn_text = oem_kvn(lines_per_segment=lines)
+    xml_text = NdmXmlIo().to_string(NdmKvnIo().from_string(kvn_text))
+
+    print(f"OEM with {lines} state vectors (best of {repeat} runs)")
+    print(f"{'backend':<10}{'KVN read':>12}{'XML read':>12}{'XML write':>12}")
+    for numeric in ["decimal", "float", "raw"]:
+        kvn_time = min(
+            timeit.repeat(
+                lambda: NdmKvnIo().from_string(kvn_text, numeric=numeric),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        xml_time = min(
+            timeit.repeat(
+                lambda: NdmXmlIo().from_string(xml_text, numeric=numeric),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        oem = NdmXmlIo().from_string(xml_text, numeric=numeric)
+        write_time = min(
+            timeit.repeat(lambda: NdmXmlIo().to_string(oem), number=1, repeat=repeat)
+        )
+        print(f"{numeric:<10}{kvn_time:>11.3f}s{xml_time:>11.3f}s{write_time:>11.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,96 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the parallel parsing of a multi-segment OEM in KVN format and of a
+combined NDM with many OMMs in XML format against the sequential parsing, for
+an increasing number of worker processes (up to the number of CPUs by
+default). The combined NDM is generated by repeating the members of the
+`omm_combined.xml` test file.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_parallel.py [segments] [lines_per_segment] [workers] [omms]
+
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_parallel import read_kvn_parallel, read_ndm_parallel
+from ccsds_ndm.ndm_xml_io import _split_ndm_members
+
+ndm_file_path = Path("ccsds_ndm", "tests", "data", "xml", "omm_combined.xml")
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _combined_ndm(omms):
+    template = ndm_file_path.read_bytes()
+    _, members = _split_ndm_members(template)
+    start = members[0][0]
+    end = members[-1][1]
+    copies = -(-omms // len(members))
+    return template[:start] + template[start:end] * copies + template[end:]
+
+
+def _compare(label, path, sequential, parallel, workers):
+    expected, sequential_time = _timed(lambda: sequential(path))
+    print(label)
+    print(f"{'sequential':<24}{sequential_time:>8.3f}s")
+
+    n_workers = 1
+    while n_workers <= workers:
+        ndm, run_time = _timed(lambda: parallel(path, n_workers))
+        assert ndm == expected
+        print(
+            f"{f'{n_workers} worker(s)':<24}{run_time:>8.3f}s  "
+            f"(x{sequential_time / run_time:.2f})"
+        )
+        n_workers *= 2
+
+
+def main(segments=32, lines_per_segment=5000, workers=None, omms=20000):
+    workers = workers or os.cpu_count() or 1
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment, 60.0))
+        _compare(
+            f"OEM with {segments} segments of {lines_per_segment} lines "
+            f"({path.stat().st_size / 1e6:.1f} MB)",
+            path,
+            lambda path: NdmIo().from_path(path, numeric="float"),
+            lambda path, n_workers: read_kvn_parallel(
+                path, numeric="float", workers=n_workers, chunk_size=1
+            ),
+            workers,
+        )
+
+        path = Path(tmp_dir).joinpath("bench_ndm.xml")
+        path.write_bytes(_combined_ndm(omms))
+        _compare(
+            f"Combined NDM with {omms} OMMs ({path.stat().st_size / 1e6:.1f} MB)",
+            path,
+            lambda path: NdmIo().from_path(path, numeric="float"),
+            lambda path, n_workers: read_ndm_parallel(
+                path, numeric="float", workers=n_workers
+            ),
+            workers,
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:5]])
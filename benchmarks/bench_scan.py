@@ -0,0 +1,54 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the header and metadata scan of a large OEM file against the raw
+read speed and the full parsing.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_scan.py [segments] [lines_per_segment]
+
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_scan import scan_path
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(segments=50, lines_per_segment=5000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment))
+        size_mb = path.stat().st_size / 1e6
+
+        print(f"OEM with {segments} x {lines_per_segment} lines ({size_mb:.1f} MB)")
+
+        _, read_time = _timed(path.read_bytes)
+        print(f"{'raw read':<20}{read_time:>9.3f}s ({size_mb / read_time:.0f} MB/s)")
+
+        records, scan_time = _timed(lambda: scan_path(path))
+        print(f"{'scan':<20}{scan_time:>9.3f}s ({size_mb / scan_time:.0f} MB/s)")
+        assert len(records) == segments
+
+        if segments * lines_per_segment <= 100_000:
+            _, full_time = _timed(lambda: NdmIo().from_path(path))
+            print(f"{'full read':<20}{full_time:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
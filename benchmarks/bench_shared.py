@@ -0,0 +1,91 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the parallel reading of a multi-segment OEM in KVN format as
+columnar sections in shared memory against the parallel parsing into object
+trees (pickled back from the workers) followed by the columnar views, for an
+increasing number of worker processes (up to the number of CPUs by default).
+The sizes of the pickled object trees and of the pickled metadata are given
+as well.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_shared.py [segments] [lines_per_segment] [workers]
+
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from synthetic import oem_kvn
+
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.ndm_parallel import read_kvn_parallel
+from ccsds_ndm.ndm_shared import _segment_sections, read_columns_parallel
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _object_columns(path, workers):
+    ndm = read_kvn_parallel(path, numeric="float", workers=workers, chunk_size=1)
+    return [columns.states for columns in message_columns(ndm)]
+
+
+def _shared_columns(path, workers):
+    with read_columns_parallel(path, workers=workers, chunk_size=1) as shared:
+        return [section.arrays["states"].copy() for section in shared]
+
+
+def main(segments=32, lines_per_segment=5000, workers=None):
+    workers = workers or os.cpu_count() or 1
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir).joinpath("bench_oem.kvn")
+        path.write_text(oem_kvn(segments, lines_per_segment, 60.0))
+        print(
+            f"OEM with {segments} segments of {lines_per_segment} lines "
+            f"({path.stat().st_size / 1e6:.1f} MB)"
+        )
+
+        # transferred from the workers: full object tree vs. metadata only
+        ndm = read_kvn_parallel(path, numeric="float", workers=1)
+        tree_size = len(pickle.dumps(ndm))
+        meta_size = len(
+            pickle.dumps(
+                [
+                    (segment.metadata, _segment_sections(segment)[1])
+                    for segment in ndm.body.segment
+                ]
+            )
+        )
+        print(f"{'pickled object tree':<24}{tree_size / 1e3:>8.1f} kB")
+        print(f"{'pickled metadata':<24}{meta_size / 1e3:>8.1f} kB")
+        del ndm
+
+        n_workers = 1
+        while n_workers <= workers:
+            expected, object_time = _timed(lambda: _object_columns(path, n_workers))
+            states, shared_time = _timed(lambda: _shared_columns(path, n_workers))
+            for array, expected_array in zip(states, expected):
+                np.testing.assert_array_equal(array, expected_array)
+            print(
+                f"{f'{n_workers} worker(s)':<24}objects {object_time:>8.3f}s  "
+                f"shared {shared_time:>8.3f}s  (x{object_time / shared_time:.2f})"
+            )
+            n_workers *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,69 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks saving and loading an OEM object tree as a snapshot against
+`pickle`, for each numeric backend.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_snapshot.py [segments] [lines_per_segment]
+
+"""
+
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+from ccsds_ndm.ndm_snapshot import load_snapshot, save_snapshot
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(segments=5, lines_per_segment=2000):
+    text = oem_kvn(segments, lines_per_segment)
+    print(f"OEM with {segments} x {lines_per_segment} lines")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = Path(tmp_dir).joinpath("bench_oem.ndmsnap")
+        pickle_path = Path(tmp_dir).joinpath("bench_oem.pickle")
+
+        for numeric in ["decimal", "float", "raw"]:
+            oem = NdmKvnIo().from_string(text, numeric=numeric)
+            print(f"\n{numeric} backend")
+
+            _, save_time = _timed(lambda: save_snapshot(oem, snapshot_path))
+            _, load_time = _timed(lambda: load_snapshot(snapshot_path))
+            _, lazy_time = _timed(lambda: load_snapshot(snapshot_path, lazy=True))
+            size_mb = snapshot_path.stat().st_size / 1e6
+            print(
+                f"{'snapshot':<16}save {save_time:>7.3f}s  load {load_time:>7.3f}s  "
+                f"lazy load {lazy_time:>7.4f}s  ({size_mb:.1f} MB)"
+            )
+
+            _, save_time = _timed(
+                lambda: pickle_path.write_bytes(
+                    pickle.dumps(oem, protocol=pickle.HIGHEST_PROTOCOL)
+                )
+            )
+            _, load_time = _timed(lambda: pickle.loads(pickle_path.read_bytes()))
+            size_mb = pickle_path.stat().st_size / 1e6
+            print(
+                f"{'pickle':<16}save {save_time:>7.3f}s  load {load_time:>7.3f}s  "
+                f"{'':<21}({size_mb:.1f} MB)"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
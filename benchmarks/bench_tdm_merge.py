@@ -0,0 +1,94 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the streaming merge of the observations of many TDM files, against
+reading all the files in full and sorting the observations. The peak memory
+use of both is measured separately with `tracemalloc`.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_tdm_merge.py [files] [segments] [lines_per_segment]
+
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from synthetic import tdm_kvn
+
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.tdm_merge import merge_tdms
+
+
+def _streaming_merge(paths):
+    count = 0
+    for _ in merge_tdms(paths):
+        count += 1
+    return count
+
+
+def _full_read_and_sort(paths):
+    observations = []
+    for source_index, path in enumerate(paths):
+        tdm = NdmIo().from_path(path)
+        for segment_index, columns in enumerate(message_columns(tdm)):
+            observations.extend(
+                zip(
+                    columns.epochs_ns.tolist(),
+                    [source_index] * len(columns),
+                    [segment_index] * len(columns),
+                    columns.keywords.tolist(),
+                    columns.values.tolist(),
+                )
+            )
+    observations.sort(key=lambda obs: obs[:3])
+    return len(observations)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main(files=20, segments=4, lines_per_segment=1000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for n in range(files):
+            path = Path(tmp_dir).joinpath(f"bench_tdm_{n}.kvn")
+            path.write_text(
+                tdm_kvn(segments, lines_per_segment, 1.0, n * 600.0, f"DSS-{n}")
+            )
+            paths.append(path)
+
+        print(f"{files} TDMs with {segments} x {lines_per_segment} lines")
+
+        for label, func in [
+            ("streaming merge", lambda: _streaming_merge(paths)),
+            ("full read and sort", lambda: _full_read_and_sort(paths)),
+        ]:
+            count, run_time = _timed(func)
+            peak = _peak_memory(func)
+            print(
+                f"{label:<24}{run_time:>8.3f}s  ({count / run_time / 1e3:.0f} k obs/s,"
+                f" peak {peak:.1f} MB)"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
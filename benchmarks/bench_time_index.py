@@ -0,0 +1,87 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the segment time index against a scan of the segments for each
+query epoch.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_time_index.py [segments] [queries]
+
+"""
+
+import sys
+import timeit
+
+import numpy as np
+from synthetic import oem_kvn
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+from ccsds_ndm.time_index import TimeIndex
+
+
+def _scan(oem, query_ns):
+    ranges = [
+        tuple(
+            parse_epochs_ns([segment.metadata.start_time, segment.metadata.stop_time])
+        )
+        for segment in oem.body.segment
+    ]
+    result = []
+    for epoch in query_ns:
+        for seg_id, (start_ns, stop_ns) in enumerate(ranges):
+            if start_ns <= epoch <= stop_ns:
+                epochs_ns = segment_columns(oem.body.segment[seg_id]).epochs_ns
+                row = int(np.searchsorted(epochs_ns, epoch, side="right")) - 1
+                result.append((seg_id, row))
+                break
+        else:
+            result.append((-1, -1))
+    return result
+
+
+def main(n_segments=1000, n_queries=1_000_000, repeat=3):
+    oem = NdmKvnIo().from_string(oem_kvn(n_segments, 10))
+    index = TimeIndex(oem)
+    start_ns, stop_ns = index.span
+    query_ns = np.random.default_rng(0).integers(start_ns, stop_ns, n_queries)
+
+    run_time = min(timeit.repeat(lambda: TimeIndex(oem), number=1, repeat=repeat))
+    print(f"{n_segments} segments, index build: {run_time:.3f}s")
+
+    run_time = min(
+        timeit.repeat(lambda: index.locate(query_ns), number=1, repeat=repeat)
+    )
+    print(
+        f"{'batch lookup':<24}{run_time:>9.3f}s  "
+        f"({n_queries / run_time / 1e6:.2f} M/s, {n_queries} queries)"
+    )
+
+    subset = query_ns[:10_000].tolist()
+    run_time = min(
+        timeit.repeat(
+            lambda: [index.locate_epoch(epoch) for epoch in subset],
+            number=1,
+            repeat=repeat,
+        )
+    )
+    print(
+        f"{'single lookups':<24}{run_time:>9.3f}s  "
+        f"({len(subset) / run_time / 1e6:.3f} M/s, {len(subset)} queries)"
+    )
+
+    subset = query_ns[:1000]
+    run_time = min(timeit.repeat(lambda: _scan(oem, subset), number=1, repeat=repeat))
+    print(
+        f"{'segment scan':<24}{run_time:>9.3f}s  "
+        f"({len(subset) / run_time / 1e6:.4f} M/s, {len(subset)} queries)"
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
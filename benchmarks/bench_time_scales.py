@@ -0,0 +1,57 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the vectorised time scale conversions against a `datetime` loop.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_time_scales.py [epochs]
+
+"""
+
+import bisect
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ccsds_ndm.epochs import format_epochs_ns
+from ccsds_ndm.time_scales import convert_epochs_ns, get_leap_second_table
+
+
+def _datetime_loop(epochs, starts, offsets):
+    # typical per-epoch conversion: parse, look up the leap seconds, shift
+    gps_epochs = []
+    for epoch in epochs:
+        utc = datetime.fromisoformat(epoch)
+        tai_minus_utc = offsets[bisect.bisect_right(starts, utc) - 1]
+        gps_epochs.append(utc + timedelta(seconds=tai_minus_utc - 19))
+    return gps_epochs
+
+
+def main(n_epochs=1_000_000, repeat=3):
+    epochs_ns = np.arange(n_epochs, dtype=np.int64) * 1_000_000_000 + 10**18
+    epoch_strings = format_epochs_ns(epochs_ns, 6).tolist()
+
+    table = get_leap_second_table()
+    starts = [
+        datetime.fromisoformat(str(epoch)[:19])
+        for epoch in table.start_ns.view("datetime64[ns]")
+    ]
+    offsets = table.tai_minus_utc_s.tolist()
+
+    print(f"{n_epochs} epochs, UTC to GPS (best of {repeat} runs)")
+    for label, func in [
+        ("datetime loop", lambda: _datetime_loop(epoch_strings, starts, offsets)),
+        ("vectorised", lambda: convert_epochs_ns(epochs_ns, "UTC", "GPS")),
+    ]:
+        run_time = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{label:<16}{run_time:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
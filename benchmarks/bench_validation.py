@@ -0,0 +1,68 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Benchmarks the validation of a large OEM against its parse time, as well as
+against a naive validation visiting the objects one by one and matching the
+patterns of their fields from the model metadata.
+
+Run from the repository root (with `ccsds_ndm` installed or on the path)::
+
+    python benchmarks/bench_validation.py [lines] [numeric]
+
+"""
+
+import re
+import sys
+import time
+from dataclasses import fields, is_dataclass
+
+from synthetic import oem_kvn
+
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.validation import validate
+
+
+def _naive_validate(obj, issues):
+    for fld in fields(obj):
+        value = getattr(obj, fld.name)
+        if value is None:
+            if fld.metadata.get("required"):
+                issues.append(fld.name)
+            continue
+        pattern = fld.metadata.get("pattern")
+        if pattern is not None and not re.fullmatch(pattern, str(value).strip()):
+            issues.append(fld.name)
+        for item in value if isinstance(value, list) else [value]:
+            if is_dataclass(item):
+                _naive_validate(item, issues)
+    return issues
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(lines=100000, numeric="float"):
+    text = oem_kvn(1, lines, 1.0)
+    oem, parse_time = _timed(lambda: NdmIo().from_string(text, numeric=numeric))
+
+    print(f"OEM with {lines} lines ({numeric} numeric backend)")
+    print(f"{'parse':<24}{parse_time:>8.3f}s")
+    for label, func in [
+        ("validation", lambda: validate(oem)),
+        ("naive validation", lambda: _naive_validate(oem, [])),
+    ]:
+        issues, run_time = _timed(func)
+        print(
+            f"{label:<24}{run_time:>8.3f}s  ({run_time / parse_time:.1%} of parse,"
+            f" {len(issues)} issues)"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]], *sys.argv[2:3])
@@ -0,0 +1,231 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Synthetic NDM data generators for the benchmarks.
+
+"""
+
+import math
+from datetime import datetime, timedelta
+
+_OEM_HEADER = """CCSDS_OEM_VERS = 2.0
+CREATION_DATE  = 2021-01-01T00:00:00
+ORIGINATOR     = BENCHMARK
+"""
+
+_OEM_METADATA = """
+META_START
+OBJECT_NAME          = BENCH SAT
+OBJECT_ID            = 2021-001A
+CENTER_NAME          = EARTH
+REF_FRAME            = EME2000
+TIME_SYSTEM          = UTC
+START_TIME           = {start}
+STOP_TIME            = {stop}
+INTERPOLATION        = LAGRANGE
+INTERPOLATION_DEGREE = 7
+META_STOP
+
+"""
+
+
+_AEM_HEADER = """CCSDS_AEM_VERS = 1.0
+CREATION_DATE  = 2021-01-01T00:00:00
+ORIGINATOR     = BENCHMARK
+"""
+
+_AEM_METADATA = """
+META_START
+OBJECT_NAME          = BENCH SAT
+OBJECT_ID            = 2021-001A
+REF_FRAME_A          = EME2000
+REF_FRAME_B          = SC_BODY
+ATTITUDE_DIR         = A2B
+TIME_SYSTEM          = UTC
+START_TIME           = {start}
+STOP_TIME            = {stop}
+ATTITUDE_TYPE        = QUATERNION/DERIVATIVE
+QUATERNION_TYPE      = FIRST
+INTERPOLATION_METHOD = SLERP
+META_STOP
+
+"""
+
+_TDM_HEADER = """CCSDS_TDM_VERS = 1.0
+CREATION_DATE  = 2021-01-01T00:00:00
+ORIGINATOR     = BENCHMARK
+"""
+
+_TDM_METADATA = """
+META_START
+TIME_SYSTEM   = UTC
+START_TIME    = {start}
+STOP_TIME     = {stop}
+PARTICIPANT_1 = {station}
+PARTICIPANT_2 = BENCH SAT
+MODE          = SEQUENTIAL
+PATH          = 1,2
+META_STOP
+
+"""
+
+
+def _epoch_str(epoch):
+    """Formats the epoch in CCSDS calendar format."""
+    return epoch.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def circular_state(t, radius=7000.0, gm=398600.4418):
+    """Position and velocity on a circular equatorial orbit at `t` seconds."""
+    n = math.sqrt(gm / radius**3)
+    v = n * radius
+    return (
+        radius * math.cos(n * t),
+        radius * math.sin(n * t),
+        0.0,
+        -v * math.sin(n * t),
+        v * math.cos(n * t),
+        0.0,
+    )
+
+
+def oem_kvn(segments=1, lines_per_segment=1000, step=60.0):
+    """
+    Generates a synthetic OEM in KVN format.
+
+    Parameters
+    ----------
+    segments : int
+        number of segments
+    lines_per_segment : int
+        number of state vector lines in each segment
+    step : float
+        step size between the state vectors [s]
+
+    Returns
+    -------
+    str
+        OEM data in KVN format
+    """
+    start = datetime(2021, 1, 1)
+    out = [_OEM_HEADER]
+    t = 0.0
+    for _ in range(segments):
+        seg_start = start + timedelta(seconds=t)
+        seg_stop = seg_start + timedelta(seconds=step * (lines_per_segment - 1))
+        out.append(
+            _OEM_METADATA.format(start=_epoch_str(seg_start), stop=_epoch_str(seg_stop))
+        )
+        for i in range(lines_per_segment):
+            epoch = start + timedelta(seconds=t + i * step)
+            state = circular_state(t + i * step)
+            out.append(
+                _epoch_str(epoch) + " " + " ".join(f"{x:.9f}" for x in state) + "\n"
+            )
+        t += step * (lines_per_segment - 1)
+
+    return "".join(out)
+
+
+def spin_quaternion(t, rate=0.01):
+    """Quaternion and its derivative of a constant rate spin about Z at `t`
+    seconds (scalar first)."""
+    half_angle = rate * t / 2
+    return (
+        math.cos(half_angle),
+        0.0,
+        0.0,
+        math.sin(half_angle),
+        -rate / 2 * math.sin(half_angle),
+        0.0,
+        0.0,
+        rate / 2 * math.cos(half_angle),
+    )
+
+
+def aem_kvn(segments=1, lines_per_segment=1000, step=10.0):
+    """
+    Generates a synthetic AEM in KVN format, with quaternions and derivatives.
+
+    Parameters
+    ----------
+    segments : int
+        number of segments
+    lines_per_segment : int
+        number of attitude lines in each segment
+    step : float
+        step size between the attitude lines [s]
+
+    Returns
+    -------
+    str
+        AEM data in KVN format
+    """
+    start = datetime(2021, 1, 1)
+    out = [_AEM_HEADER]
+    t = 0.0
+    for _ in range(segments):
+        seg_start = start + timedelta(seconds=t)
+        seg_stop = seg_start + timedelta(seconds=step * (lines_per_segment - 1))
+        out.append(
+            _AEM_METADATA.format(start=_epoch_str(seg_start), stop=_epoch_str(seg_stop))
+        )
+        for i in range(lines_per_segment):
+            epoch = start + timedelta(seconds=t + i * step)
+            state = spin_quaternion(t + i * step)
+            out.append(
+                _epoch_str(epoch) + " " + " ".join(f"{x:.12f}" for x in state) + "\n"
+            )
+        t += step * (lines_per_segment - 1)
+
+    return "".join(out)
+
+
+def tdm_kvn(
+    segments=1, lines_per_segment=1000, step=1.0, start_offset=0.0, station="DSS-25"
+):
+    """
+    Generates a synthetic TDM in KVN format, with range and angle observations.
+
+    Parameters
+    ----------
+    segments : int
+        number of segments (passes), an hour apart
+    lines_per_segment : int
+        number of observation lines in each segment
+    step : float
+        step size between the observations of the same type [s]
+    start_offset : float
+        start time of the first segment after 2021-01-01T00:00:00 [s]
+    station : str
+        tracking station (`PARTICIPANT_1`)
+
+    Returns
+    -------
+    str
+        TDM data in KVN format
+    """
+    start = datetime(2021, 1, 1)
+    out = [_TDM_HEADER]
+    for segment in range(segments):
+        t = start_offset + segment * 3600.0
+        seg_start = start + timedelta(seconds=t)
+        seg_stop = seg_start + timedelta(seconds=step * (lines_per_segment // 2))
+        out.append(
+            _TDM_METADATA.format(
+                start=_epoch_str(seg_start), stop=_epoch_str(seg_stop), station=station
+            )
+        )
+        out.append("DATA_START\n")
+        for i in range(lines_per_segment):
+            epoch = _epoch_str(start + timedelta(seconds=t + i // 2 * step))
+            if i % 2:
+                out.append(f"ANGLE_1 = {epoch} {(t + i) % 90.0:.6f}\n")
+            else:
+                out.append(f"RANGE = {epoch} {1e4 + t + i:.6f}\n")
+        out.append("DATA_STOP\n")
+
+    return "".join(out)
@@ -0,0 +1,692 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Vectorised evaluation of the AEM attitude data.
+
+The attitude of each segment is converted into an (N, 4) quaternion array,
+from the quaternion or the Euler angle data (in the `EULER_ROT_SEQ`
+sequence), and interpolated at arrays of query epochs:
+
+- `SLERP`: spherical linear interpolation between the neighbouring
+  quaternions (also used for the `LINEAR` metadata)
+- `SQUAD`: spherical cubic interpolation, smooth across the data points
+- `LAGRANGE`: polynomial interpolation of the quaternion components through
+  `degree + 1` data points, normalised afterwards
+- `HERMITE`: polynomial interpolation of the quaternion components and
+  their derivatives (`QUATERNION/DERIVATIVE` data only), normalised
+  afterwards
+
+The interpolation method and degree are taken from the `INTERPOLATION_METHOD`
+and `INTERPOLATION_DEGREE` metadata of each segment, unless overridden.
+As with the OEM interpolation (see :mod:`ccsds_ndm.interpolation`), each
+segment is interpolated only within its useable time range.
+
+The quaternions follow the CCSDS ADM definitions: the scalar part is
+`QC`, the rotation is from frame A to frame B for `A2B` direction (and the
+reverse for `B2A`) and the Euler angles are successive rotations of the
+frame, in degrees. The quaternions are in scalar first order, unless the
+`QUATERNION_TYPE` is `LAST` or otherwise requested.
+
+"""
+
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import to_epochs_ns
+from ccsds_ndm.interpolation import (
+    DEFAULT_DEGREE,
+    InterpolationMethod,
+    _check_epochs,
+    _evaluate_segments,
+    _interpolate,
+    _SegmentStates,
+    _useable_range,
+)
+
+_QUATERNION_COLUMNS = [
+    "quaternion.qc",
+    "quaternion.q1",
+    "quaternion.q2",
+    "quaternion.q3",
+]
+"""Columnar view names of the quaternion components (scalar first)."""
+
+_QUATERNION_RATE_COLUMNS = [
+    "quaternion_rate.qc_dot",
+    "quaternion_rate.q1_dot",
+    "quaternion_rate.q2_dot",
+    "quaternion_rate.q3_dot",
+]
+"""Columnar view names of the quaternion derivative components."""
+
+_EULER_COLUMNS = [
+    "rotation_angles.rotation1",
+    "rotation_angles.rotation2",
+    "rotation_angles.rotation3",
+]
+"""Columnar view names of the Euler angles (in the rotation sequence)."""
+
+_SINGULARITY_TOLERANCE = 1e-12
+"""Tolerance for the gimbal lock in the Euler angle conversions."""
+
+_AttitudeSegment = namedtuple(
+    "_AttitudeSegment",
+    ["start_ns", "stop_ns", "setup", "direction", "scalar_first", "sequence"],
+)
+"""Interpolation setup, rotation direction, quaternion order and Euler
+rotation sequence of a single segment."""
+
+
+class AttitudeInterpolationMethod(Enum):
+    """
+    Supported attitude interpolation methods.
+    """
+
+    SLERP = "SLERP"
+    SQUAD = "SQUAD"
+    LAGRANGE = "LAGRANGE"
+    HERMITE = "HERMITE"
+
+    @staticmethod
+    def find_element(method):
+        """
+        Finds the interpolation method corresponding to the requested id.
+
+        Parameters
+        ----------
+        method : str or AttitudeInterpolationMethod
+            method id (case insensitive), e.g. the `INTERPOLATION_METHOD`
+            metadata (`LINEAR` is `SLERP`)
+
+        Returns
+        -------
+        AttitudeInterpolationMethod
+            correct `AttitudeInterpolationMethod` enum corresponding to the id
+
+        Raises
+        ------
+        ValueError
+            Interpolation method not supported.
+        """
+        if isinstance(method, AttitudeInterpolationMethod):
+            return method
+
+        method_id = str(method).strip().upper()
+        if method_id == "LINEAR":
+            return AttitudeInterpolationMethod.SLERP
+
+        for element in AttitudeInterpolationMethod:
+            if element.value == method_id:
+                return element
+
+        raise ValueError(
+            f"Unsupported attitude interpolation method: {method} "
+            f"(supported methods: SLERP, SQUAD, LAGRANGE or HERMITE)"
+        )
+
+
+class AemAttitude:
+    """
+    Attitude evaluator of an AEM.
+
+    The query epochs are in the time system of the AEM. The quaternion order,
+    rotation direction and Euler rotation sequence of the results are those
+    of the first segment, unless requested otherwise.
+
+    Parameters
+    ----------
+    aem
+        AEM object or a list of AEM segments
+    method : str or AttitudeInterpolationMethod or None
+        interpolation method, `None` to use the `INTERPOLATION_METHOD`
+        metadata of each segment (`SLERP` if not defined)
+    degree : int or None
+        interpolation degree for the `LAGRANGE` and `HERMITE` methods, `None`
+        to use the `INTERPOLATION_DEGREE` metadata of each segment
+        (:data:`.DEFAULT_DEGREE` if not defined)
+
+    Raises
+    ------
+    ValueError
+        Interpolation method or attitude type not supported, or the epochs of
+        a segment not strictly increasing.
+    """
+
+    def __init__(self, aem, method=None, degree=None):
+        segments = aem.body.segment if hasattr(aem, "body") else aem
+
+        self._segments = [
+            _attitude_segment(segment, method, degree)
+            for segment in segments
+            if segment.data is not None and segment.data.attitude_state
+        ]
+
+    @property
+    def coverage(self):
+        """Interpolation ranges of the segments as (start, stop) epoch pairs,
+        in `int64` nanoseconds since 1970-01-01T00:00:00."""
+        return [(seg.start_ns, seg.stop_ns) for seg in self._segments]
+
+    def quaternions(self, epochs, scalar_first=None, direction=None):
+        """
+        Interpolates the attitude quaternions at the query epochs.
+
+        Parameters
+        ----------
+        epochs : numpy.ndarray or list
+            query epochs as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch strings
+        scalar_first : bool or None
+            `True` for the scalar first order, `None` to follow the
+            `QUATERNION_TYPE` of the first segment
+        direction : str or RotDirectionType or None
+            rotation direction (`A2B` or `B2A`), `None` for the direction of
+            each segment
+
+        Returns
+        -------
+        numpy.ndarray
+            (N, 4) `float64` array of unit quaternions, `NaN` for the epochs
+            outside the interpolation ranges
+
+        Raises
+        ------
+        ValueError
+            Rotation direction of a segment not defined.
+        """
+        quaternions = self._quaternions(epochs, direction)
+        if scalar_first is None:
+            scalar_first = self._segments[0].scalar_first if self._segments else True
+        return quaternions if scalar_first else np.roll(quaternions, -1, axis=1)
+
+    def euler_angles(self, epochs, sequence=None, direction=None):
+        """
+        Interpolates the attitude at the query epochs as Euler angles.
+
+        Parameters
+        ----------
+        epochs : numpy.ndarray or list
+            query epochs as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch strings
+        sequence : str or RotseqType or None
+            rotation sequence (e.g. `321`), `None` to use the `EULER_ROT_SEQ`
+            of the first segment
+        direction : str or RotDirectionType or None
+            rotation direction (`A2B` or `B2A`), `None` for the direction of
+            each segment
+
+        Returns
+        -------
+        numpy.ndarray
+            (N, 3) `float64` array of Euler angles in degrees, `NaN` for the
+            epochs outside the interpolation ranges
+
+        Raises
+        ------
+        ValueError
+            Rotation sequence not defined or not valid.
+        """
+        if sequence is None:
+            sequence = self._segments[0].sequence if self._segments else None
+            if sequence is None:
+                raise ValueError("Euler rotation sequence not defined.")
+        return quaternions_to_euler(self._quaternions(epochs, direction), sequence)
+
+    def __call__(self, epochs):
+        return self.quaternions(epochs)
+
+    def _quaternions(self, epochs, direction):
+        """Interpolated scalar first quaternions in the requested direction."""
+        if direction is not None:
+            direction = _direction(direction)
+            if any(seg.direction is None for seg in self._segments):
+                raise ValueError(
+                    "Rotation direction (Q_DIR/EULER_DIR) of the AEM segment "
+                    "not defined, cannot convert."
+                )
+
+        def interpolate(seg, query_ns):
+            quaternions = _interpolate_attitude(seg.setup, query_ns)
+            if direction is not None and seg.direction != direction:
+                quaternions[:, 1:] *= -1
+            return quaternions
+
+        return _evaluate_segments(self._segments, to_epochs_ns(epochs), 4, interpolate)
+
+
+def segment_quaternions(segment, scalar_first=None):
+    """
+    Converts the attitude data of the AEM segment into quaternions.
+
+    Parameters
+    ----------
+    segment : AemSegment
+        AEM segment with quaternion or Euler angle data
+    scalar_first : bool or None
+        `True` for the scalar first order, `None` to follow the
+        `QUATERNION_TYPE` of the segment
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00 and (N, 4)
+        quaternions, in the direction of the segment
+
+    Raises
+    ------
+    ValueError
+        Attitude type not supported.
+    """
+    columns = segment_columns(segment)
+    quaternions = _segment_quaternions(segment)
+    if scalar_first is None:
+        scalar_first = _scalar_first(segment.metadata)
+    if not scalar_first:
+        quaternions = np.roll(quaternions, -1, axis=1)
+    return columns.epochs_ns, quaternions
+
+
+def quaternion_multiply(q1, q2):
+    """
+    Multiplies the scalar first quaternions (Hamilton product).
+
+    Parameters
+    ----------
+    q1 : numpy.ndarray
+        (N, 4) or (4,) quaternions
+    q2 : numpy.ndarray
+        (N, 4) or (4,) quaternions
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 4) or (4,) products
+    """
+    q1 = np.asarray(q1, dtype=np.float64)
+    q2 = np.asarray(q2, dtype=np.float64)
+    w1, v1 = q1[..., :1], q1[..., 1:]
+    w2, v2 = q2[..., :1], q2[..., 1:]
+    return np.concatenate(
+        [
+            w1 * w2 - np.sum(v1 * v2, axis=-1, keepdims=True),
+            w1 * v2 + w2 * v1 + np.cross(v1, v2),
+        ],
+        axis=-1,
+    )
+
+
+def euler_to_quaternions(angles, sequence):
+    """
+    Converts the Euler angles into scalar first quaternions.
+
+    Parameters
+    ----------
+    angles : numpy.ndarray
+        (N, 3) Euler angles in degrees, in the rotation sequence
+    sequence : str or RotseqType
+        rotation sequence (e.g. `321` for Z, then Y, then X)
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 4) quaternions
+
+    Raises
+    ------
+    ValueError
+        Rotation sequence not valid.
+    """
+    axes = _rotation_axes(sequence)
+    half_angles = np.radians(np.atleast_2d(np.asarray(angles, dtype=np.float64))) / 2
+
+    result = None
+    for n, axis in enumerate(axes):
+        rotation = np.zeros((len(half_angles), 4))
+        rotation[:, 0] = np.cos(half_angles[:, n])
+        rotation[:, axis + 1] = np.sin(half_angles[:, n])
+        result = rotation if result is None else quaternion_multiply(result, rotation)
+    return result
+
+
+def quaternions_to_euler(quaternions, sequence):
+    """
+    Converts the scalar first quaternions into Euler angles.
+
+    The first and last angles are in the (-180, 180] range, the middle angle
+    is in [-90, 90] for the sequences with three different axes (e.g. `321`)
+    and in [0, 180] for the others (e.g. `313`). At the singularities, the
+    last angle is set to zero.
+
+    Parameters
+    ----------
+    quaternions : numpy.ndarray
+        (N, 4) quaternions
+    sequence : str or RotseqType
+        rotation sequence (e.g. `321` for Z, then Y, then X)
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 3) Euler angles in degrees
+
+    Raises
+    ------
+    ValueError
+        Rotation sequence not valid.
+    """
+    i, j, k = _rotation_axes(sequence)
+    dcm = _dcm(np.atleast_2d(np.asarray(quaternions, dtype=np.float64)))
+    sign = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    if i != k:
+        # three different axes (Tait-Bryan angles)
+        angle_2 = np.arctan2(sign * dcm[:, k, i], np.hypot(dcm[:, k, j], dcm[:, k, k]))
+        angle_1 = np.arctan2(-sign * dcm[:, k, j], dcm[:, k, k])
+        angle_3 = np.arctan2(-sign * dcm[:, j, i], dcm[:, i, i])
+        singular = np.abs(dcm[:, k, i]) > 1.0 - _SINGULARITY_TOLERANCE
+    else:
+        # first and last axes are the same (proper Euler angles)
+        m = 3 - i - j
+        angle_2 = np.arctan2(np.hypot(dcm[:, k, j], dcm[:, k, m]), dcm[:, i, i])
+        angle_1 = np.arctan2(dcm[:, k, j], -sign * dcm[:, k, m])
+        angle_3 = np.arctan2(dcm[:, j, i], sign * dcm[:, m, i])
+        singular = np.abs(dcm[:, i, i]) > 1.0 - _SINGULARITY_TOLERANCE
+
+    if np.any(singular):
+        # last angle set to zero, first angle from the remaining rotation
+        remaining = np.einsum(
+            "nji,njk->nik", _axis_rotation(j, angle_2[singular]), dcm[singular]
+        )
+        a, b = (i + 1) % 3, (i + 2) % 3
+        angle_1[singular] = np.arctan2(remaining[:, a, b], remaining[:, a, a])
+        angle_3[singular] = 0.0
+
+    return np.degrees(np.stack([angle_1, angle_2, angle_3], axis=1))
+
+
+def _attitude_segment(segment, method, degree):
+    """
+    Prepares the interpolation setup of the AEM segment.
+
+    Parameters
+    ----------
+    segment : AemSegment
+        AEM segment with data
+    method : str or AttitudeInterpolationMethod or None
+        interpolation method, `None` to use the metadata
+    degree : int or None
+        interpolation degree, `None` to use the metadata
+
+    Returns
+    -------
+    _AttitudeSegment
+        interpolation setup
+    """
+    metadata = segment.metadata
+    columns = segment_columns(segment)
+    epochs_ns = columns.epochs_ns
+    _check_epochs(epochs_ns, metadata)
+
+    if method is None:
+        method = metadata.interpolation_method or AttitudeInterpolationMethod.SLERP
+    method = AttitudeInterpolationMethod.find_element(method)
+    if degree is None:
+        degree = metadata.interpolation_degree or DEFAULT_DEGREE
+
+    quaternions = _segment_quaternions(segment)
+    # consecutive quaternions in the same hemisphere, for smooth interpolation
+    flips = np.sum(quaternions[1:] * quaternions[:-1], axis=1) < 0
+    signs = np.r_[1.0, np.where(np.cumsum(flips) % 2, -1.0, 1.0)]
+    quaternions = quaternions * signs[:, np.newaxis]
+
+    if method is AttitudeInterpolationMethod.HERMITE:
+        if not set(_QUATERNION_RATE_COLUMNS) <= set(columns.names):
+            raise ValueError(
+                "Hermite attitude interpolation requires quaternion derivative "
+                "(QUATERNION/DERIVATIVE) data."
+            )
+        derivatives = np.stack(
+            [columns.column(name) for name in _QUATERNION_RATE_COLUMNS], axis=1
+        )
+        states = np.concatenate(
+            [quaternions, derivatives * signs[:, np.newaxis]], axis=1
+        )
+        n_points = max(2, -(-(int(degree) + 1) // 2))
+    elif method is AttitudeInterpolationMethod.SQUAD:
+        states = np.concatenate([quaternions, _squad_controls(quaternions)], axis=1)
+        n_points = 2
+    elif method is AttitudeInterpolationMethod.LAGRANGE:
+        states = quaternions
+        n_points = int(degree) + 1
+    else:
+        states = quaternions
+        n_points = 2
+    n_points = max(1, min(n_points, len(epochs_ns)))
+
+    start_ns, stop_ns = _useable_range(metadata, epochs_ns)
+    times = (epochs_ns - epochs_ns[0]) * 1e-9
+
+    direction = metadata.attitude_dir
+    return _AttitudeSegment(
+        start_ns,
+        stop_ns,
+        _SegmentStates(start_ns, stop_ns, epochs_ns, times, states, method, n_points),
+        None if direction is None else _direction(direction),
+        _scalar_first(metadata),
+        metadata.euler_rot_seq,
+    )
+
+
+def _segment_quaternions(segment):
+    """Quaternions (scalar first) of the AEM segment, in its direction."""
+    columns = segment_columns(segment)
+    names = columns.names
+    if set(_QUATERNION_COLUMNS) <= set(names):
+        return np.stack([columns.column(name) for name in _QUATERNION_COLUMNS], axis=1)
+
+    if set(_EULER_COLUMNS) <= set(names):
+        if segment.metadata.euler_rot_seq is None:
+            raise ValueError("Euler rotation sequence (EULER_ROT_SEQ) not defined.")
+        angles = np.stack([columns.column(name) for name in _EULER_COLUMNS], axis=1)
+        return euler_to_quaternions(angles, segment.metadata.euler_rot_seq)
+
+    raise ValueError(
+        f"Attitude type not supported for evaluation: "
+        f"{columns.attitude_field} (only quaternion and Euler angle data)"
+    )
+
+
+def _scalar_first(metadata):
+    """Checks whether the quaternion type of the segment is scalar first."""
+    quaternion_type = metadata.quaternion_type
+    if quaternion_type is None:
+        return True
+    return getattr(quaternion_type, "value", quaternion_type).upper() != "LAST"
+
+
+def _direction(direction):
+    """Rotation direction id (`A2B` or `B2A`), raises `ValueError` if not valid."""
+    direction_id = str(getattr(direction, "value", direction)).strip().upper()
+    if direction_id not in ("A2B", "B2A"):
+        raise ValueError(f"Unknown rotation direction: {direction} (A2B or B2A)")
+    return direction_id
+
+
+def _rotation_axes(sequence):
+    """Axis indices (0 to 2) of the rotation sequence (e.g. `321`)."""
+    sequence_id = str(getattr(sequence, "value", sequence)).strip()
+    if (
+        len(sequence_id) != 3
+        or any(axis not in "123" for axis in sequence_id)
+        or sequence_id[0] == sequence_id[1]
+        or sequence_id[1] == sequence_id[2]
+    ):
+        raise ValueError(f"Invalid Euler rotation sequence: {sequence}")
+    return tuple(int(axis) - 1 for axis in sequence_id)
+
+
+def _axis_rotation(axis, angles):
+    """(N, 3, 3) frame rotation matrices about the axis (0 to 2)."""
+    cos, sin = np.cos(angles), np.sin(angles)
+    a, b = (axis + 1) % 3, (axis + 2) % 3
+    matrices = np.zeros((len(angles), 3, 3))
+    matrices[:, axis, axis] = 1.0
+    matrices[:, a, a] = cos
+    matrices[:, a, b] = sin
+    matrices[:, b, a] = -sin
+    matrices[:, b, b] = cos
+    return matrices
+
+
+def _dcm(quaternions):
+    """(N, 3, 3) direction cosine matrices (frame rotations) of the
+    scalar first quaternions."""
+    q = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+    w, x, y, z = q.T
+    return np.stack(
+        [
+            np.stack(
+                [1 - 2 * (y * y + z * z), 2 * (x * y + z * w), 2 * (x * z - y * w)]
+            ),
+            np.stack(
+                [2 * (x * y - z * w), 1 - 2 * (x * x + z * z), 2 * (y * z + x * w)]
+            ),
+            np.stack(
+                [2 * (x * z + y * w), 2 * (y * z - x * w), 1 - 2 * (x * x + y * y)]
+            ),
+        ]
+    ).transpose(2, 0, 1)
+
+
+def _normalise(quaternions):
+    """Normalises the quaternions (in place)."""
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return quaternions
+
+
+def _slerp(q0, q1, fraction):
+    """
+    Spherical linear interpolation between the quaternions.
+
+    Parameters
+    ----------
+    q0 : numpy.ndarray
+        (N, 4) start quaternions
+    q1 : numpy.ndarray
+        (N, 4) end quaternions
+    fraction : numpy.ndarray
+        (N,) fraction of the way from `q0` to `q1`
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 4) interpolated quaternions
+    """
+    dot = np.sum(q0 * q1, axis=1)
+    q1 = np.where(dot[:, np.newaxis] < 0, -q1, q1)
+    angle = np.arccos(np.clip(np.abs(dot), 0.0, 1.0))
+    sin_angle = np.sin(angle)
+
+    # linear interpolation for (nearly) identical quaternions
+    small = sin_angle < 1e-12
+    safe_sin = np.where(small, 1.0, sin_angle)
+    w0 = np.where(small, 1.0 - fraction, np.sin((1.0 - fraction) * angle) / safe_sin)
+    w1 = np.where(small, fraction, np.sin(fraction * angle) / safe_sin)
+    return _normalise(w0[:, np.newaxis] * q0 + w1[:, np.newaxis] * q1)
+
+
+def _quaternion_log(quaternions):
+    """Logarithm of the unit quaternions, as (N, 3) rotation vectors / 2."""
+    vectors = quaternions[:, 1:]
+    norms = np.linalg.norm(vectors, axis=1)
+    angles = np.arctan2(norms, quaternions[:, 0])
+    scale = np.divide(angles, norms, out=np.ones_like(norms), where=norms > 1e-15)
+    return vectors * scale[:, np.newaxis]
+
+
+def _quaternion_exp(vectors):
+    """Exponential of the (N, 3) pure quaternions, as unit quaternions."""
+    norms = np.linalg.norm(vectors, axis=1)
+    scale = np.divide(
+        np.sin(norms), norms, out=np.ones_like(norms), where=norms > 1e-15
+    )
+    return np.concatenate(
+        [np.cos(norms)[:, np.newaxis], vectors * scale[:, np.newaxis]], axis=1
+    )
+
+
+def _squad_controls(quaternions):
+    """
+    Computes the SQUAD control quaternions of the data points.
+
+    Parameters
+    ----------
+    quaternions : numpy.ndarray
+        (N, 4) unit quaternions, consecutive ones in the same hemisphere
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 4) control quaternions (the data points at the ends)
+    """
+    controls = quaternions.copy()
+    if len(quaternions) < 3:
+        return controls
+
+    q = quaternions[1:-1]
+    inverse = q * np.array([1.0, -1.0, -1.0, -1.0])
+    log_next = _quaternion_log(quaternion_multiply(inverse, quaternions[2:]))
+    log_prev = _quaternion_log(quaternion_multiply(inverse, quaternions[:-2]))
+    controls[1:-1] = quaternion_multiply(q, _quaternion_exp(-(log_next + log_prev) / 4))
+    return controls
+
+
+def _interpolate_attitude(seg, query_ns):
+    """
+    Interpolates the quaternions of the segment at the query epochs.
+
+    Parameters
+    ----------
+    seg : _SegmentStates
+        interpolation setup of the segment
+    query_ns : numpy.ndarray
+        query epochs within the segment range
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 4) interpolated scalar first quaternions
+    """
+    if seg.method in (
+        AttitudeInterpolationMethod.LAGRANGE,
+        AttitudeInterpolationMethod.HERMITE,
+    ):
+        states = _interpolate(
+            seg._replace(method=InterpolationMethod[seg.method.name]), query_ns
+        )
+        return _normalise(states[:, :4])
+
+    n_samples = len(seg.epochs_ns)
+    if n_samples == 1:
+        return np.repeat(seg.states[:, :4], len(query_ns), axis=0)
+
+    # interval of each query epoch
+    first = np.clip(
+        np.searchsorted(seg.epochs_ns, query_ns, side="right") - 1, 0, n_samples - 2
+    )
+    epochs_0 = seg.epochs_ns[first]
+    fraction = (query_ns - epochs_0) / (seg.epochs_ns[first + 1] - epochs_0)
+
+    q0 = seg.states[first, :4]
+    q1 = seg.states[first + 1, :4]
+    quaternions = _slerp(q0, q1, fraction)
+    if seg.method is AttitudeInterpolationMethod.SQUAD:
+        controls = _slerp(seg.states[first, 4:], seg.states[first + 1, 4:], fraction)
+        quaternions = _slerp(quaternions, controls, 2 * fraction * (1 - fraction))
+    return quaternions
@@ -0,0 +1,505 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Chebyshev polynomial representation of the OEM state vectors.
+
+Each OEM segment is divided into intervals, with a Chebyshev polynomial for
+the position over each interval (similar to the SPK type 2 records), the
+velocity being its derivative. The coefficients are fitted by least squares
+to the positions and the velocities of the state vectors within the
+interval. The intervals are found by bisection: starting from the whole
+segment, an interval is halved (at its middle state vector) until the fit
+errors at all its state vectors are within the tolerances. An interval of two
+state vectors is fitted exactly (cubic Hermite polynomial).
+
+The coefficients of all the intervals of a segment are kept in a single
+`numpy` array, so that the states at any number of epochs are evaluated
+together with the Clenshaw recurrence. As the fit errors are checked only at
+the state vectors, the step of the original data should be small enough to
+resolve the trajectory, which is the usual case for the dense ephemerides
+(e.g. 1 second steps) that benefit the most from the compression.
+
+The representation can be saved to and loaded from a compact `numpy` file,
+with the header and the metadata of the OEM stored as XML. Sampled OEMs are
+regenerated at any step, without the covariance data of the original.
+
+"""
+
+import dataclasses
+import os
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.ephemeris_stream import cut_metadata, state_vectors
+from ccsds_ndm.epochs import to_epochs_ns
+from ccsds_ndm.interpolation import (
+    _check_epochs,
+    _evaluate_segments,
+    _useable_range,
+)
+from ccsds_ndm.models.ndmxml2 import Oem, OemData, OemSegment
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+from ccsds_ndm.ndm_lazy import _loaded_data
+
+DEFAULT_DEGREE = 15
+"""Degree of the Chebyshev polynomials when not given."""
+
+_FORMAT_VERSION = 1
+"""Version of the saved file format."""
+
+_ChebyshevSegment = namedtuple(
+    "_ChebyshevSegment", ["start_ns", "stop_ns", "breaks_ns", "coefficients"]
+)
+"""Chebyshev polynomials of a single segment, valid within [`start_ns`,
+`stop_ns`]. `breaks_ns` are the (n + 1) interval boundaries and
+`coefficients` the (n, degree + 1, 3) position coefficients of the n
+intervals."""
+
+
+class ChebyshevEphemeris:
+    """
+    Chebyshev polynomial representation of the OEM state vectors.
+
+    Use :meth:`fit` to create it from an OEM and :meth:`load` to load a saved
+    one. The query epochs are in the time system of the OEM, all segments
+    share the same time system.
+
+    Parameters
+    ----------
+    message : Oem
+        OEM header and metadata (without the data), one segment for each
+        element of `segments`
+    segments
+        Chebyshev polynomials of each segment
+    """
+
+    def __init__(self, message, segments):
+        self.message = message
+        self._segments = list(segments)
+
+    @classmethod
+    def fit(cls, oem, tolerance=1e-6, velocity_tolerance=None, degree=None):
+        """
+        Fits the Chebyshev polynomials to the state vectors of the OEM.
+
+        The segments are processed one at a time, the data blocks of an OEM
+        read in lazy mode are not kept in memory. The segments with less
+        than two state vectors are skipped.
+
+        Parameters
+        ----------
+        oem : Oem or Path or AnyStr
+            OEM object or file path (read in lazy mode)
+        tolerance : float
+            maximum position error at the state vectors [km]
+        velocity_tolerance : float or None
+            maximum velocity error at the state vectors [km/s], `None` for
+            `tolerance` per 1000 seconds
+        degree : int or None
+            degree of the polynomials, `None` for :data:`DEFAULT_DEGREE`
+
+        Returns
+        -------
+        ChebyshevEphemeris
+            Chebyshev polynomial representation
+
+        Raises
+        ------
+        TypeError
+            Source is not an OEM.
+        ValueError
+            Tolerances or degree not positive, segments with different time
+            systems, or the epochs of a segment not strictly increasing.
+        """
+        if not isinstance(oem, Oem):
+            oem = NdmIo().from_path(oem, lazy=True)
+            if not isinstance(oem, Oem):
+                raise TypeError(
+                    f"Chebyshev polynomials can only be fitted to OEMs, "
+                    f"found {type(oem).__name__}."
+                )
+        if velocity_tolerance is None:
+            velocity_tolerance = tolerance * 1e-3
+        degree = DEFAULT_DEGREE if degree is None else int(degree)
+        if tolerance <= 0 or velocity_tolerance <= 0 or degree < 1:
+            raise ValueError(
+                f"Tolerances ({tolerance}, {velocity_tolerance}) and degree "
+                f"({degree}) should be positive."
+            )
+
+        time_systems = {segment.metadata.time_system for segment in oem.body.segment}
+        if len(time_systems) > 1:
+            raise ValueError(
+                f"OEM segments with different time systems cannot be fitted "
+                f"together: {', '.join(map(str, time_systems))}"
+            )
+
+        fitted = []
+        metadata = []
+        for segment in oem.body.segment:
+            # the lazy data block is not kept in the segment
+            loaded = OemSegment(metadata=segment.metadata, data=_loaded_data(segment))
+            if loaded.data is None or len(loaded.data.state_vector) < 2:
+                continue
+            fitted.append(_fit_segment(loaded, degree, tolerance, velocity_tolerance))
+            metadata.append(segment.metadata)
+
+        return cls(_skeleton(oem, metadata), fitted)
+
+    @property
+    def coverage(self):
+        """Validity ranges of the segments as (start, stop) epoch pairs, in
+        `int64` nanoseconds since 1970-01-01T00:00:00."""
+        return [(seg.start_ns, seg.stop_ns) for seg in self._segments]
+
+    @property
+    def degree(self):
+        """Degree of the polynomials."""
+        if not self._segments:
+            return None
+        return self._segments[0].coefficients.shape[1] - 1
+
+    @property
+    def interval_count(self):
+        """Total number of the polynomial intervals."""
+        return sum(len(seg.coefficients) for seg in self._segments)
+
+    @property
+    def nbytes(self):
+        """Memory used by the polynomial intervals, in bytes."""
+        return sum(
+            seg.breaks_ns.nbytes + seg.coefficients.nbytes for seg in self._segments
+        )
+
+    def states(self, epochs):
+        """
+        Evaluates the states at the query epochs.
+
+        Parameters
+        ----------
+        epochs : numpy.ndarray or list
+            query epochs as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch strings
+
+        Returns
+        -------
+        numpy.ndarray
+            (N, 6) `float64` array of position and velocity, `NaN` for the
+            epochs outside the validity ranges
+        """
+        return _evaluate_segments(self._segments, to_epochs_ns(epochs), 6, _evaluate)
+
+    def __call__(self, epochs):
+        return self.states(epochs)
+
+    def to_oem(self, step, start=None, stop=None):
+        """
+        Regenerates an OEM with the states sampled at regular steps.
+
+        The samples of each segment start at its start time (or `start`, if
+        later) and continue at `step` intervals until its stop time (or
+        `stop`, if earlier). The segments without any samples are skipped.
+
+        Parameters
+        ----------
+        step : float
+            step between the samples [s]
+        start : int or numpy.datetime64 or str or None
+            start epoch (`int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch string), `None` for the start of each
+            segment
+        stop : int or numpy.datetime64 or str or None
+            stop epoch (included), `None` for the end of each segment
+
+        Returns
+        -------
+        Oem
+            OEM with the sampled state vectors
+
+        Raises
+        ------
+        ValueError
+            Step is not positive.
+        """
+        step_ns = int(round(step * 1e9))
+        if step_ns <= 0:
+            raise ValueError(f"Step should be positive: {step} s")
+        start_ns = None if start is None else int(to_epochs_ns([start])[0])
+        stop_ns = None if stop is None else int(to_epochs_ns([stop])[0])
+
+        segments = []
+        for segment, seg in zip(self.message.body.segment, self._segments):
+            first_ns = seg.start_ns if start_ns is None else max(seg.start_ns, start_ns)
+            last_ns = seg.stop_ns if stop_ns is None else min(seg.stop_ns, stop_ns)
+            if first_ns > last_ns:
+                continue
+            epochs_ns = np.arange(first_ns, last_ns + 1, step_ns, dtype=np.int64)
+            states = _evaluate_segments([seg], epochs_ns, 6, _evaluate)
+
+            metadata = cut_metadata(segment.metadata, first_ns, last_ns)
+            data = OemData(state_vector=state_vectors(epochs_ns, states))
+            segments.append(OemSegment(metadata=metadata, data=data))
+
+        body = dataclasses.replace(self.message.body, segment=segments)
+        return dataclasses.replace(self.message, body=body)
+
+    def save(self, file_path):
+        """
+        Saves the representation to the file (atomically replacing any
+        existing file).
+
+        Parameters
+        ----------
+        file_path : Path or AnyStr
+            path of the output file
+        """
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        segments = self._segments
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=file_path.name, suffix=".tmp", dir=file_path.parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    format_version=_FORMAT_VERSION,
+                    message=NdmIo().to_string(self.message, NDMFileFormats.XML),
+                    ranges_ns=np.array(
+                        [(seg.start_ns, seg.stop_ns) for seg in segments],
+                        dtype=np.int64,
+                    ).reshape(-1, 2),
+                    interval_counts=np.array(
+                        [len(seg.coefficients) for seg in segments], dtype=np.int64
+                    ),
+                    breaks_ns=_concatenate(
+                        [seg.breaks_ns for seg in segments], (0,), np.int64
+                    ),
+                    coefficients=_concatenate(
+                        [seg.coefficients for seg in segments], (0, 1, 3), np.float64
+                    ),
+                )
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Loads the representation from the file.
+
+        Parameters
+        ----------
+        file_path : Path or AnyStr
+            path of the file
+
+        Returns
+        -------
+        ChebyshevEphemeris
+            Chebyshev polynomial representation
+
+        Raises
+        ------
+        ValueError
+            File is not readable or has an older format.
+        """
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                if int(data["format_version"]) != _FORMAT_VERSION:
+                    raise ValueError(f"File {file_path} has an older format.")
+                message = NdmIo().from_string(str(data["message"]))
+                ranges_ns = data["ranges_ns"]
+                interval_counts = data["interval_counts"]
+                breaks_ns = data["breaks_ns"]
+                coefficients = data["coefficients"]
+        except (OSError, KeyError, EOFError) as err:
+            raise ValueError(f"File {file_path} could not be read.") from err
+
+        segments: List[_ChebyshevSegment] = []
+        first = 0
+        for (start_ns, stop_ns), count in zip(
+            ranges_ns.tolist(), interval_counts.tolist()
+        ):
+            # each segment has one more break than intervals
+            first_break = first + len(segments)
+            segments.append(
+                _ChebyshevSegment(
+                    start_ns,
+                    stop_ns,
+                    breaks_ns[first_break : first_break + count + 1],
+                    coefficients[first : first + count],
+                )
+            )
+            first += count
+        return cls(message, segments)
+
+
+def _skeleton(oem, metadata):
+    """OEM with the header and the segment metadata, without the data."""
+    segments = [OemSegment(metadata=seg_metadata) for seg_metadata in metadata]
+    return dataclasses.replace(
+        oem, body=dataclasses.replace(oem.body, segment=segments)
+    )
+
+
+def _concatenate(arrays, empty_shape, dtype):
+    """Concatenates the arrays, empty array of the shape if none."""
+    if not arrays:
+        return np.empty(empty_shape, dtype=dtype)
+    return np.concatenate(arrays)
+
+
+def _fit_segment(segment, degree, tolerance, velocity_tolerance):
+    """
+    Fits the Chebyshev polynomials to the state vectors of the segment.
+
+    Parameters
+    ----------
+    segment : OemSegment
+        OEM segment with at least two state vectors
+    degree : int
+        degree of the polynomials
+    tolerance : float
+        maximum position error [km]
+    velocity_tolerance : float
+        maximum velocity error [km/s]
+
+    Returns
+    -------
+    _ChebyshevSegment
+        Chebyshev polynomials of the segment
+    """
+    columns = segment_columns(segment)
+    epochs_ns = columns.epochs_ns
+    _check_epochs(epochs_ns, segment.metadata)
+    start_ns, stop_ns = _useable_range(segment.metadata, epochs_ns)
+
+    times = (epochs_ns - epochs_ns[0]) * 1e-9
+    positions = columns.states[:, :3]
+    velocities = columns.states[:, 3:6]
+
+    weight = tolerance / velocity_tolerance
+
+    # bisection, first half first so that the intervals are in time order
+    breaks = []
+    coefficients = []
+    pending = [(0, len(epochs_ns) - 1)]
+    while pending:
+        first, last = pending.pop()
+        rows = slice(first, last + 1)
+        coefs, errors = _fit_interval(
+            times[rows], positions[rows], velocities[rows], degree, weight
+        )
+        if last - first > 1 and (
+            errors[0] > tolerance or errors[1] > velocity_tolerance
+        ):
+            middle = (first + last) // 2
+            pending.extend([(middle, last), (first, middle)])
+            continue
+        breaks.append(first)
+        coefficients.append(coefs)
+    breaks.append(len(epochs_ns) - 1)
+
+    return _ChebyshevSegment(
+        start_ns, stop_ns, epochs_ns[breaks], np.stack(coefficients)
+    )
+
+
+def _fit_interval(times, positions, velocities, degree, weight):
+    """
+    Fits a Chebyshev polynomial to the positions and velocities.
+
+    Parameters
+    ----------
+    times : numpy.ndarray
+        (k,) times of the states [s], at least two
+    positions : numpy.ndarray
+        (k, 3) positions
+    velocities : numpy.ndarray
+        (k, 3) velocities
+    degree : int
+        maximum degree of the polynomial, reduced to `2k - 1` if necessary
+    weight : float
+        weight of the velocities relative to the positions in the fit (the
+        ratio of the tolerances)
+
+    Returns
+    -------
+    (numpy.ndarray, (float, float))
+        (degree + 1, 3) coefficients (zero padded if the degree is reduced)
+        and the maximum position and velocity errors
+    """
+    half_span = 0.5 * (times[-1] - times[0])
+    tau = (times - times[0]) / half_span - 1.0
+
+    fit_degree = min(degree, 2 * len(times) - 1)
+    vander = chebyshev.chebvander(tau, fit_degree)
+    # derivatives of the basis polynomials, in units of the times
+    d_vander = chebyshev.chebvander(tau, fit_degree - 1) @ chebyshev.chebder(
+        np.eye(fit_degree + 1)
+    )
+    d_vander /= half_span
+
+    fit_coefs = np.linalg.lstsq(
+        np.concatenate([vander, weight * d_vander]),
+        np.concatenate([positions, weight * velocities]),
+        rcond=None,
+    )[0]
+
+    errors = (
+        np.linalg.norm(vander @ fit_coefs - positions, axis=1).max(),
+        np.linalg.norm(d_vander @ fit_coefs - velocities, axis=1).max(),
+    )
+    coefs = np.zeros((degree + 1, 3))
+    coefs[: fit_degree + 1] = fit_coefs
+    return coefs, errors
+
+
+def _evaluate(seg, query_ns):
+    """
+    Evaluates the polynomials of the segment at the query epochs.
+
+    Parameters
+    ----------
+    seg : _ChebyshevSegment
+        Chebyshev polynomials of the segment
+    query_ns : numpy.ndarray
+        query epochs within the segment range
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 6) positions and velocities
+    """
+    interval = np.clip(
+        np.searchsorted(seg.breaks_ns, query_ns, side="right") - 1,
+        0,
+        len(seg.coefficients) - 1,
+    )
+    start_ns = seg.breaks_ns[interval]
+    span_ns = seg.breaks_ns[interval + 1] - start_ns
+    tau = (2.0 * (query_ns - start_ns) / span_ns - 1.0)[:, np.newaxis]
+    coefs = seg.coefficients[interval]
+
+    # Clenshaw recurrence for the value and its derivative (in tau)
+    b_1 = np.zeros((len(query_ns), 3))
+    b_2 = np.zeros_like(b_1)
+    d_1 = np.zeros_like(b_1)
+    d_2 = np.zeros_like(b_1)
+    for k in range(coefs.shape[1] - 1, 0, -1):
+        d_1, d_2 = 2.0 * b_1 + 2.0 * tau * d_1 - d_2, d_1
+        b_1, b_2 = coefs[:, k] + 2.0 * tau * b_1 - b_2, b_1
+    positions = coefs[:, 0] + tau * b_1 - b_2
+    velocities = (b_1 + tau * d_1 - d_2) / (0.5e-9 * span_ns)[:, np.newaxis]
+    return np.concatenate([positions, velocities], axis=1)
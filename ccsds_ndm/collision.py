@@ -0,0 +1,374 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Batch computation of the collision probabilities of the CDMs.
+
+The states and covariances of both objects are collected from the CDMs into
+arrays (see :func:`cdm_encounters`) and the probabilities are computed for
+all the CDMs together, with the short encounter (2D) assumption:
+
+- The relative motion is linear around the time of closest approach (`TCA`)
+  and the position covariances are constant, the combined covariance is the
+  sum of the covariances of the two objects.
+- The combined covariance and the miss vector are projected onto the
+  encounter plane, normal to the relative velocity.
+- The probability is the integral of the 2D Gaussian over the circle of the
+  combined hard body radius, centred on the origin.
+
+The integral is evaluated as in Alfano (2005): in the principal axes of the
+covariance, the integral along the minor axis is analytical (`erfc`) and the
+one along the major axis is numerical (Gauss-Legendre quadrature over the part
+of the circle within 10 standard deviations of the miss distance, split
+where the chords reach the miss distance along the minor axis).
+Foster (1992) integrates the same function over the circle numerically.
+
+The states in `ITRF` are used as they are, this neglects the rotation of the
+frame.
+
+"""
+
+from collections import namedtuple
+from typing import List
+
+import numpy as np
+
+from ccsds_ndm.columnar import enum_value
+from ccsds_ndm.covariance import cdm_covariances
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Cdm
+
+DEFAULT_NODES = 64
+"""Default number of quadrature nodes along the major axis."""
+
+_SIGMA_LIMIT = 10.0
+"""Integration range along the major axis around the miss distance, in
+standard deviations."""
+
+_ERFC_COEFFICIENTS = np.array(
+    [
+        -1.3026537197817094,
+        6.4196979235649026e-1,
+        1.9476473204185836e-2,
+        -9.561514786808631e-3,
+        -9.46595344482036e-4,
+        3.66839497852761e-4,
+        4.2523324806907e-5,
+        -2.0278578112534e-5,
+        -1.624290004647e-6,
+        1.303655835580e-6,
+        1.5626441722e-8,
+        -8.5238095915e-8,
+        6.529054439e-9,
+        5.059343495e-9,
+        -9.91364156e-10,
+        -2.27365122e-10,
+        9.6467911e-11,
+        2.394038e-12,
+        -6.886027e-12,
+        8.94487e-13,
+        3.13092e-13,
+        -1.12708e-13,
+        3.81e-16,
+        7.106e-15,
+        -1.523e-15,
+        -9.4e-17,
+        1.21e-16,
+        -2.8e-17,
+    ]
+)
+"""Chebyshev coefficients of the complementary error function (Numerical
+Recipes, 3rd ed., section 6.2.2)."""
+
+CdmEncounters = namedtuple(
+    "CdmEncounters",
+    [
+        "tca_ns",
+        "ref_frames",
+        "states1",
+        "states2",
+        "covariances1",
+        "covariances2",
+        "hard_body_radii",
+        "probabilities",
+        "methods",
+    ],
+)
+CdmEncounters.__doc__ = """\
+States and covariances of the objects in the CDMs, aligned with the CDMs.
+
+`tca_ns` is the `int64` array of times of closest approach (nanoseconds
+since 1970-01-01T00:00:00), `ref_frames` the list of state reference frames,
+`states1` and `states2` the (N, 6) state arrays of the objects [km, km/s],
+`covariances1` and `covariances2` the (N, 9, 9) `RTN` covariance arrays of
+the objects [m, s] (see :func:`.cdm_covariances`), `hard_body_radii` the
+combined radii computed from the `AREA_PC` of the objects [m],
+`probabilities` the reported probabilities and `methods` the reported
+probability methods. The undefined values are `NaN` (or `None`).
+"""
+
+
+def cdm_encounters(cdms):
+    """
+    Collects the states and covariances of the objects in the CDMs.
+
+    Parameters
+    ----------
+    cdms : Cdm or list
+        CDM object or a list of CDMs
+
+    Returns
+    -------
+    CdmEncounters
+        arrays of the CDMs, in order
+
+    Raises
+    ------
+    ValueError
+        States of the objects in a CDM in different reference frames.
+    """
+    cdms = [cdms] if isinstance(cdms, Cdm) else cdms
+
+    ref_frames = []
+    for cdm in cdms:
+        frames = {
+            enum_value(segment.metadata.ref_frame) for segment in cdm.body.segment
+        }
+        if len(frames) > 1:
+            raise ValueError(
+                f"CDM object states in different reference frames: "
+                f"{', '.join(map(str, frames))}"
+            )
+        ref_frames.append(frames.pop().upper())
+
+    relative = [cdm.body.relative_metadata_data for cdm in cdms]
+    return CdmEncounters(
+        parse_epochs_ns([data.tca for data in relative]),
+        ref_frames,
+        _states([cdm.body.segment[0] for cdm in cdms]),
+        _states([cdm.body.segment[1] for cdm in cdms]),
+        cdm_covariances(cdms, 0).matrices,
+        cdm_covariances(cdms, 1).matrices,
+        np.sqrt(_areas(cdms, 0) / np.pi) + np.sqrt(_areas(cdms, 1) / np.pi),
+        np.array(
+            [
+                (
+                    np.nan
+                    if data.collision_probability is None
+                    else float(data.collision_probability)
+                )
+                for data in relative
+            ]
+        ),
+        [data.collision_probability_method for data in relative],
+    )
+
+
+def collision_probabilities(cdms, hard_body_radius=None, nodes=DEFAULT_NODES):
+    """
+    Computes the 2D collision probabilities of the CDMs.
+
+    Parameters
+    ----------
+    cdms : Cdm or list or CdmEncounters
+        CDM object, a list of CDMs or their arrays
+    hard_body_radius : float or numpy.ndarray or None
+        combined hard body radius [m] (single or for each CDM), `None` to
+        compute it from the `AREA_PC` of the objects
+    nodes : int
+        number of quadrature nodes
+
+    Returns
+    -------
+    numpy.ndarray
+        collision probabilities, aligned with the CDMs (`NaN` if not
+        computable)
+    """
+    encounters = cdms if isinstance(cdms, CdmEncounters) else cdm_encounters(cdms)
+    if hard_body_radius is None:
+        hard_body_radius = encounters.hard_body_radii
+
+    miss_vectors, covariances = encounter_plane(
+        encounters.states1,
+        encounters.states2,
+        encounters.covariances1[:, :3, :3],
+        encounters.covariances2[:, :3, :3],
+    )
+    return probability_2d(miss_vectors, covariances, hard_body_radius, nodes)
+
+
+def encounter_plane(states1, states2, covariances1, covariances2):
+    """
+    Projects the relative position and the combined covariance onto the
+    encounter plane.
+
+    The encounter plane axes are the relative position direction (normal to
+    the relative velocity) and the orbit normal of the relative motion.
+
+    Parameters
+    ----------
+    states1 : numpy.ndarray
+        (N, 6) states of the first objects [km, km/s]
+    states2 : numpy.ndarray
+        (N, 6) states of the second objects [km, km/s]
+    covariances1 : numpy.ndarray
+        (N, 3, 3) `RTN` position covariances of the first objects [m**2]
+    covariances2 : numpy.ndarray
+        (N, 3, 3) `RTN` position covariances of the second objects [m**2]
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        (N, 2) miss vectors [m] and (N, 2, 2) combined covariances [m**2]
+    """
+    states1 = np.asarray(states1, dtype=np.float64) * 1e3
+    states2 = np.asarray(states2, dtype=np.float64) * 1e3
+    covariances = _rtn_to_inertial(states1, covariances1) + _rtn_to_inertial(
+        states2, covariances2
+    )
+
+    positions = states2[:, :3] - states1[:, :3]
+    velocities = states2[:, 3:] - states1[:, 3:]
+    y_axes = _unit(velocities)
+    z_axes = _unit(np.cross(positions, velocities))
+    axes = np.stack([np.cross(y_axes, z_axes), z_axes], axis=1)
+
+    miss_vectors = np.einsum("nij,nj->ni", axes, positions)
+    covariances = axes @ covariances @ axes.transpose(0, 2, 1)
+    return miss_vectors, covariances
+
+
+def probability_2d(miss_vectors, covariances, hard_body_radius, nodes=DEFAULT_NODES):
+    """
+    Computes the 2D collision probabilities in the encounter plane.
+
+    Parameters
+    ----------
+    miss_vectors : numpy.ndarray
+        (N, 2) miss vectors in the encounter plane
+    covariances : numpy.ndarray
+        (N, 2, 2) combined covariances in the encounter plane
+    hard_body_radius : float or numpy.ndarray
+        combined hard body radius (single or for each encounter)
+    nodes : int
+        number of quadrature nodes
+
+    Returns
+    -------
+    numpy.ndarray
+        collision probabilities (`NaN` if not computable)
+    """
+    miss_vectors = np.asarray(miss_vectors, dtype=np.float64)
+    covariances = np.asarray(covariances, dtype=np.float64)
+    radii = np.broadcast_to(
+        np.asarray(hard_body_radius, dtype=np.float64), len(miss_vectors)
+    )
+
+    probabilities = np.full(len(miss_vectors), np.nan)
+    valid = (
+        np.isfinite(miss_vectors).all(axis=1)
+        & np.isfinite(covariances).all(axis=(1, 2))
+        & (radii > 0.0)
+    )
+    if not valid.any():
+        return probabilities
+
+    # principal axes, the major axis (x) is integrated numerically
+    variances, vectors = np.linalg.eigh(covariances[valid])
+    if (variances[:, 0] <= 0.0).any():
+        positive = variances[:, 0] > 0.0
+        valid[valid] = positive
+        variances, vectors = variances[positive], vectors[positive]
+    sigma_z, sigma_x = np.sqrt(variances).T
+    miss = np.einsum("nji,nj->ni", vectors, miss_vectors[valid])
+    miss_z = np.abs(miss[:, 0])
+    miss_x = miss[:, 1]
+    radii = radii[valid]
+
+    # x = R sin(theta), within the circle and the sigma limit
+    limit = _SIGMA_LIMIT * sigma_x
+    theta_lower = np.arcsin(np.clip((miss_x - limit) / radii, -1.0, 1.0))
+    theta_upper = np.arcsin(np.clip((miss_x + limit) / radii, -1.0, 1.0))
+
+    # split where the chord reaches the miss distance along z, the z integral
+    # changes sharply there for the thin covariances
+    theta_chord = np.arccos(np.clip(miss_z / radii, 0.0, 1.0))
+    bounds = np.stack(
+        [
+            theta_lower,
+            np.clip(-theta_chord, theta_lower, theta_upper),
+            np.clip(theta_chord, theta_lower, theta_upper),
+            theta_upper,
+        ],
+        axis=1,
+    )[:, :, np.newaxis]
+    half_widths = (bounds[:, 1:] - bounds[:, :-1]) / 2
+
+    points, weights = np.polynomial.legendre.leggauss(nodes)
+    thetas = (bounds[:, 1:] + bounds[:, :-1]) / 2 + half_widths * points
+    x = radii[:, np.newaxis, np.newaxis] * np.sin(thetas)
+    chords = radii[:, np.newaxis, np.newaxis] * np.cos(thetas)
+
+    # integral along z, over the chord at x
+    miss_x = miss_x[:, np.newaxis, np.newaxis]
+    miss_z = miss_z[:, np.newaxis, np.newaxis]
+    scale = 1.0 / (np.sqrt(2.0) * sigma_z[:, np.newaxis, np.newaxis])
+    z_integrals = 0.5 * (
+        _erfc((miss_z - chords) * scale) - _erfc((miss_z + chords) * scale)
+    )
+    densities = np.exp(-0.5 * ((x - miss_x) / sigma_x[:, np.newaxis, np.newaxis]) ** 2)
+    integrals = (half_widths * (densities * z_integrals * chords)) @ weights
+    probabilities[valid] = integrals.sum(axis=1) / (np.sqrt(2.0 * np.pi) * sigma_x)
+    return probabilities
+
+
+def _states(segments):
+    """(N, 6) state arrays of the CDM objects [km, km/s]."""
+    values: List[float] = []
+    for segment in segments:
+        state = segment.data.state_vector
+        values.extend(
+            np.nan if value is None else float(value.value)
+            for value in (state.x, state.y, state.z)
+            + (state.x_dot, state.y_dot, state.z_dot)
+        )
+    return np.array(values, dtype=np.float64).reshape(len(segments), 6)
+
+
+def _areas(cdms, object_index):
+    """`AREA_PC` of the objects in the CDMs [m**2], `NaN` if not defined."""
+    areas = []
+    for cdm in cdms:
+        parameters = cdm.body.segment[object_index].data.additional_parameters
+        area = None if parameters is None else parameters.area_pc
+        areas.append(np.nan if area is None else float(area.value))
+    return np.array(areas, dtype=np.float64)
+
+
+def _rtn_to_inertial(states, covariances):
+    """Rotates the (N, 3, 3) `RTN` covariances into the frame of the states."""
+    r_axes = _unit(states[:, :3])
+    n_axes = _unit(np.cross(states[:, :3], states[:, 3:]))
+    t_axes = np.cross(n_axes, r_axes)
+    rotations = np.stack([r_axes, t_axes, n_axes], axis=2)
+    return rotations @ np.asarray(covariances) @ rotations.transpose(0, 2, 1)
+
+
+def _unit(vectors):
+    """Unit vectors of the (N, 3) array."""
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _erfc(x):
+    """Complementary error function, vectorised."""
+    z = np.abs(x)
+    t = 2.0 / (2.0 + z)
+    ty = 4.0 * t - 2.0
+    d = np.zeros_like(z)
+    dd = np.zeros_like(z)
+    for coefficient in _ERFC_COEFFICIENTS[:0:-1]:
+        d, dd = ty * d - dd + coefficient, d
+    result = t * np.exp(-z * z + 0.5 * (_ERFC_COEFFICIENTS[0] + ty * d) - dd)
+    return np.where(x >= 0.0, result, 2.0 - result)
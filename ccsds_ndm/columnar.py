@@ -0,0 +1,480 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Columnar (`numpy` array) views of the bulk data in OEM, AEM and TDM segments.
+
+The object tree keeps each data line as a separate object, with the epochs as
+strings. The columnar views collect the data of a segment into arrays and
+parse the epochs in a single vectorised pass (see :mod:`ccsds_ndm.epochs`).
+All arrays are computed on first access and then cached on the view, and the
+views themselves are cached on the segments (see :func:`segment_columns`).
+
+The views do not track any changes to the underlying segment, use
+:func:`clear_columns` after modifying the data.
+
+"""
+
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from functools import cached_property
+
+import numpy as np
+
+from ccsds_ndm.epochs import parse_epochs_mjd, parse_epochs_ns
+from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_aem_1_0 import AemSegment
+from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_oem_2_0 import OemSegment
+from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_tdm_2_0 import (
+    TdmSegment,
+    TrackingDataObservationType,
+)
+from ccsds_ndm.numeric_backend import is_numeric_value
+from ccsds_ndm.time_scales import TimeScale, convert_epochs_ns
+
+_COLUMNS_ATTR = "_ccsds_ndm_columns"
+"""Instance attribute of the segment holding its cached columnar view."""
+
+
+class _SegmentColumns:
+    """
+    Base class for the columnar views of a single data segment.
+
+    Parameters
+    ----------
+    segment
+        OEM, AEM or TDM segment
+    """
+
+    def __init__(self, segment):
+        self.segment = segment
+
+    def __len__(self):
+        return len(self.epoch_strings)
+
+    @property
+    def metadata(self):
+        """Metadata of the segment."""
+        return self.segment.metadata
+
+    @property
+    def time_system(self):
+        """Time system of the epochs (e.g. `UTC`), `None` if not defined."""
+        return enum_value(self.metadata.time_system)
+
+    @property
+    def _data_lines(self):
+        """Data line objects of the segment (each with an `epoch`)."""
+        raise NotImplementedError
+
+    @cached_property
+    def epoch_strings(self):
+        """Epochs as CCSDS strings (`numpy` array of `str`)."""
+        return np.array([_line_epoch(line) for line in self._data_lines], dtype=str)
+
+    @cached_property
+    def epochs_ns(self):
+        """Epochs as `int64` nanoseconds since 1970-01-01T00:00:00."""
+        return parse_epochs_ns(self.epoch_strings)
+
+    @cached_property
+    def epochs_mjd(self):
+        """Epochs as two-part MJD (integer day and day fraction parts)."""
+        return parse_epochs_mjd(self.epoch_strings)
+
+    @property
+    def epochs_datetime64(self):
+        """Epochs as `datetime64[ns]` (a view on :attr:`epochs_ns`)."""
+        return self.epochs_ns.view("datetime64[ns]")
+
+    @cached_property
+    def _scaled_epochs_ns(self):
+        """Epochs converted to other time scales, keyed by `TimeScale`."""
+        return {}
+
+    def epochs_ns_in(self, time_scale):
+        """
+        Gets the epochs converted to another time scale.
+
+        The conversion is cached for each time scale.
+
+        Parameters
+        ----------
+        time_scale : str or TimeScale or TimeSystemType
+            target time scale (e.g. `TAI`)
+
+        Returns
+        -------
+        numpy.ndarray
+            epochs as `int64` nanoseconds since 1970-01-01T00:00:00 of
+            the target time scale
+
+        Raises
+        ------
+        ValueError
+            Time system of the segment or the target time scale not supported.
+        """
+        time_scale = TimeScale.find_element(time_scale)
+        try:
+            return self._scaled_epochs_ns[time_scale]
+        except KeyError:
+            epochs_ns = convert_epochs_ns(self.epochs_ns, self.time_system, time_scale)
+            self._scaled_epochs_ns[time_scale] = epochs_ns
+            return epochs_ns
+
+
+class OemColumns(_SegmentColumns):
+    """
+    Columnar view of a single OEM segment.
+
+    Parameters
+    ----------
+    segment : OemSegment
+        OEM segment
+    """
+
+    @property
+    def _data_lines(self):
+        return self.segment.data.state_vector
+
+    @cached_property
+    def states(self):
+        """Cartesian states as an (N, 6) `float64` array (position, velocity)."""
+        return _to_float_array(
+            [
+                (sv.x.value, sv.y.value, sv.z.value)
+                + (sv.x_dot.value, sv.y_dot.value, sv.z_dot.value)
+                for sv in self._data_lines
+            ],
+            6,
+        )
+
+    @property
+    def positions(self):
+        """Positions as an (N, 3) `float64` array (a view on :attr:`states`)."""
+        return self.states[:, :3]
+
+    @property
+    def velocities(self):
+        """Velocities as an (N, 3) `float64` array (a view on :attr:`states`)."""
+        return self.states[:, 3:]
+
+    @cached_property
+    def accelerations(self):
+        """
+        Accelerations as an (N, 3) `float64` array, `NaN` where not defined.
+        """
+        nan_acc = (np.nan, np.nan, np.nan)
+        return _to_float_array(
+            [
+                (
+                    (sv.x_ddot.value, sv.y_ddot.value, sv.z_ddot.value)
+                    if sv.x_ddot is not None
+                    else nan_acc
+                )
+                for sv in self._data_lines
+            ],
+            3,
+        )
+
+
+class AemColumns(_SegmentColumns):
+    """
+    Columnar view of a single AEM segment.
+
+    The data lines are flattened into the :attr:`values` array, with the
+    column order given in :attr:`names` (e.g. `quaternion.qc` or
+    `rotation_angles.rotation1`), in the order of the data line in the model.
+
+    Parameters
+    ----------
+    segment : AemSegment
+        AEM segment
+    """
+
+    @cached_property
+    def attitude_field(self):
+        """Name of the attitude data type (e.g. `quaternion_state`)."""
+        states = self.segment.data.attitude_state
+        return _populated_field_name(states[0]) if states else None
+
+    @cached_property
+    def _data_lines(self):
+        # each attitude state holds a single populated attitude type
+        return [
+            getattr(state, self.attitude_field)
+            for state in self.segment.data.attitude_state
+        ]
+
+    @cached_property
+    def names(self):
+        """Names of the data columns."""
+        if not self._data_lines:
+            return []
+        return [name for name, _ in _flatten_values(self._data_lines[0])]
+
+    @cached_property
+    def values(self):
+        """Attitude data as an (N, k) `float64` array (see :attr:`names`)."""
+        return _to_float_array(
+            [
+                tuple(value for _, value in _flatten_values(line))
+                for line in self._data_lines
+            ],
+            len(self.names),
+        )
+
+    def column(self, name):
+        """
+        Gets a single data column by name.
+
+        Parameters
+        ----------
+        name : str
+            column name (as in :attr:`names`)
+
+        Returns
+        -------
+        numpy.ndarray
+            data column (a view on :attr:`values`)
+        """
+        return self.values[:, self.names.index(name)]
+
+
+class TdmColumns(_SegmentColumns):
+    """
+    Columnar view of a single TDM segment.
+
+    Each observation holds a single data type, given in :attr:`keywords`
+    (e.g. `RANGE` or `ANGLE_1`), with its value in :attr:`values`.
+
+    Parameters
+    ----------
+    segment : TdmSegment
+        TDM segment
+    """
+
+    @property
+    def _data_lines(self):
+        return self.segment.data.observation
+
+    @cached_property
+    def _observation_items(self):
+        """Field name and value of each observation."""
+        obs_fields = [
+            fld.name
+            for fld in fields(TrackingDataObservationType)
+            if fld.name != "epoch"
+        ]
+        items = []
+        for obs in self._data_lines:
+            for name in obs_fields:
+                value = getattr(obs, name)
+                if value is not None:
+                    items.append((name, getattr(value, "value", value)))
+                    break
+            else:
+                items.append((None, None))
+        return items
+
+    @cached_property
+    def keywords(self):
+        """Observation data types as KVN keywords (`numpy` array of `str`)."""
+        return np.array(
+            [(name or "").upper() for name, _ in self._observation_items], dtype=str
+        )
+
+    @cached_property
+    def values(self):
+        """Observation values as an (N,) `float64` array."""
+        return _to_float_array(
+            [np.nan if value is None else value for _, value in self._observation_items]
+        )
+
+    def select(self, keyword):
+        """
+        Gets the epochs and values of a single observation data type.
+
+        Parameters
+        ----------
+        keyword : str
+            observation data type as KVN keyword (e.g. `RANGE`)
+
+        Returns
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            epochs as `int64` nanoseconds since 1970-01-01T00:00:00 and values
+        """
+        mask = self.keywords == keyword.upper()
+        return self.epochs_ns[mask], self.values[mask]
+
+
+_columns_classes = {
+    OemSegment: OemColumns,
+    AemSegment: AemColumns,
+    TdmSegment: TdmColumns,
+}
+"""Columnar view class for each supported segment type."""
+
+
+def segment_columns(segment):
+    """
+    Gets the columnar view of the OEM, AEM or TDM segment.
+
+    The view is created on the first call and cached on the segment, along with
+    any arrays computed through it.
+
+    Parameters
+    ----------
+    segment : OemSegment or AemSegment or TdmSegment
+        data segment
+
+    Returns
+    -------
+    OemColumns or AemColumns or TdmColumns
+        columnar view of the segment
+
+    Raises
+    ------
+    TypeError
+        Segment type not supported.
+    """
+    columns = segment.__dict__.get(_COLUMNS_ATTR)
+    if columns is None:
+        try:
+            columns_class = _columns_classes[type(segment)]
+        except KeyError:
+            raise TypeError(
+                f"Columnar views not available for {type(segment).__name__}, "
+                f"only for OEM, AEM and TDM segments."
+            )
+        columns = columns_class(segment)
+        segment.__dict__[_COLUMNS_ATTR] = columns
+    return columns
+
+
+def message_columns(ndm_obj):
+    """
+    Gets the columnar views of all segments of the OEM, AEM or TDM.
+
+    Parameters
+    ----------
+    ndm_obj : OemType or AemType or TdmType
+        NDM object
+
+    Returns
+    -------
+    list
+        columnar views of the segments, in order
+    """
+    return [segment_columns(segment) for segment in ndm_obj.body.segment]
+
+
+def clear_columns(ndm_obj):
+    """
+    Clears the cached columnar views, e.g. after modifying the data.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object or a single segment
+    """
+    segments = ndm_obj.body.segment if hasattr(ndm_obj, "body") else [ndm_obj]
+    for segment in segments:
+        segment.__dict__.pop(_COLUMNS_ATTR, None)
+
+
+def enum_value(value):
+    """
+    Gets the value of the enumerated metadata fields (e.g. `TIME_SYSTEM`).
+
+    Parameters
+    ----------
+    value
+        field value, an `Enum` of the models or already a plain value
+
+    Returns
+    -------
+    object
+        value of the enum (e.g. `UTC`), or the value itself
+    """
+    return value.value if isinstance(value, Enum) else value
+
+
+def _line_epoch(line):
+    """Epoch string of the data line (stripped)."""
+    return line.epoch.strip()
+
+
+def _populated_field_name(obj):
+    """Name of the first field of `obj` that is not `None`."""
+    for fld in fields(obj):
+        if getattr(obj, fld.name) is not None:
+            return fld.name
+    return None
+
+
+def _flatten_values(obj, prefix=""):
+    """
+    Flattens the numeric values of the data line object (except the epoch).
+
+    Parameters
+    ----------
+    obj
+        data line object (or any nested value object)
+    prefix : str
+        name prefix of the nested values
+
+    Returns
+    -------
+    list
+        list of (name, value) tuples
+    """
+    items = []
+    for fld in fields(obj):
+        value = getattr(obj, fld.name)
+        name = prefix + fld.name
+        if value is None or fld.name == "epoch":
+            continue
+        if is_numeric_value(value):
+            items.append((name, value))
+        elif is_dataclass(value):
+            inner_value = getattr(value, "value", None)
+            if is_numeric_value(inner_value):
+                # value with units (and keyword), e.g. `AngleType`
+                items.append((name, inner_value))
+            else:
+                items.extend(_flatten_values(value, name + "."))
+    return items
+
+
+def _to_float_array(rows, n_columns=None):
+    """
+    Converts the rows of numeric values into a `float64` array.
+
+    Parameters
+    ----------
+    rows : list
+        list of tuples (or single values) of `Decimal`, `float` or `RawNumber`
+    n_columns : int or None
+        number of columns, `None` for a 1D array
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, n_columns) or (N,) `float64` array
+    """
+    if not rows:
+        return np.empty((0, n_columns) if n_columns is not None else 0)
+
+    # go through `float()`, `RawNumber` is a `str` and may confuse numpy
+    if n_columns is None:
+        return np.fromiter((float(value) for value in rows), np.float64, len(rows))
+
+    flat = np.fromiter(
+        (float(value) for row in rows for value in row),
+        np.float64,
+        len(rows) * n_columns,
+    )
+    return flat.reshape(len(rows), n_columns)
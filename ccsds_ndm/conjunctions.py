@@ -0,0 +1,534 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Store of the conjunction events, grouping the CDMs of the same encounter.
+
+The CDMs of a conjunction come as a stream of updates for the same pair of
+objects, with changing `TCA`, `MISS_DISTANCE` and `COLLISION_PROBABILITY`.
+The :class:`ConjunctionStore` ingests them incrementally and groups them into
+events: the CDMs of the same pair of object designators (in either order),
+with the `TCA` within a tolerance of the `TCA` of the event. The values of an
+event are those of its latest CDM (by `CREATION_DATE`).
+
+Only the summaries of the CDMs are kept in memory, the CDMs themselves are
+stored in an SQLite database (in the `pickle` format, which is faster than
+the snapshot format for such small object trees) and are restored only on
+request. The database is in memory unless a file path is given, in which
+case the store can be opened again later. As with any `pickle` data, only
+the database files from trusted sources should be opened.
+
+The events are queried with sorted indexes of the `TCA`, the collision
+probability and the miss distance. The indexes are built on the first query
+after new CDMs are added.
+
+"""
+
+import pickle
+import sqlite3
+from collections import defaultdict, namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from ccsds_ndm.epochs import to_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Cdm
+
+DEFAULT_TCA_TOLERANCE = 600.0
+"""Default maximum difference between the `TCA` of a CDM and of an event of
+the same pair of objects for the CDM to belong to the event (s)."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cdms (
+    cdm_id INTEGER PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    message_id TEXT,
+    creation_ns INTEGER NOT NULL,
+    object1 TEXT NOT NULL,
+    object2 TEXT NOT NULL,
+    tca_ns INTEGER NOT NULL,
+    miss_distance REAL,
+    probability REAL,
+    cdm BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cdms_event_id ON cdms (event_id);
+"""
+"""Database schema, the CDM summaries and the pickled CDMs."""
+
+_SUMMARY_COLUMNS = (
+    "cdm_id, event_id, message_id, creation_ns, object1, object2, tca_ns, "
+    "miss_distance, probability"
+)
+"""Columns of the CDM summaries, in the `CdmRecord` order."""
+
+_ORDER_KEYS = ("tca", "probability", "miss_distance")
+"""Orders of the query results."""
+
+CdmRecord = namedtuple(
+    "CdmRecord",
+    [
+        "cdm_id",
+        "event_id",
+        "message_id",
+        "creation_ns",
+        "object1",
+        "object2",
+        "tca_ns",
+        "miss_distance",
+        "probability",
+    ],
+)
+CdmRecord.__doc__ = """\
+Summary of a CDM in the store.
+
+The epochs `creation_ns` and `tca_ns` are in nanoseconds since
+1970-01-01T00:00:00, `object1` and `object2` are the object designators and
+`miss_distance` is in metres. The miss distance and the collision
+probability are `NaN` if not defined in the CDM.
+"""
+
+ConjunctionEvent = namedtuple(
+    "ConjunctionEvent",
+    [
+        "event_id",
+        "object1",
+        "object2",
+        "tca_ns",
+        "miss_distance",
+        "probability",
+        "cdm_count",
+    ],
+)
+ConjunctionEvent.__doc__ = """\
+Conjunction event, with the values of its latest CDM.
+
+`cdm_count` is the number of CDMs of the event, the other fields are as in
+:class:`CdmRecord`.
+"""
+
+_EventIndexes = namedtuple(
+    "_EventIndexes",
+    [
+        "events",
+        "tca_ns",
+        "probabilities",
+        "miss_distances",
+        "tca_order",
+        "probability_order",
+        "miss_distance_order",
+    ],
+)
+_EventIndexes.__doc__ = """\
+Arrays of the event values, and the event positions sorted by each value.
+"""
+
+
+class ConjunctionStore:
+    """
+    Store of the conjunction events and their CDMs.
+
+    Parameters
+    ----------
+    path : Path or AnyStr or None
+        path of the SQLite database file (created if necessary), `None` for
+        an in-memory database
+    tca_tolerance : float
+        maximum difference between the `TCA` of a CDM and of an event of the
+        same pair of objects for the CDM to belong to the event (s)
+
+    Warnings
+    --------
+    The CDMs are stored with `pickle` and :meth:`cdm` unpickles them from the
+    database file: opening a database file from an untrusted source can run
+    arbitrary code. Only open the files written by your own stores.
+    """
+
+    def __init__(self, path=None, tca_tolerance=DEFAULT_TCA_TOLERANCE):
+        self.path = None if path is None else Path(path).expanduser()
+        self.tca_tolerance = tca_tolerance
+
+        self._connection = sqlite3.connect(
+            ":memory:" if self.path is None else str(self.path)
+        )
+        self._connection.executescript(_SCHEMA)
+
+        self._records = {}
+        self._event_cdms = {}
+        self._latest = {}
+        self._pair_events = defaultdict(list)
+        self._next_cdm_id = 1
+        self._next_event_id = 0
+        self._indexes = None
+
+        for row in self._connection.execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM cdms ORDER BY cdm_id"
+        ):
+            self._register(_record_from_row(row))
+
+    def __len__(self):
+        return len(self._event_cdms)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self._connection.close()
+
+    def add(self, cdms):
+        """
+        Adds the CDMs to the store, each into its conjunction event.
+
+        Parameters
+        ----------
+        cdms : Cdm or list
+            CDM object or a list of CDMs
+
+        Returns
+        -------
+        list
+            `CdmRecord` of each CDM
+        """
+        cdms = [cdms] if isinstance(cdms, Cdm) else list(cdms)
+        if not cdms:
+            return []
+
+        creations_ns = to_epochs_ns([cdm.header.creation_date for cdm in cdms])
+        tcas_ns = to_epochs_ns([cdm.body.relative_metadata_data.tca for cdm in cdms])
+        next_id = self._next_cdm_id
+
+        records = []
+        rows = []
+        for n, cdm in enumerate(cdms):
+            relative = cdm.body.relative_metadata_data
+            object1, object2 = (
+                segment.metadata.object_designator for segment in cdm.body.segment
+            )
+            tca_ns = int(tcas_ns[n])
+            record = CdmRecord(
+                next_id + n,
+                self._find_event((object1, object2), tca_ns),
+                cdm.header.message_id,
+                int(creations_ns[n]),
+                object1,
+                object2,
+                tca_ns,
+                _float(getattr(relative.miss_distance, "value", None)),
+                _float(relative.collision_probability),
+            )
+            self._register(record)
+            records.append(record)
+            rows.append(record + (pickle.dumps(cdm, protocol=pickle.HIGHEST_PROTOCOL),))
+
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO cdms ({_SUMMARY_COLUMNS}, cdm) "
+                f"VALUES ({', '.join('?' * len(rows[0]))})",
+                [_sql_row(row) for row in rows],
+            )
+        return records
+
+    def event(self, event_id):
+        """
+        Gets the conjunction event.
+
+        Parameters
+        ----------
+        event_id : int
+            event ID
+
+        Returns
+        -------
+        ConjunctionEvent
+            conjunction event
+
+        Raises
+        ------
+        KeyError
+            No event with the ID.
+        """
+        return _event(self._latest[event_id], len(self._event_cdms[event_id]))
+
+    def events(
+        self,
+        tca_start=None,
+        tca_stop=None,
+        min_probability=None,
+        max_miss_distance=None,
+        order_by="tca",
+    ):
+        """
+        Finds the conjunction events matching all the given conditions.
+
+        The events without a collision probability (or miss distance) do not
+        match any `min_probability` (or `max_miss_distance`).
+
+        Parameters
+        ----------
+        tca_start : int or str or None
+            earliest `TCA` (inclusive), as `int` nanoseconds since
+            1970-01-01T00:00:00 or CCSDS string
+        tca_stop : int or str or None
+            latest `TCA` (inclusive)
+        min_probability : float or None
+            minimum collision probability (inclusive)
+        max_miss_distance : float or None
+            maximum miss distance (inclusive, m)
+        order_by : str
+            order of the events: `tca` (ascending), `probability`
+            (descending) or `miss_distance` (ascending)
+
+        Returns
+        -------
+        list
+            matching `ConjunctionEvent` objects
+
+        Raises
+        ------
+        ValueError
+            Order not supported.
+        """
+        if order_by not in _ORDER_KEYS:
+            raise ValueError(
+                f"Order {order_by} not supported, use one of: "
+                f"{', '.join(_ORDER_KEYS)}."
+            )
+        indexes = self._event_indexes()
+
+        # candidates from each index, the smallest set is filtered further
+        ranges = []
+        if tca_start is not None or tca_stop is not None:
+            tca_start = None if tca_start is None else to_epochs_ns([tca_start])[0]
+            tca_stop = None if tca_stop is None else to_epochs_ns([tca_stop])[0]
+            ranges.append((indexes.tca_order, indexes.tca_ns, tca_start, tca_stop))
+        if min_probability is not None:
+            ranges.append(
+                (
+                    indexes.probability_order,
+                    indexes.probabilities,
+                    min_probability,
+                    np.inf,
+                )
+            )
+        if max_miss_distance is not None:
+            ranges.append(
+                (
+                    indexes.miss_distance_order,
+                    indexes.miss_distances,
+                    -np.inf,
+                    max_miss_distance,
+                )
+            )
+
+        if ranges:
+            candidates = [
+                order[_sorted_range(values[order], low, high)]
+                for order, values, low, high in ranges
+            ]
+            selected = min(candidates, key=len)
+            matches = np.ones(len(selected), dtype=bool)
+            for _, values, low, high in ranges:
+                if low is not None:
+                    matches &= values[selected] >= low
+                if high is not None:
+                    matches &= values[selected] <= high
+            selected = selected[matches]
+        else:
+            selected = indexes.tca_order
+
+        if order_by == "tca":
+            selected = selected[np.argsort(indexes.tca_ns[selected], kind="stable")]
+        elif order_by == "probability":
+            selected = selected[
+                np.argsort(-indexes.probabilities[selected], kind="stable")
+            ]
+        else:
+            selected = selected[
+                np.argsort(indexes.miss_distances[selected], kind="stable")
+            ]
+        return [indexes.events[position] for position in selected]
+
+    def history(self, event_id):
+        """
+        Gets the summaries of the CDMs of the conjunction event.
+
+        Parameters
+        ----------
+        event_id : int
+            event ID
+
+        Returns
+        -------
+        list
+            `CdmRecord` objects, in `CREATION_DATE` order
+
+        Raises
+        ------
+        KeyError
+            No event with the ID.
+        """
+        return sorted(
+            (self._records[cdm_id] for cdm_id in self._event_cdms[event_id]),
+            key=_creation_key,
+        )
+
+    def cdm(self, cdm_id):
+        """
+        Restores the CDM from the database.
+
+        The CDM is unpickled, see the warning on the database files of
+        :class:`ConjunctionStore`.
+
+        Parameters
+        ----------
+        cdm_id : int
+            CDM ID in the store
+
+        Returns
+        -------
+        Cdm
+            CDM object
+
+        Raises
+        ------
+        KeyError
+            No CDM with the ID.
+        """
+        row = self._connection.execute(
+            "SELECT cdm FROM cdms WHERE cdm_id = ?", (cdm_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(cdm_id)
+        return pickle.loads(row[0])
+
+    def event_cdms(self, event_id):
+        """
+        Restores the CDMs of the conjunction event from the database.
+
+        Parameters
+        ----------
+        event_id : int
+            event ID
+
+        Returns
+        -------
+        list
+            `Cdm` objects, in `CREATION_DATE` order
+
+        Raises
+        ------
+        KeyError
+            No event with the ID.
+        """
+        return [self.cdm(record.cdm_id) for record in self.history(event_id)]
+
+    def _find_event(self, objects, tca_ns):
+        """ID of the event of the objects and the TCA (a new one if none)."""
+        tolerance_ns = self.tca_tolerance * 1e9
+        pair_events = self._pair_events[frozenset(objects)]
+        differences = [
+            abs(self._latest[event_id].tca_ns - tca_ns) for event_id in pair_events
+        ]
+        if differences and min(differences) <= tolerance_ns:
+            return pair_events[differences.index(min(differences))]
+        event_id = self._next_event_id
+        self._next_event_id += 1
+        return event_id
+
+    def _register(self, record):
+        """Adds the CDM summary to its event."""
+        self._records[record.cdm_id] = record
+        event_id = record.event_id
+        self._next_cdm_id = max(self._next_cdm_id, record.cdm_id + 1)
+        self._next_event_id = max(self._next_event_id, event_id + 1)
+        if event_id not in self._event_cdms:
+            self._event_cdms[event_id] = []
+            self._pair_events[frozenset((record.object1, record.object2))].append(
+                event_id
+            )
+        self._event_cdms[event_id].append(record.cdm_id)
+
+        latest = self._latest.get(event_id)
+        if latest is None or _creation_key(record) >= _creation_key(latest):
+            self._latest[event_id] = record
+        self._indexes = None
+
+    def _event_indexes(self):
+        """Sorted indexes of the events, built if necessary."""
+        if self._indexes is None:
+            events = [self.event(event_id) for event_id in self._event_cdms]
+            tca_ns = np.array([event.tca_ns for event in events], dtype=np.int64)
+            probabilities = np.array(
+                [event.probability for event in events], dtype=np.float64
+            )
+            miss_distances = np.array(
+                [event.miss_distance for event in events], dtype=np.float64
+            )
+            # NaN values are sorted to the end
+            self._indexes = _EventIndexes(
+                events,
+                tca_ns,
+                probabilities,
+                miss_distances,
+                np.argsort(tca_ns, kind="stable"),
+                np.argsort(probabilities, kind="stable"),
+                np.argsort(miss_distances, kind="stable"),
+            )
+        return self._indexes
+
+
+def _sorted_range(sorted_values, low, high):
+    """Slice of the sorted values within the inclusive limits."""
+    start = 0 if low is None else np.searchsorted(sorted_values, low, "left")
+    stop = (
+        len(sorted_values)
+        if high is None
+        else np.searchsorted(sorted_values, high, "right")
+    )
+    return slice(start, stop)
+
+
+def _event(record, cdm_count):
+    """Conjunction event from the summary of its latest CDM."""
+    return ConjunctionEvent(
+        record.event_id,
+        record.object1,
+        record.object2,
+        record.tca_ns,
+        record.miss_distance,
+        record.probability,
+        cdm_count,
+    )
+
+
+def _creation_key(record):
+    """Order of the CDMs, the later added one for the same creation date."""
+    return record.creation_ns, record.cdm_id
+
+
+def _float(value):
+    """Value as `float`, `NaN` if not defined."""
+    return np.nan if value is None else float(value)
+
+
+def _sql_row(row):
+    """Row with `None` for the `NaN` values (not supported by SQLite)."""
+    return tuple(
+        None if isinstance(value, float) and np.isnan(value) else value for value in row
+    )
+
+
+def _record_from_row(row):
+    """CDM summary from the database row."""
+    record = CdmRecord(*row)
+    return record._replace(
+        miss_distance=_float(record.miss_distance),
+        probability=_float(record.probability),
+    )
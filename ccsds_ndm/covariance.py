@@ -0,0 +1,360 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Stacked `numpy` matrices of the covariance blocks in OEM, OPM and CDM files.
+
+The covariance blocks keep the lower triangular elements of the matrices as
+separate fields (21 for the 6x6 OEM and OPM matrices, 45 for the 9x9 CDM
+matrices), in row order. Here, they are converted in bulk into (N, 6, 6) or
+(N, 9, 9) symmetric `float64` arrays and back.
+
+The optional rows of the CDM matrices (drag, SRP and thrust) are `NaN` where
+not defined.
+
+"""
+
+import math
+import typing
+from collections import namedtuple
+from dataclasses import fields
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+from ccsds_ndm.epochs import format_epochs_ns, parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import (
+    Cdm,
+    CdmCovarianceMatrixType,
+    Oem,
+    OemCovarianceMatrixType,
+    Opm,
+    OpmCovarianceMatrixType,
+)
+from ccsds_ndm.numeric_backend import _number_converter, _optional_type
+
+DEFAULT_PSD_TOLERANCE = 1e-8
+"""Default tolerance of the positive semi-definiteness check, on the
+eigenvalues of the correlation matrices."""
+
+_CONTEXT_FIELDS = ("comment", "epoch", "cov_ref_frame")
+"""Fields of the covariance blocks that are not matrix elements."""
+
+_CDM_REF_FRAME = "RTN"
+"""Reference frame of the CDM covariance matrices."""
+
+CovarianceStack = namedtuple("CovarianceStack", ["epochs_ns", "ref_frames", "matrices"])
+CovarianceStack.__doc__ = """\
+Covariance matrices with their epochs and reference frames.
+
+`epochs_ns` is the `int64` array of epochs (nanoseconds since
+1970-01-01T00:00:00), `ref_frames` the list of reference frames and
+`matrices` the (N, 6, 6) or (N, 9, 9) `float64` array.
+"""
+
+
+def covariance_matrices(blocks):
+    """
+    Converts the covariance blocks into stacked symmetric matrices.
+
+    Parameters
+    ----------
+    blocks : list
+        OEM, OPM or CDM covariance blocks (all of the same type)
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 6, 6) or (N, 9, 9) `float64` array, `NaN` for the elements not
+        defined
+
+    Raises
+    ------
+    TypeError
+        Covariance block type not supported.
+    """
+    if not blocks:
+        return np.empty((0, 6, 6))
+
+    names, size = _element_fields(type(blocks[0]))
+    elements = chain.from_iterable(map(attrgetter(*names), blocks))
+
+    # the object array conversion calls `float()` on each value
+    values = np.array(
+        [np.nan if element is None else element.value for element in elements],
+        dtype=object,
+    )
+    values = values.astype(np.float64).reshape(len(blocks), len(names))
+
+    rows, cols = np.tril_indices(size)
+    matrices = np.empty((len(blocks), size, size))
+    matrices[:, rows, cols] = values
+    matrices[:, cols, rows] = values
+    return matrices
+
+
+def covariance_blocks(
+    matrices, block_type, epochs=None, ref_frames=None, numeric="decimal"
+):
+    """
+    Converts the stacked matrices into covariance blocks.
+
+    Only the lower triangular elements are used, the `NaN` elements are left
+    undefined.
+
+    Parameters
+    ----------
+    matrices : numpy.ndarray
+        (N, 6, 6) or (N, 9, 9) array (or a single matrix)
+    block_type : type
+        covariance block class, e.g. `OemCovarianceMatrixType`
+    epochs : numpy.ndarray or list or None
+        epochs of the blocks as CCSDS strings or `int64` nanoseconds since
+        1970-01-01T00:00:00 (not used for the CDM blocks)
+    ref_frames : list or str or None
+        reference frames of the blocks, or a single one for all blocks (not
+        used for the CDM blocks)
+    numeric : str or NumericBackend
+        numeric backend of the values (`decimal`, `float` or `raw`)
+
+    Returns
+    -------
+    list
+        covariance blocks
+
+    Raises
+    ------
+    TypeError
+        Covariance block type not supported.
+    ValueError
+        Matrix size not matching the block type.
+    """
+    names, size = _element_fields(block_type)
+    matrices = np.asarray(matrices, dtype=np.float64)
+    if matrices.ndim == 2:
+        matrices = matrices[np.newaxis]
+    if matrices.shape[1:] != (size, size):
+        raise ValueError(
+            f"{block_type.__name__} requires {size}x{size} matrices, "
+            f"found {'x'.join(map(str, matrices.shape[1:]))}."
+        )
+
+    count = len(matrices)
+    context = {}
+    block_fields = {fld.name for fld in fields(block_type)}
+    if epochs is not None and "epoch" in block_fields:
+        epochs = np.asarray(epochs)
+        if epochs.dtype.kind in "iu":
+            epochs = format_epochs_ns(epochs)
+        context["epoch"] = [str(epoch) for epoch in epochs]
+    if ref_frames is not None and "cov_ref_frame" in block_fields:
+        if isinstance(ref_frames, str):
+            ref_frames = [ref_frames] * count
+        context["cov_ref_frame"] = list(ref_frames)
+
+    to_number = _number_converter(numeric)
+    value_classes = _value_classes(block_type)
+    rows, cols = np.tril_indices(size)
+    values = matrices[:, rows, cols].tolist()
+
+    blocks = []
+    for n in range(count):
+        elements = {
+            name: None if math.isnan(value) else value_class(value=to_number(value))
+            for name, value_class, value in zip(names, value_classes, values[n])
+        }
+        elements.update((key, items[n]) for key, items in context.items())
+        blocks.append(block_type(**elements))
+    return blocks
+
+
+def oem_covariances(oem):
+    """
+    Gets the covariance matrices of the OEM.
+
+    The reference frame of the segment is used for the blocks without a
+    `COV_REF_FRAME`.
+
+    Parameters
+    ----------
+    oem
+        OEM object, a single OEM segment or a list of segments
+
+    Returns
+    -------
+    CovarianceStack
+        (N, 6, 6) covariance matrices of all the segments, in order
+    """
+    if isinstance(oem, Oem):
+        segments = oem.body.segment
+    elif isinstance(oem, list):
+        segments = oem
+    else:
+        segments = [oem]
+
+    blocks = []
+    ref_frames = []
+    for segment in segments:
+        if segment.data is None:
+            continue
+        for block in segment.data.covariance_matrix:
+            blocks.append(block)
+            ref_frames.append(_ref_frame(block.cov_ref_frame, segment.metadata))
+
+    return CovarianceStack(
+        parse_epochs_ns([block.epoch for block in blocks]),
+        ref_frames,
+        covariance_matrices(blocks),
+    )
+
+
+def opm_covariances(opms):
+    """
+    Gets the covariance matrices of the OPMs.
+
+    The epoch of the state vector is used for the covariance matrix, and the
+    reference frame of the OPM if there is no `COV_REF_FRAME`. The OPMs
+    without a covariance matrix are skipped.
+
+    Parameters
+    ----------
+    opms : Opm or list
+        OPM object or a list of OPMs
+
+    Returns
+    -------
+    CovarianceStack
+        (N, 6, 6) covariance matrices
+    """
+    opms = [opms] if isinstance(opms, Opm) else opms
+
+    data = [
+        (opm.body.segment.metadata, opm.body.segment.data)
+        for opm in opms
+        if opm.body.segment.data.covariance_matrix is not None
+    ]
+    return CovarianceStack(
+        parse_epochs_ns([data.state_vector.epoch for _, data in data]),
+        [
+            _ref_frame(data.covariance_matrix.cov_ref_frame, metadata)
+            for metadata, data in data
+        ],
+        covariance_matrices([data.covariance_matrix for _, data in data]),
+    )
+
+
+def cdm_covariances(cdms, object_index=0):
+    """
+    Gets the covariance matrices of one of the objects in the CDMs.
+
+    The epochs of the matrices are the times of closest approach (`TCA`),
+    the reference frame is always `RTN`.
+
+    Parameters
+    ----------
+    cdms : Cdm or list
+        CDM object or a list of CDMs
+    object_index : int
+        index of the object in the CDMs (`0` for `OBJECT1`, `1` for `OBJECT2`)
+
+    Returns
+    -------
+    CovarianceStack
+        (N, 9, 9) covariance matrices, `NaN` for the optional rows not
+        defined
+    """
+    cdms = [cdms] if isinstance(cdms, Cdm) else cdms
+
+    return CovarianceStack(
+        parse_epochs_ns([cdm.body.relative_metadata_data.tca for cdm in cdms]),
+        [_CDM_REF_FRAME] * len(cdms),
+        covariance_matrices(
+            [cdm.body.segment[object_index].data.covariance_matrix for cdm in cdms]
+        ),
+    )
+
+
+def is_positive_semidefinite(matrices, tolerance=DEFAULT_PSD_TOLERANCE):
+    """
+    Checks whether the covariance matrices are positive semi-definite.
+
+    The check is made on the eigenvalues of the correlation matrices, so that
+    the different units of the position and velocity elements do not matter.
+    The rows and columns with a `NaN` diagonal element (e.g. optional CDM
+    rows not defined) are ignored.
+
+    Parameters
+    ----------
+    matrices : numpy.ndarray
+        (N, M, M) array (or a single matrix)
+    tolerance : float
+        smallest allowed eigenvalue of the correlation matrices is
+        `-tolerance`
+
+    Returns
+    -------
+    numpy.ndarray or bool
+        `True` for the positive semi-definite matrices
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    single = matrices.ndim == 2
+    if single:
+        matrices = matrices[np.newaxis]
+
+    diagonals = np.diagonal(matrices, axis1=1, axis2=2)
+    undefined = np.isnan(diagonals)
+    skipped = undefined[:, :, np.newaxis] | undefined[:, np.newaxis, :]
+    matrices = np.where(skipped, 0.0, matrices)
+
+    # correlation matrices (the congruent scaling keeps the eigenvalue signs),
+    # zero or negative variances are not scaled
+    scales = 1.0 / np.sqrt(np.where(diagonals > 0.0, diagonals, 1.0))
+    correlations = matrices * scales[:, :, np.newaxis] * scales[:, np.newaxis, :]
+    valid = np.isfinite(correlations).all(axis=(1, 2))
+
+    result = np.zeros(len(matrices), dtype=bool)
+    if valid.any():
+        eigenvalues = np.linalg.eigvalsh(correlations[valid])
+        result[valid] = eigenvalues[:, 0] >= -tolerance
+    return bool(result[0]) if single else result
+
+
+def _element_fields(block_type):
+    """
+    Names of the matrix element fields of the covariance block, in row order.
+
+    Returns
+    -------
+    (tuple, int)
+        field names and the matrix size
+    """
+    if block_type not in (
+        OemCovarianceMatrixType,
+        OpmCovarianceMatrixType,
+        CdmCovarianceMatrixType,
+    ):
+        raise TypeError(
+            f"Covariance matrices not available for {block_type.__name__}, only "
+            f"for OEM, OPM and CDM covariance blocks."
+        )
+
+    names = tuple(
+        fld.name for fld in fields(block_type) if fld.name not in _CONTEXT_FIELDS
+    )
+    return names, int(np.sqrt(8 * len(names) + 1) - 1) // 2
+
+
+def _value_classes(block_type):
+    """Value (with units) classes of the matrix element fields, in row order."""
+    names, _ = _element_fields(block_type)
+    hints = typing.get_type_hints(block_type)
+    return [_optional_type(hints[name]) for name in names]
+
+
+def _ref_frame(cov_ref_frame, metadata):
+    """Reference frame of the covariance matrix, or of the segment."""
+    ref_frame = cov_ref_frame or metadata.ref_frame
+    return getattr(ref_frame, "value", ref_frame)
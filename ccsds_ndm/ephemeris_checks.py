@@ -0,0 +1,262 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Sanity checks of the OEM and AEM data.
+
+The epochs and the data of each segment are checked through its columnar view
+(see :mod:`ccsds_ndm.columnar`), each check being a few `numpy` operations
+over the whole segment rather than a loop over the data lines:
+
+- `non_increasing`: epochs earlier than the previous one
+- `duplicate_epoch`: epochs equal to the previous one
+- `gap`: steps longer than `gap_ratio` times the nominal step
+- `irregular_step`: other steps differing from the nominal step by more than
+  `step_tolerance` (relative)
+- `outside_time_range`: epochs outside the `START_TIME` and `STOP_TIME`
+- `coverage`: useable time range (`USEABLE_START_TIME` and
+  `USEABLE_STOP_TIME`, or the `START_TIME` and `STOP_TIME` if not defined)
+  not covered by the data
+- `quaternion_norm`: quaternions (AEM) with norms differing from 1 by more
+  than `norm_tolerance`
+
+The nominal step of a segment is the (lower) median of its positive steps. The
+violations are reported once for each check and segment, with the indices of
+all the offending data lines, so that the report remains compact for large
+files.
+
+"""
+
+import dataclasses
+import math
+from collections import namedtuple
+from typing import List, Sequence, Union
+
+import numpy as np
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Aem, AemSegment, Oem, OemSegment
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_lazy import _loaded_data
+
+CHECKS = (
+    "non_increasing",
+    "duplicate_epoch",
+    "gap",
+    "irregular_step",
+    "outside_time_range",
+    "coverage",
+    "quaternion_norm",
+)
+"""Names of the available checks."""
+
+EphemerisViolation = namedtuple(
+    "EphemerisViolation", ["check", "segment", "rows", "message"]
+)
+EphemerisViolation.__doc__ = """\
+Violation of a single check within a single OEM or AEM segment.
+
+`check` is the name of the check (see :data:`CHECKS`), `segment` the index of
+the segment in the message, `rows` the indices of the offending data lines in
+the segment (as an `int64` array) and `message` the description of the
+violation.
+"""
+
+_QUATERNION_COLUMNS = [
+    "quaternion.qc",
+    "quaternion.q1",
+    "quaternion.q2",
+    "quaternion.q3",
+]
+"""Columnar view names of the quaternion components."""
+
+
+def check_ephemeris(
+    ephemeris,
+    checks=None,
+    step_tolerance=1e-6,
+    gap_ratio=2.0,
+    norm_tolerance=1e-6,
+):
+    """
+    Checks the epochs and the data of the OEM or AEM segments.
+
+    The segments are processed one at a time, the data blocks of a message
+    read in lazy mode are not kept in memory.
+
+    Parameters
+    ----------
+    ephemeris : Oem or Aem or Path or AnyStr
+        OEM or AEM object or file path (read in lazy mode)
+    checks : Iterable[str] or None
+        names of the checks to run (see :data:`CHECKS`), `None` for all
+    step_tolerance : float
+        maximum difference of a step from the nominal step (relative)
+    gap_ratio : float
+        minimum ratio of a gap to the nominal step
+    norm_tolerance : float
+        maximum difference of a quaternion norm from 1
+
+    Returns
+    -------
+    list
+        `EphemerisViolation` for each failed check, in the order of the
+        segments and the checks (empty if all checks pass)
+
+    Raises
+    ------
+    TypeError
+        Source is not an OEM or an AEM.
+    ValueError
+        Unknown check names.
+    """
+    if not isinstance(ephemeris, (Oem, Aem)):
+        ephemeris = NdmIo().from_path(ephemeris, lazy=True)
+        if not isinstance(ephemeris, (Oem, Aem)):
+            raise TypeError(
+                f"Ephemeris checks are only available for OEMs and AEMs, "
+                f"found {type(ephemeris).__name__}."
+            )
+    checks = CHECKS if checks is None else tuple(checks)
+    unknown = set(checks) - set(CHECKS)
+    if unknown:
+        raise ValueError(
+            f"Unknown ephemeris checks: {', '.join(sorted(unknown))} "
+            f"(available: {', '.join(CHECKS)})"
+        )
+
+    violations: List[EphemerisViolation] = []
+    segments: Sequence[Union[OemSegment, AemSegment]] = ephemeris.body.segment
+    for index, segment in enumerate(segments):
+        data = _loaded_data(segment)
+        if data is None:
+            continue
+        if vars(segment).get("data") is not data:
+            # the lazy data block is not kept in the segment
+            segment = dataclasses.replace(segment, data=data)
+        columns = segment_columns(segment)
+        if not len(columns):
+            continue
+
+        violations.extend(
+            EphemerisViolation(check, index, rows, message)
+            for check, rows, message in _check_segment(
+                columns, checks, step_tolerance, gap_ratio, norm_tolerance
+            )
+        )
+    return violations
+
+
+def _check_segment(columns, checks, step_tolerance, gap_ratio, norm_tolerance):
+    """Runs the checks over the segment, yields the check, rows and message
+    of each violation (in the order of :data:`CHECKS`)."""
+    epochs_ns = columns.epochs_ns
+    metadata = columns.metadata
+
+    steps = np.diff(epochs_ns)
+    if "non_increasing" in checks:
+        rows = np.flatnonzero(steps < 0) + 1
+        if rows.size:
+            yield "non_increasing", rows, (
+                f"{rows.size} epoch(s) earlier than the previous epoch"
+            )
+    if "duplicate_epoch" in checks:
+        rows = np.flatnonzero(steps == 0) + 1
+        if rows.size:
+            yield "duplicate_epoch", rows, (
+                f"{rows.size} epoch(s) equal to the previous epoch"
+            )
+
+    if {"gap", "irregular_step"} & set(checks):
+        yield from _check_steps(steps, checks, step_tolerance, gap_ratio)
+
+    if "outside_time_range" in checks:
+        start_ns, stop_ns = _parsed_times(metadata.start_time, metadata.stop_time)
+        outside = np.zeros(len(epochs_ns), dtype=bool)
+        if start_ns is not None:
+            outside |= epochs_ns < start_ns
+        if stop_ns is not None:
+            outside |= epochs_ns > stop_ns
+        rows = np.flatnonzero(outside)
+        if rows.size:
+            yield "outside_time_range", rows, (
+                f"{rows.size} epoch(s) outside the START_TIME "
+                f"({metadata.start_time}) and STOP_TIME ({metadata.stop_time})"
+            )
+
+    if "coverage" in checks:
+        start_ns, stop_ns = _parsed_times(
+            metadata.useable_start_time or metadata.start_time,
+            metadata.useable_stop_time or metadata.stop_time,
+        )
+        first = int(np.argmin(epochs_ns))
+        last = int(np.argmax(epochs_ns))
+        uncovered = []
+        if start_ns is not None and epochs_ns[first] > start_ns:
+            uncovered.append(first)
+        if stop_ns is not None and epochs_ns[last] < stop_ns:
+            uncovered.append(last)
+        if uncovered:
+            yield "coverage", np.array(uncovered, dtype=np.int64), (
+                f"useable time range not covered by the data (from "
+                f"{columns.epoch_strings[first]} to {columns.epoch_strings[last]})"
+            )
+
+    if "quaternion_norm" in checks and set(_QUATERNION_COLUMNS) <= set(
+        getattr(columns, "names", ())
+    ):
+        indices = [columns.names.index(name) for name in _QUATERNION_COLUMNS]
+        quaternions = columns.values[:, indices]
+        norms = np.sqrt(np.einsum("ij,ij->i", quaternions, quaternions))
+        rows = np.flatnonzero(~(np.abs(norms - 1.0) <= norm_tolerance))
+        if rows.size:
+            yield "quaternion_norm", rows, (
+                f"{rows.size} quaternion(s) with norms differing from 1 by "
+                f"more than {norm_tolerance} (largest "
+                f"{np.nanmax(np.abs(norms[rows] - 1.0)):.3g})"
+            )
+
+
+def _check_steps(steps, checks, step_tolerance, gap_ratio):
+    """Checks the positive steps against the nominal (median) step."""
+    positive = steps[steps > 0]
+    if not positive.size:
+        return
+    # (lower) median, partitioning the copy in place
+    middle = (positive.size - 1) // 2
+    positive.partition(middle)
+    nominal = int(positive[middle])
+
+    # integer limits, the steps are compared without conversion to float
+    gap_limit = math.floor(gap_ratio * nominal)
+    if "gap" in checks:
+        rows = np.flatnonzero(steps > gap_limit) + 1
+        if rows.size:
+            yield "gap", rows, (
+                f"{rows.size} step(s) longer than {gap_ratio} times the nominal "
+                f"step ({nominal * 1e-9:g} s), longest "
+                f"{steps[rows - 1].max() * 1e-9:g} s"
+            )
+
+    if "irregular_step" in checks:
+        low = math.ceil(nominal * (1.0 - step_tolerance))
+        high = math.floor(nominal * (1.0 + step_tolerance))
+        irregular = (steps > 0) & (steps < low)
+        irregular |= (steps > high) & (steps <= gap_limit)
+        rows = np.flatnonzero(irregular) + 1
+        if rows.size:
+            yield "irregular_step", rows, (
+                f"{rows.size} step(s) differing from the nominal step "
+                f"({nominal * 1e-9:g} s) by more than {step_tolerance} (relative)"
+            )
+
+
+def _parsed_times(start, stop):
+    """Epochs of the start and stop times (`None` if not defined)."""
+    return tuple(
+        None if time is None else int(parse_epochs_ns([time])[0])
+        for time in (start, stop)
+    )
@@ -0,0 +1,1012 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Streaming splice, split and resampling of OEM and AEM files.
+
+The input files are read in lazy mode (see :mod:`ccsds_ndm.ndm_lazy`) and
+processed one segment at a time: the data lines of a segment are cut to the
+requested epochs and written out before the next segment is read, so that the
+memory use is bounded by a single segment rather than the files.
+
+- :func:`splice_ephemerides` joins the files (e.g. a predicted OEM onto a
+  definitive one), each file taking over after the last epoch of the
+  previous ones (or at the given splice epochs)
+- :func:`split_ephemeris` cuts a file into products between boundary epochs
+  (e.g. daily files) and :func:`cut_ephemeris` into a single epoch window
+- :func:`resample_ephemeris` interpolates the segments at a regular step,
+  with the interpolators of :mod:`ccsds_ndm.interpolation` (OEM) and
+  :mod:`ccsds_ndm.attitude` (AEM, written as quaternions)
+
+The metadata cuts and the state vector objects of the sampled states are
+available as :func:`cut_metadata` and :func:`state_vectors`, for the other
+generators of OEM segments.
+
+The consecutive output segments with the same metadata (apart from the
+comments and the start, stop and useable times) and with touching or
+overlapping time ranges are concatenated into a single segment, the data lines
+of the later segment starting after the last epoch of the earlier one.
+
+For KVN input and output, the data lines are copied as text from the
+(memory mapped) input files: only the data line starts are searched for
+and only the epochs of the lines around the cut epochs are parsed, therefore
+splicing and splitting run close to the file copy speed. Otherwise (XML input
+or output, OEM segments with covariance data and resampling) the data blocks
+are parsed and written with the regular readers and writers. The data lines
+are assumed to be in time order within each segment.
+
+"""
+
+import dataclasses
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from ccsds_ndm.attitude import AemAttitude
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import format_epochs_ns, parse_epochs_ns, to_epochs_ns
+from ccsds_ndm.interpolation import OemInterpolator
+from ccsds_ndm.models.ndmxml2 import Aem, Oem
+from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_aem_1_0 import (
+    AttitudeStateType,
+    AttitudeTypeType,
+    QuaternionEphemerisType,
+    QuaternionTypeType,
+)
+from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_common_2_0 import (
+    PositionType,
+    QuaternionType,
+    StateVectorAccType,
+    VelocityType,
+)
+from ccsds_ndm.ndm_index import _data_line_fields, _data_lines, _line_epoch
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo, _identify_data_format, _peek_file
+from ccsds_ndm.ndm_lazy import (
+    _find_marker_lines,
+    _lazy_message_types,
+    _LazyData,
+    _loaded_data,
+)
+from ccsds_ndm.numeric_backend import _number_converter
+
+_CHUNK_SIZE = 1 << 24
+"""Size of the chunks while searching for and copying the data lines."""
+
+_RANGE_FIELDS = ("start_time", "stop_time", "useable_start_time", "useable_stop_time")
+"""Metadata fields changed by the cuts (in addition to the comments)."""
+
+_Piece = namedtuple(
+    "_Piece", ["segment", "metadata", "start_ns", "stop_ns", "after_start"]
+)
+"""Part of an input segment within [`start_ns`, `stop_ns`] (excluding
+`start_ns` if `after_start`), with the output metadata."""
+
+_RawLines = namedtuple("_RawLines", ["source", "comments", "start", "end"])
+"""Comment lines and the byte range of the data lines in the KVN source."""
+
+
+def splice_ephemerides(sources, output_path, splice_epochs=None, data_format=None):
+    """
+    Splices the OEMs or AEMs into a single file.
+
+    Each source is used after the last epoch of the previous ones (e.g. the
+    predicted ephemeris after the end of the definitive one), or between the
+    splice epochs: the first source until the first splice epoch (included),
+    the second one after that epoch until the next one and so on. The header
+    of the first source is used.
+
+    Parameters
+    ----------
+    sources : list
+        OEM or AEM file paths (path or pathlike) or objects, in order
+    output_path : Path or AnyStr
+        path of the output file
+    splice_epochs : list or None
+        epochs switching between the consecutive sources (one less than the
+        sources), as `int64` nanoseconds since 1970-01-01T00:00:00,
+        `datetime64` or CCSDS epoch strings
+    data_format : NDMFileFormats or None
+        output data format (KVN or XML), `None` for the format of the first
+        source (KVN for objects)
+
+    Raises
+    ------
+    TypeError
+        Source is not an OEM or AEM, or the sources are of different types.
+    ValueError
+        Sources in different time systems, the number of the splice epochs
+        does not match the sources, or no data lines to write.
+    """
+    messages = [_open_source(source) for source in sources]
+    if not messages:
+        raise ValueError("No sources to be spliced.")
+    if len({type(message) for message in messages}) > 1:
+        raise TypeError("OEMs and AEMs cannot be spliced together.")
+    time_systems = {
+        segment.metadata.time_system
+        for message in messages
+        for segment in message.body.segment
+    }
+    if len(time_systems) > 1:
+        raise ValueError(
+            f"Sources in different time systems cannot be spliced: "
+            f"{', '.join(map(str, time_systems))}"
+        )
+
+    if splice_epochs is not None:
+        splice_epochs = to_epochs_ns(splice_epochs).tolist()
+        if len(splice_epochs) != len(messages) - 1:
+            raise ValueError(
+                f"{len(messages) - 1} splice epochs required for "
+                f"{len(messages)} sources, found {len(splice_epochs)}."
+            )
+
+    def pieces():
+        last_ns = None
+        for i, message in enumerate(messages):
+            if splice_epochs is None:
+                start_ns, stop_ns = last_ns, None
+            else:
+                start_ns = splice_epochs[i - 1] if i > 0 else None
+                stop_ns = splice_epochs[i] if i < len(splice_epochs) else None
+
+            for piece in _pieces(message, start_ns, stop_ns, after_start=i > 0):
+                last_ns = (
+                    piece.stop_ns if last_ns is None else max(last_ns, piece.stop_ns)
+                )
+                yield piece
+
+    data_format = _data_format(data_format, sources[0])
+    with _EphemerisWriter(output_path, messages[0], data_format) as writer:
+        writer.write_pieces(pieces(), _SegmentLoader(data_format))
+
+
+def split_ephemeris(source, boundaries, output_paths, data_format=None):
+    """
+    Splits the OEM or AEM into products between the boundary epochs.
+
+    The `n`-th product covers the epochs from the `n`-th boundary to the next
+    one (both included), e.g. daily products with the boundaries at midnight.
+    The data outside the boundaries is not used.
+
+    Parameters
+    ----------
+    source
+        OEM or AEM file path (path or pathlike) or object
+    boundaries : list
+        product boundaries in increasing order, as `int64` nanoseconds since
+        1970-01-01T00:00:00, `datetime64` or CCSDS epoch strings
+    output_paths : list
+        paths of the output files, one less than the boundaries
+    data_format : NDMFileFormats or None
+        output data format (KVN or XML), `None` for the format of the source
+        (KVN for objects)
+
+    Raises
+    ------
+    TypeError
+        Source is not an OEM or AEM.
+    ValueError
+        Number of the output paths does not match the boundaries, or no data
+        lines between the boundaries of a product (the products before it
+        are written).
+    """
+    message = _open_source(source)
+    boundaries = to_epochs_ns(boundaries).tolist()
+    if len(output_paths) != len(boundaries) - 1:
+        raise ValueError(
+            f"{len(boundaries) - 1} output paths required for "
+            f"{len(boundaries)} boundaries, found {len(output_paths)}."
+        )
+
+    # the same loader for all products, a segment spanning many products is
+    # searched only once
+    data_format = _data_format(data_format, source)
+    loader = _SegmentLoader(data_format)
+    for i, output_path in enumerate(output_paths):
+        with _EphemerisWriter(output_path, message, data_format) as writer:
+            writer.write_pieces(
+                _pieces(message, boundaries[i], boundaries[i + 1]), loader
+            )
+
+
+def cut_ephemeris(source, output_path, start=None, stop=None, data_format=None):
+    """
+    Cuts the OEM or AEM to the epoch window.
+
+    Parameters
+    ----------
+    source
+        OEM or AEM file path (path or pathlike) or object
+    output_path : Path or AnyStr
+        path of the output file
+    start, stop
+        start and stop epochs of the window (included), as `int64`
+        nanoseconds since 1970-01-01T00:00:00, `datetime64` or CCSDS epoch
+        strings, `None` for unbounded
+    data_format : NDMFileFormats or None
+        output data format (KVN or XML), `None` for the format of the source
+        (KVN for objects)
+
+    Raises
+    ------
+    TypeError
+        Source is not an OEM or AEM.
+    ValueError
+        No data lines within the time span.
+    """
+    message = _open_source(source)
+    data_format = _data_format(data_format, source)
+    with _EphemerisWriter(output_path, message, data_format) as writer:
+        writer.write_pieces(
+            _pieces(message, _epoch_ns(start), _epoch_ns(stop)),
+            _SegmentLoader(data_format),
+        )
+
+
+def resample_ephemeris(
+    source,
+    output_path,
+    step,
+    start=None,
+    stop=None,
+    method=None,
+    degree=None,
+    data_format=None,
+):
+    """
+    Resamples the OEM or AEM at a regular step.
+
+    The output epochs are on a grid with the `step` from `start` (or the start
+    of the first segment), within the interpolation range of each segment.
+    The OEM states are written as positions and velocities, the AEM attitude
+    as quaternions (in the quaternion order of each segment).
+
+    Parameters
+    ----------
+    source
+        OEM or AEM file path (path or pathlike) or object
+    output_path : Path or AnyStr
+        path of the output file
+    step : float
+        step between the output epochs [s]
+    start, stop
+        start and stop epochs of the output (included), as `int64`
+        nanoseconds since 1970-01-01T00:00:00, `datetime64` or CCSDS epoch
+        strings, `None` for unbounded
+    method : str or None
+        interpolation method (see :class:`.OemInterpolator` and
+        :class:`.AemAttitude`), `None` to use the metadata of each segment
+    degree : int or None
+        interpolation degree, `None` to use the metadata of each segment
+    data_format : NDMFileFormats or None
+        output data format (KVN or XML), `None` for the format of the source
+        (KVN for objects)
+
+    Raises
+    ------
+    TypeError
+        Source is not an OEM or AEM.
+    ValueError
+        Step is not positive, or no data lines within the time span.
+    """
+    step_ns = int(round(step * 1e9))
+    if step_ns <= 0:
+        raise ValueError(f"Resampling step should be positive, found {step}.")
+
+    message = _open_source(source)
+    start_ns, stop_ns = _epoch_ns(start), _epoch_ns(stop)
+    pieces = [
+        piece._replace(metadata=_resampled_metadata(piece.metadata))
+        for piece in _pieces(message, start_ns, stop_ns)
+    ]
+    if start_ns is None and pieces:
+        start_ns = min(piece.start_ns for piece in pieces)
+
+    data_format = _data_format(data_format, source)
+    loader = _ResamplingLoader(start_ns, step_ns, method, degree)
+    with _EphemerisWriter(output_path, message, data_format) as writer:
+        writer.write_pieces(pieces, loader)
+
+
+def cut_metadata(metadata, start=None, stop=None):
+    """
+    Cuts the time range of the OEM or AEM segment metadata.
+
+    The start and stop times (and the useable ones, if defined) are moved
+    within the time range, the times already within it are left as in the
+    metadata.
+
+    Parameters
+    ----------
+    metadata
+        OEM or AEM segment metadata
+    start, stop
+        start and stop epochs of the time range, as `int64` nanoseconds since
+        1970-01-01T00:00:00, `datetime64` or CCSDS epoch strings, `None` for
+        unbounded
+
+    Returns
+    -------
+    object
+        copy of the metadata with the cut times
+    """
+    start_ns, stop_ns = _epoch_ns(start), _epoch_ns(stop)
+    return dataclasses.replace(
+        metadata,
+        start_time=_cut_time(metadata.start_time, start_ns, max),
+        stop_time=_cut_time(metadata.stop_time, stop_ns, min),
+        useable_start_time=_cut_time(metadata.useable_start_time, start_ns, max),
+        useable_stop_time=_cut_time(metadata.useable_stop_time, stop_ns, min),
+    )
+
+
+class _SegmentLoader:
+    """
+    Loads the data lines of the pieces, copied as text for KVN sources and
+    outputs where possible.
+
+    The last loaded segment is kept, so that the pieces of the same segment
+    are searched only once.
+
+    Parameters
+    ----------
+    data_format : NDMFileFormats
+        output data format
+    """
+
+    def __init__(self, data_format):
+        self.data_format = data_format
+        self._segment = None
+        self._cached = None
+
+    def __call__(self, piece, with_comments):
+        """
+        Loads the data lines of the piece.
+
+        Parameters
+        ----------
+        piece : _Piece
+            part of the segment
+        with_comments : bool
+            `True` to keep the comments of the data block
+
+        Returns
+        -------
+        _RawLines or object or None
+            data lines as text, data object (e.g. `OemData`), or `None` if no
+            data lines within the piece
+        """
+        if piece.segment is not self._segment:
+            self._segment = piece.segment
+            self._cached = None
+            if self.data_format is NDMFileFormats.KVN:
+                self._cached = _scan_kvn_segment(piece.segment)
+            if self._cached is None:
+                self._cached = _load_segment(piece.segment)
+
+        if isinstance(self._cached, _KvnDataLines):
+            return self._cached.lines(piece, with_comments)
+        return _cut_data(self._cached, piece, with_comments)
+
+
+class _ResamplingLoader:
+    """
+    Interpolates the data lines of the pieces on a regular grid.
+
+    Parameters
+    ----------
+    grid_start_ns : int
+        start epoch of the grid
+    step_ns : int
+        step of the grid
+    method : str or None
+        interpolation method, `None` to use the metadata
+    degree : int or None
+        interpolation degree, `None` to use the metadata
+    """
+
+    def __init__(self, grid_start_ns, step_ns, method, degree):
+        self.grid_start_ns = grid_start_ns
+        self.step_ns = step_ns
+        self.method = method
+        self.degree = degree
+
+    def __call__(self, piece, with_comments):
+        segment, data_epochs_ns = _load_segment(piece.segment)
+        if not len(data_epochs_ns):
+            return None
+
+        is_oem = _message_class(segment) is Oem
+        if is_oem:
+            interpolator = OemInterpolator([segment], self.method, self.degree)
+            coverage = interpolator.coverage
+        else:
+            attitude = AemAttitude([segment], self.method, self.degree)
+            coverage = attitude.coverage
+
+        start_ns, stop_ns = coverage[0]
+        start_ns, stop_ns = max(start_ns, piece.start_ns), min(stop_ns, piece.stop_ns)
+        first = -(-(start_ns - self.grid_start_ns) // self.step_ns)
+        last = (stop_ns - self.grid_start_ns) // self.step_ns
+        epochs_ns = self.grid_start_ns + self.step_ns * np.arange(
+            first, last + 1, dtype=np.int64
+        )
+        if piece.after_start:
+            epochs_ns = epochs_ns[epochs_ns > piece.start_ns]
+        if not len(epochs_ns):
+            return None
+
+        comments = segment.data.comment if with_comments else []
+        if is_oem:
+            lines = state_vectors(epochs_ns, interpolator.states(epochs_ns))
+            return type(segment.data)(comment=comments, state_vector=lines)
+
+        quaternions = attitude.quaternions(epochs_ns, scalar_first=True)
+        lines = _quaternion_states(_format_epochs(epochs_ns), quaternions)
+        return type(segment.data)(comment=comments, attitude_state=lines)
+
+
+class _KvnDataLines:
+    """
+    Data lines of a KVN segment, found without parsing them.
+
+    Parameters
+    ----------
+    loader : _SegmentDataLoader
+        lazy data loader of the segment (with its source and byte range)
+    ndm_class : type
+        message class (`Oem` or `Aem`)
+    line_starts : numpy.ndarray
+        start offsets of the data lines
+    content_starts : numpy.ndarray
+        start offsets of the data line contents (after any blanks)
+    """
+
+    def __init__(self, loader, ndm_class, line_starts, content_starts):
+        self.loader = loader
+        self.ndm_class = ndm_class
+        self.line_starts = line_starts
+        self.content_starts = content_starts
+
+    def lines(self, piece, with_comments):
+        """Comments and the byte range of the data lines within the piece."""
+        source = self.loader.source
+        with source.open_buffer() as buffer:
+            epochs = _LineEpochs(buffer, self.content_starts, self.ndm_class)
+            find_start = bisect_right if piece.after_start else bisect_left
+            first = find_start(epochs, piece.start_ns, 0, len(epochs))
+            last = bisect_right(epochs, piece.stop_ns, first, len(epochs)) - 1
+
+            comments = b""
+            if with_comments and len(self.line_starts):
+                comments = b"".join(
+                    line.strip() + b"\n"
+                    for line in bytes(
+                        buffer[self.loader.start : int(self.line_starts[0])]
+                    ).splitlines()
+                    if line.strip().startswith(b"COMMENT")
+                )
+
+            if last < first:
+                return None
+            end = buffer.find(b"\n", int(self.line_starts[last]), self.loader.end)
+            end = self.loader.end if end < 0 else end + 1
+
+        return _RawLines(source, comments, int(self.line_starts[first]), end)
+
+
+class _LineEpochs:
+    """Epochs of the data lines, parsed on access (e.g. for binary search)."""
+
+    def __init__(self, buffer, content_starts, ndm_class):
+        self.buffer = buffer
+        self.content_starts = content_starts
+        self.ndm_class = ndm_class
+
+    def __len__(self):
+        return len(self.content_starts)
+
+    def __getitem__(self, index):
+        epoch = _line_epoch(
+            self.buffer, int(self.content_starts[index]), self.ndm_class
+        )
+        return int(parse_epochs_ns([epoch])[0])
+
+
+class _EphemerisWriter:
+    """
+    Writes the OEM or AEM segment by segment.
+
+    The header (and the closing tags for XML) are written with the regular
+    writers, as well as the metadata and the data objects of each segment.
+
+    Parameters
+    ----------
+    output_path : Path or AnyStr
+        path of the output file
+    message : Oem or Aem
+        message providing the header
+    data_format : NDMFileFormats
+        output data format (KVN or XML)
+    """
+
+    def __init__(self, output_path, message, data_format):
+        if data_format not in (NDMFileFormats.KVN, NDMFileFormats.XML):
+            raise ValueError(
+                f"Unsupported output data format: {data_format} (KVN or XML)"
+            )
+        self.message = message
+        self.data_format = data_format
+        self._file = None
+        self._output_path = Path(output_path)
+        # closing tags, `None` until the header is written
+        self._tail = None
+
+    def __enter__(self):
+        self._file = open(self._output_path, "wb")
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """
+        Writes the closing tags (for XML) and closes the file.
+
+        Raises
+        ------
+        ValueError
+            No data lines written, the file is removed.
+        """
+        if self._file is None:
+            return
+        if self._tail is not None:
+            self._file.write(self._tail)
+        self._file.close()
+        self._file = None
+        if self._tail is None:
+            self._output_path.unlink()
+            raise ValueError(
+                f"No data lines within the requested time span, "
+                f"{self._output_path} is not written."
+            )
+
+    def write_pieces(self, pieces, load):
+        """
+        Writes the pieces, concatenating the compatible consecutive ones.
+
+        Parameters
+        ----------
+        pieces : Iterable
+            `_Piece` objects in output order
+        load : Callable
+            loader of the data lines of each piece, called with the piece and
+            whether the comments should be kept
+        """
+        for group in _groups(pieces):
+            self._write_group(group, load)
+
+    def _write_group(self, group, load):
+        """Writes the pieces as a single segment, if they have any data."""
+        metadata = _group_metadata(group)
+        covariances = []
+        started = False
+        for piece in group:
+            data = load(piece, with_comments=not started)
+            if data is None:
+                continue
+
+            if not started:
+                if self._tail is None:
+                    self._write_head(metadata)
+                self._file.write(self._render_metadata(metadata))
+                started = True
+
+            if isinstance(data, _RawLines):
+                self._file.write(data.comments)
+                _copy_range(data.source, data.start, data.end, self._file)
+            else:
+                lines, covariance = self._render_data(metadata, data)
+                self._file.write(lines)
+                covariances.append(covariance)
+
+        if started:
+            self._file.write(b"".join(covariances))
+            self._file.write(self._segment_close)
+
+    def _render(self, metadata, data=None):
+        """Renders the message with a single segment with the regular writers."""
+        types = _lazy_message_types[type(self.message)]
+        if data is None:
+            data = types.data()
+        message = dataclasses.replace(
+            self.message,
+            body=types.body(segment=[types.segment(metadata=metadata, data=data)]),
+        )
+        return NdmIo().to_string(message, self.data_format).encode()
+
+    def _write_head(self, metadata):
+        """Writes the header and prepares the closing tags."""
+        text = self._render(metadata)
+        if self.data_format is NDMFileFormats.KVN:
+            self._file.write(text[: _find_marker_lines(text, b"META_START")[0][0]])
+            self._tail = b""
+            self._segment_close = b"DATA_STOP\n\n" if self._is_aem else b"\n"
+        else:
+            segment_start = _tag_line(text, b"<segment>")[0]
+            segment_end = _tag_line(text, b"</segment>", last=True)[1]
+            self._file.write(text[:segment_start])
+            self._tail = text[segment_end:]
+            indent = text[segment_start : text.find(b"<segment>", segment_start)]
+            self._data_open = indent + b"  <data>\n"
+            self._segment_close = indent + b"  </data>\n" + indent + b"</segment>\n"
+
+    def _render_metadata(self, metadata):
+        """Metadata block of the segment (and the start of the data block)."""
+        text = self._render(metadata)
+        if self.data_format is NDMFileFormats.KVN:
+            start = _find_marker_lines(text, b"META_START")[0][0]
+            end = _find_marker_lines(text, b"META_STOP")[0][1]
+            return text[start:end] + (b"\nDATA_START\n" if self._is_aem else b"\n")
+
+        start = _tag_line(text, b"<segment>")[0]
+        end = _tag_line(text, b"</metadata>")[1]
+        return text[start:end] + self._data_open
+
+    def _render_data(self, metadata, data):
+        """Data lines and covariance data of the data object."""
+        text = self._render(metadata, data)
+        if self.data_format is NDMFileFormats.KVN:
+            if self._is_aem:
+                start = _find_marker_lines(text, b"DATA_START")[0][1]
+                end = _find_marker_lines(text, b"DATA_STOP")[-1][0]
+            else:
+                start = _find_marker_lines(text, b"META_STOP")[0][1]
+                end = len(text)
+            covariance = _find_marker_lines(text, b"COVARIANCE_START", start)
+        else:
+            start = _tag_line(text, b"<data>")[1]
+            end = _tag_line(text, b"</data>", last=True)[0]
+            covariance = [_tag_line(text, b"<covarianceMatrix>", start=start)]
+
+        split = covariance[0][0] if covariance and covariance[0][0] >= 0 else end
+        return text[start:split].rstrip(b"\n") + b"\n", text[split:end]
+
+    @property
+    def _is_aem(self):
+        return isinstance(self.message, Aem)
+
+
+def _open_source(source):
+    """
+    OEM or AEM object of the source, files are read in lazy mode.
+
+    Raises
+    ------
+    TypeError
+        Source is not an OEM or AEM.
+    """
+    message = (
+        source
+        if isinstance(source, (Oem, Aem))
+        else NdmIo().from_path(source, lazy=True)
+    )
+    if not isinstance(message, (Oem, Aem)):
+        raise TypeError(
+            f"Only OEM and AEM data can be spliced, split or resampled, "
+            f"found {type(message).__name__}."
+        )
+    return message
+
+
+def _data_format(data_format, source):
+    """Output data format, that of the source file if not given."""
+    if data_format is not None:
+        return data_format
+    if isinstance(source, (Oem, Aem)):
+        return NDMFileFormats.KVN
+    return _identify_data_format(_peek_file(source))
+
+
+def _pieces(message, start_ns=None, stop_ns=None, after_start=False):
+    """
+    Parts of the segments within the epoch window, from their metadata.
+
+    Parameters
+    ----------
+    message : Oem or Aem
+        OEM or AEM object
+    start_ns : int or None
+        start of the window, `None` for unbounded
+    stop_ns : int or None
+        end of the window (included), `None` for unbounded
+    after_start : bool
+        `True` to exclude the start epoch itself
+
+    Yields
+    ------
+    _Piece
+        parts of the segments, with their metadata cut to the window
+    """
+    for segment in message.body.segment:
+        seg_start_ns, seg_stop_ns = parse_epochs_ns(
+            [segment.metadata.start_time, segment.metadata.stop_time]
+        ).tolist()
+
+        piece_after_start = False
+        if start_ns is not None and start_ns >= seg_start_ns:
+            seg_start_ns, piece_after_start = start_ns, after_start
+        if stop_ns is not None:
+            seg_stop_ns = min(seg_stop_ns, stop_ns)
+
+        if seg_start_ns < seg_stop_ns or (
+            seg_start_ns == seg_stop_ns and not piece_after_start
+        ):
+            yield _Piece(
+                segment, segment.metadata, seg_start_ns, seg_stop_ns, piece_after_start
+            )
+
+
+def _groups(pieces):
+    """
+    Groups the consecutive pieces to be concatenated into a single segment.
+
+    The later pieces of a group start after the end of the earlier ones, the
+    pieces within the earlier ones are skipped.
+    """
+    group: List[_Piece] = []
+    for piece in pieces:
+        if group and _metadata_key(piece.metadata) == _metadata_key(group[-1].metadata):
+            last_stop_ns = group[-1].stop_ns
+            if piece.start_ns <= last_stop_ns:
+                if piece.stop_ns <= last_stop_ns:
+                    continue
+                group.append(piece._replace(start_ns=last_stop_ns, after_start=True))
+                continue
+
+        if group:
+            yield group
+        group = [piece]
+
+    if group:
+        yield group
+
+
+def _metadata_key(metadata):
+    """Metadata values that should match for the concatenation."""
+    return tuple(
+        getattr(metadata, fld.name)
+        for fld in dataclasses.fields(metadata)
+        if fld.name != "comment" and fld.name not in _RANGE_FIELDS
+    )
+
+
+def _group_metadata(group):
+    """Metadata of the concatenated pieces, with the times cut to the pieces."""
+    first, last = group[0], group[-1]
+    metadata = cut_metadata(first.metadata, first.start_ns, last.stop_ns)
+    if last is not first:
+        stop_metadata = cut_metadata(last.metadata, stop=last.stop_ns)
+        times = {"stop_time": stop_metadata.stop_time}
+        if stop_metadata.useable_stop_time:
+            times["useable_stop_time"] = stop_metadata.useable_stop_time
+        metadata = dataclasses.replace(metadata, **times)
+    return metadata
+
+
+def _cut_time(epoch, cut_ns, select):
+    """Metadata epoch cut to `cut_ns` (with `max` or `min`), unchanged if
+    within the cut or undefined."""
+    if not epoch or cut_ns is None:
+        return epoch
+    epoch_ns = int(parse_epochs_ns([epoch])[0])
+    if select(epoch_ns, cut_ns) == epoch_ns:
+        return epoch
+    return _format_epochs(np.array([cut_ns], dtype=np.int64))[0]
+
+
+def _resampled_metadata(metadata):
+    """Metadata of the resampled segment, quaternion data for the AEMs."""
+    if not hasattr(metadata, "attitude_type"):
+        return metadata
+    # upper case values, as expected by the KVN reader
+    quaternion_type = QuaternionTypeType.FIRST_1
+    if metadata.quaternion_type is not None:
+        quaternion_type = QuaternionTypeType(metadata.quaternion_type.value.upper())
+    return dataclasses.replace(
+        metadata,
+        attitude_type=AttitudeTypeType.QUATERNION_1,
+        quaternion_type=quaternion_type,
+        rate_frame=None,
+    )
+
+
+def _message_class(segment):
+    """Message class (`Oem` or `Aem`) of the segment."""
+    return next(
+        ndm_class
+        for ndm_class, types in _lazy_message_types.items()
+        if isinstance(segment, types.segment)
+    )
+
+
+def _load_segment(segment):
+    """
+    Segment with its data parsed (without keeping it in the original segment)
+    and the epochs of its data lines.
+    """
+    types = _lazy_message_types[_message_class(segment)]
+    loaded = types.segment(metadata=segment.metadata, data=_loaded_data(segment))
+    if loaded.data is None or not getattr(
+        loaded.data, _data_line_fields[_message_class(segment)]
+    ):
+        return loaded, np.empty(0, dtype=np.int64)
+    return loaded, segment_columns(loaded).epochs_ns
+
+
+def _cut_data(loaded, piece, with_comments):
+    """Data object with the data lines within the piece, `None` if empty."""
+    segment, epochs_ns = loaded
+    first = np.searchsorted(
+        epochs_ns, piece.start_ns, side="right" if piece.after_start else "left"
+    )
+    last = np.searchsorted(epochs_ns, piece.stop_ns, side="right")
+    if last <= first:
+        return None
+
+    line_field = _data_line_fields[_message_class(segment)]
+    values = {
+        line_field: getattr(segment.data, line_field)[first:last],
+        "comment": segment.data.comment if with_comments else [],
+    }
+    if hasattr(segment.data, "covariance_matrix"):
+        cov_epochs_ns = [
+            parse_epochs_ns([cov.epoch])[0] for cov in segment.data.covariance_matrix
+        ]
+        values["covariance_matrix"] = [
+            cov
+            for cov, epoch_ns in zip(segment.data.covariance_matrix, cov_epochs_ns)
+            if epoch_ns <= piece.stop_ns
+            and (
+                epoch_ns > piece.start_ns
+                if piece.after_start
+                else epoch_ns >= piece.start_ns
+            )
+        ]
+    return dataclasses.replace(segment.data, **values)
+
+
+def _scan_kvn_segment(segment):
+    """
+    Finds the data lines of the lazily read KVN segment without parsing them.
+
+    Returns
+    -------
+    _KvnDataLines or None
+        data lines, `None` if the segment is not a lazily read KVN segment or
+        has covariance data
+    """
+    data = vars(segment).get("data")
+    if not isinstance(data, _LazyData):
+        return None
+    loader = data.__dict__["_lazy_loader"]
+    if not loader.prefix.lstrip().startswith(b"CCSDS_"):
+        return None
+
+    ndm_class = _message_class(segment)
+    with loader.source.open_buffer() as buffer:
+        if buffer.find(b"COVARIANCE_START", loader.start, loader.end) >= 0:
+            return None
+
+        block = np.frombuffer(buffer, np.uint8, loader.end - loader.start, loader.start)
+        line_start_chunks = [np.zeros(1, dtype=np.int64)]
+        for chunk_start in range(0, len(block), _CHUNK_SIZE):
+            chunk = block[chunk_start : chunk_start + _CHUNK_SIZE]
+            line_start_chunks.append(
+                np.flatnonzero(chunk == ord("\n")) + chunk_start + 1
+            )
+        line_starts = np.concatenate(line_start_chunks)
+        line_starts = line_starts[line_starts < len(block)]
+
+        line_starts, content_starts = _data_lines(block, line_starts, ndm_class)
+        del block, chunk
+
+    return _KvnDataLines(
+        loader, ndm_class, line_starts + loader.start, content_starts + loader.start
+    )
+
+
+def _copy_range(source, start, end, out_file):
+    """Copies the byte range of the source into the file, chunk by chunk."""
+    with source.open_buffer() as buffer:
+        for chunk_start in range(start, end, _CHUNK_SIZE):
+            out_file.write(buffer[chunk_start : min(chunk_start + _CHUNK_SIZE, end)])
+        if end > start and buffer[end - 1 : end] != b"\n":
+            out_file.write(b"\n")
+
+
+def _tag_line(text, tag, start=0, last=False):
+    """Start and end (including the newline) of the line with the XML tag,
+    `(-1, -1)` if not found."""
+    pos = text.rfind(tag, start) if last else text.find(tag, start)
+    if pos < 0:
+        return -1, -1
+    line_end = text.find(b"\n", pos)
+    return text.rfind(b"\n", 0, pos) + 1, len(text) if line_end < 0 else line_end + 1
+
+
+def _epoch_ns(epoch):
+    """Epoch in nanoseconds, `None` if not defined."""
+    if epoch is None:
+        return None
+    return int(to_epochs_ns([epoch])[0])
+
+
+def _format_epochs(epochs_ns):
+    """CCSDS epoch strings, with nanoseconds only if necessary."""
+    precision = 6 if not np.any(epochs_ns % 1000) else 9
+    return format_epochs_ns(epochs_ns, precision=precision).tolist()
+
+
+def state_vectors(epochs_ns, states):
+    """
+    Generates the OEM state vector objects of the sampled states.
+
+    The epochs are written with microseconds (or nanoseconds if necessary)
+    and the values as `Decimal`.
+
+    Parameters
+    ----------
+    epochs_ns : numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00
+    states : numpy.ndarray
+        (N, 6) positions [km] and velocities [km/s]
+
+    Returns
+    -------
+    list
+        state vector objects (`StateVectorAccType`) of the OEM data block
+    """
+    epochs = _format_epochs(np.asarray(epochs_ns, dtype=np.int64))
+    to_number = _number_converter("decimal")
+    return [
+        StateVectorAccType(
+            epoch=epoch,
+            x=PositionType(to_number(x)),
+            y=PositionType(to_number(y)),
+            z=PositionType(to_number(z)),
+            x_dot=VelocityType(to_number(vx)),
+            y_dot=VelocityType(to_number(vy)),
+            z_dot=VelocityType(to_number(vz)),
+        )
+        for epoch, (x, y, z, vx, vy, vz) in zip(epochs, states.tolist())
+    ]
+
+
+def _quaternion_states(epochs, quaternions):
+    """AEM quaternion attitude objects of the (scalar first) quaternions."""
+    to_number = _number_converter("decimal")
+    return [
+        AttitudeStateType(
+            quaternion_state=QuaternionEphemerisType(
+                epoch=epoch,
+                quaternion=QuaternionType(
+                    qc=to_number(qc),
+                    q1=to_number(q1),
+                    q2=to_number(q2),
+                    q3=to_number(q3),
+                ),
+            )
+        )
+        for epoch, (qc, q1, q2, q3) in zip(epochs, quaternions.tolist())
+    ]
@@ -0,0 +1,478 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Vectorised parsing of CCSDS epoch strings.
+
+The NDM models keep the epochs as strings, in calendar
+(`2020-12-29T03:57:59.406624`) or day-of-year (`2007-075T16:50:01`) format.
+The functions in this module convert whole arrays of these strings (mixed
+formats included) in a single pass to:
+
+- `int64` nanoseconds since 1970-01-01T00:00:00 (directly viewable as
+  `datetime64[ns]`)
+- two-part Modified Julian Dates, as an integer day part and a day fraction
+  part, both `float64`
+
+No time scale conversion is applied, the output is in the time scale of the
+input strings. Any UTC offset (`Z`, `+hh:mm` or `-hh:mm`) is removed. A leap
+second (`23:59:60`) is counted as the 86400th second of its day.
+
+"""
+
+import numpy as np
+
+NS_PER_SECOND = 1_000_000_000
+"""Nanoseconds in a second."""
+
+NS_PER_DAY = 86400 * NS_PER_SECOND
+"""Nanoseconds in a day (without leap seconds)."""
+
+MJD_UNIX_EPOCH = 40587
+"""Modified Julian Date of 1970-01-01T00:00:00."""
+
+_MAX_FRACTION_DIGITS = 18
+"""Maximum number of fraction of second digits processed."""
+
+_TZ_WIDTH = 7
+"""Number of columns checked for the time zone (e.g. `+hh:mm` and terminator)."""
+
+_MIN_WIDTH = 11 + 9 + _MAX_FRACTION_DIGITS + _TZ_WIDTH
+"""Minimum width of the character matrix for the fixed position checks."""
+
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+"""Number of days in each month (index 1 to 12) of a non-leap year."""
+
+_T, _DASH, _COLON, _DOT, _Z, _PLUS, _MINUS, _SPACE, _TAB, _ZERO = (
+    ord(char) for char in "T-:.Z+- \t0"
+)
+
+
+def parse_epochs_ns(epochs):
+    """
+    Parses the CCSDS epoch strings into nanoseconds since 1970-01-01T00:00:00.
+
+    The digits beyond nanoseconds are rounded.
+
+    Parameters
+    ----------
+    epochs : Iterable[str] or numpy.ndarray
+        CCSDS epoch strings (calendar or day-of-year format, can be mixed)
+
+    Returns
+    -------
+    numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00
+
+    Raises
+    ------
+    ValueError
+        Some epoch strings are not in CCSDS calendar or day-of-year format.
+    """
+    days, ns_of_day, sub_ns = _parse_epoch_parts(epochs)
+    return days * NS_PER_DAY + ns_of_day + np.rint(sub_ns).astype(np.int64)
+
+
+def parse_epochs_mjd(epochs):
+    """
+    Parses the CCSDS epoch strings into two-part Modified Julian Dates.
+
+    The integer day part and the day fraction part keep the full precision of
+    the input strings (down to about 10 picoseconds).
+
+    Parameters
+    ----------
+    epochs : Iterable[str] or numpy.ndarray
+        CCSDS epoch strings (calendar or day-of-year format, can be mixed)
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        MJD integer day and day fraction parts (both `float64`)
+
+    Raises
+    ------
+    ValueError
+        Some epoch strings are not in CCSDS calendar or day-of-year format.
+    """
+    days, ns_of_day, sub_ns = _parse_epoch_parts(epochs)
+    return (
+        (days + MJD_UNIX_EPOCH).astype(np.float64),
+        (ns_of_day + sub_ns) / NS_PER_DAY,
+    )
+
+
+def to_epochs_ns(epochs):
+    """
+    Converts the epochs into nanoseconds since 1970-01-01T00:00:00.
+
+    Parameters
+    ----------
+    epochs : Iterable or numpy.ndarray
+        CCSDS epoch strings, `datetime64` values or `int64` nanoseconds since
+        1970-01-01T00:00:00
+
+    Returns
+    -------
+    numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00
+
+    Raises
+    ------
+    ValueError
+        Some epoch strings are not in CCSDS calendar or day-of-year format.
+    """
+    epochs = np.asarray(epochs)
+    if epochs.dtype.kind in "USO":
+        return parse_epochs_ns(epochs.astype(str))
+    if epochs.dtype.kind == "M":
+        return epochs.astype("datetime64[ns]").view(np.int64)
+    return epochs.astype(np.int64, copy=False)
+
+
+def ns_to_mjd(epochs_ns):
+    """
+    Converts the nanoseconds since 1970-01-01T00:00:00 to two-part MJD.
+
+    Parameters
+    ----------
+    epochs_ns : numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        MJD integer day and day fraction parts (both `float64`)
+    """
+    days, ns_of_day = np.divmod(np.asarray(epochs_ns, dtype=np.int64), NS_PER_DAY)
+    return (days + MJD_UNIX_EPOCH).astype(np.float64), ns_of_day / NS_PER_DAY
+
+
+def mjd_to_ns(mjd_day, mjd_fraction):
+    """
+    Converts the two-part MJD to nanoseconds since 1970-01-01T00:00:00.
+
+    Parameters
+    ----------
+    mjd_day : numpy.ndarray
+        MJD day part
+    mjd_fraction : numpy.ndarray
+        MJD day fraction part
+
+    Returns
+    -------
+    numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00
+    """
+    mjd_day = np.asarray(mjd_day, dtype=np.float64)
+    mjd_fraction = np.asarray(mjd_fraction, dtype=np.float64)
+
+    # move any fraction in the day part to the fraction part
+    days = np.floor(mjd_day)
+    mjd_fraction = mjd_fraction + (mjd_day - days)
+
+    return (days.astype(np.int64) - MJD_UNIX_EPOCH) * NS_PER_DAY + np.rint(
+        mjd_fraction * NS_PER_DAY
+    ).astype(np.int64)
+
+
+def format_epochs_ns(epochs_ns, precision=6, day_of_year=False):
+    """
+    Formats nanoseconds since 1970-01-01T00:00:00 as CCSDS epoch strings.
+
+    Parameters
+    ----------
+    epochs_ns : numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00
+    precision : int
+        number of fraction of second digits (0 to 9)
+    day_of_year : bool
+        `True` for day-of-year format, `False` for calendar format
+
+    Returns
+    -------
+    numpy.ndarray
+        CCSDS epoch strings
+    """
+    if not 0 <= precision <= 9:
+        raise ValueError(f"Precision should be between 0 and 9, found {precision}.")
+
+    # round to the requested precision
+    step = 10 ** (9 - precision)
+    epochs_ns = np.asarray(epochs_ns, dtype=np.int64)
+    epochs_ns = (epochs_ns + step // 2) // step * step
+
+    cal_strings = np.datetime_as_string(
+        epochs_ns.view("datetime64[ns]"), unit="ns" if precision else "s"
+    )
+    if precision:
+        # strip the unused digits
+        cal_strings = cal_strings.astype(f"U{20 + precision}")
+
+    if not day_of_year:
+        return cal_strings
+
+    # replace month and day with day of year
+    days = epochs_ns // NS_PER_DAY
+    year_start = (
+        np.datetime_as_string(epochs_ns.view("datetime64[ns]"), unit="Y")
+        .astype("datetime64[D]")
+        .astype(np.int64)
+    )
+    doy = days - year_start + 1
+    return np.array(
+        [
+            f"{cal[:4]}-{day:03d}{cal[10:]}"
+            for cal, day in zip(cal_strings.tolist(), doy.tolist())
+        ]
+    )
+
+
+def days_from_civil(year, month, day):
+    """
+    Days since 1970-01-01 of the proleptic Gregorian calendar dates (vectorised).
+
+    Parameters
+    ----------
+    year : numpy.ndarray
+        years
+    month : numpy.ndarray
+        months (1 to 12)
+    day : numpy.ndarray
+        days of month (1 to 31)
+
+    Returns
+    -------
+    numpy.ndarray
+        days since 1970-01-01 (`int64`)
+    """
+    year = np.asarray(year, dtype=np.int64) - (np.asarray(month) <= 2)
+    month = np.asarray(month, dtype=np.int64)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _char_matrix(epochs):
+    """
+    Converts the epoch strings into a left-aligned matrix of ASCII codes.
+
+    Parameters
+    ----------
+    epochs : Iterable[str] or numpy.ndarray
+        epoch strings
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, W) matrix of `uint8` ASCII codes, padded with zeros
+    """
+    arr = np.asarray(epochs)
+    if arr.dtype.kind == "U" or arr.dtype.kind == "S":
+        arr = arr.astype("S")
+    else:
+        arr = np.array([str(epoch) for epoch in arr.ravel()], dtype="S")
+    arr = arr.ravel()
+
+    width = max(arr.dtype.itemsize, 1)
+    chars = arr.view(np.uint8).reshape(len(arr), width)
+
+    # pad to make space for fixed position checks
+    chars = np.pad(chars, ((0, 0), (0, max(_TZ_WIDTH, _MIN_WIDTH - width))))
+
+    # shift to remove any leading whitespace (rare, so row by row)
+    for i in np.flatnonzero((chars[:, 0] == _SPACE) | (chars[:, 0] == _TAB)):
+        stripped = bytes(chars[i]).lstrip(b" \t")
+        chars[i] = 0
+        chars[i, : len(stripped)] = np.frombuffer(stripped, dtype=np.uint8)
+
+    return chars
+
+
+def _parse_epoch_parts(epochs):
+    """
+    Parses the CCSDS epoch strings into their components.
+
+    Parameters
+    ----------
+    epochs : Iterable[str] or numpy.ndarray
+        CCSDS epoch strings (calendar or day-of-year format, can be mixed)
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        days since 1970-01-01 (`int64`), nanoseconds of day (`int64`)
+        and the remaining sub-nanoseconds (`float64`)
+
+    Raises
+    ------
+    ValueError
+        Some epoch strings are not in CCSDS calendar or day-of-year format.
+    """
+    chars = _char_matrix(epochs)
+    n_epochs = len(chars)
+
+    days = np.zeros(n_epochs, dtype=np.int64)
+    ns_of_day = np.zeros(n_epochs, dtype=np.int64)
+    sub_ns = np.zeros(n_epochs, dtype=np.float64)
+    valid = np.zeros(n_epochs, dtype=bool)
+
+    # the position of "T" identifies the format
+    is_cal = chars[:, 10] == _T
+    is_doy = (chars[:, 8] == _T) & ~is_cal
+
+    # process each format as a block, as the fields are at fixed columns
+    for group, is_calendar in ((is_cal, True), (is_doy, False)):
+        if group.all():
+            # single format (the usual case), no need to split the matrix
+            days, ns_of_day, sub_ns, valid = _parse_epoch_block(chars, is_calendar)
+            break
+
+        indexes = np.flatnonzero(group)
+        if len(indexes):
+            (
+                days[indexes],
+                ns_of_day[indexes],
+                sub_ns[indexes],
+                valid[indexes],
+            ) = _parse_epoch_block(chars[indexes], is_calendar)
+
+    if not valid.all():
+        bad_indexes = np.flatnonzero(~valid)
+        bad_epochs = [
+            bytes(chars[i]).rstrip(b"\x00").decode(errors="replace")
+            for i in bad_indexes[:5]
+        ]
+        raise ValueError(
+            f"{len(bad_indexes)} epoch(s) not in CCSDS calendar or day-of-year format "
+            f"(first indexes: {bad_indexes[:5].tolist()}, epochs: {bad_epochs})"
+        )
+
+    return days, ns_of_day, sub_ns
+
+
+def _parse_number(chars, start, length):
+    """
+    Parses the fixed width unsigned integers in the columns of the matrix.
+
+    Parameters
+    ----------
+    chars : numpy.ndarray
+        (N, W) matrix of `uint8` ASCII codes
+    start : int
+        start column
+    length : int
+        number of digits
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        parsed numbers (`int64`) and their validity (all characters are digits)
+    """
+    # digits wrap around in uint8, so any non-digit is larger than 9
+    block = chars[:, start : start + length] - np.uint8(_ZERO)
+    is_valid = (block <= 9).all(axis=1)
+    return block @ 10 ** np.arange(length - 1, -1, -1, dtype=np.int64), is_valid
+
+
+def _parse_epoch_block(chars, is_calendar):
+    """
+    Parses the CCSDS epoch strings of a single format into their components.
+
+    Parameters
+    ----------
+    chars : numpy.ndarray
+        (N, W) matrix of `uint8` ASCII codes
+    is_calendar : bool
+        `True` for calendar format, `False` for day-of-year format
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        days since 1970-01-01 (`int64`), nanoseconds of day (`int64`),
+        the remaining sub-nanoseconds (`float64`) and the validity of each epoch
+    """
+    # date part
+    year, valid = _parse_number(chars, 0, 4)
+    valid &= chars[:, 4] == _DASH
+    is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    if is_calendar:
+        month, valid_month = _parse_number(chars, 5, 2)
+        day, valid_day = _parse_number(chars, 8, 2)
+        valid &= valid_month & (month >= 1) & (month <= 12)
+        month_days = _MONTH_DAYS[np.where(valid, month, 0)] + (is_leap & (month == 2))
+        valid &= valid_day & (chars[:, 7] == _DASH) & (day >= 1) & (day <= month_days)
+        days = days_from_civil(year, month, day)
+        t0 = 11
+    else:
+        doy, valid_doy = _parse_number(chars, 5, 3)
+        valid &= valid_doy & (doy >= 1) & (doy <= 365 + is_leap)
+        days = days_from_civil(year, 1, 1) + doy - 1
+        t0 = 9
+
+    # time part
+    hour, valid_hour = _parse_number(chars, t0, 2)
+    minute, valid_minute = _parse_number(chars, t0 + 3, 2)
+    second, valid_second = _parse_number(chars, t0 + 6, 2)
+    valid &= (
+        valid_hour
+        & valid_minute
+        & valid_second
+        & (chars[:, t0 + 2] == _COLON)
+        & (chars[:, t0 + 5] == _COLON)
+        & (hour <= 24)
+        & (minute <= 59)
+        & (second <= 60)
+    )
+
+    # fraction of second part (consecutive digits after the dot)
+    has_dot = chars[:, t0 + 8] == _DOT
+    frac_block = chars[:, t0 + 9 : -_TZ_WIDTH] - np.uint8(_ZERO)
+    frac_valid = np.logical_and.accumulate(frac_block <= 9, axis=1)
+    frac_valid &= has_dot[:, None]
+    frac_digits = frac_block[:, :_MAX_FRACTION_DIGITS] * frac_valid[
+        :, :_MAX_FRACTION_DIGITS
+    ].view(np.uint8)
+    ns_fraction = frac_digits[:, :9] @ 10 ** np.arange(8, -1, -1, dtype=np.int64)
+    sub_ns = frac_digits[:, 9:] @ (10.0 ** -np.arange(1, 10))
+
+    # hour 24 only as the end of the day (24:00:00)
+    valid &= (hour < 24) | (
+        (minute == 0) & (second == 0) & (ns_fraction == 0) & (sub_ns == 0)
+    )
+
+    # time zone part (position depends on the fraction length)
+    end = t0 + 8 + has_dot + frac_valid.sum(axis=1)
+    tz_chars = np.take_along_axis(chars, end[:, None] + np.arange(_TZ_WIDTH), axis=1)
+    has_offset = (tz_chars[:, 0] == _PLUS) | (tz_chars[:, 0] == _MINUS)
+    tz_hour, valid_tz_hour = _parse_number(tz_chars, 1, 2)
+    tz_minute, valid_tz_minute = _parse_number(tz_chars, 4, 2)
+    valid &= ~has_offset | (
+        valid_tz_hour & valid_tz_minute & (tz_chars[:, 3] == _COLON)
+    )
+    offset_s = np.where(
+        has_offset,
+        np.where(tz_chars[:, 0] == _MINUS, -1, 1) * (tz_hour * 3600 + tz_minute * 60),
+        0,
+    )
+
+    # nothing else (but whitespace) should follow
+    tail_start = end + np.where(has_offset, 6, tz_chars[:, 0] == _Z)
+    first = tail_start.min(initial=chars.shape[1])
+    tail = chars[:, first:]
+    in_tail = np.arange(first, chars.shape[1]) >= tail_start[:, None]
+    valid &= ((tail == 0) | (tail == _SPACE) | (tail == _TAB) | ~in_tail).all(axis=1)
+
+    ns_of_day = (
+        hour * 3600 + minute * 60 + second - offset_s
+    ) * NS_PER_SECOND + ns_fraction
+
+    # normalise the day (time zone offsets can push the time to another day),
+    # leap seconds are kept in their own day
+    day_shift = np.floor_divide(ns_of_day - (second == 60) * NS_PER_SECOND, NS_PER_DAY)
+
+    return days + day_shift, ns_of_day - day_shift * NS_PER_DAY, sub_ns, valid
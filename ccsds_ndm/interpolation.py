@@ -0,0 +1,426 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Vectorised interpolation of the OEM state vectors.
+
+The interpolation method and degree are taken from the `INTERPOLATION` and
+`INTERPOLATION_DEGREE` metadata of each segment, unless overridden:
+
+- `LAGRANGE`: positions and velocities are interpolated separately with a
+  polynomial through `degree + 1` states
+- `HERMITE`: positions are interpolated with a polynomial matching the
+  positions and the velocities of the states, velocities are its
+  derivative. The polynomial of degree `2n - 1` through `n` states is used,
+  with the smallest `n` (at least 2) reaching the requested degree.
+- `LINEAR`: Lagrange interpolation between the two neighbouring states
+
+The states used for each query epoch are the ones closest to it (centred
+window), found with a binary search over the epochs of the segment. Each
+segment is interpolated separately, only within its useable time range
+(`USEABLE_START_TIME` and `USEABLE_STOP_TIME`, or the start and stop times if
+not defined) that is also covered by its data. Where the useable ranges of
+consecutive segments meet, the earlier segment is used.
+
+The polynomials are evaluated in the Newton form, with all the query epochs
+processed together as `numpy` arrays. The coefficients are computed only once
+for the queries sharing the same states.
+
+"""
+
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns, to_epochs_ns
+
+DEFAULT_DEGREE = 7
+"""Interpolation degree used when neither given nor defined in the metadata."""
+
+_CHUNK_SIZE = 32768
+"""Number of query epochs processed at once (to limit the memory use)."""
+
+_SegmentStates = namedtuple(
+    "_SegmentStates",
+    ["start_ns", "stop_ns", "epochs_ns", "times", "states", "method", "n_points"],
+)
+"""Interpolation setup of a single segment."""
+
+
+class InterpolationMethod(Enum):
+    """
+    Supported interpolation methods.
+    """
+
+    LAGRANGE = "LAGRANGE"
+    HERMITE = "HERMITE"
+    LINEAR = "LINEAR"
+
+    @staticmethod
+    def find_element(method):
+        """
+        Finds the interpolation method corresponding to the requested id.
+
+        Parameters
+        ----------
+        method : str or InterpolationMethod
+            method id (case insensitive), e.g. the `INTERPOLATION` metadata
+
+        Returns
+        -------
+        InterpolationMethod
+            correct `InterpolationMethod` enum corresponding to the id
+
+        Raises
+        ------
+        ValueError
+            Interpolation method not supported.
+        """
+        if isinstance(method, InterpolationMethod):
+            return method
+
+        for element in InterpolationMethod:
+            if element.value == str(method).strip().upper():
+                return element
+
+        raise ValueError(
+            f"Unsupported interpolation method: {method} "
+            f"(supported methods: LAGRANGE, HERMITE or LINEAR)"
+        )
+
+
+class OemInterpolator:
+    """
+    Interpolator of the state vectors of an OEM.
+
+    The query epochs are in the time system of the OEM, all segments should
+    share the same time system.
+
+    Parameters
+    ----------
+    oem
+        OEM object or a list of OEM segments
+    method : str or InterpolationMethod or None
+        interpolation method, `None` to use the `INTERPOLATION` metadata of
+        each segment (`LAGRANGE` if not defined)
+    degree : int or None
+        interpolation degree, `None` to use the `INTERPOLATION_DEGREE`
+        metadata of each segment (:data:`DEFAULT_DEGREE` if not defined)
+
+    Raises
+    ------
+    ValueError
+        Interpolation method not supported, segments with different time
+        systems, or the epochs of a segment not strictly increasing.
+    """
+
+    def __init__(self, oem, method=None, degree=None):
+        segments = oem.body.segment if hasattr(oem, "body") else oem
+
+        time_systems = {segment.metadata.time_system for segment in segments}
+        if len(time_systems) > 1:
+            raise ValueError(
+                f"OEM segments with different time systems cannot be "
+                f"interpolated together: {', '.join(map(str, time_systems))}"
+            )
+
+        self._segments = [
+            _segment_states(segment, method, degree)
+            for segment in segments
+            if segment.data is not None and segment.data.state_vector
+        ]
+
+    @property
+    def coverage(self):
+        """Interpolation ranges of the segments as (start, stop) epoch pairs,
+        in `int64` nanoseconds since 1970-01-01T00:00:00."""
+        return [(seg.start_ns, seg.stop_ns) for seg in self._segments]
+
+    def states(self, epochs):
+        """
+        Interpolates the states at the query epochs.
+
+        Parameters
+        ----------
+        epochs : numpy.ndarray or list
+            query epochs as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch strings
+
+        Returns
+        -------
+        numpy.ndarray
+            (N, 6) `float64` array of position and velocity, `NaN` for the
+            epochs outside the interpolation ranges
+        """
+        return _evaluate_segments(self._segments, to_epochs_ns(epochs), 6, _interpolate)
+
+    def __call__(self, epochs):
+        return self.states(epochs)
+
+
+def _segment_states(segment, method, degree):
+    """
+    Prepares the interpolation setup of the segment.
+
+    Parameters
+    ----------
+    segment : OemSegment
+        OEM segment with data
+    method : str or InterpolationMethod or None
+        interpolation method, `None` to use the metadata
+    degree : int or None
+        interpolation degree, `None` to use the metadata
+
+    Returns
+    -------
+    _SegmentStates
+        interpolation setup
+    """
+    metadata = segment.metadata
+    columns = segment_columns(segment)
+    epochs_ns = columns.epochs_ns
+    _check_epochs(epochs_ns, metadata)
+
+    if method is None:
+        method = metadata.interpolation or InterpolationMethod.LAGRANGE
+    method = InterpolationMethod.find_element(method)
+    if degree is None:
+        degree = metadata.interpolation_degree or DEFAULT_DEGREE
+
+    if method is InterpolationMethod.LINEAR:
+        n_points = 2
+    elif method is InterpolationMethod.HERMITE:
+        n_points = max(2, -(-(int(degree) + 1) // 2))
+    else:
+        n_points = int(degree) + 1
+    n_points = max(1, min(n_points, len(epochs_ns)))
+
+    start_ns, stop_ns = _useable_range(metadata, epochs_ns)
+
+    # seconds from the first epoch, for the polynomials
+    times = (epochs_ns - epochs_ns[0]) * 1e-9
+
+    return _SegmentStates(
+        start_ns, stop_ns, epochs_ns, times, columns.states, method, n_points
+    )
+
+
+def _check_epochs(epochs_ns, metadata):
+    """Checks that the epochs of the segment are strictly increasing."""
+    if np.any(np.diff(epochs_ns) <= 0):
+        raise ValueError(
+            f"Epochs of the segment ({metadata.object_name}) are not strictly "
+            f"increasing, cannot interpolate."
+        )
+
+
+def _useable_range(metadata, epochs_ns):
+    """
+    Useable time range of the segment that is covered by its data.
+
+    Parameters
+    ----------
+    metadata
+        segment metadata (with the start, stop and useable times)
+    epochs_ns : numpy.ndarray
+        epochs of the segment data
+
+    Returns
+    -------
+    (int, int)
+        start and stop epochs of the range
+    """
+    start_ns = epochs_ns[0]
+    stop_ns = epochs_ns[-1]
+    useable_start = metadata.useable_start_time or metadata.start_time
+    useable_stop = metadata.useable_stop_time or metadata.stop_time
+    if useable_start:
+        start_ns = max(start_ns, parse_epochs_ns([useable_start])[0])
+    if useable_stop:
+        stop_ns = min(stop_ns, parse_epochs_ns([useable_stop])[0])
+    return int(start_ns), int(stop_ns)
+
+
+def _evaluate_segments(segments, epochs_ns, width, interpolate):
+    """
+    Interpolates the segments at the query epochs falling into their ranges.
+
+    Parameters
+    ----------
+    segments : list
+        interpolation setup of each segment (with `start_ns` and `stop_ns`)
+    epochs_ns : numpy.ndarray
+        query epochs
+    width : int
+        number of interpolated values at each epoch
+    interpolate : Callable
+        interpolation function, called with the segment setup and the query
+        epochs within its range (in chunks)
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, width) interpolated values, `NaN` outside the segment ranges
+    """
+    result = np.full((len(epochs_ns), width), np.nan)
+
+    unassigned = np.ones(len(epochs_ns), dtype=bool)
+    for seg in segments:
+        indices = np.flatnonzero(
+            unassigned & (epochs_ns >= seg.start_ns) & (epochs_ns <= seg.stop_ns)
+        )
+        if not len(indices):
+            continue
+        unassigned[indices] = False
+
+        for start in range(0, len(indices), _CHUNK_SIZE):
+            chunk = indices[start : start + _CHUNK_SIZE]
+            result[chunk] = interpolate(seg, epochs_ns[chunk])
+
+    return result
+
+
+def _interpolate(seg, query_ns):
+    """
+    Interpolates the states of the segment at the query epochs.
+
+    Parameters
+    ----------
+    seg : _SegmentStates
+        interpolation setup of the segment
+    query_ns : numpy.ndarray
+        query epochs within the segment range
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, c) interpolated states
+
+    Notes
+    -----
+    For Hermite interpolation, the first half of the state columns are the
+    values and the second half their derivatives (e.g. position and velocity).
+    """
+    n_points = seg.n_points
+    n_samples = len(seg.epochs_ns)
+
+    # centred window of states around each query epoch
+    after = np.searchsorted(seg.epochs_ns, query_ns, side="right")
+    first = np.clip(after - 1 - (n_points - 1) // 2, 0, n_samples - n_points)
+
+    # polynomial coefficients computed once for each window used
+    windows, inverse = np.unique(first, return_inverse=True)
+    window_indices = windows[:, np.newaxis] + np.arange(n_points)
+    nodes = seg.times[window_indices]
+    states = seg.states[window_indices]
+    hermite = seg.method is InterpolationMethod.HERMITE and n_points > 1
+    if hermite:
+        nodes = np.repeat(nodes, 2, axis=1)
+        half = states.shape[2] // 2
+        coefs = _hermite_coefficients(nodes, states[:, :, :half], states[:, :, half:])
+    else:
+        coefs = _newton_coefficients(nodes, states)
+
+    # nodes relative to the query epochs (order first, for contiguous steps),
+    # polynomials evaluated at zero
+    query_times = (query_ns - seg.epochs_ns[0]) * 1e-9
+    offsets = query_times - nodes.T[:, inverse]
+    coefs = coefs.transpose(1, 0, 2)[:, inverse]
+    if hermite:
+        return np.concatenate(_newton_eval(offsets, coefs, True), axis=1)
+    return _newton_eval(offsets, coefs)[0]
+
+
+def _newton_coefficients(nodes, values, coefs=None, start_order=1):
+    """
+    Computes the divided differences (Newton form coefficients) in place.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        (N, k) interpolation nodes
+    values : numpy.ndarray
+        (N, k, c) values at the nodes
+    coefs : numpy.ndarray or None
+        (N, k, c) divided differences up to `start_order - 1`, `None` to
+        start from the values
+    start_order : int
+        first order of divided differences to compute
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, k, c) coefficients
+    """
+    if coefs is None:
+        coefs = values.copy()
+    for order in range(start_order, nodes.shape[1]):
+        steps = nodes[:, order:] - nodes[:, :-order]
+        coefs[:, order:] = (coefs[:, order:] - coefs[:, order - 1 : -1]) / steps[
+            :, :, np.newaxis
+        ]
+    return coefs
+
+
+def _hermite_coefficients(nodes, positions, velocities):
+    """
+    Computes the Newton form coefficients of the Hermite interpolation.
+
+    Each node is repeated twice, with the velocity as the first divided
+    difference between the repeated nodes. Any other values and their
+    derivatives can be interpolated in the same way.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        (N, 2k) interpolation nodes (each node repeated twice)
+    positions : numpy.ndarray
+        (N, k, c) positions at the nodes
+    velocities : numpy.ndarray
+        (N, k, c) velocities at the nodes
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 2k, c) coefficients
+    """
+    coefs = np.repeat(positions, 2, axis=1)
+    coefs[:, 1::2] = velocities
+    coefs[:, 2::2] = (positions[:, 1:] - positions[:, :-1]) / (
+        nodes[:, 2::2] - nodes[:, :-2:2]
+    )[:, :, np.newaxis]
+    return _newton_coefficients(nodes, None, coefs, 2)
+
+
+def _newton_eval(offsets, coefs, with_derivative=False):
+    """
+    Evaluates the Newton form polynomials (and their derivatives).
+
+    Parameters
+    ----------
+    offsets : numpy.ndarray
+        (k, N) evaluation points relative to the interpolation nodes
+    coefs : numpy.ndarray
+        (k, N, c) coefficients
+    with_derivative : bool
+        `True` to evaluate the derivatives as well
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray or None)
+        (N, c) values and derivatives (`None` if not requested)
+    """
+    value = coefs[-1].copy()
+    derivative = np.zeros_like(value) if with_derivative else None
+    for k in range(len(offsets) - 2, -1, -1):
+        offset = offsets[k, :, np.newaxis]
+        if with_derivative:
+            derivative *= offset
+            derivative += value
+        value *= offset
+        value += coefs[k]
+    return value, derivative
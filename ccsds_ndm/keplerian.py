@@ -0,0 +1,561 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Batch conversions between the Keplerian elements and the Cartesian states of
+the OPM and OMM collections.
+
+The Keplerian elements of the OPMs and the mean elements of the OMMs are
+collected into arrays (see :func:`opm_elements` and :func:`omm_elements`),
+the OMMs either as a list of messages or as a catalogue table (see
+:mod:`ccsds_ndm.ndm_arrow`). The conversions then work on all the objects
+together, with the two-body relations:
+
+- the semi-major axis is computed from the mean motion where necessary
+- the true anomaly is computed from the mean anomaly where necessary, by
+  solving Kepler's equation (elliptic and hyperbolic orbits)
+- the `GM` of the message is used where present
+
+The mean elements of the OMMs are used as they are, e.g. the SGP4 mean
+elements are not converted to osculating elements. The parabolic orbits are
+not supported.
+
+The distances are in km, the velocities in km/s and the angles in degrees,
+as in the messages.
+
+"""
+
+from collections import namedtuple
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import (
+    KeplerianElementsType,
+    Omm,
+    Opm,
+)
+
+DEFAULT_GM = 398600.4418
+"""Default gravitational coefficient (Earth) for the messages without `GM`
+(km**3/s**2)."""
+
+_KEPLER_TOLERANCE = 1e-14
+"""Convergence tolerance of the eccentric (or hyperbolic) anomaly (rad)."""
+
+_KEPLER_ITERATIONS = 50
+"""Maximum number of Newton iterations for Kepler's equation."""
+
+_SINGULAR_TOLERANCE = 1e-11
+"""Eccentricity (and relative node vector size) below which the orbit is
+taken as circular (or equatorial)."""
+
+_SECONDS_PER_DAY = 86400.0
+"""Seconds in a day, for the mean motion in rev/day."""
+
+_OPM_FIELDS = (
+    "semi_major_axis",
+    "eccentricity",
+    "inclination",
+    "ra_of_asc_node",
+    "arg_of_pericenter",
+    "true_anomaly",
+    "mean_anomaly",
+    "gm",
+)
+"""Fields of the OPM Keplerian elements, in the `KeplerianElements` order."""
+
+_OMM_FIELDS = (
+    "semi_major_axis",
+    "mean_motion",
+    "eccentricity",
+    "inclination",
+    "ra_of_asc_node",
+    "arg_of_pericenter",
+    "mean_anomaly",
+    "gm",
+)
+"""Fields of the OMM mean elements."""
+
+_STATE_FIELDS = ("x", "y", "z", "x_dot", "y_dot", "z_dot")
+"""Fields of the state vectors."""
+
+KeplerianElements = namedtuple(
+    "KeplerianElements",
+    [
+        "epochs_ns",
+        "semi_major_axis",
+        "eccentricity",
+        "inclination",
+        "ra_of_asc_node",
+        "arg_of_pericenter",
+        "true_anomaly",
+        "mean_anomaly",
+        "gm",
+    ],
+)
+KeplerianElements.__doc__ = """\
+Keplerian elements of a collection of objects, as arrays.
+
+`epochs_ns` is the `int64` array of epochs (nanoseconds since
+1970-01-01T00:00:00), the other fields are `float64` arrays: the semi-major
+axis [km] (negative for hyperbolic orbits), the eccentricity, the angles
+[deg] and the gravitational coefficient [km**3/s**2]. Either the true or the
+mean anomaly is sufficient, the undefined values are `NaN`.
+"""
+
+CartesianStates = namedtuple("CartesianStates", ["epochs_ns", "states", "gm"])
+CartesianStates.__doc__ = """\
+Cartesian states of a collection of objects, as arrays.
+
+`epochs_ns` is the `int64` array of epochs (nanoseconds since
+1970-01-01T00:00:00), `states` the (N, 6) array of positions and velocities
+[km, km/s] and `gm` the array of gravitational coefficients [km**3/s**2].
+"""
+
+
+def opm_elements(opms, gm=DEFAULT_GM):
+    """
+    Collects the Keplerian elements of the OPMs.
+
+    The epoch of the state vector is used for the elements. The OPMs without
+    Keplerian elements have `NaN` elements.
+
+    Parameters
+    ----------
+    opms : Opm or list
+        OPM object or a list of OPMs
+    gm : float
+        gravitational coefficient for the OPMs without `GM` [km**3/s**2]
+
+    Returns
+    -------
+    KeplerianElements
+        elements of the OPMs, in order
+    """
+    opms = [opms] if isinstance(opms, Opm) else opms
+    data = [opm.body.segment.data for opm in opms]
+
+    values = _values(
+        [data.keplerian_elements or KeplerianElementsType() for data in data],
+        _OPM_FIELDS,
+    )
+    (
+        semi_major_axis,
+        eccentricity,
+        inclination,
+        ra_of_asc_node,
+        arg_of_pericenter,
+        true_anomaly,
+        mean_anomaly,
+        gms,
+    ) = values.T
+    return KeplerianElements(
+        epochs_ns=parse_epochs_ns([data.state_vector.epoch for data in data]),
+        semi_major_axis=semi_major_axis,
+        eccentricity=eccentricity,
+        inclination=inclination,
+        ra_of_asc_node=ra_of_asc_node,
+        arg_of_pericenter=arg_of_pericenter,
+        true_anomaly=true_anomaly,
+        mean_anomaly=mean_anomaly,
+        gm=np.where(np.isnan(gms), gm, gms),
+    )
+
+
+def omm_elements(omms, gm=DEFAULT_GM):
+    """
+    Collects the mean elements of the OMMs.
+
+    The semi-major axis is computed from the mean motion where not defined.
+
+    Parameters
+    ----------
+    omms : Omm or list or pyarrow.Table
+        OMM object, a list of OMMs or a table of OMM records (see
+        :func:`.to_arrow`)
+    gm : float
+        gravitational coefficient for the OMMs without `GM` [km**3/s**2]
+
+    Returns
+    -------
+    KeplerianElements
+        elements of the OMMs, in order (the true anomaly is `NaN`)
+
+    Raises
+    ------
+    ValueError
+        Some OMMs have no mean elements.
+    """
+    if hasattr(omms, "column_names"):
+        values, epochs_ns = _table_values(omms)
+    else:
+        omms = [omms] if isinstance(omms, Omm) else omms
+        elements = [omm.body.segment.data.mean_elements for omm in omms]
+        missing = [n for n, element in enumerate(elements) if element is None]
+        if missing:
+            raise ValueError(f"OMMs without mean elements at indices: {missing}")
+        values = _values(elements, _OMM_FIELDS)
+        epochs_ns = parse_epochs_ns([element.epoch for element in elements])
+
+    (
+        semi_major_axis,
+        mean_motion,
+        eccentricity,
+        inclination,
+        ra_of_asc_node,
+        arg_of_pericenter,
+        mean_anomaly,
+        gms,
+    ) = values.T
+    gms = np.where(np.isnan(gms), gm, gms)
+
+    # Kepler's third law, mean motion in rev/day
+    mean_motion = mean_motion * 2.0 * np.pi / _SECONDS_PER_DAY
+    semi_major_axis = np.where(
+        np.isnan(semi_major_axis),
+        np.cbrt(gms / mean_motion**2),
+        semi_major_axis,
+    )
+    return KeplerianElements(
+        epochs_ns,
+        semi_major_axis,
+        eccentricity,
+        inclination,
+        ra_of_asc_node,
+        arg_of_pericenter,
+        np.full(len(gms), np.nan),
+        mean_anomaly,
+        gms,
+    )
+
+
+def opm_states(opms, gm=DEFAULT_GM):
+    """
+    Collects the state vectors of the OPMs.
+
+    Parameters
+    ----------
+    opms : Opm or list
+        OPM object or a list of OPMs
+    gm : float
+        gravitational coefficient for the OPMs without `GM` in the Keplerian
+        elements [km**3/s**2]
+
+    Returns
+    -------
+    CartesianStates
+        states of the OPMs, in order
+    """
+    opms = [opms] if isinstance(opms, Opm) else opms
+    data = [opm.body.segment.data for opm in opms]
+
+    state_vectors = [data.state_vector for data in data]
+    gms = _values(
+        [data.keplerian_elements or KeplerianElementsType() for data in data], ("gm",)
+    )[:, 0]
+    return CartesianStates(
+        parse_epochs_ns([state_vector.epoch for state_vector in state_vectors]),
+        _values(state_vectors, _STATE_FIELDS),
+        np.where(np.isnan(gms), gm, gms),
+    )
+
+
+def to_cartesian(elements):
+    """
+    Converts the Keplerian elements into Cartesian states.
+
+    The true anomaly is used where defined, otherwise it is computed from the
+    mean anomaly.
+
+    Parameters
+    ----------
+    elements : KeplerianElements
+        Keplerian elements
+
+    Returns
+    -------
+    CartesianStates
+        Cartesian states, `NaN` where not computable
+    """
+    eccentricity = np.asarray(elements.eccentricity, dtype=np.float64)
+    true_anomaly = np.where(
+        np.isnan(elements.true_anomaly),
+        np.degrees(
+            mean_to_true_anomaly(np.radians(elements.mean_anomaly), eccentricity)
+        ),
+        elements.true_anomaly,
+    )
+    inclination, ra_of_asc_node, arg_of_pericenter, true_anomaly = np.radians(
+        [
+            elements.inclination,
+            elements.ra_of_asc_node,
+            elements.arg_of_pericenter,
+            true_anomaly,
+        ]
+    )
+
+    # perifocal axes
+    cos_raan, sin_raan = np.cos(ra_of_asc_node), np.sin(ra_of_asc_node)
+    cos_argp, sin_argp = np.cos(arg_of_pericenter), np.sin(arg_of_pericenter)
+    cos_inc, sin_inc = np.cos(inclination), np.sin(inclination)
+    p_axes = np.stack(
+        [
+            cos_raan * cos_argp - sin_raan * sin_argp * cos_inc,
+            sin_raan * cos_argp + cos_raan * sin_argp * cos_inc,
+            sin_argp * sin_inc,
+        ],
+        axis=1,
+    )
+    q_axes = np.stack(
+        [
+            -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc,
+            -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc,
+            cos_argp * sin_inc,
+        ],
+        axis=1,
+    )
+
+    gms = np.asarray(elements.gm, dtype=np.float64)
+    semi_latus_rectum = elements.semi_major_axis * (1.0 - eccentricity**2)
+    cos_nu, sin_nu = np.cos(true_anomaly), np.sin(true_anomaly)
+    radii = semi_latus_rectum / (1.0 + eccentricity * cos_nu)
+    speeds = np.sqrt(gms / semi_latus_rectum)
+
+    positions = (radii * cos_nu)[:, np.newaxis] * p_axes + (radii * sin_nu)[
+        :, np.newaxis
+    ] * q_axes
+    velocities = speeds[:, np.newaxis] * (
+        -sin_nu[:, np.newaxis] * p_axes
+        + (eccentricity + cos_nu)[:, np.newaxis] * q_axes
+    )
+    return CartesianStates(
+        np.asarray(elements.epochs_ns), np.hstack([positions, velocities]), gms
+    )
+
+
+def to_keplerian(states):
+    """
+    Converts the Cartesian states into osculating Keplerian elements.
+
+    For the circular orbits, the argument of pericentre is zero and the
+    anomalies are measured from the ascending node. For the equatorial
+    orbits, the right ascension of the ascending node is zero and the
+    argument of pericentre is measured from the x axis.
+
+    Parameters
+    ----------
+    states : CartesianStates
+        Cartesian states
+
+    Returns
+    -------
+    KeplerianElements
+        Keplerian elements, with both the true and the mean anomalies, the
+        angles within [0, 360) degrees (except the mean anomaly of the
+        hyperbolic orbits)
+    """
+    values = np.asarray(states.states, dtype=np.float64)
+    gms = np.broadcast_to(np.asarray(states.gm, dtype=np.float64), len(values))
+    positions, velocities = values[:, :3], values[:, 3:]
+
+    radii = np.linalg.norm(positions, axis=1)
+    speeds_sq = np.einsum("ij,ij->i", velocities, velocities)
+    radial_speeds = np.einsum("ij,ij->i", positions, velocities)
+
+    momenta = np.cross(positions, velocities)
+    momentum_axes = momenta / np.linalg.norm(momenta, axis=1)[:, np.newaxis]
+    nodes = np.stack([-momenta[:, 1], momenta[:, 0], np.zeros(len(momenta))], axis=1)
+    eccentricity_vectors = (
+        (speeds_sq - gms / radii)[:, np.newaxis] * positions
+        - radial_speeds[:, np.newaxis] * velocities
+    ) / gms[:, np.newaxis]
+    eccentricity = np.linalg.norm(eccentricity_vectors, axis=1)
+
+    # reference directions of the singular cases: the x axis for equatorial
+    # and the node for circular orbits
+    node_sizes = np.linalg.norm(nodes, axis=1)
+    equatorial = node_sizes <= _SINGULAR_TOLERANCE * np.linalg.norm(momenta, axis=1)
+    node_axes = np.where(
+        equatorial[:, np.newaxis],
+        [1.0, 0.0, 0.0],
+        nodes / np.where(equatorial, 1.0, node_sizes)[:, np.newaxis],
+    )
+    circular = eccentricity <= _SINGULAR_TOLERANCE
+    pericentre_axes = np.where(
+        circular[:, np.newaxis],
+        node_axes,
+        eccentricity_vectors / np.where(circular, 1.0, eccentricity)[:, np.newaxis],
+    )
+
+    ra_of_asc_node = np.arctan2(node_axes[:, 1], node_axes[:, 0])
+    arg_of_pericenter = _angle(node_axes, pericentre_axes, momentum_axes)
+    true_anomaly = _angle(pericentre_axes, positions, momentum_axes)
+    inclination = np.arccos(np.clip(momentum_axes[:, 2], -1.0, 1.0))
+    # the hyperbolic mean anomaly is not an angle, it is not wrapped
+    mean_anomaly = np.degrees(true_to_mean_anomaly(true_anomaly, eccentricity))
+    mean_anomaly = np.where(eccentricity < 1.0, mean_anomaly % 360.0, mean_anomaly)
+
+    return KeplerianElements(
+        np.asarray(states.epochs_ns),
+        1.0 / (2.0 / radii - speeds_sq / gms),
+        eccentricity,
+        np.degrees(inclination),
+        np.degrees(ra_of_asc_node) % 360.0,
+        np.degrees(arg_of_pericenter) % 360.0,
+        np.degrees(true_anomaly) % 360.0,
+        mean_anomaly,
+        np.array(gms),
+    )
+
+
+def mean_to_true_anomaly(mean_anomaly, eccentricity):
+    """
+    Converts the mean anomalies into true anomalies.
+
+    Kepler's equation is solved with Newton iterations, for all the elliptic
+    and hyperbolic orbits together.
+
+    Parameters
+    ----------
+    mean_anomaly : numpy.ndarray
+        mean anomalies [rad]
+    eccentricity : numpy.ndarray
+        eccentricities
+
+    Returns
+    -------
+    numpy.ndarray
+        true anomalies [rad], `NaN` for the parabolic orbits
+    """
+    mean_anomaly, eccentricity = np.broadcast_arrays(
+        np.asarray(mean_anomaly, dtype=np.float64),
+        np.asarray(eccentricity, dtype=np.float64),
+    )
+    hyperbolic = eccentricity > 1.0
+
+    # elliptic: M = E - e sin E, within [-pi, pi) (Danby starting values)
+    mean_elliptic = np.remainder(mean_anomaly + np.pi, 2.0 * np.pi) - np.pi
+    anomaly = np.where(
+        hyperbolic,
+        np.arcsinh(mean_anomaly / np.where(hyperbolic, eccentricity, 1.0)),
+        mean_elliptic + 0.85 * eccentricity * np.sign(np.sin(mean_elliptic)),
+    )
+    for _ in range(_KEPLER_ITERATIONS):
+        # hyperbolic: M = e sinh H - H
+        residual = np.where(
+            hyperbolic,
+            eccentricity * np.sinh(anomaly) - anomaly - mean_anomaly,
+            anomaly - eccentricity * np.sin(anomaly) - mean_elliptic,
+        )
+        derivative = np.where(
+            hyperbolic,
+            eccentricity * np.cosh(anomaly) - 1.0,
+            1.0 - eccentricity * np.cos(anomaly),
+        )
+        step = residual / derivative
+        anomaly = anomaly - step
+        if not np.any(np.abs(step) > _KEPLER_TOLERANCE):
+            break
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        true_anomaly = np.where(
+            hyperbolic,
+            2.0
+            * np.arctan(
+                np.sqrt((eccentricity + 1.0) / (eccentricity - 1.0))
+                * np.tanh(anomaly / 2.0)
+            ),
+            2.0
+            * np.arctan2(
+                np.sqrt(1.0 + eccentricity) * np.sin(anomaly / 2.0),
+                np.sqrt(1.0 - eccentricity) * np.cos(anomaly / 2.0),
+            ),
+        )
+    return np.where(eccentricity == 1.0, np.nan, true_anomaly)
+
+
+def true_to_mean_anomaly(true_anomaly, eccentricity):
+    """
+    Converts the true anomalies into mean anomalies.
+
+    Parameters
+    ----------
+    true_anomaly : numpy.ndarray
+        true anomalies [rad]
+    eccentricity : numpy.ndarray
+        eccentricities
+
+    Returns
+    -------
+    numpy.ndarray
+        mean anomalies [rad], `NaN` for the parabolic orbits
+    """
+    true_anomaly, eccentricity = np.broadcast_arrays(
+        np.asarray(true_anomaly, dtype=np.float64),
+        np.asarray(eccentricity, dtype=np.float64),
+    )
+    hyperbolic = eccentricity > 1.0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        eccentric_anomaly = 2.0 * np.arctan2(
+            np.sqrt(1.0 - eccentricity) * np.sin(true_anomaly / 2.0),
+            np.sqrt(1.0 + eccentricity) * np.cos(true_anomaly / 2.0),
+        )
+        hyperbolic_anomaly = 2.0 * np.arctanh(
+            np.sqrt((eccentricity - 1.0) / (eccentricity + 1.0))
+            * np.tan(true_anomaly / 2.0)
+        )
+    mean_anomaly = np.where(
+        hyperbolic,
+        eccentricity * np.sinh(hyperbolic_anomaly) - hyperbolic_anomaly,
+        eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly),
+    )
+    return np.where(eccentricity == 1.0, np.nan, mean_anomaly)
+
+
+def _values(blocks, names):
+    """Values of the fields of the blocks as an (N, M) array, `NaN` if not
+    defined."""
+    getter = attrgetter(*names)
+    rows = map(getter, blocks) if len(names) > 1 else zip(map(getter, blocks))
+    elements = chain.from_iterable(rows)
+
+    # the object array conversion calls `float()` on each value
+    values = np.array(
+        [
+            np.nan if element is None else getattr(element, "value", element)
+            for element in elements
+        ],
+        dtype=object,
+    )
+    return values.astype(np.float64).reshape(len(blocks), len(names))
+
+
+def _table_values(table):
+    """Values of the OMM fields (and the epochs) of the table of OMM records."""
+    columns = {
+        "semi_major_axis": "mean_elements.semi_major_axis",
+        "mean_motion": "mean_elements.mean_motion.value",
+        "gm": "mean_elements.gm.value",
+    }
+    values = np.full((table.num_rows, len(_OMM_FIELDS)), np.nan)
+    for n, name in enumerate(_OMM_FIELDS):
+        column_name = columns.get(name, f"mean_elements.{name}")
+        if column_name in table.column_names:
+            values[:, n] = table.column(column_name).to_numpy(zero_copy_only=False)
+
+    epochs = table.column("mean_elements.epoch").to_numpy(zero_copy_only=False)
+    return values, epochs.astype("datetime64[ns]").view(np.int64)
+
+
+def _angle(from_axes, to_vectors, normal_axes):
+    """Angles from the axes to the vectors, about the normal axes [rad]."""
+    return np.arctan2(
+        np.einsum("ij,ij->i", np.cross(from_axes, to_vectors), normal_axes),
+        np.einsum("ij,ij->i", from_axes, to_vectors),
+    )
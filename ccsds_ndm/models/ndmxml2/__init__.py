@@ -1,238 +1,522 @@
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_aem_1_0 import (
-    AemBody,
-    AemData,
-    AemMetadata,
-    AemRateFrameType,
-    AemSegment,
-    AemType,
-    AttitudeStateType,
-    AttitudeTypeType,
-    EulerAngleRateType,
-    EulerAngleType,
-    QuaternionDerivativeType,
-    QuaternionEphemerisType,
-    QuaternionEulerRateType,
-    QuaternionTypeType,
-    SpinNutationType,
-    SpinType,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_apm_1_0 import (
-    ApmBody,
-    ApmData,
-    ApmMetadata,
-    ApmRateFrameType,
-    ApmSegment,
-    ApmType,
-    AttManeuverParametersType,
-    AttSpacecraftParametersType,
-    EulerElementsSpinType,
-    EulerElementsThreeType,
-    QuaternionStateType,
-    TorqueType,
-    TorqueUnits,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_cdm_1_0 import (
-    AdditionalParametersType,
-    CdmBody,
-    CdmCovarianceMatrixType,
-    CdmData,
-    CdmHeader,
-    CdmMetadata,
-    CdmPositionType,
-    CdmSegment,
-    CdmStateVectorType,
-    CdmType,
-    CdmVelocityType,
-    CovarianceMethodType,
-    DvType,
-    DvUnits,
-    M2KgType,
-    M2KgUnits,
-    M2S2Type,
-    M2S2Units,
-    M2S3Type,
-    M2S3Units,
-    M2S4Type,
-    M2S4Units,
-    M2SType,
-    M2SUnits,
-    M2Type,
-    M2Units,
-    M3Kgs2Type,
-    M3Kgs2Units,
-    M3KgsType,
-    M3KgsUnits,
-    M3KgType,
-    M3KgUnits,
-    M4Kg2Type,
-    M4Kg2Units,
-    ManeuverableType,
-    ObjectType,
-    ReferenceFrameType,
-    RelativeMetadataData,
-    RelativeStateVectorType,
-    ScreenVolumeFrameType,
-    ScreenVolumeShapeType,
-    WkgType,
-    WkgUnits,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_common_2_0 import (
-    AccType,
-    AccUnits,
-    AltType,
-    AngleKeywordType,
-    AngleRateKeywordType,
-    AngleRateType,
-    AngleRateUnits,
-    AngleType,
-    AngleUnits,
-    AreaType,
-    AreaUnits,
-    AtmosphericReentryParametersType,
-    BallisticCoeffType,
-    BallisticCoeffUnitsType,
-    ControlledType,
-    DayIntervalType,
-    DayIntervalUnits,
-    DeltamassType,
-    DisintegrationType,
-    DistanceType,
-    DurationType,
-    FrequencyType,
-    FrequencyUnits,
-    GmType,
-    GmUnits,
-    GroundImpactParametersType,
-    ImpactUncertaintyType,
-    InclinationType,
-    Km2S2Type,
-    Km2S2Units,
-    Km2SType,
-    Km2SUnits,
-    Km2Type,
-    Km2Units,
-    LatLonUnits,
-    LatType,
-    LengthType,
-    LengthUnits,
-    LonType,
-    MassType,
-    MassUnits,
-    MomentType,
-    MomentUnits,
-    Ms2Type,
-    Ms2Units,
-    NdmHeader,
-    ObjectDescriptionType,
-    OdParametersType,
-    OemCovarianceMatrixAbstractType,
-    OemCovarianceMatrixType,
-    OpmCovarianceMatrixAbstractType,
-    OpmCovarianceMatrixType,
-    PercentageType,
-    PercentageUnits,
-    PositionCovarianceType,
-    PositionCovarianceUnits,
-    PositionType,
-    PositionUnits,
-    PositionVelocityCovarianceType,
-    PositionVelocityCovarianceUnits,
-    QuaternionDotType,
-    QuaternionDotUnits,
-    QuaternionRateType,
-    QuaternionType,
-    RdmPositionType,
-    RdmSpacecraftParametersType,
-    RdmVelocityType,
-    ReentryUncertaintyMethodType,
-    RotationAngleComponentType,
-    RotationAngleComponentTypeold,
-    RotationAngleType,
-    RotationRateComponentType,
-    RotationRateComponentTypeOld,
-    RotationRateType,
-    RotDirectionType,
-    RotseqType,
-    SpacecraftParametersType,
-    StateVectorAccType,
-    StateVectorType,
-    TimeSystemType,
-    TimeUnits,
-    UserDefinedParameterType,
-    UserDefinedType,
-    VelocityCovarianceType,
-    VelocityCovarianceUnits,
-    VelocityType,
-    VelocityUnits,
-    YesNoType,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_master_2_0 import (
-    Aem,
-    Apm,
-    Cdm,
-    Ndm,
-    Oem,
-    Omm,
-    Opm,
-    Rdm,
-    Tdm,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_ndm_2_0 import NdmType
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_oem_2_0 import (
-    OemBody,
-    OemData,
-    OemMetadata,
-    OemSegment,
-    OemType,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_omm_2_0 import (
-    BStarType,
-    BStarUnits,
-    DdRevType,
-    DdRevUnits,
-    DRevType,
-    DRevUnits,
-    MeanElementsType,
-    OmmBody,
-    OmmData,
-    OmmMetadata,
-    OmmSegment,
-    OmmType,
-    RevType,
-    RevUnits,
-    TleParametersType,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_opm_2_0 import (
-    KeplerianElementsType,
-    ManeuverParametersType,
-    OpmBody,
-    OpmData,
-    OpmMetadata,
-    OpmSegment,
-    OpmType,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_rdm_1_0 import (
-    RdmBody,
-    RdmData,
-    RdmHeader,
-    RdmMetadata,
-    RdmSegment,
-    RdmType,
-)
-from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_tdm_2_0 import (
-    AngleTypeType,
-    DataQualityType,
-    IntegrationRefType,
-    ModeType,
-    RangemodeType,
-    RangeUnitsType,
-    RefFrameType,
-    TdmBody,
-    TdmData,
-    TdmHeader,
-    TdmMetadata,
-    TdmSegment,
-    TdmType,
-    TimetagRefType,
-    TrackingDataObservationType,
-)
+"""
+Classes of the NDM/XML 2.0 schemas, generated by `xsdata`.
+
+The generated modules are imported on the first access to one of their
+classes (e.g. `OmmType` only loads the OMM and the common modules), which
+keeps the package import fast. The root element classes (e.g. `Omm`) load the
+master module, with all the message types.
+
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # the classes as seen by the static type checkers
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_aem_1_0 import (
+        AemBody,
+        AemData,
+        AemMetadata,
+        AemRateFrameType,
+        AemSegment,
+        AemType,
+        AttitudeStateType,
+        AttitudeTypeType,
+        EulerAngleRateType,
+        EulerAngleType,
+        QuaternionDerivativeType,
+        QuaternionEphemerisType,
+        QuaternionEulerRateType,
+        QuaternionTypeType,
+        SpinNutationType,
+        SpinType,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_apm_1_0 import (
+        ApmBody,
+        ApmData,
+        ApmMetadata,
+        ApmRateFrameType,
+        ApmSegment,
+        ApmType,
+        AttManeuverParametersType,
+        AttSpacecraftParametersType,
+        EulerElementsSpinType,
+        EulerElementsThreeType,
+        QuaternionStateType,
+        TorqueType,
+        TorqueUnits,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_cdm_1_0 import (
+        AdditionalParametersType,
+        CdmBody,
+        CdmCovarianceMatrixType,
+        CdmData,
+        CdmHeader,
+        CdmMetadata,
+        CdmPositionType,
+        CdmSegment,
+        CdmStateVectorType,
+        CdmType,
+        CdmVelocityType,
+        CovarianceMethodType,
+        DvType,
+        DvUnits,
+        M2KgType,
+        M2KgUnits,
+        M2S2Type,
+        M2S2Units,
+        M2S3Type,
+        M2S3Units,
+        M2S4Type,
+        M2S4Units,
+        M2SType,
+        M2SUnits,
+        M2Type,
+        M2Units,
+        M3Kgs2Type,
+        M3Kgs2Units,
+        M3KgsType,
+        M3KgsUnits,
+        M3KgType,
+        M3KgUnits,
+        M4Kg2Type,
+        M4Kg2Units,
+        ManeuverableType,
+        ObjectType,
+        ReferenceFrameType,
+        RelativeMetadataData,
+        RelativeStateVectorType,
+        ScreenVolumeFrameType,
+        ScreenVolumeShapeType,
+        WkgType,
+        WkgUnits,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_common_2_0 import (
+        AccType,
+        AccUnits,
+        AltType,
+        AngleKeywordType,
+        AngleRateKeywordType,
+        AngleRateType,
+        AngleRateUnits,
+        AngleType,
+        AngleUnits,
+        AreaType,
+        AreaUnits,
+        AtmosphericReentryParametersType,
+        BallisticCoeffType,
+        BallisticCoeffUnitsType,
+        ControlledType,
+        DayIntervalType,
+        DayIntervalUnits,
+        DeltamassType,
+        DisintegrationType,
+        DistanceType,
+        DurationType,
+        FrequencyType,
+        FrequencyUnits,
+        GmType,
+        GmUnits,
+        GroundImpactParametersType,
+        ImpactUncertaintyType,
+        InclinationType,
+        Km2S2Type,
+        Km2S2Units,
+        Km2SType,
+        Km2SUnits,
+        Km2Type,
+        Km2Units,
+        LatLonUnits,
+        LatType,
+        LengthType,
+        LengthUnits,
+        LonType,
+        MassType,
+        MassUnits,
+        MomentType,
+        MomentUnits,
+        Ms2Type,
+        Ms2Units,
+        NdmHeader,
+        ObjectDescriptionType,
+        OdParametersType,
+        OemCovarianceMatrixAbstractType,
+        OemCovarianceMatrixType,
+        OpmCovarianceMatrixAbstractType,
+        OpmCovarianceMatrixType,
+        PercentageType,
+        PercentageUnits,
+        PositionCovarianceType,
+        PositionCovarianceUnits,
+        PositionType,
+        PositionUnits,
+        PositionVelocityCovarianceType,
+        PositionVelocityCovarianceUnits,
+        QuaternionDotType,
+        QuaternionDotUnits,
+        QuaternionRateType,
+        QuaternionType,
+        RdmPositionType,
+        RdmSpacecraftParametersType,
+        RdmVelocityType,
+        ReentryUncertaintyMethodType,
+        RotationAngleComponentType,
+        RotationAngleComponentTypeold,
+        RotationAngleType,
+        RotationRateComponentType,
+        RotationRateComponentTypeOld,
+        RotationRateType,
+        RotDirectionType,
+        RotseqType,
+        SpacecraftParametersType,
+        StateVectorAccType,
+        StateVectorType,
+        TimeSystemType,
+        TimeUnits,
+        UserDefinedParameterType,
+        UserDefinedType,
+        VelocityCovarianceType,
+        VelocityCovarianceUnits,
+        VelocityType,
+        VelocityUnits,
+        YesNoType,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_master_2_0 import (
+        Aem,
+        Apm,
+        Cdm,
+        Ndm,
+        Oem,
+        Omm,
+        Opm,
+        Rdm,
+        Tdm,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_ndm_2_0 import NdmType
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_oem_2_0 import (
+        OemBody,
+        OemData,
+        OemMetadata,
+        OemSegment,
+        OemType,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_omm_2_0 import (
+        BStarType,
+        BStarUnits,
+        DdRevType,
+        DdRevUnits,
+        DRevType,
+        DRevUnits,
+        MeanElementsType,
+        OmmBody,
+        OmmData,
+        OmmMetadata,
+        OmmSegment,
+        OmmType,
+        RevType,
+        RevUnits,
+        TleParametersType,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_opm_2_0 import (
+        KeplerianElementsType,
+        ManeuverParametersType,
+        OpmBody,
+        OpmData,
+        OpmMetadata,
+        OpmSegment,
+        OpmType,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_rdm_1_0 import (
+        RdmBody,
+        RdmData,
+        RdmHeader,
+        RdmMetadata,
+        RdmSegment,
+        RdmType,
+    )
+    from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_tdm_2_0 import (
+        AngleTypeType,
+        DataQualityType,
+        IntegrationRefType,
+        ModeType,
+        RangemodeType,
+        RangeUnitsType,
+        RefFrameType,
+        TdmBody,
+        TdmData,
+        TdmHeader,
+        TdmMetadata,
+        TdmSegment,
+        TdmType,
+        TimetagRefType,
+        TrackingDataObservationType,
+    )
+
+_MODULE_CLASSES = {
+    "ndmxml_2_0_0_aem_1_0": (
+        "AemBody",
+        "AemData",
+        "AemMetadata",
+        "AemRateFrameType",
+        "AemSegment",
+        "AemType",
+        "AttitudeStateType",
+        "AttitudeTypeType",
+        "EulerAngleRateType",
+        "EulerAngleType",
+        "QuaternionDerivativeType",
+        "QuaternionEphemerisType",
+        "QuaternionEulerRateType",
+        "QuaternionTypeType",
+        "SpinNutationType",
+        "SpinType",
+    ),
+    "ndmxml_2_0_0_apm_1_0": (
+        "ApmBody",
+        "ApmData",
+        "ApmMetadata",
+        "ApmRateFrameType",
+        "ApmSegment",
+        "ApmType",
+        "AttManeuverParametersType",
+        "AttSpacecraftParametersType",
+        "EulerElementsSpinType",
+        "EulerElementsThreeType",
+        "QuaternionStateType",
+        "TorqueType",
+        "TorqueUnits",
+    ),
+    "ndmxml_2_0_0_cdm_1_0": (
+        "AdditionalParametersType",
+        "CdmBody",
+        "CdmCovarianceMatrixType",
+        "CdmData",
+        "CdmHeader",
+        "CdmMetadata",
+        "CdmPositionType",
+        "CdmSegment",
+        "CdmStateVectorType",
+        "CdmType",
+        "CdmVelocityType",
+        "CovarianceMethodType",
+        "DvType",
+        "DvUnits",
+        "M2KgType",
+        "M2KgUnits",
+        "M2S2Type",
+        "M2S2Units",
+        "M2S3Type",
+        "M2S3Units",
+        "M2S4Type",
+        "M2S4Units",
+        "M2SType",
+        "M2SUnits",
+        "M2Type",
+        "M2Units",
+        "M3Kgs2Type",
+        "M3Kgs2Units",
+        "M3KgsType",
+        "M3KgsUnits",
+        "M3KgType",
+        "M3KgUnits",
+        "M4Kg2Type",
+        "M4Kg2Units",
+        "ManeuverableType",
+        "ObjectType",
+        "ReferenceFrameType",
+        "RelativeMetadataData",
+        "RelativeStateVectorType",
+        "ScreenVolumeFrameType",
+        "ScreenVolumeShapeType",
+        "WkgType",
+        "WkgUnits",
+    ),
+    "ndmxml_2_0_0_common_2_0": (
+        "AccType",
+        "AccUnits",
+        "AltType",
+        "AngleKeywordType",
+        "AngleRateKeywordType",
+        "AngleRateType",
+        "AngleRateUnits",
+        "AngleType",
+        "AngleUnits",
+        "AreaType",
+        "AreaUnits",
+        "AtmosphericReentryParametersType",
+        "BallisticCoeffType",
+        "BallisticCoeffUnitsType",
+        "ControlledType",
+        "DayIntervalType",
+        "DayIntervalUnits",
+        "DeltamassType",
+        "DisintegrationType",
+        "DistanceType",
+        "DurationType",
+        "FrequencyType",
+        "FrequencyUnits",
+        "GmType",
+        "GmUnits",
+        "GroundImpactParametersType",
+        "ImpactUncertaintyType",
+        "InclinationType",
+        "Km2S2Type",
+        "Km2S2Units",
+        "Km2SType",
+        "Km2SUnits",
+        "Km2Type",
+        "Km2Units",
+        "LatLonUnits",
+        "LatType",
+        "LengthType",
+        "LengthUnits",
+        "LonType",
+        "MassType",
+        "MassUnits",
+        "MomentType",
+        "MomentUnits",
+        "Ms2Type",
+        "Ms2Units",
+        "NdmHeader",
+        "ObjectDescriptionType",
+        "OdParametersType",
+        "OemCovarianceMatrixAbstractType",
+        "OemCovarianceMatrixType",
+        "OpmCovarianceMatrixAbstractType",
+        "OpmCovarianceMatrixType",
+        "PercentageType",
+        "PercentageUnits",
+        "PositionCovarianceType",
+        "PositionCovarianceUnits",
+        "PositionType",
+        "PositionUnits",
+        "PositionVelocityCovarianceType",
+        "PositionVelocityCovarianceUnits",
+        "QuaternionDotType",
+        "QuaternionDotUnits",
+        "QuaternionRateType",
+        "QuaternionType",
+        "RdmPositionType",
+        "RdmSpacecraftParametersType",
+        "RdmVelocityType",
+        "ReentryUncertaintyMethodType",
+        "RotationAngleComponentType",
+        "RotationAngleComponentTypeold",
+        "RotationAngleType",
+        "RotationRateComponentType",
+        "RotationRateComponentTypeOld",
+        "RotationRateType",
+        "RotDirectionType",
+        "RotseqType",
+        "SpacecraftParametersType",
+        "StateVectorAccType",
+        "StateVectorType",
+        "TimeSystemType",
+        "TimeUnits",
+        "UserDefinedParameterType",
+        "UserDefinedType",
+        "VelocityCovarianceType",
+        "VelocityCovarianceUnits",
+        "VelocityType",
+        "VelocityUnits",
+        "YesNoType",
+    ),
+    "ndmxml_2_0_0_master_2_0": (
+        "Aem",
+        "Apm",
+        "Cdm",
+        "Ndm",
+        "Oem",
+        "Omm",
+        "Opm",
+        "Rdm",
+        "Tdm",
+    ),
+    "ndmxml_2_0_0_ndm_2_0": ("NdmType",),
+    "ndmxml_2_0_0_oem_2_0": (
+        "OemBody",
+        "OemData",
+        "OemMetadata",
+        "OemSegment",
+        "OemType",
+    ),
+    "ndmxml_2_0_0_omm_2_0": (
+        "BStarType",
+        "BStarUnits",
+        "DdRevType",
+        "DdRevUnits",
+        "DRevType",
+        "DRevUnits",
+        "MeanElementsType",
+        "OmmBody",
+        "OmmData",
+        "OmmMetadata",
+        "OmmSegment",
+        "OmmType",
+        "RevType",
+        "RevUnits",
+        "TleParametersType",
+    ),
+    "ndmxml_2_0_0_opm_2_0": (
+        "KeplerianElementsType",
+        "ManeuverParametersType",
+        "OpmBody",
+        "OpmData",
+        "OpmMetadata",
+        "OpmSegment",
+        "OpmType",
+    ),
+    "ndmxml_2_0_0_rdm_1_0": (
+        "RdmBody",
+        "RdmData",
+        "RdmHeader",
+        "RdmMetadata",
+        "RdmSegment",
+        "RdmType",
+    ),
+    "ndmxml_2_0_0_tdm_2_0": (
+        "AngleTypeType",
+        "DataQualityType",
+        "IntegrationRefType",
+        "ModeType",
+        "RangemodeType",
+        "RangeUnitsType",
+        "RefFrameType",
+        "TdmBody",
+        "TdmData",
+        "TdmHeader",
+        "TdmMetadata",
+        "TdmSegment",
+        "TdmType",
+        "TimetagRefType",
+        "TrackingDataObservationType",
+    ),
+}
+"""Public classes of each generated module."""
+
+_CLASS_MODULES = {
+    name: module_name
+    for module_name, names in _MODULE_CLASSES.items()
+    for name in names
+}
+"""Generated module of each public class."""
+
+__all__ = list(_CLASS_MODULES)
+
+
+def __getattr__(name):
+    """Imports the generated module of the class (or the module itself)."""
+    if name in _MODULE_CLASSES:
+        return import_module(f"{__name__}.{name}")
+
+    module_name = _CLASS_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_CLASS_MODULES))
@@ -0,0 +1,951 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Conversion of the tabular NDM contents to and from Apache Arrow tables,
+Parquet files and Arrow IPC streams.
+
+Requires the optional `pyarrow` package (e.g. `pip install pyarrow`).
+
+Each data record type becomes a separate table (see :data:`RECORD_TYPES`):
+OEM state vectors and covariance matrices, AEM attitude states, TDM
+observations and OMM data (a single record per message, e.g. for a GP
+catalogue). Each row holds a single record with:
+
+- `message` and `segment`: index of the message in the input and index of
+  the segment within the message
+- `header.<field>` and `metadata.<field>`: header and metadata of the
+  segment, dictionary-encoded (comments joined with newlines)
+- the record fields, with nested objects flattened into dotted names (e.g.
+  `mean_elements.inclination`)
+
+The real numbers are stored as `float64` and the `epoch` fields of the
+records as `timestamp[ns]`, in the time system of the segment. Values with
+fixed units (e.g. `PositionType`) are stored as plain numbers, with their
+units in the field metadata (`units` key) of the schema. The units of the
+individual values are not kept.
+
+The tables are built in batches of records while the messages are read,
+therefore the input does not have to fit into memory: it can be a generator
+of NDM objects, and the data blocks of messages read in lazy mode are parsed
+one segment at a time (see :mod:`ccsds_ndm.ndm_lazy`), without being kept in
+the message.
+
+"""
+
+import typing
+from collections import namedtuple
+from dataclasses import is_dataclass
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ccsds_ndm.epochs import format_epochs_ns, parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import (
+    Aem,
+    AttitudeStateType,
+    Ndm,
+    NdmHeader,
+    Oem,
+    OemCovarianceMatrixType,
+    Omm,
+    OmmBody,
+    OmmData,
+    OmmMetadata,
+    OmmSegment,
+    StateVectorAccType,
+    Tdm,
+    TrackingDataObservationType,
+)
+from ccsds_ndm.ndm_lazy import (
+    _lazy_message_types,
+    _LazyMessageType,
+    _loaded_data,
+    _segments,
+)
+from ccsds_ndm.numeric_backend import _number_converter, _optional_type
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    # optional dependency, checked on use
+    pa = None
+
+DEFAULT_BATCH_SIZE = 65536
+"""Default maximum number of records in a record batch."""
+
+_FORMAT_VERSION = "1"
+"""Version of the table layout, stored in the schema metadata."""
+
+_RECORD_TYPE_KEY = b"ccsds_ndm.record_type"
+"""Schema metadata key of the record type."""
+
+_FORMAT_VERSION_KEY = b"ccsds_ndm.format_version"
+"""Schema metadata key of the table layout version."""
+
+RecordType = namedtuple("RecordType", ["message_class", "data_field", "record_class"])
+"""Message class, field of the data object holding the records (`None` if the
+data object itself is the record) and the record class of a record type."""
+
+RECORD_TYPES = {
+    "oem_state_vector": RecordType(Oem, "state_vector", StateVectorAccType),
+    "oem_covariance_matrix": RecordType(
+        Oem, "covariance_matrix", OemCovarianceMatrixType
+    ),
+    "aem_attitude_state": RecordType(Aem, "attitude_state", AttitudeStateType),
+    "tdm_observation": RecordType(Tdm, "observation", TrackingDataObservationType),
+    "omm": RecordType(Omm, None, OmmData),
+}
+"""Supported record types (table names)."""
+
+_message_types = {
+    **_lazy_message_types,
+    Omm: _LazyMessageType(NdmHeader, OmmBody, OmmSegment, OmmMetadata, OmmData),
+}
+"""Classes making up each supported message type."""
+
+_Node = namedtuple("_Node", ["name", "field", "kind", "cls", "units", "children"])
+"""
+Column (or group of columns) of a model class field.
+
+The kinds are `string`, `epoch`, `number`, `integer`, `enum`, `string_list`,
+`unit_value` (value with fixed units), `object_list` (list of objects,
+stored as a list of structs) and `nested` (object with its fields as separate
+columns, in `children`).
+"""
+
+
+def record_schema(record_type):
+    """
+    Generates the Arrow schema of the record type.
+
+    Parameters
+    ----------
+    record_type : str
+        record type (see :data:`RECORD_TYPES`)
+
+    Returns
+    -------
+    pyarrow.Schema
+        schema of the tables of the record type
+
+    Raises
+    ------
+    ValueError
+        Record type not supported.
+    """
+    _require_pyarrow()
+    rec_type = _find_record_type(record_type)
+    classes = _message_types[rec_type.message_class]
+
+    schema_fields = [
+        pa.field("message", pa.int64(), nullable=False),
+        pa.field("segment", pa.int64(), nullable=False),
+    ]
+    for prefix, cls in [("header.", classes.header), ("metadata.", classes.metadata)]:
+        schema_fields.extend(
+            pa.field(prefix + node.name, _context_arrow_type(node))
+            for node in _leaves(_plan(cls))
+        )
+    for node in _leaves(_plan(rec_type.record_class)):
+        metadata = {"units": node.units} if node.units else None
+        schema_fields.append(pa.field(node.name, _arrow_type(node), metadata=metadata))
+
+    return pa.schema(
+        schema_fields,
+        metadata={
+            _RECORD_TYPE_KEY: record_type,
+            _FORMAT_VERSION_KEY: _FORMAT_VERSION,
+        },
+    )
+
+
+def record_batches(ndm_objs, record_type, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generates the record batches of the record type from the NDM objects.
+
+    The NDM objects are read one by one, combined NDM objects are searched for
+    the messages of the requested type and any other messages are skipped.
+
+    Parameters
+    ----------
+    ndm_objs
+        NDM object or an iterable (e.g. a generator) of NDM objects
+    record_type : str
+        record type (see :data:`RECORD_TYPES`)
+    batch_size : int
+        maximum number of records in each batch
+
+    Yields
+    ------
+    pyarrow.RecordBatch
+        batch of records, with the schema of :func:`record_schema`
+
+    Raises
+    ------
+    ValueError
+        Record type not supported.
+    """
+    schema = record_schema(record_type)
+    rec_type = _find_record_type(record_type)
+    classes = _message_types[rec_type.message_class]
+    header_plan = _plan(classes.header)
+    metadata_plan = _plan(classes.metadata)
+
+    runs = []
+    run_size = 0
+    for message_index, message in enumerate(
+        _messages(ndm_objs, rec_type.message_class)
+    ):
+        header_values = _context_values(header_plan, message.header)
+        for segment_index, segment in enumerate(_segments(message)):
+            records = _segment_records(segment, rec_type.data_field)
+            if not records:
+                continue
+            metadata_values = _context_values(metadata_plan, segment.metadata)
+
+            start = 0
+            while start < len(records):
+                count = min(batch_size - run_size, len(records) - start)
+                runs.append(
+                    (
+                        message_index,
+                        segment_index,
+                        header_values,
+                        metadata_values,
+                        records[start : start + count],
+                    )
+                )
+                run_size += count
+                start += count
+                if run_size == batch_size:
+                    yield _record_batch(schema, rec_type, runs)
+                    runs = []
+                    run_size = 0
+
+    if runs:
+        yield _record_batch(schema, rec_type, runs)
+
+
+def to_arrow(ndm_objs, record_type, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Converts the records of the NDM objects into an Arrow table.
+
+    Parameters
+    ----------
+    ndm_objs
+        NDM object or an iterable (e.g. a generator) of NDM objects
+    record_type : str
+        record type (see :data:`RECORD_TYPES`)
+    batch_size : int
+        maximum number of records in each batch of the table
+
+    Returns
+    -------
+    pyarrow.Table
+        table of the records
+    """
+    return pa.Table.from_batches(
+        record_batches(ndm_objs, record_type, batch_size),
+        schema=record_schema(record_type),
+    )
+
+
+def write_parquet(
+    ndm_objs, file_path, record_type, batch_size=DEFAULT_BATCH_SIZE, **kwargs
+):
+    """
+    Writes the records of the NDM objects into a Parquet file, batch by batch.
+
+    Parameters
+    ----------
+    ndm_objs
+        NDM object or an iterable (e.g. a generator) of NDM objects
+    file_path : Path or AnyStr
+        path of the Parquet file
+    record_type : str
+        record type (see :data:`RECORD_TYPES`)
+    batch_size : int
+        maximum number of records in each batch
+    kwargs
+        further options of `pyarrow.parquet.ParquetWriter` (e.g. `compression`)
+    """
+    schema = record_schema(record_type)
+    with pq.ParquetWriter(str(file_path), schema, **kwargs) as writer:
+        for batch in record_batches(ndm_objs, record_type, batch_size):
+            writer.write_batch(batch)
+
+
+def write_ipc(ndm_objs, sink, record_type, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Writes the records of the NDM objects into an Arrow IPC stream, batch by
+    batch.
+
+    Parameters
+    ----------
+    ndm_objs
+        NDM object or an iterable (e.g. a generator) of NDM objects
+    sink : Path or AnyStr or file-like object
+        file path or writable binary stream
+    record_type : str
+        record type (see :data:`RECORD_TYPES`)
+    batch_size : int
+        maximum number of records in each batch
+    """
+    schema = record_schema(record_type)
+    if not hasattr(sink, "write"):
+        sink = str(sink)
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in record_batches(ndm_objs, record_type, batch_size):
+            writer.write_batch(batch)
+
+
+def from_arrow(tables, numeric="decimal"):
+    """
+    Converts the Arrow tables back into NDM objects.
+
+    The records of the same message (e.g. OEM state vectors and covariance
+    matrices) can be given in separate tables.
+
+    Parameters
+    ----------
+    tables : pyarrow.Table or pyarrow.RecordBatch or Iterable or dict
+        table or tables of records, with the schemas of :func:`record_schema`
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+
+    Returns
+    -------
+    list
+        NDM objects, one per message
+
+    Raises
+    ------
+    ValueError
+        Tables not generated from the NDM objects, or of different message
+        types.
+    """
+    _require_pyarrow()
+    if isinstance(tables, (pa.Table, pa.RecordBatch)):
+        tables = [tables]
+    elif isinstance(tables, dict):
+        tables = list(tables.values())
+
+    to_number = _number_converter(numeric)
+
+    message_class = None
+    messages: Dict[int, Dict[str, Any]] = {}
+    for table in tables:
+        rec_type = _table_record_type(table)
+        if message_class not in (None, rec_type.message_class):
+            raise ValueError("Tables of different message types cannot be combined.")
+        message_class = rec_type.message_class
+        _read_table(table, rec_type, to_number, messages)
+
+    if message_class is None:
+        return []
+    return [
+        _build_message(message_class, messages[index], to_number)
+        for index in sorted(messages)
+    ]
+
+
+def read_parquet(file_path, numeric="decimal"):
+    """
+    Reads the NDM objects from a Parquet file.
+
+    Parameters
+    ----------
+    file_path : Path or AnyStr
+        path of the Parquet file, written by :func:`write_parquet`
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+
+    Returns
+    -------
+    list
+        NDM objects, one per message
+    """
+    _require_pyarrow()
+    return from_arrow(pq.read_table(str(file_path)), numeric)
+
+
+def read_ipc(source, numeric="decimal"):
+    """
+    Reads the NDM objects from an Arrow IPC stream.
+
+    Parameters
+    ----------
+    source : Path or AnyStr or file-like object or bytes
+        file path, readable binary stream or the stream contents, written by
+        :func:`write_ipc`
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+
+    Returns
+    -------
+    list
+        NDM objects, one per message
+    """
+    _require_pyarrow()
+    if not hasattr(source, "read") and not isinstance(source, (bytes, bytearray)):
+        source = str(source)
+    with pa.ipc.open_stream(source) as reader:
+        return from_arrow(reader.read_all(), numeric)
+
+
+def _require_pyarrow():
+    """Checks that the optional `pyarrow` package is available."""
+    if pa is None:
+        raise ImportError(
+            "The Arrow and Parquet converters require the `pyarrow` package."
+        )
+
+
+def _find_record_type(record_type):
+    """Finds the record type definition, raises `ValueError` if not supported."""
+    try:
+        return RECORD_TYPES[record_type]
+    except KeyError:
+        raise ValueError(
+            f"Unknown record type: {record_type} "
+            f"(valid record types: {', '.join(RECORD_TYPES)})"
+        )
+
+
+def _table_record_type(table):
+    """Record type definition of the table, from its schema metadata."""
+    metadata = table.schema.metadata or {}
+    if metadata.get(_FORMAT_VERSION_KEY) != _FORMAT_VERSION.encode():
+        raise ValueError("Table not generated from NDM objects (or unsupported).")
+    return _find_record_type(metadata[_RECORD_TYPE_KEY].decode())
+
+
+def _messages(ndm_objs, message_class):
+    """
+    Iterates over the messages of the requested type.
+
+    Parameters
+    ----------
+    ndm_objs
+        NDM object or an iterable of NDM objects
+    message_class : type
+        message class (e.g. `Oem`)
+
+    Yields
+    ------
+    object
+        messages of the type, including those within combined NDM objects
+    """
+    if is_dataclass(ndm_objs):
+        ndm_objs = [ndm_objs]
+
+    for ndm_obj in ndm_objs:
+        if isinstance(ndm_obj, message_class):
+            yield ndm_obj
+        elif isinstance(ndm_obj, Ndm):
+            for value in vars(ndm_obj).values():
+                if isinstance(value, list):
+                    yield from (
+                        message
+                        for message in value
+                        if isinstance(message, message_class)
+                    )
+
+
+def _segment_records(segment, data_field):
+    """Records of the segment (parsing lazy data without keeping it)."""
+    data = _loaded_data(segment)
+    if data is None:
+        return []
+    if data_field is None:
+        return [data]
+    return getattr(data, data_field)
+
+
+# ------------------------ column plans ------------------------
+
+
+@lru_cache(maxsize=None)
+def _plan(cls, prefix=""):
+    """
+    Generates the columns of the fields of the model class.
+
+    Parameters
+    ----------
+    cls : type
+        model class
+    prefix : str
+        prefix of the column names
+
+    Returns
+    -------
+    tuple
+        `_Node` of each field
+    """
+    nodes = []
+    for name, hint in typing.get_type_hints(cls).items():
+        if name in ("id", "version"):
+            # message class constants
+            continue
+        nodes.append(_node(prefix + name, name, hint))
+    return tuple(nodes)
+
+
+def _node(name, field_name, hint):
+    """Generates the column (or the group of columns) of the field."""
+    hint = _optional_type(hint)
+
+    if typing.get_origin(hint) is list:
+        item_type = typing.get_args(hint)[0]
+        if item_type is str:
+            return _Node(name, field_name, "string_list", None, None, None)
+        return _Node(name, field_name, "object_list", item_type, None, _plan(item_type))
+
+    if hint is str:
+        kind = "epoch" if field_name == "epoch" else "string"
+        return _Node(name, field_name, kind, None, None, None)
+    if hint in (Decimal, float):
+        return _Node(name, field_name, "number", None, None, None)
+    if hint is int:
+        return _Node(name, field_name, "integer", None, None, None)
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return _Node(name, field_name, "enum", hint, None, None)
+
+    units = _fixed_units(hint)
+    if units is not None:
+        return _Node(name, field_name, "unit_value", hint, units, None)
+    return _Node(name, field_name, "nested", hint, None, _plan(hint, name + "."))
+
+
+def _fixed_units(cls):
+    """
+    Units of the value with fixed units (e.g. `PositionType`).
+
+    Returns
+    -------
+    str or None
+        units, `None` if the class is not a value with a single possible unit
+    """
+    hints = typing.get_type_hints(cls)
+    if (
+        set(hints) != {"value", "units"}
+        or _optional_type(hints["value"]) is not Decimal
+    ):
+        return None
+
+    units_type = _optional_type(hints["units"])
+    if not (isinstance(units_type, type) and issubclass(units_type, Enum)):
+        return None
+    members = list(units_type)
+    return members[0].value if len(members) == 1 else None
+
+
+def _leaves(nodes):
+    """Columns of the plan, with the nested groups expanded."""
+    leaves = []
+    for node in nodes:
+        if node.kind == "nested":
+            leaves.extend(_leaves(node.children))
+        else:
+            leaves.append(node)
+    return leaves
+
+
+def _arrow_type(node, in_struct=False):
+    """Arrow type of the record column."""
+    kind = node.kind
+    if kind in ("number", "unit_value"):
+        return pa.float64()
+    if kind == "integer":
+        return pa.int64()
+    if kind == "epoch" and not in_struct:
+        return pa.timestamp("ns")
+    if kind == "enum" and not in_struct:
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == "string_list":
+        return pa.list_(pa.string())
+    if kind == "object_list":
+        return pa.list_(
+            pa.struct(
+                [
+                    pa.field(child.name, _arrow_type(child, in_struct=True))
+                    for child in _leaves(node.children)
+                ]
+            )
+        )
+    return pa.string()
+
+
+def _context_arrow_type(node):
+    """Arrow type of the header or metadata column (dictionary-encoded)."""
+    if node.kind in ("number", "unit_value"):
+        value_type = pa.float64()
+    elif node.kind == "integer":
+        value_type = pa.int64()
+    else:
+        value_type = pa.string()
+    return pa.dictionary(pa.int32(), value_type)
+
+
+# ------------------------ export ------------------------
+
+
+def _extract(nodes, objs, columns):
+    """
+    Extracts the column values of the objects, column by column.
+
+    Parameters
+    ----------
+    nodes : tuple
+        column plan of the object class
+    objs : list
+        objects (or `None`)
+    columns : list
+        list of column values, extended with the values of each column
+    """
+    for node in nodes:
+        values = [None if obj is None else getattr(obj, node.field) for obj in objs]
+        if node.kind == "nested":
+            _extract(node.children, values, columns)
+        elif node.kind == "unit_value":
+            columns.append([None if value is None else value.value for value in values])
+        elif node.kind == "object_list":
+            columns.append(
+                [
+                    None if value is None else _struct_values(node.children, value)
+                    for value in values
+                ]
+            )
+        else:
+            columns.append(values)
+
+
+def _struct_values(nodes, objs):
+    """Converts the list of objects into a list of dicts (Arrow structs)."""
+    columns: List[list] = []
+    _extract(nodes, objs, columns)
+    leaves = _leaves(nodes)
+    converted = [
+        [_python_value(leaf, value) for value in column]
+        for leaf, column in zip(leaves, columns)
+    ]
+    names = [leaf.name for leaf in leaves]
+    return [dict(zip(names, row)) for row in zip(*converted)]
+
+
+def _python_value(node, value):
+    """Converts the value for the Arrow structs and dictionaries."""
+    if value is None:
+        return None
+    if node.kind in ("number", "unit_value"):
+        return float(value)
+    if node.kind == "enum":
+        return value.value
+    if node.kind == "string_list":
+        return "\n".join(value) if value else None
+    return value
+
+
+def _context_values(nodes, obj):
+    """Header or metadata values, converted for the dictionary columns."""
+    columns: List[list] = []
+    _extract(nodes, [obj], columns)
+    return [
+        _python_value(leaf, column[0]) for leaf, column in zip(_leaves(nodes), columns)
+    ]
+
+
+def _record_batch(schema, rec_type, runs):
+    """
+    Builds the record batch.
+
+    Parameters
+    ----------
+    schema : pyarrow.Schema
+        schema of the record type
+    rec_type : RecordType
+        record type definition
+    runs : list
+        (message index, segment index, header values, metadata values, records)
+        of each run of records from the same segment
+
+    Returns
+    -------
+    pyarrow.RecordBatch
+        record batch
+    """
+    counts = np.array([len(run[4]) for run in runs])
+    arrays = [
+        pa.array(np.repeat([run[0] for run in runs], counts), pa.int64()),
+        pa.array(np.repeat([run[1] for run in runs], counts), pa.int64()),
+    ]
+
+    n_header = len(runs[0][2])
+    n_metadata = len(runs[0][3])
+    context_types = [schema.field(i).type for i in range(2, 2 + n_header + n_metadata)]
+    for i, arrow_type in enumerate(context_types):
+        if i < n_header:
+            values = [run[2][i] for run in runs]
+        else:
+            values = [run[3][i - n_header] for run in runs]
+        arrays.append(_dictionary_array(values, counts, arrow_type))
+
+    records = [record for run in runs for record in run[4]]
+    columns: List[list] = []
+    plan = _plan(rec_type.record_class)
+    _extract(plan, records, columns)
+    for leaf, column in zip(_leaves(plan), columns):
+        arrays.append(_record_array(leaf, column))
+
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _dictionary_array(values, counts, arrow_type):
+    """Dictionary array with each value repeated `counts` times."""
+    dictionary = list(dict.fromkeys(value for value in values if value is not None))
+    codes = {value: code for code, value in enumerate(dictionary)}
+    indices = np.repeat([codes.get(value, -1) for value in values], counts)
+    return pa.DictionaryArray.from_arrays(
+        pa.array(indices, pa.int32(), mask=indices < 0),
+        pa.array(dictionary, arrow_type.value_type),
+    )
+
+
+def _record_array(node, values):
+    """Arrow array of the record column."""
+    kind = node.kind
+    if kind in ("number", "unit_value"):
+        return pa.array(
+            [None if value is None else float(value) for value in values],
+            pa.float64(),
+        )
+    if kind == "epoch":
+        mask = np.array([value is None for value in values], dtype=bool)
+        epochs_ns = np.zeros(len(values), np.int64)
+        if not mask.all():
+            epochs_ns[~mask] = parse_epochs_ns(
+                np.array([value for value in values if value is not None], dtype=str)
+            )
+        return pa.array(epochs_ns, pa.timestamp("ns"), mask=mask)
+    if kind == "enum":
+        return pa.array(
+            [None if value is None else value.value for value in values], pa.string()
+        ).dictionary_encode()
+    return pa.array(values, _arrow_type(node))
+
+
+# ------------------------ import ------------------------
+
+
+def _read_table(table, rec_type, to_number, messages):
+    """
+    Reads the records of the table, grouped by message and segment.
+
+    Parameters
+    ----------
+    table : pyarrow.Table or pyarrow.RecordBatch
+        table of records
+    rec_type : RecordType
+        record type definition of the table
+    to_number : Callable
+        converter of the `float` values
+    messages : dict
+        header values and segments (metadata values and records) of each
+        message, updated with the contents of the table
+    """
+    if table.num_rows == 0:
+        return
+    classes = _message_types[rec_type.message_class]
+    header_leaves = _leaves(_plan(classes.header))
+    metadata_leaves = _leaves(_plan(classes.metadata))
+
+    message_indices = table.column("message").to_numpy()
+    segment_indices = table.column("segment").to_numpy()
+    run_starts = np.flatnonzero(
+        np.r_[
+            True,
+            (np.diff(message_indices) != 0) | (np.diff(segment_indices) != 0),
+        ]
+    )
+    run_ends = np.r_[run_starts[1:], table.num_rows]
+
+    first_rows = table.take(pa.array(run_starts))
+    header_columns = [
+        first_rows.column("header." + leaf.name).to_pylist() for leaf in header_leaves
+    ]
+    metadata_columns = [
+        first_rows.column("metadata." + leaf.name).to_pylist()
+        for leaf in metadata_leaves
+    ]
+
+    plan = _plan(rec_type.record_class)
+    columns = [
+        _python_column(leaf, table.column(leaf.name), to_number)
+        for leaf in _leaves(plan)
+    ]
+    records = _build_objects(plan, iter(columns), table.num_rows, rec_type.record_class)
+
+    for run, (start, end) in enumerate(zip(run_starts.tolist(), run_ends.tolist())):
+        message = messages.setdefault(
+            int(message_indices[start]),
+            {"header": [column[run] for column in header_columns], "segments": {}},
+        )
+        segment = message["segments"].setdefault(
+            int(segment_indices[start]),
+            {"metadata": [column[run] for column in metadata_columns], "records": {}},
+        )
+        segment["records"].setdefault(rec_type.data_field, []).extend(
+            records[start:end]
+        )
+
+
+def _python_column(node, column, to_number):
+    """Converts the Arrow column into the values of the model fields."""
+    kind = node.kind
+    if kind == "epoch":
+        mask = column.is_null().to_numpy(zero_copy_only=False)
+        epochs_ns = column.cast(pa.int64()).fill_null(0).to_numpy()
+        strings = format_epochs_ns(epochs_ns, precision=9).tolist()
+        return [None if null else epoch for epoch, null in zip(strings, mask)]
+
+    values = column.to_pylist()
+    return _model_values(node, values, to_number)
+
+
+def _model_values(node, values, to_number):
+    """Converts the Python values of the column into the model field values."""
+    kind = node.kind
+    if kind in ("number", "unit_value"):
+        return [None if value is None else to_number(value) for value in values]
+    if kind == "enum":
+        return [None if value is None else node.cls(value) for value in values]
+    if kind == "string_list":
+        return [[] if value is None else value for value in values]
+    if kind == "object_list":
+        return [
+            [] if value is None else _objects_from_structs(node, value, to_number)
+            for value in values
+        ]
+    return values
+
+
+def _objects_from_structs(node, structs, to_number):
+    """Builds the list of objects from the list of dicts (Arrow structs)."""
+    columns = [
+        _model_values(leaf, [struct[leaf.name] for struct in structs], to_number)
+        for leaf in _leaves(node.children)
+    ]
+    return _build_objects(node.children, iter(columns), len(structs), node.cls)
+
+
+def _build_objects(nodes, columns, count, cls, optional=False):
+    """
+    Builds the objects from the column values.
+
+    Parameters
+    ----------
+    nodes : tuple
+        column plan of the class
+    columns : Iterator
+        values of each column (in the order of the plan leaves)
+    count : int
+        number of objects
+    cls : type
+        model class
+    optional : bool
+        `True` to return `None` instead of the objects without any values
+
+    Returns
+    -------
+    list
+        objects
+    """
+    field_values = {}
+    for node in nodes:
+        if node.kind == "nested":
+            values = _build_objects(node.children, columns, count, node.cls, True)
+        elif node.kind == "unit_value":
+            values = [
+                None if value is None else node.cls(value=value)
+                for value in next(columns)
+            ]
+        else:
+            values = next(columns)
+        field_values[node.field] = values
+
+    names = list(field_values)
+    objs: List[Any] = []
+    for row in zip(*field_values.values()):
+        if optional and all(value is None or value == [] for value in row):
+            objs.append(None)
+        else:
+            objs.append(cls(**dict(zip(names, row))))
+    return objs
+
+
+def _context_object(cls, values, to_number):
+    """Builds the header or metadata object from the dictionary column values."""
+    nodes = _plan(cls)
+    columns = []
+    for leaf, value in zip(_leaves(nodes), values):
+        if leaf.kind == "string_list":
+            value = [] if value is None else value.split("\n")
+        elif leaf.kind == "object_list":
+            value = []
+        columns.append(_model_values(leaf, [value], to_number))
+    return _build_objects(nodes, iter(columns), 1, cls)[0]
+
+
+def _build_message(message_class, contents, to_number):
+    """
+    Builds the message object.
+
+    Parameters
+    ----------
+    message_class : type
+        message class
+    contents : dict
+        header values and segments (metadata values and records)
+    to_number : Callable
+        converter of the `float` values
+
+    Returns
+    -------
+    object
+        message object
+    """
+    classes = _message_types[message_class]
+
+    segments = []
+    for index in sorted(contents["segments"]):
+        segment = contents["segments"][index]
+        records = segment["records"]
+        if None in records:
+            data = records[None][0]
+        else:
+            data = classes.data(**records)
+        segments.append(
+            classes.segment(
+                metadata=_context_object(
+                    classes.metadata, segment["metadata"], to_number
+                ),
+                data=data,
+            )
+        )
+
+    if message_class is Omm:
+        body = classes.body(segment=segments[0])
+    else:
+        body = classes.body(segment=segments)
+    return message_class(
+        header=_context_object(classes.header, contents["header"], to_number),
+        body=body,
+    )
@@ -0,0 +1,267 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Content addressed on-disk cache of the parsed NDM object trees.
+
+The cache is opt-in, pass a :class:`ParseCache` to :meth:`.NdmIo.from_path`
+or :meth:`.NdmIo.from_bytes`::
+
+    cache = ParseCache("~/.cache/ccsds_ndm", max_size=2**30)
+    oem = NdmIo().from_path(oem_file_path, cache=cache)
+
+The entries are keyed by the hash of the file contents, the library version
+and the parse options (e.g. the numeric backend), therefore a changed file or
+a new library version is never served from an old entry. The object trees
+are stored in the snapshot format (see :mod:`ccsds_ndm.ndm_snapshot`), which
+loads much faster than parsing the XML or KVN contents. Any other objects are
+stored in the `pickle` format.
+
+The cache size is bounded: when it grows above the maximum size, the least
+recently used entries are deleted. Several processes can use the same cache
+directory at the same time: the entries are written to temporary files and
+renamed into place atomically, and the eviction is done under a file lock
+(on platforms supporting `fcntl`).
+
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from dataclasses import is_dataclass
+from pathlib import Path
+
+from ccsds_ndm import __version__
+from ccsds_ndm.ndm_snapshot import _MAGIC, _gc_paused, from_snapshot, to_snapshot
+from ccsds_ndm.numeric_backend import NumericBackend
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # no file locking (e.g. on Windows), the atomic renames still apply
+    fcntl = None
+
+DEFAULT_MAX_SIZE = 1 << 30
+"""Default maximum size of the cache (1 GiB)."""
+
+_ENTRY_SUFFIX = ".entry"
+"""Suffix of the cache entry files."""
+
+_LOCK_FILE = ".lock"
+"""Name of the lock file in the cache directory."""
+
+
+class ParseCache:
+    """
+    Content addressed on-disk cache of the parsed NDM object trees.
+
+    Parameters
+    ----------
+    cache_dir : Path or AnyStr
+        cache directory (created if necessary)
+    max_size : int
+        maximum total size of the entries in bytes
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.max_size = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(ndm_data, numeric="decimal"):
+        """
+        Generates the cache key of the NDM data and the parse options.
+
+        Parameters
+        ----------
+        ndm_data : bytes
+            NDM data as read from the file
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+
+        Returns
+        -------
+        str
+            cache key (hex string)
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        options = f"{__version__}|{NumericBackend.find_element(numeric).value}|"
+        digest.update(options.encode())
+        digest.update(ndm_data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Loads the cached object tree.
+
+        Parameters
+        ----------
+        key : str
+            cache key
+
+        Returns
+        -------
+        object or None
+            cached object tree, `None` if not in the cache
+        """
+        path = self._entry_path(key)
+        try:
+            entry = path.read_bytes()
+            with _gc_paused():
+                if entry.startswith(_MAGIC):
+                    ndm_obj = from_snapshot(entry)
+                else:
+                    ndm_obj = pickle.loads(entry)
+        except FileNotFoundError:
+            return None
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            AttributeError,
+            ValueError,
+            KeyError,
+        ):
+            # broken or stale entry, discard it
+            path.unlink(missing_ok=True)
+            return None
+
+        # mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return ndm_obj
+
+    def put(self, key, ndm_obj):
+        """
+        Stores the object tree in the cache.
+
+        Parameters
+        ----------
+        key : str
+            cache key
+        ndm_obj
+            object tree to be stored
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if is_dataclass(ndm_obj):
+                    f.write(to_snapshot(ndm_obj))
+                else:
+                    pickle.dump(ndm_obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            # another process may be using the entry, skip caching
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+
+        self.evict()
+
+    def get_or_parse(self, ndm_data, parse, numeric="decimal"):
+        """
+        Loads the object tree from the cache, or parses and stores it.
+
+        Parameters
+        ----------
+        ndm_data : bytes
+            NDM data as read from the file
+        parse : Callable
+            parser without arguments, returning the object tree of `ndm_data`
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+
+        Returns
+        -------
+        object
+            NDM object tree
+        """
+        key = self.key(ndm_data, numeric)
+
+        ndm_obj = self.get(key)
+        if ndm_obj is None:
+            ndm_obj = parse()
+            self.put(key, ndm_obj)
+        return ndm_obj
+
+    def size(self):
+        """
+        Total size of the cache entries.
+
+        Returns
+        -------
+        int
+            total size in bytes
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache fits into
+        the maximum size.
+        """
+        with self._lock():
+            entries = sorted(self._entries(), key=lambda entry: entry[1])
+            total_size = sum(size for _, _, size in entries)
+            for path, _, size in entries:
+                if total_size <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+
+    def clear(self):
+        """
+        Deletes all cache entries.
+        """
+        with self._lock():
+            for path, _, _ in self._entries():
+                path.unlink(missing_ok=True)
+
+    def _entry_path(self, key):
+        """Path of the cache entry file."""
+        return self.cache_dir.joinpath(key[:2], key + _ENTRY_SUFFIX)
+
+    def _entries(self):
+        """
+        Lists the cache entries.
+
+        Returns
+        -------
+        list
+            (path, last use time, size) of each entry
+        """
+        entries = []
+        for sub_dir in self.cache_dir.iterdir():
+            if not sub_dir.is_dir():
+                continue
+            for path in sub_dir.glob("*" + _ENTRY_SUFFIX):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    # deleted by another process
+                    continue
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+        return entries
+
+    @contextmanager
+    def _lock(self):
+        """Exclusive lock on the cache directory (across processes)."""
+        if fcntl is None:  # pragma: no cover
+            yield
+            return
+
+        with open(self.cache_dir.joinpath(_LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
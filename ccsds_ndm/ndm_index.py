@@ -0,0 +1,790 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Sidecar byte offset index for random access into large OEM, AEM and TDM files.
+
+The index records the byte offsets of the metadata and data blocks of each
+segment, and the byte offset and the epoch of every `step`-th data line (as
+well as the first and the last data lines of each segment). With the index,
+the data lines within an epoch window can be read by seeking to the nearest
+indexed lines and parsing only the lines in between (see
+:meth:`NdmIndex.read_window`).
+
+The index is saved next to the data file (`<file name>.ndmidx`) or in a
+cache directory. It is validated against the file size, modification time and
+a fingerprint (hash) of the start and the end of the indexed contents. If the
+file has been appended to, only the last segment and the new segments are
+indexed again.
+
+Only KVN files are supported. The data lines are assumed to be in time order
+within each segment.
+
+"""
+
+import hashlib
+import os
+import tempfile
+from enum import Enum, auto
+from pathlib import Path
+
+import numpy as np
+
+from ccsds_ndm.columnar import clear_columns, segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Aem, Oem, Tdm
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo, _parse_kvn_header, _split_kvn_segments
+from ccsds_ndm.ndm_lazy import _ByteSource, _lazy_message_types
+
+DEFAULT_STEP = 100
+"""Default number of data lines between the indexed lines."""
+
+_INDEX_FORMAT_VERSION = 1
+"""Version of the saved index format, older versions are rebuilt."""
+
+_INDEX_SUFFIX = ".ndmidx"
+"""Suffix of the index files."""
+
+_FINGERPRINT_SIZE = 65536
+"""Size of the start and end blocks of the contents used in the fingerprint."""
+
+_CHUNK_SIZE = 1 << 26
+"""Size of the chunks while searching for the data lines."""
+
+_MAX_INDENT = 32
+"""Maximum number of blanks at the start of a data line."""
+
+_data_line_fields = {
+    Oem: "state_vector",
+    Aem: "attitude_state",
+    Tdm: "observation",
+}
+"""Data field holding the list of data lines, for each message type."""
+
+_ndm_types = {ndm_class.__name__.upper(): ndm_class for ndm_class in _data_line_fields}
+"""Message class for each type name."""
+
+
+class _FileState(Enum):
+    """
+    State of the data file with respect to its index.
+    """
+
+    VALID = auto()
+    APPENDED = auto()
+    MODIFIED = auto()
+
+
+class NdmIndex:
+    """
+    Byte offset index of an OEM, AEM or TDM KVN file.
+
+    Use :meth:`build` or :func:`open_index` to generate the index.
+
+    Parameters
+    ----------
+    file_path : Path
+        path of the data file
+    ndm_type : str
+        message type (`OEM`, `AEM` or `TDM`)
+    step : int
+        number of data lines between the indexed lines
+    file_size : int
+        size of the indexed contents
+    mtime_ns : int
+        modification time of the file when indexed
+    fingerprint : str
+        hash of the start and the end of the indexed contents
+    segment_blocks : numpy.ndarray
+        (metadata start, metadata end, data start, data end) offsets for
+        each segment, as an (S, 4) array
+    line_counts : numpy.ndarray
+        number of data lines in each segment
+    entry_segments : numpy.ndarray
+        segment index of each indexed line
+    entry_lines : numpy.ndarray
+        line number of each indexed line within its segment data lines
+    entry_offsets : numpy.ndarray
+        start offset of each indexed line
+    entry_epochs_ns : numpy.ndarray
+        epoch of each indexed line as `int64` nanoseconds since 1970
+    """
+
+    def __init__(
+        self,
+        file_path,
+        ndm_type,
+        step,
+        file_size,
+        mtime_ns,
+        fingerprint,
+        segment_blocks,
+        line_counts,
+        entry_segments,
+        entry_lines,
+        entry_offsets,
+        entry_epochs_ns,
+    ):
+        self.file_path = Path(file_path)
+        self.ndm_type = ndm_type
+        self.step = step
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.fingerprint = fingerprint
+        self.segment_blocks = np.asarray(segment_blocks, dtype=np.int64).reshape(-1, 4)
+        self.line_counts = np.asarray(line_counts, dtype=np.int64)
+        self.entry_segments = np.asarray(entry_segments, dtype=np.int64)
+        self.entry_lines = np.asarray(entry_lines, dtype=np.int64)
+        self.entry_offsets = np.asarray(entry_offsets, dtype=np.int64)
+        self.entry_epochs_ns = np.asarray(entry_epochs_ns, dtype=np.int64)
+
+    @property
+    def segment_count(self):
+        """Number of segments."""
+        return len(self.segment_blocks)
+
+    @property
+    def segment_epochs_ns(self):
+        """First and last epochs of each segment, as an (S, 2) `int64` array."""
+        bounds = np.full((self.segment_count, 2), np.iinfo(np.int64).min)
+        for segment in range(self.segment_count):
+            epochs = self.entry_epochs_ns[self.entry_segments == segment]
+            if len(epochs):
+                bounds[segment] = epochs[0], epochs[-1]
+        return bounds
+
+    @classmethod
+    def build(cls, file_path, step=DEFAULT_STEP):
+        """
+        Builds the index of the file.
+
+        Parameters
+        ----------
+        file_path : Path or AnyStr
+            path of the OEM, AEM or TDM KVN file
+        step : int
+            number of data lines between the indexed lines
+
+        Returns
+        -------
+        NdmIndex
+            index of the file
+
+        Raises
+        ------
+        ValueError
+            File is not an OEM, AEM or TDM KVN file or its segments could
+            not be identified.
+        """
+        index = cls(file_path, None, step, 0, 0, "", [], [], [], [], [], [])
+        return index._index_from(0)
+
+    def update(self):
+        """
+        Brings the index up to date with the file.
+
+        If the file has only been appended to, the last segment and the new
+        segments are indexed, otherwise the index is built again.
+
+        Returns
+        -------
+        NdmIndex
+            up to date index (`self` if the file is not changed)
+        """
+        state = self._file_state()
+        if state is _FileState.VALID:
+            return self
+
+        if state is _FileState.APPENDED and self.segment_count:
+            return self._index_from(self.segment_count - 1)
+
+        return NdmIndex.build(self.file_path, self.step)
+
+    def is_valid(self):
+        """
+        Checks whether the index is up to date with the file.
+
+        Returns
+        -------
+        bool
+            `True` if the file is not changed since it has been indexed
+        """
+        return self._file_state() is _FileState.VALID
+
+    def save(self, index_path):
+        """
+        Saves the index to the file (atomically replacing any existing file).
+
+        Parameters
+        ----------
+        index_path : Path or AnyStr
+            path of the index file
+        """
+        index_path = Path(index_path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=index_path.name, suffix=".tmp", dir=index_path.parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    format_version=_INDEX_FORMAT_VERSION,
+                    ndm_type=self.ndm_type,
+                    step=self.step,
+                    file_size=self.file_size,
+                    mtime_ns=self.mtime_ns,
+                    fingerprint=self.fingerprint,
+                    segment_blocks=self.segment_blocks,
+                    line_counts=self.line_counts,
+                    entry_segments=self.entry_segments,
+                    entry_lines=self.entry_lines,
+                    entry_offsets=self.entry_offsets,
+                    entry_epochs_ns=self.entry_epochs_ns,
+                )
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, index_path, file_path):
+        """
+        Loads the index from the file.
+
+        The index is not validated against the data file, see :meth:`update`.
+
+        Parameters
+        ----------
+        index_path : Path or AnyStr
+            path of the index file
+        file_path : Path or AnyStr
+            path of the data file
+
+        Returns
+        -------
+        NdmIndex
+            index of the data file
+
+        Raises
+        ------
+        ValueError
+            Index file is not readable or has an older format.
+        """
+        try:
+            with np.load(index_path, allow_pickle=False) as data:
+                if int(data["format_version"]) != _INDEX_FORMAT_VERSION:
+                    raise ValueError(f"Index file {index_path} has an older format.")
+                return cls(
+                    file_path,
+                    str(data["ndm_type"]),
+                    int(data["step"]),
+                    int(data["file_size"]),
+                    int(data["mtime_ns"]),
+                    str(data["fingerprint"]),
+                    data["segment_blocks"],
+                    data["line_counts"],
+                    data["entry_segments"],
+                    data["entry_lines"],
+                    data["entry_offsets"],
+                    data["entry_epochs_ns"],
+                )
+        except (OSError, KeyError, EOFError) as err:
+            raise ValueError(f"Index file {index_path} could not be read.") from err
+
+    def read_window(self, start, stop, numeric="decimal"):
+        """
+        Reads the data lines within the epoch window.
+
+        Only the lines between the indexed lines around the window are read
+        and parsed. The epochs are compared in the time system of each segment.
+
+        Parameters
+        ----------
+        start : str or int or numpy.datetime64
+            start of the window (included), as a CCSDS epoch string or `int64`
+            nanoseconds since 1970
+        stop : str or int or numpy.datetime64
+            end of the window (included)
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+
+        Returns
+        -------
+        object
+            NDM object with the segments overlapping the window, each with
+            the data lines within the window (metadata as in the file)
+
+        Raises
+        ------
+        RuntimeError
+            File has been modified since it was indexed.
+        """
+        if not self.is_valid():
+            raise RuntimeError(
+                f"File {self.file_path} has been modified since it was indexed, "
+                f"update the index first."
+            )
+
+        start_ns = _to_epoch_ns(start)
+        stop_ns = _to_epoch_ns(stop)
+        ndm_class = _ndm_types[self.ndm_type]
+
+        header = None
+        segments = []
+        with _ByteSource.from_path(self.file_path).open_buffer() as buffer:
+            for segment in range(self.segment_count):
+                region = self._window_region(buffer, segment, start_ns, stop_ns)
+                if region is None:
+                    continue
+
+                ndm_obj = self._parse_region(buffer, segment, region, numeric)
+                header = ndm_obj.header
+                segments.append(
+                    _filter_segment(
+                        ndm_obj.body.segment[0],
+                        _data_line_fields[ndm_class],
+                        start_ns,
+                        stop_ns,
+                    )
+                )
+
+            if header is None:
+                # no overlapping segments, parse the header block alone
+                header = _parse_kvn_header(
+                    bytes(buffer[: self.segment_blocks[0][0]]), ndm_class, numeric
+                )
+
+        return ndm_class(
+            header=header,
+            body=_lazy_message_types[ndm_class].body(segment=segments),
+        )
+
+    def _parse_region(self, buffer, segment, region, numeric):
+        """
+        Parses the data lines in the byte range with the header and metadata.
+
+        Parameters
+        ----------
+        buffer : bytes or mmap.mmap
+            full contents
+        segment : int
+            segment index
+        region : (int, int)
+            start and end offsets of the data lines
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+
+        Returns
+        -------
+        object
+            NDM object with a single segment
+        """
+        meta_start, meta_end = self.segment_blocks[segment][:2]
+        data_lines = bytes(buffer[region[0] : region[1]])
+        if self.ndm_type != "OEM":
+            data_lines = b"DATA_START\n" + data_lines + b"DATA_STOP\n"
+
+        text = (
+            bytes(buffer[: self.segment_blocks[0][0]])
+            + bytes(buffer[meta_start:meta_end])
+            + data_lines
+        )
+        return NdmKvnIo().from_string(text.decode(), numeric=numeric)
+
+    def _window_region(self, buffer, segment, start_ns, stop_ns):
+        """
+        Finds the byte range of the data lines around the epoch window.
+
+        Parameters
+        ----------
+        buffer : bytes or mmap.mmap
+            full contents
+        segment : int
+            segment index
+        start_ns : int
+            start of the window
+        stop_ns : int
+            end of the window
+
+        Returns
+        -------
+        (int, int) or None
+            start and end offsets, `None` if the segment is outside the window
+        """
+        mask = self.entry_segments == segment
+        epochs = self.entry_epochs_ns[mask]
+        offsets = self.entry_offsets[mask]
+        if not len(epochs) or epochs[0] > stop_ns or epochs[-1] < start_ns:
+            return None
+
+        # last indexed line before the window and first one after
+        first = max(int(np.searchsorted(epochs, start_ns, side="left")) - 1, 0)
+        last = int(np.searchsorted(epochs, stop_ns, side="right"))
+
+        if last < len(offsets):
+            end = int(offsets[last])
+        else:
+            # up to the end of the last data line
+            end = buffer.find(b"\n", int(offsets[-1]))
+            end = len(buffer) if end < 0 else end + 1
+        return int(offsets[first]), end
+
+    def _file_state(self):
+        """Checks the state of the file with respect to the index."""
+        stat = os.stat(self.file_path)
+        if stat.st_size < self.file_size:
+            return _FileState.MODIFIED
+
+        with _ByteSource.from_path(self.file_path).open_buffer() as buffer:
+            if _fingerprint(buffer, self.file_size) != self.fingerprint:
+                return _FileState.MODIFIED
+
+        if stat.st_size > self.file_size:
+            return _FileState.APPENDED
+        if stat.st_mtime_ns != self.mtime_ns:
+            return _FileState.MODIFIED
+        return _FileState.VALID
+
+    def _index_from(self, first_segment):
+        """
+        Indexes the file, keeping the segments before `first_segment`.
+
+        Parameters
+        ----------
+        first_segment : int
+            first segment to be indexed
+
+        Returns
+        -------
+        NdmIndex
+            new index of the file
+        """
+        source = _ByteSource.from_path(self.file_path)
+        with source.open_buffer() as buffer:
+            search_start = (
+                int(self.segment_blocks[first_segment][0]) if first_segment else 0
+            )
+            split = _split_kvn_segments(buffer, search_start)
+            if split is None or split[0] not in _data_line_fields:
+                raise ValueError(
+                    f"File {self.file_path} is not an OEM, AEM or TDM KVN file, "
+                    f"or its segments could not be identified."
+                )
+            ndm_class, new_blocks = split
+
+            # keep the entries of the segments before
+            kept = self.entry_segments < first_segment
+            segment_blocks = [
+                tuple(block) for block in self.segment_blocks[:first_segment]
+            ]
+            line_counts = list(self.line_counts[:first_segment])
+            entry_segments = [self.entry_segments[kept]]
+            entry_lines = [self.entry_lines[kept]]
+            entry_offsets = [self.entry_offsets[kept]]
+            entry_epochs_ns = [self.entry_epochs_ns[kept]]
+
+            for segment, block in enumerate(new_blocks, first_segment):
+                line_count, lines, offsets, epochs_ns = _index_data_block(
+                    buffer, ndm_class, block[2], block[3], self.step
+                )
+                segment_blocks.append(block)
+                line_counts.append(line_count)
+                entry_segments.append(np.full(len(lines), segment, dtype=np.int64))
+                entry_lines.append(lines)
+                entry_offsets.append(offsets)
+                entry_epochs_ns.append(epochs_ns)
+
+            fingerprint = _fingerprint(buffer, len(buffer))
+
+        return NdmIndex(
+            self.file_path,
+            ndm_class.__name__.upper(),
+            self.step,
+            source._stat[0],
+            source._stat[1],
+            fingerprint,
+            segment_blocks,
+            line_counts,
+            np.concatenate(entry_segments),
+            np.concatenate(entry_lines),
+            np.concatenate(entry_offsets),
+            np.concatenate(entry_epochs_ns),
+        )
+
+
+def index_path_for(file_path, cache_dir=None):
+    """
+    Path of the index file for the data file.
+
+    Parameters
+    ----------
+    file_path : Path or AnyStr
+        path of the data file
+    cache_dir : Path or AnyStr or None
+        directory of the index files, `None` to keep the index next to the
+        data file
+
+    Returns
+    -------
+    Path
+        path of the index file
+    """
+    file_path = Path(file_path)
+    if cache_dir is None:
+        return file_path.with_name(file_path.name + _INDEX_SUFFIX)
+
+    # unique name for each data file in the cache directory
+    path_hash = hashlib.sha1(str(file_path.resolve()).encode()).hexdigest()[:16]
+    return Path(cache_dir).joinpath(f"{file_path.name}.{path_hash}{_INDEX_SUFFIX}")
+
+
+def open_index(file_path, step=DEFAULT_STEP, cache_dir=None):
+    """
+    Loads the index of the data file, building or updating it as necessary.
+
+    Any new or updated index is saved to the index file.
+
+    Parameters
+    ----------
+    file_path : Path or AnyStr
+        path of the OEM, AEM or TDM KVN file
+    step : int
+        number of data lines between the indexed lines
+    cache_dir : Path or AnyStr or None
+        directory of the index files, `None` to keep the index next to the
+        data file
+
+    Returns
+    -------
+    NdmIndex
+        up to date index of the data file
+    """
+    index_path = index_path_for(file_path, cache_dir)
+
+    index = None
+    if index_path.exists():
+        try:
+            index = NdmIndex.load(index_path, file_path)
+        except ValueError:
+            # unreadable or old format, build again
+            index = None
+
+    if index is None or index.step != step:
+        new_index = NdmIndex.build(file_path, step)
+    else:
+        new_index = index.update()
+
+    if new_index is not index:
+        new_index.save(index_path)
+    return new_index
+
+
+def _index_data_block(buffer, ndm_class, data_start, data_end, step):
+    """
+    Finds the data lines in the data block and indexes every `step`-th line.
+
+    The data lines are found with vectorised operations over the contents,
+    chunk by chunk, without splitting the block into lines.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full contents
+    ndm_class : type
+        message class (`Oem`, `Aem` or `Tdm`)
+    data_start : int
+        start offset of the data block
+    data_end : int
+        end offset of the data block
+    step : int
+        number of data lines between the indexed lines
+
+    Returns
+    -------
+    (int, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        number of data lines, line numbers, start offsets and epochs of the
+        indexed lines
+    """
+    if ndm_class is Oem:
+        # covariance data at the end of the block is not indexed
+        cov_start = buffer.find(b"COVARIANCE_START", data_start, data_end)
+        if cov_start >= 0:
+            data_end = buffer.rfind(b"\n", data_start, cov_start) + 1 or data_start
+
+    block = np.frombuffer(buffer, np.uint8, data_end - data_start, data_start)
+
+    line_count = 0
+    empty = np.empty(0, np.int64)
+    line_chunks = [empty]
+    line_start_chunks = [empty]
+    content_start_chunks = [empty]
+    last = None
+    for chunk_start in range(0, len(block), _CHUNK_SIZE):
+        chunk = block[chunk_start : chunk_start + _CHUNK_SIZE]
+        starts = np.flatnonzero(chunk == ord("\n")) + chunk_start + 1
+        if chunk_start == 0:
+            starts = np.concatenate(([0], starts))
+        starts = starts[starts < len(block)]
+
+        data_starts, data_contents = _data_lines(block, starts, ndm_class)
+        if not len(data_starts):
+            continue
+
+        numbers = np.arange(line_count, line_count + len(data_starts))
+        selected = numbers % step == 0
+        line_chunks.append(numbers[selected])
+        line_start_chunks.append(data_starts[selected])
+        content_start_chunks.append(data_contents[selected])
+
+        line_count += len(data_starts)
+        last = numbers[-1], data_starts[-1], data_contents[-1]
+
+    # the last line is always indexed
+    if last is not None and last[0] % step:
+        line_chunks.append(np.array([last[0]], np.int64))
+        line_start_chunks.append(np.array([last[1]], np.int64))
+        content_start_chunks.append(np.array([last[2]], np.int64))
+
+    lines = np.concatenate(line_chunks)
+    line_starts = np.concatenate(line_start_chunks)
+    content_starts = np.concatenate(content_start_chunks)
+
+    epochs = [
+        _line_epoch(buffer, data_start + int(content_start), ndm_class)
+        for content_start in content_starts
+    ]
+    epochs_ns = parse_epochs_ns(epochs) if epochs else np.empty(0, np.int64)
+
+    return line_count, lines, line_starts + data_start, epochs_ns
+
+
+def _data_lines(block, starts, ndm_class):
+    """
+    Selects the data lines among the lines of the data block.
+
+    Parameters
+    ----------
+    block : numpy.ndarray
+        data block as `uint8` array
+    starts : numpy.ndarray
+        start offsets of the lines in the block
+    ndm_class : type
+        message class (`Oem`, `Aem` or `Tdm`)
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        line start and content start (after any blanks) offsets of the data
+        lines
+    """
+    # skip the blanks at the start of the lines
+    last_index = len(block) - 1
+    contents = starts.copy()
+    first_chars = block[contents]
+    for _ in range(_MAX_INDENT):
+        blank = (first_chars == ord(" ")) | (first_chars == ord("\t"))
+        if not blank.any():
+            break
+        contents[blank] = np.minimum(contents[blank] + 1, last_index)
+        first_chars = block[contents]
+
+    if ndm_class is Tdm:
+        # keyword lines, except the comments and the data markers
+        is_data = (first_chars >= ord("A")) & (first_chars <= ord("Z"))
+        for keyword in (b"COMMENT", b"DATA_START", b"DATA_STOP"):
+            is_data &= ~_starts_with(block, contents, keyword)
+    else:
+        # lines starting with the epoch
+        is_data = (first_chars >= ord("0")) & (first_chars <= ord("9"))
+
+    return starts[is_data], contents[is_data]
+
+
+def _starts_with(block, starts, prefix):
+    """Checks whether the text at each offset starts with the `prefix`."""
+    last_index = len(block) - 1
+    matches = np.ones(len(starts), dtype=bool)
+    for i, char in enumerate(prefix):
+        matches &= block[np.minimum(starts + i, last_index)] == char
+    return matches
+
+
+def _line_epoch(buffer, content_start, ndm_class):
+    """Extracts the epoch string of the data line at the offset."""
+    line_end = buffer.find(b"\n", content_start)
+    line = bytes(buffer[content_start : line_end if line_end >= 0 else len(buffer)])
+    if ndm_class is Tdm:
+        # e.g. `RANGE = 2007-075T11:50:43.000 7175510611.7`
+        line = line.split(b"=", 1)[1]
+    return line.split()[0].decode()
+
+
+def _fingerprint(buffer, size):
+    """
+    Hash of the start and the end of the contents up to `size`.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full contents
+    size : int
+        size of the contents to be considered
+
+    Returns
+    -------
+    str
+        hash as hex string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+    digest.update(buffer[: min(size, _FINGERPRINT_SIZE)])
+    digest.update(buffer[max(size - _FINGERPRINT_SIZE, 0) : size])
+    return digest.hexdigest()
+
+
+def _to_epoch_ns(epoch):
+    """Converts the epoch (string, `datetime64` or `int`) to nanoseconds."""
+    if isinstance(epoch, str):
+        return int(parse_epochs_ns([epoch])[0])
+    if isinstance(epoch, np.datetime64):
+        return int(epoch.astype("datetime64[ns]").astype(np.int64))
+    return int(epoch)
+
+
+def _filter_segment(segment, field_name, start_ns, stop_ns):
+    """
+    Removes the data lines outside the epoch window from the segment.
+
+    Parameters
+    ----------
+    segment
+        OEM, AEM or TDM segment
+    field_name : str
+        data field holding the list of data lines (e.g. `state_vector`)
+    start_ns : int
+        start of the window
+    stop_ns : int
+        end of the window
+
+    Returns
+    -------
+    object
+        the same segment, with the data lines within the window
+    """
+    epochs_ns = segment_columns(segment).epochs_ns
+    keep = (epochs_ns >= start_ns) & (epochs_ns <= stop_ns)
+
+    data_lines = getattr(segment.data, field_name)
+    setattr(
+        segment.data,
+        field_name,
+        [line for line, is_kept in zip(data_lines, keep) if is_kept],
+    )
+
+    clear_columns(segment)
+    return segment
@@ -6,13 +6,25 @@
 """
 CCSDS Navigation Data Messages XML File I/O.
 
+The KVN and XML backends (and the NDM classes, `lxml` and `xsdata` with them)
+are imported on first use, therefore importing this module is fast and
+reading an XML file does not import the KVN backend.
+
 """
 
+import os
 from enum import Enum, auto
+from functools import partial
+from importlib import import_module
 from pathlib import Path
 
-from ccsds_ndm.ndm_kvn_io import NdmKvnIo
-from ccsds_ndm.ndm_xml_io import NdmXmlIo
+_backend_modules = {
+    "NdmKvnIo": "ccsds_ndm.ndm_kvn_io",
+    "NdmXmlIo": "ccsds_ndm.ndm_xml_io",
+    "read_kvn_parallel": "ccsds_ndm.ndm_parallel",
+    "read_ndm_parallel": "ccsds_ndm.ndm_parallel",
+}
+"""Modules of the backend names, imported on first use."""
 
 
 class NDMFileFormats(Enum):
@@ -30,7 +42,9 @@ class NdmIo:
     Unified I/O Model for CCSDS Navigation Data Message (NDM) input and output.
     """
 
-    def from_path(self, input_file_path):
+    def from_path(
+        self, input_file_path, numeric="decimal", lazy=False, cache=None, workers=1
+    ):
         """
         Reads the file to extract contents to an object of correct type.
 
@@ -38,19 +52,63 @@ class NdmIo:
         ----------
         input_file_path : Path or AnyStr
             Path of the file to be read (path or pathlike accepted)
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
+        cache : ParseCache or None
+            cache of the parsed object trees (see :mod:`ccsds_ndm.ndm_cache`),
+            not used in lazy mode
+        workers : int or None
+            number of worker processes to parse the segments of the OEM, AEM
+            and TDM files in KVN format or the members of the combined NDM
+            files in XML format (see :mod:`ccsds_ndm.ndm_parallel`), `None` for
+            the number of CPUs, not used in lazy mode or with a cache
 
         Returns
         -------
         object
             NDM Object tree from the file contents
         """
+        if cache is not None and not lazy:
+            return self.from_bytes(
+                Path(input_file_path).read_bytes(), numeric=numeric, cache=cache
+            )
+
+        if not lazy and workers != 1:
+            data_format = _identify_data_format(_peek_file(input_file_path))
+            if data_format is NDMFileFormats.KVN:
+                return _backend("read_kvn_parallel")(
+                    input_file_path, numeric=numeric, workers=workers
+                )
+            if data_format is NDMFileFormats.XML:
+                return _backend("read_ndm_parallel")(
+                    input_file_path, numeric=numeric, workers=workers
+                )
+
+        if lazy:
+            # identify the format from the start and end of the file only
+            data_format = _identify_data_format(_peek_file(input_file_path))
+
+            if data_format is NDMFileFormats.XML:
+                return _backend("NdmXmlIo")().from_path(
+                    input_file_path, numeric=numeric, lazy=True
+                )
+
+            if data_format is NDMFileFormats.KVN:
+                return _backend("NdmKvnIo")().from_path(
+                    input_file_path, numeric=numeric, lazy=True
+                )
+
         # read file contents as text
         file_contents = Path(input_file_path).read_text()
 
         # parse as `from_string()`
-        return self.from_string(file_contents)
+        return self.from_string(file_contents, numeric=numeric)
 
-    def from_bytes(self, ndm_data_source):
+    def from_bytes(self, ndm_data_source, numeric="decimal", lazy=False, cache=None):
         """
         Reads the input bytes array to extract contents to an object of correct type.
 
@@ -58,16 +116,32 @@ class NdmIo:
         ----------
         ndm_data_source : bytes
             NDM data as input bytes array
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
+        cache : ParseCache or None
+            cache of the parsed object trees (see :mod:`ccsds_ndm.ndm_cache`),
+            not used in lazy mode
 
         Returns
         -------
         object
             NDM Object tree from the file contents
         """
+        if cache is not None and not lazy:
+            return cache.get_or_parse(
+                ndm_data_source,
+                partial(self.from_bytes, ndm_data_source, numeric=numeric),
+                numeric=numeric,
+            )
+
         # decode bytes and parse as `from_string()`
-        return self.from_string(ndm_data_source.decode())
+        return self.from_string(ndm_data_source.decode(), numeric=numeric, lazy=lazy)
 
-    def from_string(self, ndm_data_source):
+    def from_string(self, ndm_data_source, numeric="decimal", lazy=False):
         """
         Reads the input string to extract contents to an object of correct type.
 
@@ -75,6 +149,12 @@ class NdmIo:
         ----------
         ndm_data_source : str
             input string data
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
 
         Raises
         ------
@@ -90,10 +170,14 @@ class NdmIo:
         data_format = _identify_data_format(ndm_data_source)
 
         if data_format is NDMFileFormats.XML:
-            return NdmXmlIo().from_string(ndm_data_source)
+            return _backend("NdmXmlIo")().from_string(
+                ndm_data_source, numeric=numeric, lazy=lazy
+            )
 
         if data_format is NDMFileFormats.KVN:
-            return NdmKvnIo().from_string(ndm_data_source)
+            return _backend("NdmKvnIo")().from_string(
+                ndm_data_source, numeric=numeric, lazy=lazy
+            )
 
         if data_format is NDMFileFormats.JSON:
             raise NotImplementedError(
@@ -125,10 +209,10 @@ class NdmIo:
             given object tree as string in the requested format
         """
         if data_format is NDMFileFormats.XML:
-            return NdmXmlIo().to_string(ndm_obj, **kwargs)
+            return _backend("NdmXmlIo")().to_string(ndm_obj, **kwargs)
 
         if data_format is NDMFileFormats.KVN:
-            return NdmKvnIo().to_string(ndm_obj)
+            return _backend("NdmKvnIo")().to_string(ndm_obj)
 
         if data_format is NDMFileFormats.JSON:
             raise NotImplementedError(
@@ -154,10 +238,12 @@ class NdmIo:
 
         """
         if data_format is NDMFileFormats.XML:
-            return NdmXmlIo().to_file(ndm_obj, xml_write_file_path, **kwargs)
+            return _backend("NdmXmlIo")().to_file(
+                ndm_obj, xml_write_file_path, **kwargs
+            )
 
         if data_format is NDMFileFormats.KVN:
-            return NdmKvnIo().to_file(ndm_obj, xml_write_file_path)
+            return _backend("NdmKvnIo")().to_file(ndm_obj, xml_write_file_path)
 
         if data_format is NDMFileFormats.JSON:
             raise NotImplementedError(
@@ -165,6 +251,18 @@ class NdmIo:
             )
 
 
+def __getattr__(name):
+    """Imports the backend names (e.g. `NdmXmlIo`) on first access."""
+    if name not in _backend_modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _backend(name)
+
+
+def _backend(name):
+    """Backend class or function, importing its module on first use."""
+    return getattr(import_module(_backend_modules[name]), name)
+
+
 def _identify_data_format(ndm_data_source):
     """
     Identify the data format of the input string.
@@ -196,3 +294,34 @@ def _identify_data_format(ndm_data_source):
             "Data type could not be identified (valid formats: KVN, XML or JSON)"
         )
     return file_format
+
+
+def _peek_file(file_path, size=4096):
+    """
+    Reads the start and the end of the file, e.g. to identify the data format.
+
+    Parameters
+    ----------
+    file_path : Path or AnyStr
+        path of the file
+    size : int
+        number of bytes to be read from the start and from the end
+
+    Returns
+    -------
+    str
+        start and end of the file, concatenated (full contents if the file is
+        small)
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(size)
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        if file_size <= 2 * size:
+            f.seek(0)
+            return f.read().decode(errors="replace")
+
+        f.seek(file_size - size)
+        tail = f.read(size)
+
+    return (head + b"\n" + tail).decode(errors="replace")
@@ -9,32 +9,28 @@ CCSDS Navigation Data Messages KVN File I/O.
 """
 from collections import namedtuple
 from copy import deepcopy
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from decimal import Decimal
 from enum import Enum
+from functools import partial
 from typing import Any, Dict, List
 
 from lxml import etree
 from xsdata.formats.dataclass.parsers import XmlParser
 from xsdata.formats.dataclass.parsers.config import ParserConfig
 
+from ccsds_ndm.models import ndmxml2
 from ccsds_ndm.models.ndmxml2 import (
     Aem,
     AemData,
     AemMetadata,
     AemSegment,
-    Apm,
     AttitudeStateType,
-    Cdm,
-    Ndm,
     Oem,
     OemCovarianceMatrixType,
     OemMetadata,
-    Omm,
-    Opm,
     QuaternionDerivativeType,
     QuaternionEulerRateType,
-    Rdm,
     StateVectorAccType,
     Tdm,
     TdmData,
@@ -42,7 +38,16 @@ from ccsds_ndm.models.ndmxml2 import (
     TrackingDataObservationType,
     UserDefinedType,
 )
-from ccsds_ndm.ndm_xml_io import NdmXmlIo, _is_multi_ndm
+from ccsds_ndm.ndm_lazy import (
+    _ByteSource,
+    _find_marker_lines,
+    _lazy_data,
+    _lazy_message_types,
+    _SegmentDataLoader,
+    materialise,
+)
+from ccsds_ndm.ndm_xml_io import _NDM_ID, NdmXmlIo, _is_multi_ndm
+from ccsds_ndm.numeric_backend import is_numeric_value, numeric_backend
 
 _MinMaxTuple = namedtuple("_MinMaxTuple", ["min", "max"])
 """Data structure to keep min and max tuples."""
@@ -53,19 +58,24 @@ class _NdmDataType(Enum):
     NDM Data Type (e.g. OEM or AEM).
     """
 
-    AEMv2 = (Aem.id, Aem)
-    APMv2 = (Apm.id, Apm)
-    CDMv2 = (Cdm.id, Cdm)
-    OEMv2 = (Oem.id, Oem)
-    OMMv2 = (Omm.id, Omm)
-    OPMv2 = (Opm.id, Opm)
-    RDMv2 = (Rdm.id, Rdm)
-    TDMv2 = (Tdm.id, Tdm)
-
-    def __init__(self, ndm_id, clazz):
-        self.clazz = clazz
+    AEMv2 = ("CCSDS_AEM_VERS", "Aem")
+    APMv2 = ("CCSDS_APM_VERS", "Apm")
+    CDMv2 = ("CCSDS_CDM_VERS", "Cdm")
+    OEMv2 = ("CCSDS_OEM_VERS", "Oem")
+    OMMv2 = ("CCSDS_OMM_VERS", "Omm")
+    OPMv2 = ("CCSDS_OPM_VERS", "Opm")
+    RDMv2 = ("CCSDS_RDM_VERS", "Rdm")
+    TDMv2 = ("CCSDS_TDM_VERS", "Tdm")
+
+    def __init__(self, ndm_id, class_name):
+        self.class_name = class_name
         self.ndm_id = ndm_id
 
+    @property
+    def clazz(self):
+        """NDM class (e.g. `Aem`), its module is imported on first access."""
+        return getattr(ndmxml2, self.class_name)
+
     @staticmethod
     def find_element(ndm_id):
         """
@@ -161,7 +171,7 @@ class NdmKvnIo:
     _keys: List[str] = []
     _lines: List[List[str]] = []
 
-    def from_path(self, kvn_read_file_path):
+    def from_path(self, kvn_read_file_path, numeric="decimal", lazy=False):
         """
         Reads the file to extract contents to an object of correct type.
 
@@ -169,18 +179,29 @@ class NdmKvnIo:
         ----------
         kvn_read_file_path : Path
             Path of the KVN file to be read
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
 
         Returns
         -------
         object
             Object tree from the file contents
         """
+        if lazy:
+            return self._from_source_lazy(
+                _ByteSource.from_path(kvn_read_file_path), numeric
+            )
+
         with open(kvn_read_file_path, "r") as f:
             kvn_source = f.read()
 
-        return self.from_string(kvn_source)
+        return self.from_string(kvn_source, numeric=numeric)
 
-    def from_string(self, kvn_source):
+    def from_string(self, kvn_source, numeric="decimal", lazy=False):
         """
         Reads the input string to extract contents to an object of correct type.
 
@@ -188,12 +209,21 @@ class NdmKvnIo:
         ----------
         kvn_source : str
             input string containing KVN data
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
 
         Returns
         -------
         object
             Object tree from the file contents
         """
+        if lazy:
+            return self._from_source_lazy(_ByteSource(kvn_source.encode()), numeric)
+
         # parse file to fill lines and keys lists
         self._pre_process_kvn_data(kvn_source)
 
@@ -213,7 +243,8 @@ class NdmKvnIo:
         self._identify_segments()
 
         # build the object
-        return self._build_object()
+        with numeric_backend(numeric):
+            return self._build_object()
 
     def to_file(self, ndm_obj, kvn_write_file_path):
         """
@@ -248,13 +279,16 @@ class NdmKvnIo:
             Combined NDM input for KVN not implemented in CCSDS NDM Standard.
         """
         # check for multi-NDM file
-        if ndm_obj.Meta.name == Ndm.Meta.name and _is_multi_ndm(ndm_obj):
+        if ndm_obj.Meta.name == _NDM_ID and _is_multi_ndm(ndm_obj):
             raise NotImplementedError(
                 "NDM data appears to have more than one data set (e.g. two OPMs). "
                 "This sort of NDM output to KVN is not supported. "
                 "Try outputting to multiple files instead."
             )
 
+        # parse any lazy data blocks first
+        materialise(ndm_obj)
+
         out_str = [_fill_str_out_kvn(ndm_obj.id, ndm_obj.version)]
         self._collate_str_out("", ndm_obj, out_str)
 
@@ -265,6 +299,69 @@ class NdmKvnIo:
 
         return kvn_string
 
+    def _from_source_lazy(self, source, numeric):
+        """
+        Reads the header and the metadata, leaving the data blocks to be parsed
+        on first access.
+
+        Falls back to the full parsing for the message types other than OEM,
+        AEM and TDM.
+
+        Parameters
+        ----------
+        source : _ByteSource
+            data source
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+
+        Returns
+        -------
+        object
+            Object tree with lazy data blocks
+        """
+        with source.open_buffer() as buffer:
+            split = _split_kvn_segments(buffer)
+            if split is None:
+                # not supported, parse in full
+                return self.from_string(bytes(buffer).decode(), numeric=numeric)
+
+            ndm_class, segment_blocks = split
+            header_text = bytes(buffer[: segment_blocks[0][0]])
+            meta_texts = [
+                bytes(buffer[meta_start:meta_end])
+                for meta_start, meta_end, _, _ in segment_blocks
+            ]
+
+        message_type = _lazy_message_types[ndm_class]
+        parser = XmlParser(config=ParserConfig(fail_on_unknown_properties=True))
+        parse = partial(_parse_kvn, numeric=numeric)
+
+        header = _parse_kvn_header(header_text, ndm_class, numeric)
+        with numeric_backend(numeric):
+            segments = []
+            for meta_text, (_, _, data_start, data_end) in zip(
+                meta_texts, segment_blocks
+            ):
+                meta_lines = [
+                    line
+                    for line in _split_kvn_lines(meta_text.decode())
+                    if line[0] not in ("META_START", "META_STOP")
+                ]
+                metadata = parser.from_bytes(
+                    _xmlify_list("metadata", meta_lines), message_type.metadata
+                )
+                loader = _SegmentDataLoader(
+                    source, data_start, data_end, header_text + meta_text, b"", parse
+                )
+                segments.append(
+                    message_type.segment(
+                        metadata=metadata,
+                        data=_lazy_data(message_type.data, loader),
+                    )
+                )
+
+        return ndm_class(header=header, body=message_type.body(segment=segments))
+
     def _collate_str_out(self, root_key, root_ndm_obj, out_str):
         """
         Collates the data to build KVN formatted output string from the object.
@@ -282,7 +379,13 @@ class NdmKvnIo:
 
         """
 
-        subclasses = vars(root_ndm_obj)
+        # fields only, not the other attributes (e.g. cached columnar views)
+        field_names = {fld.name for fld in fields(root_ndm_obj)}
+        subclasses = {
+            key: value
+            for key, value in vars(root_ndm_obj).items()
+            if key in field_names
+        }
 
         if type(root_ndm_obj) in _special_output_data_classes:
             # add special data - can be more than a single line (e.g. stacked covar)
@@ -413,45 +516,7 @@ class NdmKvnIo:
         kvn_source : str
             input string containing KVN data
         """
-
-        input_lines = kvn_source.split("\n")
-
-        lines = []
-        for line in input_lines:
-            # strip spaces around the line
-            line = line.strip()
-            # skip empty lines
-            if not line.strip():
-                continue
-
-            # process Comment lines first
-            if line.startswith("COMMENT"):
-                line = ["COMMENT", line[7:].strip()]
-
-                # sometimes comment line starts with an "=" sign, delete this
-                if line[1].startswith("="):
-                    line[1] = line[1][1:].strip()
-            else:
-                # This is not a comment line
-
-                # split the data lines with "=" as delimiter
-                line = line.split("=", maxsplit=1)
-
-                # parse data lines with units
-                if len(line) == 2 and line[1].rstrip().endswith("]"):
-                    text = line[1]
-                    splitter_index = line[1].find("[")
-                    if splitter_index >= 0:
-                        line[1] = text[0:splitter_index]
-                        # strip square braces
-                        unit = text[splitter_index:].replace("[", "").replace("]", "")
-                        line.append(unit)
-
-            # finally, strip each element of spaces
-            line = [item.strip() for item in line]
-
-            # add to list
-            lines.append(line)
+        lines = _split_kvn_lines(kvn_source)
 
         # modify lines and keys for id and header
         lines.insert(1, lines[0])
@@ -546,7 +611,7 @@ class NdmKvnIo:
             else:
                 name_class_sublist = []
                 # go one level deeper into the tree and extract subclass info
-                for (name, clazz, is_list) in names_classes:
+                for name, clazz, is_list in names_classes:
                     name_class_sublist.append(
                         self._extract_object_submap(name, clazz, root_is_list=is_list)
                     )
@@ -1045,6 +1110,171 @@ class NdmKvnIo:
         return xml_data
 
 
+def _parse_kvn(kvn_source, numeric="decimal"):
+    """
+    Parses the KVN string with a new reader.
+
+    The reader keeps the lines and the object tree of the last parse, so that
+    sharing a reader between the lazy data blocks would keep the last parsed
+    block of each file in memory.
+    """
+    return NdmKvnIo().from_string(kvn_source, numeric=numeric)
+
+
+def _parse_kvn_header(header_text, ndm_class, numeric="decimal"):
+    """
+    Parses the header block (up to the first `META_START`) of an OEM, AEM or
+    TDM in KVN format.
+
+    Parameters
+    ----------
+    header_text : bytes
+        header block, starting with the id line (e.g. `CCSDS_OEM_VERS`)
+    ndm_class : type
+        NDM class of the message
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+
+    Returns
+    -------
+    object
+        header object of the message
+    """
+    parser = XmlParser(config=ParserConfig(fail_on_unknown_properties=True))
+    header_lines = _split_kvn_lines(header_text.decode())
+    with numeric_backend(numeric):
+        # skip the id line
+        return parser.from_bytes(
+            _xmlify_list("header", header_lines[1:]),
+            _lazy_message_types[ndm_class].header,
+        )
+
+
+def _split_kvn_lines(kvn_source):
+    """
+    Splits the KVN data string into a list of key-value(-unit) lists.
+
+    Parameters
+    ----------
+    kvn_source : str
+        input string containing KVN data
+
+    Returns
+    -------
+    List[List[str]]
+        lines as `[key, value]` or `[key, value, unit]` lists
+    """
+    input_lines = kvn_source.split("\n")
+
+    lines = []
+    for line in input_lines:
+        # strip spaces around the line
+        line = line.strip()
+        # skip empty lines
+        if not line.strip():
+            continue
+
+        # process Comment lines first
+        if line.startswith("COMMENT"):
+            line = ["COMMENT", line[7:].strip()]
+
+            # sometimes comment line starts with an "=" sign, delete this
+            if line[1].startswith("="):
+                line[1] = line[1][1:].strip()
+        else:
+            # This is not a comment line
+
+            # split the data lines with "=" as delimiter
+            line = line.split("=", maxsplit=1)
+
+            # parse data lines with units
+            if len(line) == 2 and line[1].rstrip().endswith("]"):
+                text = line[1]
+                splitter_index = line[1].find("[")
+                if splitter_index >= 0:
+                    line[1] = text[0:splitter_index]
+                    # strip square braces
+                    unit = text[splitter_index:].replace("[", "").replace("]", "")
+                    line.append(unit)
+
+        # finally, strip each element of spaces
+        line = [item.strip() for item in line]
+
+        # add to list
+        lines.append(line)
+
+    return lines
+
+
+def _split_kvn_segments(buffer, start=0):
+    """
+    Finds the metadata and data blocks of each segment in OEM, AEM or TDM data.
+
+    Only the segment markers (e.g. `META_START`) are searched for, the data
+    lines are not processed.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full KVN contents
+    start : int
+        start offset of the search (e.g. the start of a segment), the segments
+        before are skipped
+
+    Returns
+    -------
+    (type, list) or None
+        NDM class and the (metadata start, metadata end, data start, data end)
+        offsets for each segment, `None` if the data is not an OEM, AEM
+        or TDM or the segment markers are not consistent
+    """
+    first_line_end = buffer.find(b"\n")
+    first_line = bytes(buffer[: first_line_end if first_line_end >= 0 else None])
+    ndm_data_type = _NdmDataType.find_element(
+        first_line.split(b"=")[0].strip().decode(errors="replace")
+    )
+    if ndm_data_type is None or ndm_data_type.clazz not in _lazy_message_types:
+        return None
+
+    meta_starts = _find_marker_lines(buffer, b"META_START", start)
+    meta_stops = _find_marker_lines(buffer, b"META_STOP", start)
+    if not meta_starts or len(meta_starts) != len(meta_stops):
+        return None
+
+    if ndm_data_type.clazz is Oem:
+        # data (and covariance) lines until the next segment
+        data_blocks = [
+            (meta_stop[1], next_meta_start[0])
+            for meta_stop, next_meta_start in zip(
+                meta_stops, meta_starts[1:] + [(len(buffer), len(buffer))]
+            )
+        ]
+    else:
+        # data lines between the data markers
+        data_starts = _find_marker_lines(buffer, b"DATA_START", start)
+        data_stops = _find_marker_lines(buffer, b"DATA_STOP", start)
+        if len(data_starts) != len(meta_starts) or len(data_stops) != len(meta_starts):
+            return None
+        data_blocks = [
+            (data_start[0], data_stop[1])
+            for data_start, data_stop in zip(data_starts, data_stops)
+        ]
+
+    segment_blocks = [
+        (meta_start[0], meta_stop[1], data_start, data_end)
+        for meta_start, meta_stop, (data_start, data_end) in zip(
+            meta_starts, meta_stops, data_blocks
+        )
+    ]
+
+    # the blocks should be in order, without overlaps
+    offsets = [offset for block in segment_blocks for offset in block]
+    if offsets != sorted(offsets):
+        return None
+
+    return ndm_data_type.clazz, segment_blocks
+
+
 def _identify_data_type(kvn_source):
     """
     Identify the KVN data type.
@@ -1589,19 +1819,19 @@ def _collate_special_data_str_out(key, ndm_obj, out_str):
                     if quat_last:
                         line.extend(
                             [
-                                str(rot_objects[0]["q1_dot"]),
-                                str(rot_objects[0]["q2_dot"]),
-                                str(rot_objects[0]["q3_dot"]),
-                                str(rot_objects[0]["qc_dot"]),
+                                str(rot_objects[1]["q1_dot"].value),
+                                str(rot_objects[1]["q2_dot"].value),
+                                str(rot_objects[1]["q3_dot"].value),
+                                str(rot_objects[1]["qc_dot"].value),
                             ]
                         )
                     else:
                         line.extend(
                             [
-                                str(rot_objects[0]["qc_dot"]),
-                                str(rot_objects[0]["q1_dot"]),
-                                str(rot_objects[0]["q2_dot"]),
-                                str(rot_objects[0]["q3_dot"]),
+                                str(rot_objects[1]["qc_dot"].value),
+                                str(rot_objects[1]["q1_dot"].value),
+                                str(rot_objects[1]["q2_dot"].value),
+                                str(rot_objects[1]["q3_dot"].value),
                             ]
                         )
             else:
@@ -1622,7 +1852,7 @@ def _collate_special_data_str_out(key, ndm_obj, out_str):
         item_key, item_value = [
             (k, v)
             for k, v in vars(ndm_obj).items()
-            if isinstance(v, Decimal) and k != "epoch"
+            if is_numeric_value(v) and k != "epoch"
         ][0]
 
         return [
@@ -0,0 +1,369 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Lazy (on demand) materialisation of the bulk data in OEM, AEM and TDM files.
+
+In lazy mode, the readers parse only the header and the metadata of each
+segment. The data block of each segment is replaced by a placeholder object,
+which records where the block is in the source (file or string) and parses it
+on its first access (e.g. `segment.data.state_vector`). The placeholder then
+turns into the regular data object (e.g. `OemData`) in place, therefore the
+parsing cost is paid only once and only for the segments actually used.
+
+File sources are not kept open, the data block is read again from the file
+when it is materialised. The file should not be modified in between.
+
+"""
+
+import mmap
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict
+
+from ccsds_ndm.models.ndmxml2 import (
+    Aem,
+    AemBody,
+    AemData,
+    AemMetadata,
+    AemSegment,
+    NdmHeader,
+    Oem,
+    OemBody,
+    OemData,
+    OemMetadata,
+    OemSegment,
+    Tdm,
+    TdmBody,
+    TdmData,
+    TdmHeader,
+    TdmMetadata,
+    TdmSegment,
+)
+
+_LazyMessageType = namedtuple(
+    "_LazyMessageType", ["header", "body", "segment", "metadata", "data"]
+)
+"""Classes making up the skeleton of a message with lazy data."""
+
+_lazy_message_types = {
+    Oem: _LazyMessageType(NdmHeader, OemBody, OemSegment, OemMetadata, OemData),
+    Aem: _LazyMessageType(NdmHeader, AemBody, AemSegment, AemMetadata, AemData),
+    Tdm: _LazyMessageType(TdmHeader, TdmBody, TdmSegment, TdmMetadata, TdmData),
+}
+"""Message types supporting lazy data, the rest is always parsed in full."""
+
+_materialise_lock = threading.RLock()
+"""Lock to make sure that a data block is parsed only once."""
+
+
+class _LazyData:
+    """
+    Base class for the lazy data placeholders.
+
+    The actual placeholder classes derive from this class and the data class
+    (e.g. `OemData`), with each data field replaced by a property that
+    triggers the parsing.
+    """
+
+    def __repr__(self):
+        return f"{type(self).__mro__[2].__name__}(<not loaded>)"
+
+    def __eq__(self, other):
+        _materialise_data(self)
+        return self == other
+
+    def __reduce_ex__(self, protocol):
+        _materialise_data(self)
+        return self.__reduce_ex__(protocol)
+
+
+_lazy_classes: Dict[type, type] = {}
+"""Placeholder class for each data class, generated on demand."""
+
+
+def _lazy_field(name):
+    """Generates the property that materialises the data for the field `name`."""
+
+    def getter(self):
+        _materialise_data(self)
+        return getattr(self, name)
+
+    def setter(self, value):
+        _materialise_data(self)
+        setattr(self, name, value)
+
+    return property(getter, setter)
+
+
+def _lazy_data(data_class, loader):
+    """
+    Generates the lazy placeholder for the data block.
+
+    Parameters
+    ----------
+    data_class : type
+        data class (e.g. `OemData`)
+    loader : Callable
+        callable without arguments, returning the parsed data object
+
+    Returns
+    -------
+    object
+        placeholder object, an instance of `data_class`
+    """
+    lazy_class = _lazy_classes.get(data_class)
+    if lazy_class is None:
+        namespace = {fld.name: _lazy_field(fld.name) for fld in fields(data_class)}
+        lazy_class = type(data_class.__name__, (_LazyData, data_class), namespace)
+        _lazy_classes[data_class] = lazy_class
+
+    lazy_obj: _LazyData = object.__new__(lazy_class)
+    lazy_obj.__dict__["_lazy_loader"] = loader
+    return lazy_obj
+
+
+def _materialise_data(lazy_obj):
+    """
+    Parses the data block and turns the placeholder into the data object.
+
+    Parameters
+    ----------
+    lazy_obj : _LazyData
+        placeholder object
+    """
+    with _materialise_lock:
+        if not isinstance(lazy_obj, _LazyData):
+            # already materialised in another thread
+            return
+
+        data = lazy_obj.__dict__["_lazy_loader"]()
+
+        lazy_obj.__dict__.clear()
+        lazy_obj.__dict__.update(vars(data))
+        lazy_obj.__class__ = type(data)
+
+
+def _loaded_data(segment):
+    """
+    Data object of the segment, parsed if necessary.
+
+    Unlike the regular access, a lazy data block is parsed without being kept
+    in the segment, e.g. to process large files one segment at a time.
+    """
+    data = vars(segment).get("data")
+    if isinstance(data, _LazyData):
+        return data.__dict__["_lazy_loader"]()
+    return data
+
+
+def _segments(ndm_obj):
+    """Segments of the message, or the segment itself."""
+    body = getattr(ndm_obj, "body", None)
+    if body is None:
+        return [ndm_obj] if hasattr(ndm_obj, "data") else []
+
+    segments = getattr(body, "segment", None)
+    if segments is None:
+        return []
+    return segments if isinstance(segments, list) else [segments]
+
+
+def is_lazy(ndm_obj):
+    """
+    Checks whether any data block of the NDM object is not parsed yet.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object or a single segment
+
+    Returns
+    -------
+    bool
+        `True` if some data blocks are not parsed yet
+    """
+    return any(
+        isinstance(vars(segment).get("data"), _LazyData)
+        for segment in _segments(ndm_obj)
+    )
+
+
+def materialise(ndm_obj):
+    """
+    Parses all the data blocks of the NDM object that are not parsed yet.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object or a single segment
+
+    Returns
+    -------
+    object
+        the same NDM object, fully parsed
+    """
+    for segment in _segments(ndm_obj):
+        data = vars(segment).get("data")
+        if isinstance(data, _LazyData):
+            _materialise_data(data)
+    return ndm_obj
+
+
+class _ByteSource:
+    """
+    Source of the NDM data (bytes in memory or a file) for the lazy readers.
+
+    Parameters
+    ----------
+    buffer : bytes or None
+        data in memory
+    file_path : Path or None
+        path of the data file (if `buffer` is `None`)
+    """
+
+    def __init__(self, buffer=None, file_path=None):
+        self.buffer = buffer
+        self.file_path = file_path
+        self._stat = None
+        if file_path is not None:
+            stat = os.stat(file_path)
+            self._stat = (stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def from_path(cls, file_path):
+        """Generates the source for the file."""
+        return cls(file_path=Path(file_path))
+
+    @contextmanager
+    def open_buffer(self):
+        """
+        Opens the full contents for scanning (memory mapped for files).
+
+        Yields
+        ------
+        bytes or mmap.mmap
+            full contents
+        """
+        if self.buffer is not None:
+            yield self.buffer
+            return
+
+        with open(self.file_path, "rb") as f:
+            if self._stat[0] == 0:
+                # empty files cannot be memory mapped
+                yield b""
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+    def read(self, start, end):
+        """
+        Reads a byte range of the contents.
+
+        Parameters
+        ----------
+        start : int
+            start offset
+        end : int
+            end offset (excluded)
+
+        Returns
+        -------
+        bytes
+            contents in the range
+
+        Raises
+        ------
+        RuntimeError
+            The file has been modified since it was first read.
+        """
+        if self.buffer is not None:
+            return self.buffer[start:end]
+
+        stat = os.stat(self.file_path)
+        if (stat.st_size, stat.st_mtime_ns) != self._stat:
+            raise RuntimeError(
+                f"File {self.file_path} has been modified since it was opened "
+                f"in lazy mode, data cannot be loaded."
+            )
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+
+class _SegmentDataLoader:
+    """
+    Loads and parses the data block of a single segment.
+
+    The parsed document consists of `prefix` (e.g. the header and the metadata
+    of the segment), the data block and `suffix` (e.g. the closing tags).
+
+    Parameters
+    ----------
+    source : _ByteSource
+        data source
+    start : int
+        start offset of the data block
+    end : int
+        end offset of the data block (excluded)
+    prefix : bytes
+        text to be added before the data block
+    suffix : bytes
+        text to be added after the data block
+    parse : Callable
+        parser, converting the string to the NDM object
+    """
+
+    def __init__(self, source, start, end, prefix, suffix, parse):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.prefix = prefix
+        self.suffix = suffix
+        self.parse = parse
+
+    def __call__(self):
+        text = self.prefix + self.source.read(self.start, self.end) + self.suffix
+        return self.parse(text.decode()).body.segment[0].data
+
+
+def _find_marker_lines(buffer, marker, start=0):
+    """
+    Finds the lines consisting of the `marker` only (e.g. `META_START`).
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full contents
+    marker : bytes
+        marker keyword
+    start : int
+        start offset of the search
+
+    Returns
+    -------
+    list
+        list of (line start, line end) offsets, line end includes the newline
+    """
+    lines = []
+    pos = buffer.find(marker, start)
+    while pos >= 0:
+        line_start = buffer.rfind(b"\n", 0, pos) + 1
+        line_end = buffer.find(b"\n", pos)
+        line_end = len(buffer) if line_end < 0 else line_end + 1
+
+        if (
+            not buffer[line_start:pos].strip()
+            and not buffer[pos + len(marker) : line_end].strip()
+        ):
+            lines.append((line_start, line_end))
+
+        pos = buffer.find(marker, pos + len(marker))
+    return lines
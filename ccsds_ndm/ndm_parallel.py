@@ -0,0 +1,389 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Parallel parsing of large NDM files on a process pool.
+
+The segments of the OEM, AEM and TDM files in KVN format are parsed in
+parallel. The segment boundaries are found with a pre-scan of the memory
+mapped file, only looking for the segment markers (e.g. `META_START`, see
+:mod:`ccsds_ndm.ndm_lazy`). The consecutive segments are then grouped into
+chunks of similar size, each chunk being a contiguous byte range of the file.
+The worker processes read the header and their byte range from the file and
+parse them as a stand-alone message. The segments are finally reassembled in
+the file order.
+
+A single segment is never split, therefore the speed-up is limited by the
+largest segment. The files of other message types (or with inconsistent
+segment markers) are parsed in the current process.
+
+Similarly, the members of a combined NDM in XML format (e.g. each OMM) are
+found by their start and end tags only, grouped into chunks and parsed in
+parallel, directly into their final classes (e.g. `Omm`). The members are
+either assembled into the `Ndm` object in the original order, or returned one
+by one as they are parsed, without keeping the whole `Ndm` in memory.
+
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque
+
+from xsdata.formats.dataclass.parsers import XmlParser
+from xsdata.formats.dataclass.parsers.config import ParserConfig
+
+from ccsds_ndm.models.ndmxml2 import Ndm
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo, _parse_kvn, _split_kvn_segments
+from ccsds_ndm.ndm_lazy import _ByteSource
+from ccsds_ndm.ndm_xml_io import (
+    NdmXmlIo,
+    _parse_ndm_member,
+    _split_ndm_members,
+    _strip_multi_ndm,
+)
+from ccsds_ndm.numeric_backend import numeric_backend
+
+_CHUNKS_PER_WORKER = 4
+"""Number of chunks for each worker, to balance the load."""
+
+_MIN_CHUNK_SIZE = 1 << 20
+"""Minimum size of a chunk [bytes], smaller files are not worth distributing."""
+
+
+def read_kvn_parallel(kvn_file_path, numeric="decimal", workers=None, chunk_size=None):
+    """
+    Reads the OEM, AEM or TDM file in KVN format, parsing its segments in
+    parallel.
+
+    Parameters
+    ----------
+    kvn_file_path : Path or AnyStr
+        path of the KVN file
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+        (`decimal`, `float` or `raw`)
+    workers : int or None
+        number of worker processes, `None` for the number of CPUs
+    chunk_size : int or None
+        target size of the byte range parsed by each task, `None` to divide
+        the file between the workers (several chunks each, at least 1 MB)
+
+    Returns
+    -------
+    object
+        Object tree from the file contents, same as
+        :meth:`NdmKvnIo.from_path <ccsds_ndm.ndm_kvn_io.NdmKvnIo.from_path>`
+
+    Raises
+    ------
+    RuntimeError
+        The file has been modified during the parsing.
+    """
+    workers = worker_count(workers)
+
+    source = _ByteSource.from_path(kvn_file_path)
+    with source.open_buffer() as buffer:
+        split = _split_kvn_segments(buffer)
+        file_size = len(buffer)
+
+    if split is None or workers < 2:
+        return NdmKvnIo().from_path(kvn_file_path, numeric=numeric)
+
+    _, segment_blocks = split
+    chunks = chunk_ranges(
+        segment_blocks, target_chunk_size(chunk_size, file_size, workers)
+    )
+    if len(chunks) < 2:
+        return NdmKvnIo().from_path(kvn_file_path, numeric=numeric)
+
+    header_end = segment_blocks[0][0]
+    tasks = [(source, header_end, start, end, numeric) for start, end in chunks]
+    with ProcessPoolExecutor(min(workers, len(chunks))) as executor:
+        messages = list(executor.map(parse_kvn_chunk, tasks))
+
+    # segments of the later chunks appended to the first message
+    ndm_obj = messages[0]
+    for message in messages[1:]:
+        ndm_obj.body.segment.extend(message.body.segment)
+    return ndm_obj
+
+
+def read_ndm_parallel(xml_file_path, numeric="decimal", workers=None, chunk_size=None):
+    """
+    Reads the combined NDM file in XML format, parsing its members in
+    parallel.
+
+    Parameters
+    ----------
+    xml_file_path : Path or AnyStr
+        path of the XML file
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+        (`decimal`, `float` or `raw`)
+    workers : int or None
+        number of worker processes, `None` for the number of CPUs
+    chunk_size : int or None
+        target size of the byte range parsed by each task, `None` to divide
+        the file between the workers (several chunks each, at least 1 MB)
+
+    Returns
+    -------
+    object
+        Object tree from the file contents, same as
+        :meth:`NdmXmlIo.from_path <ccsds_ndm.ndm_xml_io.NdmXmlIo.from_path>`
+        (e.g. the single member if the NDM has only one)
+
+    Raises
+    ------
+    RuntimeError
+        The file has been modified during the parsing.
+    """
+    source = _ByteSource.from_path(xml_file_path)
+    with source.open_buffer() as buffer:
+        split = _split_ndm_members(buffer)
+        if split is None:
+            return NdmXmlIo().from_path(xml_file_path, numeric=numeric)
+
+        # skeleton without the members, for the comments and the message id
+        namespaces, members = split
+        starts = [start for start, _, _ in members]
+        gaps = zip([0] + [end for _, end, _ in members], starts)
+        skeleton = b"".join(bytes(buffer[start:end]) for start, end in gaps)
+        skeleton += bytes(buffer[members[-1][1] :])
+        file_size = len(buffer)
+
+    parser = XmlParser(config=ParserConfig(fail_on_unknown_properties=True))
+    with numeric_backend(numeric):
+        ndm = parser.from_bytes(skeleton, Ndm)
+
+    for (_, _, clazz), member in zip(
+        members,
+        _parsed_members(
+            source, namespaces, members, file_size, numeric, workers, chunk_size
+        ),
+    ):
+        getattr(ndm, clazz.Meta.name).append(member)
+
+    return _strip_multi_ndm(ndm)
+
+
+def iter_ndm_members(xml_file_path, numeric="decimal", workers=1, chunk_size=None):
+    """
+    Iterates over the members of the combined NDM file in XML format (e.g.
+    each OMM), parsing them on demand.
+
+    With multiple workers, the chunks of members are parsed in parallel, a few
+    chunks ahead of the iteration. The comments and the message id of the NDM
+    are not parsed.
+
+    Parameters
+    ----------
+    xml_file_path : Path or AnyStr
+        path of the XML file
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+        (`decimal`, `float` or `raw`)
+    workers : int or None
+        number of worker processes, `1` to parse in the current process,
+        `None` for the number of CPUs
+    chunk_size : int or None
+        target size of the byte range parsed by each task, `None` to divide
+        the file between the workers (several chunks each, at least 1 MB)
+
+    Yields
+    ------
+    object
+        members in the file order, in their final classes (e.g. `Omm`), or the
+        message itself if the file is not a combined NDM
+
+    Raises
+    ------
+    RuntimeError
+        The file has been modified during the iteration.
+    """
+    source = _ByteSource.from_path(xml_file_path)
+    with source.open_buffer() as buffer:
+        split = _split_ndm_members(buffer)
+        file_size = len(buffer)
+
+    if split is None:
+        yield NdmXmlIo().from_path(xml_file_path, numeric=numeric)
+        return
+
+    namespaces, members = split
+    yield from _parsed_members(
+        source, namespaces, members, file_size, numeric, workers, chunk_size
+    )
+
+
+def _parsed_members(
+    source, namespaces, members, file_size, numeric, workers, chunk_size
+):
+    """
+    Parses the members of the combined NDM, in parallel if possible.
+
+    Parameters
+    ----------
+    source : _ByteSource
+        data source
+    namespaces : bytes
+        namespace declarations of the NDM root element
+    members : list
+        (start, end, NDM class) for each member
+    file_size : int
+        size of the file
+    numeric : str or NumericBackend
+        numeric backend for the real-valued fields
+    workers : int or None
+        number of worker processes, `None` for the number of CPUs
+    chunk_size : int or None
+        target size of the chunks, `None` to divide the file between the
+        workers
+
+    Yields
+    ------
+    object
+        members in the file order
+    """
+    workers = worker_count(workers)
+    chunks = chunk_ranges(
+        [(start, end) for start, end, _ in members],
+        target_chunk_size(chunk_size, file_size, workers),
+    )
+
+    tasks = []
+    index = 0
+    for start, end in chunks:
+        chunk_members = []
+        while index < len(members) and members[index][0] < end:
+            chunk_members.append(members[index])
+            index += 1
+        tasks.append((source, start, end, chunk_members, namespaces, numeric))
+
+    if workers < 2 or len(tasks) < 2:
+        for task in tasks:
+            yield from _parse_member_chunk(task)
+        return
+
+    # a few chunks parsed ahead of the iteration
+    executor = ProcessPoolExecutor(min(workers, len(tasks)))
+    pending: Deque[Future] = deque()
+    try:
+        for task in tasks:
+            pending.append(executor.submit(_parse_member_chunk, task))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+
+def worker_count(workers):
+    """
+    Number of the worker processes.
+
+    Parameters
+    ----------
+    workers : int or None
+        number of the worker processes, `None` for the number of CPUs
+
+    Returns
+    -------
+    int
+        number of the worker processes
+    """
+    return (os.cpu_count() or 1) if workers is None else int(workers)
+
+
+def target_chunk_size(chunk_size, file_size, workers):
+    """
+    Target size of the chunks, dividing the file between the workers if not
+    given.
+
+    Parameters
+    ----------
+    chunk_size : int or None
+        requested size of the chunks, `None` to divide the file
+    file_size : int
+        size of the file (bytes)
+    workers : int
+        number of the worker processes
+
+    Returns
+    -------
+    int
+        target size of the chunks (bytes)
+    """
+    if chunk_size is None:
+        return max(file_size // (workers * _CHUNKS_PER_WORKER), _MIN_CHUNK_SIZE)
+    return chunk_size
+
+
+def chunk_ranges(blocks, chunk_size):
+    """
+    Groups the consecutive blocks into byte ranges of about `chunk_size`.
+
+    Parameters
+    ----------
+    blocks : list
+        offsets of each block (e.g. a segment), starting with the start offset
+        and ending with the end offset
+    chunk_size : int
+        target size of the byte ranges
+
+    Returns
+    -------
+    list
+        (start, end) offsets of the byte ranges, each holding whole blocks
+    """
+    chunks = []
+    start = None
+    for block in blocks:
+        if start is None:
+            start = block[0]
+        if block[-1] - start >= chunk_size:
+            chunks.append((start, block[-1]))
+            start = None
+    if start is not None:
+        chunks.append((start, blocks[-1][-1]))
+    return chunks
+
+
+def parse_kvn_chunk(task):
+    """
+    Parses the header and the segments in the byte range (in the worker).
+
+    Parameters
+    ----------
+    task : tuple
+        byte source of the KVN file, end offset of the header, start and end
+        offsets of the segments and numeric backend
+
+    Returns
+    -------
+    object
+        message with the header and the segments of the byte range
+    """
+    source, header_end, start, end, numeric = task
+    text = source.read(0, header_end) + source.read(start, end)
+    return _parse_kvn(text.decode(), numeric=numeric)
+
+
+def _parse_member_chunk(task):
+    """Parses the combined NDM members in the byte range (in the worker)."""
+    source, start, end, members, namespaces, numeric = task
+    text = source.read(start, end)
+    parser = XmlParser(config=ParserConfig(fail_on_unknown_properties=True))
+    with numeric_backend(numeric):
+        return [
+            _parse_ndm_member(
+                parser, text[m_start - start : m_end - start], clazz, namespaces
+            )
+            for m_start, m_end, clazz in members
+        ]
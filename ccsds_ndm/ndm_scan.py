@@ -0,0 +1,314 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Fast scan of the header and the metadata of NDM files, e.g. for cataloguing.
+
+The scan returns a small record for each segment, with the header and the
+metadata keywords (e.g. `ORIGINATOR` or `OBJECT_NAME`) and their values as
+strings. For OEM, AEM and TDM files, only the segment markers are searched for
+(e.g. `META_START` in KVN or `<metadata>` in XML) and only the header and the
+metadata blocks are processed, the data lines are skipped without being
+parsed. Files are memory mapped, so that the scan of large files is limited
+by the disk access rather than the parsing.
+
+Other message types (and Combined NDM files) are small in general and are
+parsed in full to extract the same records.
+
+"""
+
+import re
+import xml.etree.ElementTree as ElementTree
+from collections import namedtuple
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import Dict
+
+from ccsds_ndm.models.ndmxml2 import Ndm
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_kvn_io import _split_kvn_lines, _split_kvn_segments
+from ccsds_ndm.ndm_lazy import _ByteSource, _segments
+from ccsds_ndm.ndm_xml_io import (
+    _find_xml_element,
+    _find_xml_root,
+    _NdmDataType,
+    _split_xml_segments,
+)
+
+SegmentRecord = namedtuple(
+    "SegmentRecord", ["ndm_type", "version", "index", "offset", "header", "metadata"]
+)
+"""
+Scan result for a single segment.
+
+- `ndm_type`: message type (e.g. `OEM`)
+- `version`: message version (e.g. `2.0`)
+- `index`: index of the segment within the message
+- `offset`: byte offset of the segment in the source, `None` if not known
+- `header`: header keywords and values (e.g. `{"ORIGINATOR": "NASA/JPL"}`)
+- `metadata`: metadata keywords and values (e.g. `{"OBJECT_NAME": "MARS"}`)
+"""
+
+_SKIPPED_KEYWORDS = ("COMMENT", "META_START", "META_STOP")
+"""Keywords that are not included in the records."""
+
+_XML_VERSION_PATTERN = re.compile(rb"""\bversion\s*=\s*["']([^"']*)["']""")
+"""Pattern of the `version` attribute of the root element."""
+
+
+def scan_path(input_file_path):
+    """
+    Scans the header and the metadata of the file.
+
+    Parameters
+    ----------
+    input_file_path : Path or AnyStr
+        Path of the file to be scanned (path or pathlike accepted)
+
+    Returns
+    -------
+    list
+        `SegmentRecord` for each segment, in order
+    """
+    with _ByteSource.from_path(input_file_path).open_buffer() as buffer:
+        return _scan_buffer(buffer)
+
+
+def scan_string(ndm_data_source):
+    """
+    Scans the header and the metadata of the input string.
+
+    Parameters
+    ----------
+    ndm_data_source : str
+        input string data
+
+    Returns
+    -------
+    list
+        `SegmentRecord` for each segment, in order
+    """
+    return _scan_buffer(ndm_data_source.encode())
+
+
+def _scan_buffer(buffer):
+    """
+    Scans the full contents, falling back to the full parsing if necessary.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full contents
+
+    Returns
+    -------
+    list
+        `SegmentRecord` for each segment, in order
+    """
+    # the format can be identified from the first characters
+    if bytes(buffer[:64]).lstrip().startswith(b"<"):
+        records = _scan_xml(buffer)
+    else:
+        records = _scan_kvn(buffer)
+
+    if records is None:
+        # not an OEM, AEM or TDM, parse in full
+        ndm_obj = NdmIo().from_string(bytes(buffer).decode())
+        records = _records_from_object(ndm_obj)
+
+    return records
+
+
+def _scan_kvn(buffer):
+    """
+    Scans the OEM, AEM or TDM KVN contents.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full KVN contents
+
+    Returns
+    -------
+    list or None
+        `SegmentRecord` for each segment, `None` if the data is not an OEM,
+        AEM or TDM
+    """
+    split = _split_kvn_segments(buffer)
+    if split is None:
+        return None
+
+    ndm_class, segment_blocks = split
+    header_lines = _split_kvn_lines(bytes(buffer[: segment_blocks[0][0]]).decode())
+
+    # first line is the id line (e.g. `CCSDS_OEM_VERS = 2.0`)
+    version = header_lines[0][1]
+    header = _keyword_dict(header_lines[1:])
+
+    return [
+        SegmentRecord(
+            ndm_class.__name__.upper(),
+            version,
+            index,
+            meta_start,
+            header,
+            _keyword_dict(
+                _split_kvn_lines(bytes(buffer[meta_start:meta_end]).decode())
+            ),
+        )
+        for index, (meta_start, meta_end, _, _) in enumerate(segment_blocks)
+    ]
+
+
+def _scan_xml(buffer):
+    """
+    Scans the OEM, AEM or TDM XML contents.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full XML contents
+
+    Returns
+    -------
+    list or None
+        `SegmentRecord` for each segment, `None` if the data is not an OEM,
+        AEM or TDM
+    """
+    segment_blocks = _split_xml_segments(buffer)
+    if segment_blocks is None:
+        return None
+
+    root_tag, root_start, root_tag_end = _find_xml_root(buffer)
+    ndm_type = _NdmDataType.find_element(root_tag).class_name.upper()
+    version_match = _XML_VERSION_PATTERN.search(
+        bytes(buffer[root_tag_end : buffer.find(b">", root_tag_end)])
+    )
+    version = None if version_match is None else version_match.group(1).decode()
+
+    header_elem = _find_xml_element(buffer, b"header", root_start, segment_blocks[0][0])
+    header = {} if header_elem is None else _xml_element_dict(buffer, header_elem)
+
+    records = []
+    for index, (seg_start, data_start, _, _) in enumerate(segment_blocks):
+        meta_elem = _find_xml_element(buffer, b"metadata", seg_start, data_start)
+        records.append(
+            SegmentRecord(
+                ndm_type,
+                version,
+                index,
+                seg_start,
+                header,
+                {} if meta_elem is None else _xml_element_dict(buffer, meta_elem),
+            )
+        )
+    return records
+
+
+def _xml_element_dict(buffer, element_offsets):
+    """
+    Collects the child elements and their values of an XML element.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full XML contents
+    element_offsets : (int, int, int, int)
+        offsets of the element, as returned by `_find_xml_element`
+
+    Returns
+    -------
+    dict
+        child element tags and their values
+    """
+    elem = ElementTree.XML(bytes(buffer[element_offsets[0] : element_offsets[3]]))
+    return {
+        child.tag.split("}")[-1]: (child.text or "").strip()
+        for child in elem
+        if isinstance(child.tag, str)
+        and child.tag.split("}")[-1] not in _SKIPPED_KEYWORDS
+    }
+
+
+def _keyword_dict(lines):
+    """Collects the keywords and their values from the KVN lines."""
+    return {
+        line[0]: line[1]
+        for line in lines
+        if len(line) > 1 and line[0] not in _SKIPPED_KEYWORDS
+    }
+
+
+def _records_from_object(ndm_obj):
+    """
+    Generates the records from the parsed NDM object.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object (or Combined NDM object)
+
+    Returns
+    -------
+    list
+        `SegmentRecord` for each segment, in order
+    """
+    if isinstance(ndm_obj, Ndm):
+        # Combined NDM, go through the messages of each type
+        return [
+            record
+            for fld in fields(ndm_obj)
+            if isinstance(getattr(ndm_obj, fld.name), list) and fld.name != "comment"
+            for message in getattr(ndm_obj, fld.name)
+            for record in _records_from_object(message)
+        ]
+
+    header = _dataclass_dict(ndm_obj.header)
+    return [
+        SegmentRecord(
+            type(ndm_obj).__name__.upper(),
+            str(ndm_obj.version),
+            index,
+            None,
+            header,
+            _dataclass_dict(segment.metadata),
+        )
+        for index, segment in enumerate(_segments(ndm_obj))
+    ]
+
+
+def _dataclass_dict(obj):
+    """
+    Collects the keywords and their values (as strings) of the object.
+
+    Parameters
+    ----------
+    obj
+        header or metadata object (or `None`)
+
+    Returns
+    -------
+    dict
+        keywords and values, for the single valued fields
+    """
+    items: Dict[str, str] = {}
+    if obj is None:
+        return items
+
+    for fld in fields(obj):
+        value = getattr(obj, fld.name)
+        keyword = fld.metadata.get("name", fld.name.upper())
+        if value is None or isinstance(value, list) or keyword in _SKIPPED_KEYWORDS:
+            continue
+
+        if isinstance(value, Enum):
+            value = value.value
+        elif is_dataclass(value):
+            # value with units
+            value = getattr(value, "value", None)
+            if value is None:
+                continue
+        items[keyword] = str(value)
+    return items
@@ -0,0 +1,320 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Parallel reading of the OEM, AEM and TDM data as `numpy` arrays in shared
+memory.
+
+Returning the parsed object trees from the worker processes (see
+:mod:`ccsds_ndm.ndm_parallel`) requires pickling them, which may cost more
+than the parsing itself for large files. Here, the workers parse their chunks
+of segments and convert them to columnar sections (see
+:mod:`ccsds_ndm.columnar`), which are copied into a single shared memory
+block for each chunk. Only the header, the segment metadata and the layout of
+the arrays in the block are pickled.
+
+The arrays in the current process are views on the shared memory blocks,
+without any copies. The block names are unlinked as soon as they are
+attached, therefore no shared memory is left behind even if the process is
+terminated. The memory itself is released by :meth:`SharedColumns.close` (or
+at the end of the `with` block), after which the arrays should not be used.
+
+The arrays of each segment are (N is the number of data lines):
+
+- OEM: `epochs_ns` (N), `states` (N, 6), `accelerations` (N, 3, only if
+  defined), and if there are covariance blocks, `covariance_epochs_ns` (M),
+  `covariances` (M, 6, 6) and `covariance_ref_frames` (M)
+- AEM: `epochs_ns` (N) and `values` (N, k)
+- TDM: `epochs_ns` (N), `values` (N) and `keywords` (N)
+
+The string columns (e.g. the TDM keywords) are stored as `int32` codes, with
+the distinct strings in `labels` under the same name. The column names of the
+AEM `values` are given in `labels` as well.
+
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.covariance import oem_covariances
+from ccsds_ndm.models.ndmxml2 import OemSegment, TdmSegment
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo, _split_kvn_segments
+from ccsds_ndm.ndm_lazy import _ByteSource, _lazy_message_types
+from ccsds_ndm.ndm_parallel import (
+    chunk_ranges,
+    parse_kvn_chunk,
+    target_chunk_size,
+    worker_count,
+)
+
+_ALIGNMENT = 64
+"""Alignment of the arrays in the shared memory blocks [bytes]."""
+
+SharedSegment = namedtuple("SharedSegment", ["metadata", "arrays", "labels"])
+SharedSegment.__doc__ = """\
+Columnar sections of a single OEM, AEM or TDM segment.
+
+`metadata` is the segment metadata, `arrays` the dictionary of `numpy` arrays
+by name (e.g. `epochs_ns` or `states`) and `labels` the dictionary of the
+string labels of the arrays (e.g. the distinct TDM `keywords`).
+"""
+
+_ArraySpec = namedtuple("_ArraySpec", ["name", "dtype", "shape", "offset"])
+"""Layout of an array in a shared memory block."""
+
+
+class SharedColumns:
+    """
+    Columnar sections of the OEM, AEM or TDM segments, with the arrays in
+    shared memory.
+
+    Use :func:`read_columns_parallel` to read them from a file. Supports the
+    `with` statement, releasing the shared memory at the end of the block.
+
+    Parameters
+    ----------
+    header
+        message header
+    segments : list
+        `SharedSegment` for each segment, in order
+    blocks : list
+        shared memory blocks of the arrays, attached and unlinked
+    """
+
+    def __init__(self, header, segments, blocks=()):
+        self.header = header
+        self.segments = list(segments)
+        self._blocks = list(blocks)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __getitem__(self, index):
+        return self.segments[index]
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Releases the shared memory blocks, the arrays should not be used
+        afterwards.
+
+        Raises
+        ------
+        BufferError
+            Some arrays are still referenced (e.g. by local variables), their
+            blocks are released with a later call.
+        """
+        self.segments = []
+        blocks = self._blocks
+        self._blocks = []
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                self._blocks.append(block)
+
+        if self._blocks:
+            raise BufferError(
+                f"{len(self._blocks)} shared memory block(s) cannot be released, "
+                f"their arrays are still referenced (copy the arrays to keep "
+                f"them after closing)."
+            )
+
+
+def read_columns_parallel(kvn_file_path, workers=None, chunk_size=None):
+    """
+    Reads the OEM, AEM or TDM file in KVN format as columnar sections, parsing
+    its segments in parallel.
+
+    The arrays are transferred through shared memory from the worker
+    processes. Without parallel processing (e.g. a single worker or a small
+    file) they are regular arrays. The data is always parsed with the `float`
+    numeric backend.
+
+    Parameters
+    ----------
+    kvn_file_path : Path or AnyStr
+        path of the KVN file
+    workers : int or None
+        number of worker processes, `None` for the number of CPUs
+    chunk_size : int or None
+        target size of the byte range parsed by each task, `None` to divide
+        the file between the workers (several chunks each, at least 1 MB)
+
+    Returns
+    -------
+    SharedColumns
+        columnar sections of the segments, to be closed after use
+
+    Raises
+    ------
+    TypeError
+        File is not an OEM, AEM or TDM.
+    RuntimeError
+        The file has been modified during the parsing.
+    """
+    workers = worker_count(workers)
+
+    source = _ByteSource.from_path(kvn_file_path)
+    with source.open_buffer() as buffer:
+        split = _split_kvn_segments(buffer)
+        file_size = len(buffer)
+
+    chunks = []
+    if split is not None:
+        segment_blocks = split[1]
+        chunks = chunk_ranges(
+            segment_blocks, target_chunk_size(chunk_size, file_size, workers)
+        )
+
+    if workers < 2 or len(chunks) < 2:
+        ndm_obj = NdmKvnIo().from_path(kvn_file_path, numeric="float")
+        if type(ndm_obj) not in _lazy_message_types:
+            raise TypeError(
+                f"Columnar sections are only available for OEM, AEM and TDM, "
+                f"found {type(ndm_obj).__name__}."
+            )
+        segments = [
+            SharedSegment(segment.metadata, *_segment_sections(segment))
+            for segment in ndm_obj.body.segment
+        ]
+        return SharedColumns(ndm_obj.header, segments)
+
+    header_end = segment_blocks[0][0]
+    tasks = [(source, header_end, start, end, "float") for start, end in chunks]
+
+    # workers should share the resource tracker of this process
+    resource_tracker.ensure_running()
+    futures = []
+    try:
+        with ProcessPoolExecutor(min(workers, len(chunks))) as executor:
+            futures = [executor.submit(_share_chunk, task) for task in tasks]
+            results = [future.result() for future in futures]
+    except BaseException:
+        # release the blocks of the completed chunks
+        for future in futures:
+            if future.done() and not future.cancelled() and not future.exception():
+                _attach(future.result()[1]).close()
+        raise
+
+    blocks = []
+    segments = []
+    for _, block_name, segment_specs in results:
+        block = _attach(block_name)
+        blocks.append(block)
+        for metadata, specs, labels in segment_specs:
+            arrays = {spec.name: _shared_array(block, spec) for spec in specs}
+            segments.append(SharedSegment(metadata, arrays, labels))
+
+    return SharedColumns(results[0][0], segments, blocks)
+
+
+def _segment_sections(segment):
+    """Arrays and labels of the columnar sections of the segment."""
+    columns = segment_columns(segment)
+    arrays = {"epochs_ns": columns.epochs_ns}
+    labels = {}
+
+    if isinstance(segment, OemSegment):
+        arrays["states"] = columns.states
+        if any(sv.x_ddot is not None for sv in segment.data.state_vector):
+            arrays["accelerations"] = columns.accelerations
+        if segment.data.covariance_matrix:
+            stack = oem_covariances(segment)
+            arrays["covariance_epochs_ns"] = stack.epochs_ns
+            arrays["covariances"] = stack.matrices
+            labels["covariance_ref_frames"], arrays["covariance_ref_frames"] = _codes(
+                stack.ref_frames
+            )
+    elif isinstance(segment, TdmSegment):
+        arrays["values"] = columns.values
+        labels["keywords"], arrays["keywords"] = _codes(columns.keywords)
+    else:
+        arrays["values"] = columns.values
+        labels["values"] = list(columns.names)
+
+    return arrays, labels
+
+
+def _codes(strings):
+    """Distinct strings and the `int32` codes of the strings."""
+    distinct, codes = np.unique(np.asarray(strings, dtype=str), return_inverse=True)
+    return distinct.tolist(), codes.astype(np.int32).reshape(-1)
+
+
+def _share_chunk(task):
+    """
+    Parses the chunk and copies its arrays into a new shared memory block (in
+    the worker).
+
+    Returns
+    -------
+    (object, str, list)
+        header, name of the block and the (metadata, array specs, labels) for
+        each segment
+    """
+    message = parse_kvn_chunk(task)
+
+    offset = 0
+    sections = []
+    for segment in message.body.segment:
+        arrays, labels = _segment_sections(segment)
+        specs = []
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            specs.append(_ArraySpec(name, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        sections.append((segment.metadata, arrays, specs, labels))
+
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    try:
+        for _, arrays, specs, _ in sections:
+            for spec in specs:
+                view = _shared_array(block, spec)
+                view[...] = arrays[spec.name]
+                del view
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+
+    return (
+        message.header,
+        block.name,
+        [(metadata, specs, labels) for metadata, _, specs, labels in sections],
+    )
+
+
+def _attach(block_name):
+    """Attaches the shared memory block and unlinks its name."""
+    block = shared_memory.SharedMemory(name=block_name)
+    block.unlink()
+    return block
+
+
+def _shared_array(block, spec):
+    """
+    Array in the shared memory block.
+
+    The array holds a buffer export of the block, so that the block cannot be
+    closed while the array (or a view on it) is referenced.
+    """
+    count = int(np.prod(spec.shape, dtype=np.int64))
+    array = np.frombuffer(block.buf, spec.dtype, count, spec.offset)
+    return array.reshape(spec.shape)
@@ -0,0 +1,873 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Compact binary snapshot format for the NDM object trees.
+
+A snapshot stores any object tree of the :mod:`ccsds_ndm.models.ndmxml2`
+models (e.g. as parsed by :class:`.NdmIo`) and restores it exactly, including
+the numeric backend of the values (`Decimal`, `float` or `RawNumber`).
+
+The bulk record sections (OEM state vectors and covariances, AEM attitude
+states and TDM observations) are stored column by column as packed `numpy`
+arrays, the rest of the tree (header, metadata etc.) as a small JSON schema
+header. The file layout is:
+
+- fixed size prefix: magic bytes, format version and the header size
+- JSON header: the tree, with the bulk sections replaced by their column
+  descriptions, and the type, shape and offset of each array
+- array data, each array aligned to 64 bytes
+
+The values of the columns are packed depending on their type:
+
+- `float` and `int` values as `float64` and `int64` arrays
+- `Decimal` values as their exact integer coefficient, exponent and sign
+- strings (e.g. the epochs) and `RawNumber` values as fixed width byte arrays
+- enumerations as integer codes
+- nested objects (e.g. `PositionType`) as one column per field
+
+Missing (`None`) values are recorded in a separate mask array and constant
+columns (e.g. the units) are stored only once.
+
+Snapshot files are memory mapped on loading. In lazy mode, only the tree
+skeleton is built, the data objects holding the bulk sections (e.g. `OemData`)
+are built from the memory mapped arrays on first access (see
+:mod:`ccsds_ndm.ndm_lazy`).
+
+"""
+
+import decimal
+import gc
+import importlib
+import json
+import mmap
+import struct
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from decimal import Decimal
+from enum import Enum
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ccsds_ndm import __version__
+from ccsds_ndm.ndm_lazy import _lazy_data, _LazyData, _materialise_data
+from ccsds_ndm.numeric_backend import RawNumber
+
+SNAPSHOT_FORMAT_VERSION = 1
+"""Version of the snapshot format written by this library."""
+
+_MAGIC = b"CCSDSNDM"
+"""Magic bytes at the start of the snapshot."""
+
+_PREFIX = struct.Struct("<8sIIQ")
+"""Fixed size prefix: magic bytes, format version, flags and header size."""
+
+_ALIGNMENT = 64
+"""Alignment of the header end and of each array in the data section."""
+
+_MODELS_PACKAGE = "ccsds_ndm.models.ndmxml2."
+"""Package of the model classes that can be stored in a snapshot."""
+
+_BULK_FIELDS = frozenset(
+    ["state_vector", "covariance_matrix", "attitude_state", "observation"]
+)
+"""Fields holding the bulk record sections, stored as packed columns."""
+
+_MAX_DECIMAL_DIGITS = 18
+"""Maximum number of coefficient digits of the packed `Decimal` values."""
+
+_DECIMAL_DTYPE = np.dtype([("coefficient", "<u8"), ("exponent", "<i4"), ("sign", "u1")])
+"""Packed `Decimal` values (as in :meth:`decimal.Decimal.as_tuple`)."""
+
+_DECIMAL_CONTEXT = decimal.Context(
+    prec=_MAX_DECIMAL_DIGITS + 2, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN
+)
+"""Context to restore the packed `Decimal` values without rounding."""
+
+_string_types = {"str": str, "raw": RawNumber}
+"""Value types of the string columns."""
+
+_record_builders: Dict[Tuple[str, ...], Callable] = {}
+"""Functions building the records, for each set of field names."""
+
+_field_names: Dict[type, List[str]] = {}
+"""Names of the constructor fields of each model class, cached."""
+
+
+def to_snapshot(ndm_obj):
+    """
+    Converts the NDM object tree to a snapshot.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object tree (or any part of it)
+
+    Returns
+    -------
+    bytes
+        snapshot contents
+    """
+    return b"".join(_SnapshotWriter().write(ndm_obj))
+
+
+def save_snapshot(ndm_obj, file_path):
+    """
+    Saves the NDM object tree to a snapshot file.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object tree (or any part of it)
+    file_path : Path or AnyStr
+        path of the snapshot file
+    """
+    with open(file_path, "wb") as f:
+        for part in _SnapshotWriter().write(ndm_obj):
+            f.write(part)
+
+
+def from_snapshot(snapshot, lazy=False):
+    """
+    Restores the NDM object tree from the snapshot contents.
+
+    The arrays are not copied from `snapshot`, which should not be modified
+    while the lazy data blocks are not loaded yet.
+
+    Parameters
+    ----------
+    snapshot : bytes or bytearray or memoryview or mmap.mmap
+        snapshot contents
+    lazy : bool
+        `True` to build the data objects with bulk sections on first access
+
+    Returns
+    -------
+    object
+        NDM object tree
+
+    Raises
+    ------
+    ValueError
+        Not a snapshot or snapshot format version not supported.
+    """
+    with _gc_paused():
+        return _SnapshotReader(snapshot).read(lazy)
+
+
+def load_snapshot(file_path, lazy=False):
+    """
+    Loads the NDM object tree from a snapshot file (memory mapped).
+
+    Parameters
+    ----------
+    file_path : Path or AnyStr
+        path of the snapshot file
+    lazy : bool
+        `True` to build the data objects with bulk sections on first access
+
+    Returns
+    -------
+    object
+        NDM object tree
+
+    Raises
+    ------
+    ValueError
+        Not a snapshot or snapshot format version not supported.
+    """
+    with open(Path(file_path), "rb") as f:
+        if f.seek(0, 2) < _PREFIX.size:
+            raise ValueError(f"File {file_path} is not an NDM snapshot.")
+        # the map stays open as long as any (lazy) array refers to it
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return from_snapshot(buffer, lazy)
+
+
+class _SnapshotWriter:
+    """
+    Converts the object tree into the snapshot header and arrays.
+    """
+
+    def __init__(self):
+        self.arrays = []
+
+    def write(self, ndm_obj):
+        """
+        Generates the snapshot contents.
+
+        Parameters
+        ----------
+        ndm_obj
+            NDM object tree
+
+        Returns
+        -------
+        list
+            snapshot contents as a list of `bytes` (or byte arrays)
+        """
+        root = self.encode(ndm_obj)
+
+        array_specs = []
+        offset = 0
+        for array in self.arrays:
+            array_specs.append(
+                {
+                    "dtype": _dtype_spec(array.dtype),
+                    "shape": list(array.shape),
+                    "offset": offset,
+                }
+            )
+            offset += _padded_size(array.nbytes)
+
+        header = {"library_version": __version__, "arrays": array_specs, "root": root}
+        header_bytes = json.dumps(header, separators=(",", ":")).encode()
+        header_end = _PREFIX.size + len(header_bytes)
+
+        parts = [
+            _PREFIX.pack(_MAGIC, SNAPSHOT_FORMAT_VERSION, 0, len(header_bytes)),
+            header_bytes,
+            bytes(_padded_size(header_end) - header_end),
+        ]
+        for array in self.arrays:
+            parts.append(array.reshape(-1).view(np.uint8))
+            parts.append(bytes(_padded_size(array.nbytes) - array.nbytes))
+        return parts
+
+    def add_array(self, array):
+        """Adds the array to the data section, returns its index."""
+        self.arrays.append(np.ascontiguousarray(array))
+        return len(self.arrays) - 1
+
+    def encode(self, value):
+        """
+        Encodes the value as a JSON compatible object.
+
+        Parameters
+        ----------
+        value
+            value in the object tree
+
+        Returns
+        -------
+        object
+            JSON compatible object
+        """
+        if value is None or type(value) in (str, int, bool, float):
+            return value
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, RawNumber):
+            return {"$raw": str(value)}
+        if isinstance(value, Decimal):
+            return {"$decimal": str(value)}
+        if isinstance(value, Enum):
+            return {"$enum": _class_name(type(value)), "value": value.value}
+        if isinstance(value, _LazyData):
+            _materialise_data(value)
+        if is_dataclass(value):
+            return self.encode_dataclass(value)
+
+        raise TypeError(
+            f"Values of type {type(value).__name__} cannot be stored in a snapshot."
+        )
+
+    def encode_dataclass(self, obj):
+        """Encodes the model object, with the bulk sections as tables."""
+        encoded_fields = {}
+        for fld in fields(obj):
+            name = fld.name
+            if not fld.init and name not in vars(obj):
+                # class level constant (e.g. `version`), not stored
+                continue
+            value = getattr(obj, name)
+            if (
+                name in _BULK_FIELDS
+                and isinstance(value, list)
+                and value
+                and _is_uniform_dataclass_list(value)
+            ):
+                encoded_fields[name] = {
+                    "$table": _class_name(type(value[0])),
+                    "length": len(value),
+                    "columns": self.encode_columns(type(value[0]), value),
+                }
+            else:
+                encoded_fields[name] = self.encode(value)
+        return {"$class": _class_name(type(obj)), "fields": encoded_fields}
+
+    def encode_columns(self, cls, rows):
+        """Encodes the fields of the objects (of class `cls`) as columns."""
+        return {
+            name: self.encode_column([getattr(row, name) for row in rows])
+            for name in _fields_of(cls)
+        }
+
+    def encode_column(self, values):
+        """
+        Encodes the column of values (with the same type or `None`).
+
+        Parameters
+        ----------
+        values : list
+            values of a single field of the records
+
+        Returns
+        -------
+        dict
+            column description
+        """
+        present = [value for value in values if value is not None]
+        if not present:
+            return {"kind": "constant", "value": None}
+
+        value_type = type(present[0])
+        if any(type(value) is not value_type for value in present):
+            return {"kind": "object", "values": self.encode(values)}
+
+        column = None
+        if len(present) == len(values) and value_type in (str, list):
+            if all(value == present[0] for value in present):
+                return {"kind": "constant", "value": self.encode(present[0])}
+
+        if value_type is float:
+            column = {
+                "kind": "float64",
+                "array": self.add_array(np.array(present, "<f8")),
+            }
+        elif value_type is int:
+            column = self.encode_int_column(present)
+        elif value_type is Decimal:
+            column = self.encode_decimal_column(present)
+        elif value_type in (str, RawNumber):
+            column = self.encode_string_column(present, value_type)
+        elif issubclass(value_type, Enum):
+            column = self.encode_enum_column(present, value_type)
+        elif is_dataclass(value_type) and not issubclass(value_type, _LazyData):
+            column = {
+                "kind": "struct",
+                "class": _class_name(value_type),
+                "columns": self.encode_columns(value_type, present),
+            }
+
+        if column is None:
+            return {"kind": "object", "values": self.encode(values)}
+
+        if len(present) < len(values):
+            column["mask"] = self.add_array(
+                np.fromiter((value is not None for value in values), bool, len(values))
+            )
+        return column
+
+    def encode_int_column(self, values):
+        """Encodes the `int` values, `None` if not within the `int64` range."""
+        try:
+            return {"kind": "int64", "array": self.add_array(np.array(values, "<i8"))}
+        except OverflowError:
+            return None
+
+    def encode_decimal_column(self, values):
+        """Encodes the `Decimal` values, as strings if not packable."""
+        strings = [str(value) for value in values]
+        packed = _pack_decimals(strings)
+        if packed is None:
+            return {
+                "kind": "decimal_string",
+                "array": self.add_array(_pack_strings(strings)),
+            }
+        return {"kind": "decimal", "array": self.add_array(packed)}
+
+    def encode_string_column(self, values, value_type):
+        """Encodes the `str` or `RawNumber` values, `None` if not ASCII."""
+        array = _pack_strings(values)
+        if array is None:
+            return None
+        kind = "raw" if value_type is RawNumber else "str"
+        return {"kind": "string", "type": kind, "array": self.add_array(array)}
+
+    def encode_enum_column(self, values, enum_class):
+        """Encodes the enumeration values as codes."""
+        members = list(dict.fromkeys(values))
+        codes = {member: code for code, member in enumerate(members)}
+        return {
+            "kind": "enum",
+            "class": _class_name(enum_class),
+            "values": [member.value for member in members],
+            "array": self.add_array(
+                np.fromiter((codes[value] for value in values), "<i4", len(values))
+            ),
+        }
+
+
+class _SnapshotReader:
+    """
+    Restores the object tree from the snapshot contents.
+
+    Parameters
+    ----------
+    snapshot : bytes or bytearray or memoryview or mmap.mmap
+        snapshot contents
+
+    Raises
+    ------
+    ValueError
+        Not a snapshot or snapshot format version not supported.
+    """
+
+    def __init__(self, snapshot):
+        if len(snapshot) < _PREFIX.size:
+            raise ValueError("Contents are not an NDM snapshot.")
+
+        magic, version, _, header_size = _PREFIX.unpack_from(snapshot)
+        if magic != _MAGIC:
+            raise ValueError("Contents are not an NDM snapshot.")
+        if version > SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Snapshot format version {version} not supported "
+                f"(up to version {SNAPSHOT_FORMAT_VERSION}), "
+                f"written by a newer library version."
+            )
+
+        header_end = _PREFIX.size + header_size
+        header = json.loads(bytes(snapshot[_PREFIX.size : header_end]))
+
+        self.snapshot = snapshot
+        self.data_offset = _padded_size(header_end)
+        self.array_specs = header["arrays"]
+        self.root = header["root"]
+
+    def read(self, lazy=False):
+        """
+        Builds the object tree.
+
+        Parameters
+        ----------
+        lazy : bool
+            `True` to build the data objects with bulk sections on first access
+
+        Returns
+        -------
+        object
+            NDM object tree
+        """
+        return self.decode(self.root, lazy)
+
+    def array(self, index):
+        """Gets the array in the data section (without copying)."""
+        spec = self.array_specs[index]
+        dtype = _dtype_from_spec(spec["dtype"])
+        shape = tuple(spec["shape"])
+        return np.frombuffer(
+            self.snapshot,
+            dtype,
+            int(np.prod(shape)),
+            self.data_offset + spec["offset"],
+        ).reshape(shape)
+
+    def decode(self, value, lazy=False):
+        """
+        Decodes the JSON compatible object into the value.
+
+        Parameters
+        ----------
+        value
+            JSON compatible object
+        lazy : bool
+            `True` to build the data objects with bulk sections on first access
+
+        Returns
+        -------
+        object
+            value in the object tree
+        """
+        if isinstance(value, list):
+            return [self.decode(item, lazy) for item in value]
+        if not isinstance(value, dict):
+            return value
+
+        if "$class" in value:
+            cls = _model_class(value["$class"])
+            has_tables = any(
+                isinstance(item, dict) and "$table" in item
+                for item in value["fields"].values()
+            )
+            if lazy and has_tables:
+                return _lazy_data(cls, partial(self.decode_dataclass, cls, value))
+            return self.decode_dataclass(cls, value, lazy)
+        if "$table" in value:
+            return self.decode_table(value)
+        if "$decimal" in value:
+            return Decimal(value["$decimal"])
+        if "$raw" in value:
+            return RawNumber(value["$raw"])
+        if "$enum" in value:
+            return _model_class(value["$enum"])(value["value"])
+
+        raise ValueError(f"Snapshot contents not recognised: {value}")
+
+    def decode_dataclass(self, cls, value, lazy=False):
+        """Builds the model object (of class `cls`)."""
+        obj = object.__new__(cls)
+        obj.__dict__.update(
+            (name, self.decode(item, lazy)) for name, item in value["fields"].items()
+        )
+        return obj
+
+    def decode_table(self, table):
+        """Builds the list of records of the bulk section."""
+        cls = _model_class(table["$table"])
+        return _build_records(
+            cls, self.decode_columns(table["columns"], table["length"])
+        )
+
+    def decode_columns(self, columns, length):
+        """Decodes the columns into lists of values, keyed by the field name."""
+        return {
+            name: self.decode_column(column, length) for name, column in columns.items()
+        }
+
+    def decode_column(self, column, length):
+        """
+        Decodes the column into the list of values.
+
+        Parameters
+        ----------
+        column : dict
+            column description
+        length : int
+            number of records
+
+        Returns
+        -------
+        list
+            values of the column
+        """
+        kind = column["kind"]
+        if kind == "constant":
+            value = column["value"]
+            if isinstance(value, list):
+                # new list for each record
+                return [self.decode(value) for _ in range(length)]
+            return [self.decode(value)] * length
+        if kind == "object":
+            return self.decode(column["values"])
+
+        mask = self.array(column["mask"]) if "mask" in column else None
+        count = length if mask is None else int(np.count_nonzero(mask))
+
+        if kind in ("float64", "int64"):
+            values = self.array(column["array"]).tolist()
+        elif kind == "decimal":
+            values = _unpack_decimals(self.array(column["array"]))
+        elif kind == "decimal_string":
+            values = list(map(Decimal, _unpack_strings(self.array(column["array"]))))
+        elif kind == "string":
+            values = _unpack_strings(self.array(column["array"]))
+            if column["type"] != "str":
+                values = list(map(_string_types[column["type"]], values))
+        elif kind == "enum":
+            enum_class = _model_class(column["class"])
+            members = [enum_class(value) for value in column["values"]]
+            values = [members[code] for code in self.array(column["array"]).tolist()]
+        elif kind == "struct":
+            values = _build_records(
+                _model_class(column["class"]),
+                self.decode_columns(column["columns"], count),
+            )
+        else:
+            raise ValueError(f"Snapshot column type not recognised: {kind}")
+
+        if mask is None:
+            return values
+
+        full_values = [None] * length
+        for index, value in zip(np.flatnonzero(mask).tolist(), values):
+            full_values[index] = value
+        return full_values
+
+
+def _build_records(cls, columns):
+    """
+    Builds the records from the columns.
+
+    Parameters
+    ----------
+    cls : type
+        model class of the records
+    columns : dict
+        list of values for each field
+
+    Returns
+    -------
+    list
+        list of records
+
+    Raises
+    ------
+    ValueError
+        Column names are not the fields of the model class.
+    """
+    names = tuple(columns)
+    if not set(names) <= set(_fields_of(cls)):
+        raise ValueError(f"Snapshot columns do not match the class {cls.__name__}.")
+
+    builder = _record_builders.get(names)
+    if builder is None:
+        builder = _record_builder(names)
+        _record_builders[names] = builder
+    return builder(object.__new__, cls, *columns.values())
+
+
+def _record_builder(names):
+    """
+    Generates the function building the records with the given field names.
+
+    The function creates the instance dictionary of each record as a literal,
+    which is much faster than filling it field by field. The names appear only
+    as string literals in the generated code.
+
+    Parameters
+    ----------
+    names : tuple
+        field names
+
+    Returns
+    -------
+    Callable
+        function with the arguments `(new, cls, *columns)`, returning the
+        list of records
+    """
+    args = [f"column_{i}" for i in range(len(names))]
+    values = [f"value_{i}" for i in range(len(names))]
+    items = ", ".join(f"{name!r}: {value}" for name, value in zip(names, values))
+    source = (
+        f"def build(new, cls, {', '.join(args)}):\n"
+        f"    records = []\n"
+        f"    append = records.append\n"
+        f"    for {', '.join(values)}, in zip({', '.join(args)}):\n"
+        f"        record = new(cls)\n"
+        f"        record.__dict__ = {{{items}}}\n"
+        f"        append(record)\n"
+        f"    return records\n"
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return namespace["build"]
+
+
+def _fields_of(cls):
+    """Names of the fields set in the constructor of the model class (cached)."""
+    names = _field_names.get(cls)
+    if names is None:
+        names = [fld.name for fld in fields(cls) if fld.init]
+        _field_names[cls] = names
+    return names
+
+
+def _is_uniform_dataclass_list(values):
+    """Checks whether all items are model objects of the same class."""
+    value_type = type(values[0])
+    return (
+        is_dataclass(value_type)
+        and not issubclass(value_type, _LazyData)
+        and all(type(value) is value_type for value in values)
+    )
+
+
+def _class_name(cls):
+    """Name of the model class within the models package."""
+    if not cls.__module__.startswith(_MODELS_PACKAGE):
+        raise TypeError(
+            f"Values of type {cls.__name__} cannot be stored in a snapshot."
+        )
+    return f"{cls.__module__[len(_MODELS_PACKAGE):]}.{cls.__qualname__}"
+
+
+def _model_class(name):
+    """
+    Gets the model class from its name within the models package.
+
+    Parameters
+    ----------
+    name : str
+        class name (e.g. `ndmxml_2_0_0_oem_2_0.OemData`)
+
+    Returns
+    -------
+    type
+        model class
+
+    Raises
+    ------
+    ValueError
+        Class not found in the models package.
+    """
+    module_name, _, qualname = name.partition(".")
+    try:
+        obj = importlib.import_module(_MODELS_PACKAGE + module_name)
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr)
+    except (ImportError, AttributeError):
+        raise ValueError(f"Model class {name} in the snapshot not found.")
+
+    if not isinstance(obj, type) or not (is_dataclass(obj) or issubclass(obj, Enum)):
+        raise ValueError(f"Model class {name} in the snapshot not found.")
+    return obj
+
+
+def _padded_size(size):
+    """Size padded to the alignment."""
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _dtype_spec(dtype):
+    """JSON compatible description of the array type."""
+    return dtype.descr if dtype.names else dtype.str
+
+
+def _dtype_from_spec(spec):
+    """Array type from its JSON compatible description."""
+    if isinstance(spec, list):
+        return np.dtype([tuple(item) for item in spec])
+    return np.dtype(spec)
+
+
+def _pack_strings(values):
+    """
+    Packs the strings into a fixed width byte array.
+
+    Parameters
+    ----------
+    values : list
+        list of `str` (or `str` subclass) values
+
+    Returns
+    -------
+    numpy.ndarray or None
+        fixed width byte array, `None` if any value is not ASCII or ends with
+        a null character (which would be lost)
+    """
+    if not all(value.isascii() and not value.endswith("\0") for value in values):
+        return None
+    return np.array([str(value) for value in values], dtype="S")
+
+
+def _unpack_strings(array):
+    """Unpacks the fixed width byte array into a list of `str`."""
+    return array.astype(str).tolist()
+
+
+def _pack_decimals(strings):
+    """
+    Packs the `Decimal` values (given as strings) into their exact integer
+    coefficient, exponent and sign.
+
+    The strings are parsed in a vectorised manner, as a 2D array of characters.
+
+    Parameters
+    ----------
+    strings : list
+        `Decimal` values as strings (e.g. `-1.25E-7`)
+
+    Returns
+    -------
+    numpy.ndarray or None
+        packed values, `None` if any value is not finite or has more
+        coefficient digits than can be packed
+    """
+    array = np.array(strings, dtype="S")
+    width = array.itemsize
+    chars = array.view(np.uint8).reshape(len(strings), width)
+
+    valid_chars = np.isin(chars, np.frombuffer(b"0123456789.-+E\0", np.uint8))
+    if not valid_chars.all():
+        # NaN or infinity
+        return None
+
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    positions = np.arange(width)
+
+    is_exp = chars == ord("E")
+    exp_pos = np.where(is_exp.any(axis=1), is_exp.argmax(axis=1), width)
+    is_dot = chars == ord(".")
+    dot_pos = np.where(is_dot.any(axis=1), is_dot.argmax(axis=1), exp_pos)
+
+    coeff_digits = is_digit & (positions < exp_pos[:, None])
+    if coeff_digits.sum(axis=1).max() > _MAX_DECIMAL_DIGITS:
+        return None
+    exp_digits = is_digit & (positions > exp_pos[:, None])
+    fraction_digits = (coeff_digits & (positions > dot_pos[:, None])).sum(axis=1)
+
+    coefficient = np.zeros(len(strings), np.uint64)
+    exponent = np.zeros(len(strings), np.int64)
+    for position in range(width):
+        digit = chars[:, position] - ord("0")
+        coefficient = np.where(
+            coeff_digits[:, position], coefficient * 10 + digit, coefficient
+        )
+        exponent = np.where(exp_digits[:, position], exponent * 10 + digit, exponent)
+
+    exp_sign_pos = np.minimum(exp_pos + 1, width - 1)[:, None]
+    exp_negative = np.take_along_axis(chars, exp_sign_pos, axis=1)[:, 0] == ord("-")
+    exponent = np.where(exp_negative, -exponent, exponent) - fraction_digits
+    if np.abs(exponent).max() > np.iinfo(np.int32).max:
+        return None
+
+    packed = np.empty(len(strings), _DECIMAL_DTYPE)
+    packed["coefficient"] = coefficient
+    packed["exponent"] = exponent
+    packed["sign"] = chars[:, 0] == ord("-")
+    return packed
+
+
+def _unpack_decimals(packed):
+    """
+    Unpacks the coefficients, exponents and signs into `Decimal` values.
+
+    Parameters
+    ----------
+    packed : numpy.ndarray
+        packed values
+
+    Returns
+    -------
+    list
+        list of `Decimal`
+    """
+    negative = packed["sign"].astype(bool)
+    coefficients = packed["coefficient"].astype(np.int64)
+    coefficients[negative] *= -1
+    exponents = packed["exponent"].tolist()
+
+    with decimal.localcontext(_DECIMAL_CONTEXT):
+        values = list(
+            map(Decimal.scaleb, map(Decimal, coefficients.tolist()), exponents)
+        )
+
+    # the sign of zero is lost in the integer coefficient
+    for index in np.flatnonzero(negative & (coefficients == 0)).tolist():
+        values[index] = Decimal((1, (0,), exponents[index]))
+    return values
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pauses the cyclic garbage collector, e.g. while loading large object trees.
+
+    The collector would otherwise run repeatedly while the (acyclic) tree is
+    built, traversing the growing tree each time.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
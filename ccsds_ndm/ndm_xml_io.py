@@ -8,8 +8,10 @@ CCSDS Navigation Data Messages XML File I/O.
 
 """
 
+import re
 import xml.etree.ElementTree as ElementTree
 from enum import Enum
+from functools import partial
 from pathlib import Path
 
 from xsdata.formats.dataclass.parsers import XmlParser
@@ -17,7 +19,15 @@ from xsdata.formats.dataclass.parsers.config import ParserConfig
 from xsdata.formats.dataclass.serializers import XmlSerializer
 from xsdata.formats.dataclass.serializers.config import SerializerConfig
 
-from ccsds_ndm.models.ndmxml2 import Aem, Apm, Cdm, Ndm, Oem, Omm, Opm, Rdm, Tdm
+from ccsds_ndm.models import ndmxml2
+from ccsds_ndm.ndm_lazy import (
+    _ByteSource,
+    _lazy_data,
+    _lazy_message_types,
+    _SegmentDataLoader,
+    materialise,
+)
+from ccsds_ndm.numeric_backend import numeric_backend
 
 
 class _NdmDataType(Enum):
@@ -25,19 +35,24 @@ class _NdmDataType(Enum):
     NDM Data Type (e.g. OEM or AEM).
     """
 
-    AEMv2 = (Aem.Meta.name, Aem)
-    APMv2 = (Apm.Meta.name, Apm)
-    CDMv2 = (Cdm.Meta.name, Cdm)
-    OEMv2 = (Oem.Meta.name, Oem)
-    OMMv2 = (Omm.Meta.name, Omm)
-    OPMv2 = (Opm.Meta.name, Opm)
-    RDMv2 = (Rdm.Meta.name, Rdm)
-    TDMv2 = (Tdm.Meta.name, Tdm)
-
-    def __init__(self, ndm_id, clazz):
-        self.clazz = clazz
+    AEMv2 = ("aem", "Aem")
+    APMv2 = ("apm", "Apm")
+    CDMv2 = ("cdm", "Cdm")
+    OEMv2 = ("oem", "Oem")
+    OMMv2 = ("omm", "Omm")
+    OPMv2 = ("opm", "Opm")
+    RDMv2 = ("rdm", "Rdm")
+    TDMv2 = ("tdm", "Tdm")
+
+    def __init__(self, ndm_id, class_name):
+        self.class_name = class_name
         self.ndm_id = ndm_id
 
+    @property
+    def clazz(self):
+        """NDM class (e.g. `Aem`), its module is imported on first access."""
+        return getattr(ndmxml2, self.class_name)
+
     @staticmethod
     def find_element(ndm_id):
         """
@@ -57,6 +72,20 @@ class _NdmDataType(Enum):
                 return ndm_data
 
 
+_NDM_ID = "ndm"
+"""Root element of the combined NDM."""
+
+_MEMBER_START_REGEX = re.compile(
+    rb"<("
+    + "|".join(ndm_data.ndm_id for ndm_data in _NdmDataType).encode()
+    + rb")[\s/>]"
+)
+"""Start tag of a member of the combined NDM (e.g. `<omm `)."""
+
+_NAMESPACE_REGEX = re.compile(rb"\sxmlns(?::[\w.-]+)?\s*=\s*(?:\"[^\"]*\"|'[^']*')")
+"""Namespace declaration attribute (e.g. `xmlns:xsi="..."`)."""
+
+
 class NdmXmlIo:
     """
     Unified I/O Model for XML input and output.
@@ -66,7 +95,7 @@ class NdmXmlIo:
         self.parser = None
         self.serializer = None
 
-    def from_path(self, xml_read_file_path):
+    def from_path(self, xml_read_file_path, numeric="decimal", lazy=False):
         """
         Reads the file to extract contents to an object of correct type.
 
@@ -74,19 +103,30 @@ class NdmXmlIo:
         ----------
         xml_read_file_path : Path or AnyStr
             Path of the XML file to be read
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
 
         Returns
         -------
         object
             Object tree from the file contents
         """
+        if lazy:
+            return self._from_source_lazy(
+                _ByteSource.from_path(xml_read_file_path), numeric
+            )
+
         # read file contents as text
         file_contents = Path(xml_read_file_path).read_text()
 
         # parse as `from_string()`
-        return self.from_string(file_contents)
+        return self.from_string(file_contents, numeric=numeric)
 
-    def from_bytes(self, xml_source):
+    def from_bytes(self, xml_source, numeric="decimal", lazy=False):
         """
         Reads the input bytes array to extract contents to an object of correct type.
 
@@ -94,16 +134,25 @@ class NdmXmlIo:
         ----------
         xml_source : bytes
             input bytes array
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
 
         Returns
         -------
         object
             Object tree from the file contents
         """
+        if lazy:
+            return self._from_source_lazy(_ByteSource(bytes(xml_source)), numeric)
+
         # decode bytes and parse as `from_string()`
-        return self.from_string(xml_source.decode())
+        return self.from_string(xml_source.decode(), numeric=numeric)
 
-    def from_string(self, xml_source):
+    def from_string(self, xml_source, numeric="decimal", lazy=False):
         """
         Reads the input string to extract contents to an object of correct type.
 
@@ -111,12 +160,21 @@ class NdmXmlIo:
         ----------
         xml_source : str
             input string data
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+            (`decimal`, `float` or `raw`)
+        lazy : bool
+            `True` to parse the data blocks of OEM, AEM and TDM segments
+            only on first access (see :mod:`ccsds_ndm.ndm_lazy`)
 
         Returns
         -------
         object
             Object tree from the file contents
         """
+        if lazy:
+            return self._from_source_lazy(_ByteSource(xml_source.encode()), numeric)
+
         # lazy init parser
         if self.parser is None:
             self.__init_parser()
@@ -124,15 +182,16 @@ class NdmXmlIo:
         # Identify data type of the string (Oem, Apm etc.)
         data_type, ndm_combi = _identify_data_type(xml_source)
 
-        ndm = self.parser.from_string(xml_source)
+        with numeric_backend(numeric):
+            ndm = self.parser.from_string(xml_source)
 
         # if the file is NDM, downcast the elements to their respective subclasses
-        if isinstance(ndm, Ndm):
+        if type(ndm).Meta.name == _NDM_ID:
             for tag, ndm_item_list in vars(ndm).items():
                 if tag == "comment" or tag == "message_id":
                     continue
-                for i, ndm_item in enumerate(ndm_item_list):
-                    subclazz = type(ndm_item).__subclasses__()[0]
+                subclazz = _NdmDataType.find_element(tag).clazz
+                for ndm_item in ndm_item_list:
                     ndm_item.__class__ = subclazz
 
         if ndm_combi is False:
@@ -170,6 +229,9 @@ class NdmXmlIo:
                 schema_location=schema_location,
             )
 
+        # parse any lazy data blocks first
+        materialise(ndm_obj)
+
         return self.serializer.render(ndm_obj)
 
     def to_file(
@@ -200,6 +262,65 @@ class NdmXmlIo:
         )
         Path(xml_write_file_path).write_text(xml_txt)
 
+    def _from_source_lazy(self, source, numeric):
+        """
+        Reads the header and the metadata, leaving the data blocks to be parsed
+        on first access.
+
+        Falls back to the full parsing for the message types other than OEM,
+        AEM and TDM.
+
+        Parameters
+        ----------
+        source : _ByteSource
+            data source
+        numeric : str or NumericBackend
+            numeric backend for the real-valued fields
+
+        Returns
+        -------
+        object
+            Object tree with lazy data blocks
+        """
+        with source.open_buffer() as buffer:
+            segment_blocks = _split_xml_segments(buffer)
+            if segment_blocks is None:
+                # not supported, parse in full
+                return self.from_string(bytes(buffer).decode(), numeric=numeric)
+
+            # skeleton without the data blocks
+            body_start = segment_blocks[0][0]
+            body_end = segment_blocks[-1][3]
+            skeleton = [bytes(buffer[:body_start])]
+            loaders = []
+            for seg_start, data_start, data_end, seg_end in segment_blocks:
+                seg_head = bytes(buffer[seg_start:data_start])
+                seg_tail = bytes(buffer[data_end:seg_end])
+                skeleton.extend([seg_head, seg_tail])
+                loaders.append((seg_head, data_start, data_end, seg_tail))
+            doc_head = skeleton[0]
+            doc_tail = bytes(buffer[body_end:])
+            skeleton.append(doc_tail)
+
+        ndm_obj = self.from_string(b"".join(skeleton).decode(), numeric=numeric)
+
+        parse = partial(NdmXmlIo().from_string, numeric=numeric)
+        data_class = _lazy_message_types[type(ndm_obj)].data
+        for segment, (seg_head, data_start, data_end, seg_tail) in zip(
+            ndm_obj.body.segment, loaders
+        ):
+            loader = _SegmentDataLoader(
+                source,
+                data_start,
+                data_end,
+                doc_head + seg_head,
+                seg_tail + doc_tail,
+                parse,
+            )
+            segment.data = _lazy_data(data_class, loader)
+
+        return ndm_obj
+
     def __init_parser(self):
         """
         Inits the internal parser.
@@ -256,11 +377,212 @@ def _identify_data_type(xml_source):
     except (ElementTree.ParseError, AttributeError):
         # auto identify failed, try NDM (Combined Instantiation)
         ndm_combi = True
-        data_type = Ndm
+        data_type = ndmxml2.Ndm
 
     return data_type, ndm_combi
 
 
+def _find_xml_element(buffer, tag, start=0, end=None):
+    """
+    Finds the first element with the `tag` (without a namespace prefix).
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full XML contents
+    tag : bytes
+        element tag (e.g. `b"segment"`)
+    start : int
+        start offset of the search
+    end : int or None
+        end offset of the search, `None` for the end of the contents
+
+    Returns
+    -------
+    (int, int, int, int) or None
+        start tag start and end, end tag start and end offsets, `None` if the
+        element is not found or is empty (`<tag/>`)
+    """
+    end = len(buffer) if end is None else end
+    pos = buffer.find(b"<" + tag, start, end)
+    while pos >= 0:
+        next_char = buffer[pos + len(tag) + 1 : pos + len(tag) + 2]
+        if next_char in (b">", b" ", b"\t", b"\r", b"\n"):
+            break
+        pos = buffer.find(b"<" + tag, pos + 1, end)
+    else:
+        return None
+
+    start_tag_end = buffer.find(b">", pos, end) + 1
+    if start_tag_end <= 0 or buffer[start_tag_end - 2 : start_tag_end - 1] == b"/":
+        return None
+
+    end_tag_start = buffer.find(b"</" + tag + b">", start_tag_end, end)
+    if end_tag_start < 0:
+        return None
+
+    return pos, start_tag_end, end_tag_start, end_tag_start + len(tag) + 3
+
+
+def _find_xml_root(buffer):
+    """
+    Finds the root element, skipping the declarations and comments.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full XML contents
+
+    Returns
+    -------
+    (str, int, int) or None
+        root tag, start offset of the root element and end offset of its tag
+        name, `None` if no element is found
+    """
+    pos = buffer.find(b"<")
+    while pos >= 0 and buffer[pos + 1 : pos + 2] in (b"?", b"!"):
+        pos = buffer.find(b"<", pos + 1)
+    if pos < 0:
+        return None
+
+    tag_end = pos + 1
+    while buffer[tag_end : tag_end + 1] not in (b">", b" ", b"\t", b"\r", b"\n", b""):
+        tag_end += 1
+
+    return bytes(buffer[pos + 1 : tag_end]).decode(errors="replace"), pos, tag_end
+
+
+def _split_xml_segments(buffer):
+    """
+    Finds the data block of each segment in OEM, AEM or TDM data.
+
+    Only the segment and data tags are searched for, the data is not parsed.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full XML contents
+
+    Returns
+    -------
+    list or None
+        (segment start, data start, data end, segment end) offsets for each
+        segment, `None` if the data is not an OEM, AEM or TDM or the
+        segments could not be identified
+    """
+    root = _find_xml_root(buffer)
+    if root is None:
+        return None
+
+    ndm_data_type = _NdmDataType.find_element(root[0])
+    if ndm_data_type is None or ndm_data_type.clazz not in _lazy_message_types:
+        return None
+    tag_end = root[2]
+
+    segment_blocks = []
+    segment = _find_xml_element(buffer, b"segment", tag_end)
+    while segment is not None:
+        seg_start, seg_content_start, seg_content_end, seg_end = segment
+        data = _find_xml_element(buffer, b"data", seg_content_start, seg_content_end)
+        if data is None:
+            return None
+
+        segment_blocks.append((seg_start, data[1], data[2], seg_end))
+        segment = _find_xml_element(buffer, b"segment", seg_end)
+
+    return segment_blocks if segment_blocks else None
+
+
+def _split_ndm_members(buffer):
+    """
+    Finds the members (e.g. each OMM) of the combined NDM.
+
+    Only the start and end tags of the members are searched for, the members
+    are not parsed.
+
+    Parameters
+    ----------
+    buffer : bytes or mmap.mmap
+        full XML contents
+
+    Returns
+    -------
+    (bytes, list) or None
+        namespace declarations of the root element and the (start, end, NDM
+        class) for each member, `None` if the data is not a combined NDM or
+        the members could not be identified
+    """
+    root = _find_xml_root(buffer)
+    if root is None or root[0] != _NDM_ID:
+        return None
+    root_tag_end = buffer.find(b">", root[2]) + 1
+    if root_tag_end <= 0:
+        return None
+    namespaces = b"".join(
+        match.group(0)
+        for match in _NAMESPACE_REGEX.finditer(buffer[root[1] : root_tag_end])
+    )
+
+    members = []
+    match = _MEMBER_START_REGEX.search(buffer, root_tag_end)
+    while match is not None:
+        tag = match.group(1)
+        start_tag_end = buffer.find(b">", match.end() - 1) + 1
+        if start_tag_end <= 0:
+            return None
+        if buffer[start_tag_end - 2 : start_tag_end - 1] == b"/":
+            # empty member (`<omm/>`)
+            end = start_tag_end
+        else:
+            end_tag_start = buffer.find(b"</" + tag + b">", start_tag_end)
+            if end_tag_start < 0:
+                return None
+            end = end_tag_start + len(tag) + 3
+
+        clazz = _NdmDataType.find_element(tag.decode()).clazz
+        members.append((match.start(), end, clazz))
+        match = _MEMBER_START_REGEX.search(buffer, end)
+
+    return (namespaces, members) if members else None
+
+
+def _parse_ndm_member(parser, member_text, clazz, namespaces=b""):
+    """
+    Parses a member of the combined NDM as a stand-alone message.
+
+    Parameters
+    ----------
+    parser : XmlParser
+        XML parser
+    member_text : bytes
+        XML contents of the member element
+    clazz : type
+        NDM class of the member (e.g. `Omm`)
+    namespaces : bytes
+        namespace declarations of the combined NDM root element, added to the
+        member unless it declares the same prefix
+
+    Returns
+    -------
+    object
+        member object (e.g. `Omm`)
+    """
+    if namespaces:
+        name_end = len(clazz.Meta.name) + 1
+        start_tag = member_text[: member_text.find(b">")]
+        declared = {
+            match.group(0).split(b"=")[0].strip()
+            for match in _NAMESPACE_REGEX.finditer(start_tag)
+        }
+        inherited = b"".join(
+            match.group(0)
+            for match in _NAMESPACE_REGEX.finditer(namespaces)
+            if match.group(0).split(b"=")[0].strip() not in declared
+        )
+        member_text = member_text[:name_end] + inherited + member_text[name_end:]
+    return parser.from_bytes(member_text, clazz)
+
+
 def _strip_multi_ndm(ndm):
     """
     Identifies whether the Combined Instantiation NDM actually contains
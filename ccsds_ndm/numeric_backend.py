@@ -0,0 +1,296 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Selectable numeric backend for the parsed NDM object trees.
+
+The generated models declare all real-valued fields as `Decimal`. The
+numeric backend decides what is actually stored in these fields while parsing:
+
+- `decimal`: a `Decimal` (the default, exact representation)
+- `float`: a `float` (fast, 64-bit binary representation)
+- `raw`: a :class:`RawNumber`, i.e. the source string, converted on first
+  numeric access
+
+"""
+
+import typing
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from enum import Enum
+
+from xsdata.exceptions import ConverterError
+from xsdata.formats.converter import DecimalConverter, converter
+
+
+class NumericBackend(Enum):
+    """
+    Numeric backends for the real-valued fields of the NDM object tree.
+    """
+
+    DECIMAL = "decimal"
+    FLOAT = "float"
+    RAW = "raw"
+
+    @staticmethod
+    def find_element(numeric):
+        """
+        Finds the numeric backend corresponding to the requested id.
+
+        Parameters
+        ----------
+        numeric : str or NumericBackend
+            numeric backend id (`decimal`, `float` or `raw`)
+
+        Returns
+        -------
+        NumericBackend
+            correct `NumericBackend` enum corresponding to the id
+
+        Raises
+        ------
+        ValueError
+            Numeric backend not recognised.
+        """
+        if isinstance(numeric, NumericBackend):
+            return numeric
+
+        for backend in NumericBackend:
+            if backend.value == str(numeric).lower():
+                return backend
+
+        raise ValueError(
+            f"Unknown numeric backend: {numeric} "
+            f"(valid backends: decimal, float or raw)"
+        )
+
+
+class RawNumber(str):
+    """
+    Numeric value kept as its source string.
+
+    The value behaves as a string (and is therefore written out exactly as it
+    was read), but it is converted to `Decimal` on its first numeric access
+    (arithmetic, comparison with numbers, `float()` etc.). The converted value
+    is cached.
+
+    Equality and hash follow the numeric value, as for `Decimal`: a raw number
+    equals the numbers (and the raw numbers) of the same value, but not the
+    plain strings. Values that are not numbers (e.g. `abc`) fall back to their
+    text.
+    """
+
+    @property
+    def decimal(self):
+        """Value as `Decimal` (converted on first access and then cached)."""
+        try:
+            return self.__dict__["_decimal"]
+        except KeyError:
+            value = self.__dict__["_decimal"] = Decimal(self)
+            return value
+
+    def __float__(self):
+        return float(self.decimal)
+
+    def __int__(self):
+        return int(self.decimal)
+
+    def __neg__(self):
+        return -self.decimal
+
+    def __pos__(self):
+        return +self.decimal
+
+    def __abs__(self):
+        return abs(self.decimal)
+
+    def __add__(self, other):
+        return _num_op(self.decimal, other, Decimal.__add__, float.__add__)
+
+    def __radd__(self, other):
+        return _num_op(self.decimal, other, Decimal.__radd__, float.__radd__)
+
+    def __sub__(self, other):
+        return _num_op(self.decimal, other, Decimal.__sub__, float.__sub__)
+
+    def __rsub__(self, other):
+        return _num_op(self.decimal, other, Decimal.__rsub__, float.__rsub__)
+
+    def __mul__(self, other):
+        return _num_op(self.decimal, other, Decimal.__mul__, float.__mul__)
+
+    def __rmul__(self, other):
+        return _num_op(self.decimal, other, Decimal.__rmul__, float.__rmul__)
+
+    def __truediv__(self, other):
+        return _num_op(self.decimal, other, Decimal.__truediv__, float.__truediv__)
+
+    def __rtruediv__(self, other):
+        return _num_op(self.decimal, other, Decimal.__rtruediv__, float.__rtruediv__)
+
+    def __floordiv__(self, other):
+        return _num_op(self.decimal, other, Decimal.__floordiv__, float.__floordiv__)
+
+    def __rfloordiv__(self, other):
+        return _num_op(self.decimal, other, Decimal.__rfloordiv__, float.__rfloordiv__)
+
+    def __mod__(self, other):
+        return _num_op(self.decimal, other, Decimal.__mod__, float.__mod__)
+
+    def __rmod__(self, other):
+        return _num_op(self.decimal, other, Decimal.__rmod__, float.__rmod__)
+
+    def __pow__(self, other):
+        return _num_op(self.decimal, other, Decimal.__pow__, float.__pow__)
+
+    def __rpow__(self, other):
+        return _num_op(self.decimal, other, Decimal.__rpow__, float.__rpow__)
+
+    def __round__(self, ndigits=None):
+        return round(self.decimal, ndigits)
+
+    def _key(self):
+        """Value for the equality and the hash, the text if not a number."""
+        try:
+            return self.decimal
+        except ArithmeticError:
+            return str(self)
+
+    def __eq__(self, other):
+        if isinstance(other, RawNumber):
+            other = other._key()
+        return self._key() == other
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, other):
+        return _num_cmp(self.decimal, other, Decimal.__lt__)
+
+    def __le__(self, other):
+        return _num_cmp(self.decimal, other, Decimal.__le__)
+
+    def __gt__(self, other):
+        return _num_cmp(self.decimal, other, Decimal.__gt__)
+
+    def __ge__(self, other):
+        return _num_cmp(self.decimal, other, Decimal.__ge__)
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"RawNumber('{str(self)}')"
+
+
+def _to_number(value):
+    """Converts a `RawNumber` to its `Decimal` value, leaves others intact."""
+    return value.decimal if isinstance(value, RawNumber) else value
+
+
+def _num_op(value, other, decimal_op, float_op):
+    """
+    Applies the arithmetic operation, in float if the other operand is a float.
+    """
+    other = _to_number(other)
+    if isinstance(other, float):
+        return float_op(float(value), other)
+    return decimal_op(value, other)
+
+
+def _num_cmp(value, other, decimal_op):
+    """
+    Applies the comparison with the `Decimal` value.
+    """
+    return decimal_op(value, _to_number(other))
+
+
+def _number_converter(numeric):
+    """Converter of the `float` values into the numeric backend type."""
+    backend = NumericBackend.find_element(numeric)
+    if backend is NumericBackend.FLOAT:
+        return float
+    if backend is NumericBackend.RAW:
+        return lambda value: RawNumber(repr(value))
+    return lambda value: Decimal(repr(value))
+
+
+def _optional_type(hint):
+    """Type within `Optional` (or the type itself)."""
+    if typing.get_origin(hint) is typing.Union:
+        return next(arg for arg in typing.get_args(hint) if arg is not type(None))
+    return hint
+
+
+_active_backend: ContextVar = ContextVar(
+    "ccsds_ndm_numeric_backend", default=NumericBackend.DECIMAL
+)
+"""Numeric backend active in the current context (thread or task)."""
+
+
+class _BackendDecimalConverter(DecimalConverter):
+    """
+    `xsdata` converter for the `Decimal` fields, following the active backend.
+
+    Serialisation of `float` and :class:`RawNumber` values is handled by the
+    `float` and `str` converters, respectively, as they are found through the
+    type of the value.
+    """
+
+    def deserialize(self, value, **kwargs):
+        backend = _active_backend.get()
+
+        if backend is NumericBackend.FLOAT:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ConverterError()
+
+        if backend is NumericBackend.RAW:
+            return RawNumber(str(value).strip())
+
+        return super().deserialize(value, **kwargs)
+
+
+converter.register_converter(Decimal, _BackendDecimalConverter())
+
+
+@contextmanager
+def numeric_backend(numeric):
+    """
+    Context manager to parse the NDM data with the requested numeric backend.
+
+    The setting is local to the current thread (or async task), therefore
+    parallel parsers with different backends do not interfere.
+
+    Parameters
+    ----------
+    numeric : str or NumericBackend
+        numeric backend id (`decimal`, `float` or `raw`)
+    """
+    token = _active_backend.set(NumericBackend.find_element(numeric))
+    try:
+        yield
+    finally:
+        _active_backend.reset(token)
+
+
+def is_numeric_value(value):
+    """
+    Checks whether the value is a parsed real number in any of the backends.
+
+    Parameters
+    ----------
+    value
+        value to be checked
+
+    Returns
+    -------
+    bool
+        `True` if `value` is a `Decimal`, `float` or `RawNumber`
+    """
+    return isinstance(value, (Decimal, float, RawNumber))
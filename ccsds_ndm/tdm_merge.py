@@ -0,0 +1,287 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Streaming merge of the observations of many TDM files in time order.
+
+The TDM files (KVN or XML) are read in lazy mode (see
+:mod:`ccsds_ndm.ndm_lazy`), so that only their headers and metadata are kept
+in memory. The observations of all the segments are then merged with a heap
+(k-way merge), each segment being a time ordered stream:
+
+- a segment enters the heap with its `START_TIME` (or at the start, if not
+  defined) and its data block is parsed only when that time is reached
+- the observations are yielded in epoch order (ties in the order of the files
+  and the segments), tagged with the metadata of their segment
+- the data block of a segment is released once all its observations are
+  yielded
+
+Therefore the memory use depends on the number of the segments with
+overlapping time spans (e.g. the simultaneous passes), rather than the total
+number of observations. The segments not in time order are sorted when they
+are parsed.
+
+"""
+
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+from ccsds_ndm.columnar import enum_value, segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Tdm, TdmSegment
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_lazy import _loaded_data
+from ccsds_ndm.time_scales import TimeScale, convert_epochs_ns
+
+_PARTICIPANT_FIELDS = tuple(f"participant_{n}" for n in range(1, 6))
+"""Participant fields of the TDM metadata."""
+
+TdmObservation = namedtuple(
+    "TdmObservation",
+    [
+        "epoch_ns",
+        "keyword",
+        "value",
+        "observation",
+        "metadata",
+        "source_index",
+        "segment_index",
+    ],
+)
+TdmObservation.__doc__ = """\
+Single observation of the merged TDMs.
+
+`epoch_ns` is the epoch in nanoseconds since 1970-01-01T00:00:00 (of the
+merge time scale), `keyword` the observation data type as KVN keyword (e.g.
+`RANGE`), `value` the observation value as `float` and `observation` the
+observation object itself. `metadata` is the metadata of the segment,
+`source_index` the index of the TDM in the input and `segment_index` the
+index of the segment within the TDM.
+"""
+
+
+class _SegmentStream:
+    """
+    Observations of a single segment, parsed on the first access.
+
+    Parameters
+    ----------
+    segment : TdmSegment
+        TDM segment (possibly with lazy data)
+    source_index : int
+        index of the TDM in the input
+    segment_index : int
+        index of the segment within the TDM
+    """
+
+    def __init__(self, segment, source_index, segment_index):
+        self.segment = segment
+        self.source_index = source_index
+        self.segment_index = segment_index
+        self.observations = None
+        self.epochs_ns = None
+        self.keywords = None
+        self.values = None
+
+    def load(self, keywords, time_scale):
+        """
+        Parses the data block, keeping the selected observations in time order.
+
+        Parameters
+        ----------
+        keywords : set or None
+            selected observation data types as KVN keywords, `None` for all
+        time_scale : TimeScale or None
+            time scale of the merge, `None` for the time system of the segment
+        """
+        # the lazy data block is not kept in the segment
+        loaded = TdmSegment(
+            metadata=self.segment.metadata, data=_loaded_data(self.segment)
+        )
+        columns = segment_columns(loaded)
+        epochs_ns = (
+            columns.epochs_ns
+            if time_scale is None
+            else columns.epochs_ns_in(time_scale)
+        )
+
+        rows = np.arange(len(epochs_ns))
+        if keywords is not None:
+            rows = rows[np.isin(columns.keywords, list(keywords))]
+        if np.any(np.diff(epochs_ns[rows]) < 0):
+            rows = rows[np.argsort(epochs_ns[rows], kind="stable")]
+
+        self.observations = loaded.data.observation
+        self.epochs_ns = epochs_ns.tolist()
+        self.keywords = columns.keywords.tolist()
+        self.values = columns.values.tolist()
+        return rows.tolist()
+
+    def observation(self, row):
+        """Observation of the segment at the row."""
+        return TdmObservation(
+            self.epochs_ns[row],
+            self.keywords[row],
+            self.values[row],
+            self.observations[row],
+            self.segment.metadata,
+            self.source_index,
+            self.segment_index,
+        )
+
+    def release(self):
+        """Releases the parsed data block."""
+        self.observations = self.epochs_ns = self.keywords = self.values = None
+
+
+def merge_tdms(sources, keywords=None, participants=None, time_system=None):
+    """
+    Merges the observations of the TDMs in time order.
+
+    The segments are filtered by their metadata before their data blocks are
+    parsed: the segments with a `DATA_TYPES` list without any of the
+    `keywords` and the segments without any of the `participants` are
+    skipped.
+
+    Parameters
+    ----------
+    sources : list
+        TDM file paths (path or pathlike) or `Tdm` objects, the files are read
+        in lazy mode
+    keywords : list or None
+        selected observation data types as KVN keywords (e.g. `RANGE`),
+        `None` for all
+    participants : list or None
+        selected participants (e.g. `DSS-25`), the segments with any of them
+        as `PARTICIPANT_n` are used, `None` for all
+    time_system : str or TimeScale or None
+        time scale of the merge (e.g. `TAI`), the epochs of the segments are
+        converted into it, `None` if all the segments are in the same time
+        system
+
+    Yields
+    ------
+    TdmObservation
+        observations in epoch order
+
+    Raises
+    ------
+    TypeError
+        Source is not a TDM.
+    ValueError
+        Segments in different time systems (without `time_system`), or time
+        system not supported.
+    """
+    time_scale = None if time_system is None else TimeScale.find_element(time_system)
+    keywords = None if keywords is None else {keyword.upper() for keyword in keywords}
+    participants = (
+        None
+        if participants is None
+        else {_participant_name(participant) for participant in participants}
+    )
+
+    streams = []
+    for source_index, source in enumerate(sources):
+        tdm = (
+            source if isinstance(source, Tdm) else NdmIo().from_path(source, lazy=True)
+        )
+        if not isinstance(tdm, Tdm):
+            raise TypeError(
+                f"Observations can only be merged for TDMs, found {type(tdm).__name__}."
+            )
+        for segment_index, segment in enumerate(tdm.body.segment):
+            if _selected(segment.metadata, keywords, participants):
+                streams.append(_SegmentStream(segment, source_index, segment_index))
+
+    # segments enter the heap with their start times, or at the start
+    start_keys = _start_keys(streams, time_scale)
+    heap = [
+        (start_key, stream.source_index, stream.segment_index, -1, n)
+        for n, (stream, start_key) in enumerate(zip(streams, start_keys))
+    ]
+    heapq.heapify(heap)
+    cursors = {}
+
+    while heap:
+        _, source_index, segment_index, row, n = heap[0]
+        stream = streams[n]
+
+        if row < 0:
+            rows = stream.load(keywords, time_scale)
+            cursors[n] = iter(rows)
+        else:
+            yield stream.observation(row)
+
+        row = next(cursors[n], None)
+        if row is None:
+            heapq.heappop(heap)
+            stream.release()
+            del cursors[n]
+        else:
+            heapq.heapreplace(
+                heap, (stream.epochs_ns[row], source_index, segment_index, row, n)
+            )
+
+
+def _selected(metadata, keywords, participants):
+    """Checks whether the segment may have the selected observations."""
+    if participants is not None:
+        names = {
+            _participant_name(getattr(metadata, name))
+            for name in _PARTICIPANT_FIELDS
+            if getattr(metadata, name) is not None
+        }
+        if not names & participants:
+            return False
+
+    if keywords is not None and metadata.data_types:
+        data_types = {
+            data_type.strip().upper() for data_type in metadata.data_types.split(",")
+        }
+        if not data_types & keywords:
+            return False
+    return True
+
+
+def _start_keys(streams, time_scale):
+    """
+    Heap keys of the segments, their start times or the earliest key.
+
+    Raises
+    ------
+    ValueError
+        Segments in different time systems (without `time_scale`).
+    """
+    time_systems = {
+        enum_value(stream.segment.metadata.time_system) for stream in streams
+    }
+    if time_scale is None and len(time_systems) > 1:
+        raise ValueError(
+            f"TDM segments in different time systems "
+            f"({', '.join(sorted(map(str, time_systems)))}), the merge time "
+            f"system should be given."
+        )
+
+    earliest = np.iinfo(np.int64).min
+    keys = []
+    for stream in streams:
+        start_time = stream.segment.metadata.start_time
+        if start_time is None:
+            keys.append(earliest)
+            continue
+        key = parse_epochs_ns([start_time])
+        if time_scale is not None:
+            key = convert_epochs_ns(
+                key, enum_value(stream.segment.metadata.time_system), time_scale
+            )
+        keys.append(int(key[0]))
+    return keys
+
+
+def _participant_name(participant):
+    """Participant name without the KVN quotes."""
+    return str(participant).strip().strip("'\"")
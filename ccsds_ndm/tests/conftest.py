@@ -0,0 +1,25 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Shared fixtures of the tests.
+
+"""
+
+from pathlib import Path
+
+import pytest
+
+_tests_dir = Path(__file__).parent
+"""Directory of the tests, holding the `data` directory."""
+
+
+@pytest.fixture
+def data_path():
+    """
+    Resolves the path of a test data file (e.g. `data/kvn/file.kvn`),
+    independent of the directory the tests are run from.
+    """
+    return _tests_dir.joinpath
@@ -0,0 +1,221 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the AEM attitude evaluation.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.attitude import (
+    AemAttitude,
+    AttitudeInterpolationMethod,
+    euler_to_quaternions,
+    quaternion_multiply,
+    quaternions_to_euler,
+    segment_quaternions,
+)
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+
+sequences = ["121", "123", "131", "132", "212", "213"]
+sequences += ["231", "232", "312", "313", "321", "323"]
+
+_RATE = np.radians(2.0)
+"""Rotation rate of the test attitude [rad/s]."""
+
+_AXIS = np.array([0.6, 0.8, 0.0])
+"""Rotation axis of the test attitude."""
+
+_AEM = """CCSDS_AEM_VERS = 1.0
+CREATION_DATE = 2021-01-01T00:00:00
+ORIGINATOR = TEST
+
+META_START
+OBJECT_NAME = TEST SAT
+OBJECT_ID = 2021-001A
+REF_FRAME_A = EME2000
+REF_FRAME_B = SC_BODY
+ATTITUDE_DIR = A2B
+TIME_SYSTEM = UTC
+START_TIME = 2021-01-01T00:00:00
+USEABLE_START_TIME = 2021-01-01T00:00:00
+USEABLE_STOP_TIME = 2021-01-01T00:00:55
+STOP_TIME = 2021-01-01T00:01:00
+ATTITUDE_TYPE = QUATERNION/DERIVATIVE
+QUATERNION_TYPE = LAST
+INTERPOLATION_METHOD = {method}
+INTERPOLATION_DEGREE = 5
+META_STOP
+
+DATA_START
+{data}
+DATA_STOP
+"""
+
+
+def _truth(seconds):
+    """Scalar first quaternions of the constant rate rotation."""
+    half_angles = _RATE * np.asarray(seconds) / 2
+    return np.c_[np.cos(half_angles), np.outer(np.sin(half_angles), _AXIS)]
+
+
+def _test_aem(method):
+    """AEM with the quaternions and derivatives of a constant rate rotation."""
+    lines = []
+    for second in range(0, 61, 5):
+        quaternion = _truth([second])[0]
+        derivative = _truth([second + np.pi / _RATE])[0] * _RATE / 2
+        values = np.r_[quaternion[1:], quaternion[0], derivative[1:], derivative[0]]
+        lines.append(
+            f"2021-01-01T00:00:{second:02d} " + " ".join(f"{v:.15f}" for v in values)
+        )
+    return NdmKvnIo().from_string(_AEM.format(method=method, data="\n".join(lines)))
+
+
+@pytest.mark.parametrize("method", ["LINEAR", "SQUAD", "LAGRANGE", "HERMITE"])
+def test_interpolation(method):
+    """Tests the interpolation of the constant rate rotation."""
+    aem = _test_aem(method)
+    attitude = AemAttitude(aem)
+    t0_ns = parse_epochs_ns(["2021-01-01T00:00:00"])[0]
+
+    seconds = np.linspace(0.0, 55.0, 1001)
+    epochs_ns = t0_ns + (seconds * 1e9).astype(np.int64)
+    truth = _truth(seconds)
+    tolerance = 1e-6 if method == "LAGRANGE" else 1e-12
+
+    # scalar last, as in the segment
+    np.testing.assert_allclose(
+        attitude(epochs_ns), np.roll(truth, -1, axis=1), atol=tolerance
+    )
+    np.testing.assert_allclose(
+        attitude.quaternions(epochs_ns, scalar_first=True), truth, atol=tolerance
+    )
+
+    # other direction
+    np.testing.assert_allclose(
+        attitude.quaternions(epochs_ns, scalar_first=True, direction="B2A"),
+        truth * [1, -1, -1, -1],
+        atol=tolerance,
+    )
+
+    # outside the useable range
+    assert np.isnan(attitude([t0_ns + 58 * 10**9, t0_ns - 1])).all()
+
+
+def test_segment_quaternions(data_path):
+    """Tests the quaternion arrays of the quaternion and Euler angle data."""
+    aem = NdmIo().from_path(data_path(aem_file_path))
+    euler_segment, quaternion_segment = aem.body.segment
+
+    epochs_ns, quaternions = segment_quaternions(quaternion_segment)
+    state = quaternion_segment.data.attitude_state[0].quaternion_euler_rate
+    assert len(epochs_ns) == len(quaternions) == 54
+    # scalar last, as in the segment
+    assert list(quaternions[0]) == [
+        float(state.quaternion.q1),
+        float(state.quaternion.q2),
+        float(state.quaternion.q3),
+        float(state.quaternion.qc),
+    ]
+    assert segment_quaternions(quaternion_segment, scalar_first=True)[1][0, 0] == (
+        float(state.quaternion.qc)
+    )
+
+    epochs_ns, quaternions = segment_quaternions(euler_segment)
+    np.testing.assert_allclose(np.linalg.norm(quaternions, axis=1), 1.0)
+
+    attitude = AemAttitude(aem)
+    angles = attitude.euler_angles(epochs_ns[:-1])
+    rotation = euler_segment.data.attitude_state[0].euler_angle_rate.rotation_angles
+    np.testing.assert_allclose(
+        angles[0],
+        [
+            float(rotation.rotation1.value),
+            float(rotation.rotation2.value),
+            float(rotation.rotation3.value),
+        ],
+        atol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("sequence", sequences)
+def test_euler_conversions(sequence):
+    """Tests the Euler angle and quaternion conversions, and the singularities."""
+    rng = np.random.default_rng(42)
+    proper = sequence[0] == sequence[2]
+    angles = np.c_[
+        rng.uniform(-179.0, 179.0, 100),
+        rng.uniform(1.0, 179.0, 100) if proper else rng.uniform(-89.0, 89.0, 100),
+        rng.uniform(-179.0, 179.0, 100),
+    ]
+
+    quaternions = euler_to_quaternions(angles, sequence)
+    np.testing.assert_allclose(np.linalg.norm(quaternions, axis=1), 1.0)
+    np.testing.assert_allclose(
+        quaternions_to_euler(quaternions, sequence), angles, atol=1e-9
+    )
+
+    # successive rotations of the frame
+    axes = [int(axis) for axis in sequence]
+    rotations = [
+        euler_to_quaternions(np.eye(3)[[axis - 1] * 100] * angles[:, [n]], "123")
+        for n, axis in enumerate(axes)
+    ]
+    np.testing.assert_allclose(
+        quaternion_multiply(
+            quaternion_multiply(rotations[0], rotations[1]), rotations[2]
+        ),
+        quaternions,
+        atol=1e-12,
+    )
+
+    # singularities: same rotation with the last angle set to zero
+    angles[:, 1] = 0.0 if proper else 90.0
+    quaternions = euler_to_quaternions(angles, sequence)
+    singular_angles = quaternions_to_euler(quaternions, sequence)
+    assert np.all(singular_angles[:, 2] == 0.0)
+    back = euler_to_quaternions(singular_angles, sequence)
+    np.testing.assert_allclose(
+        np.abs(np.sum(back * quaternions, axis=1)), 1.0, atol=1e-12
+    )
+
+
+def test_elementary_rotation():
+    """Tests the frame rotation about the Z axis."""
+    quaternion = euler_to_quaternions([[90.0, 0.0, 0.0]], "321")
+    np.testing.assert_allclose(quaternion, [[np.sqrt(0.5), 0, 0, np.sqrt(0.5)]])
+
+
+def test_invalid_input(data_path):
+    """Tests the unsupported methods, sequences and attitude types."""
+    aem = NdmIo().from_path(data_path(aem_file_path))
+
+    with pytest.raises(ValueError):
+        AttitudeInterpolationMethod.find_element("spline")
+    assert (
+        AttitudeInterpolationMethod.find_element("linear")
+        is AttitudeInterpolationMethod.SLERP
+    )
+
+    # no quaternion derivatives
+    with pytest.raises(ValueError):
+        AemAttitude(aem, "HERMITE")
+
+    with pytest.raises(ValueError):
+        euler_to_quaternions([[0.0, 0.0, 0.0]], "331")
+    with pytest.raises(ValueError):
+        quaternions_to_euler([[1.0, 0.0, 0.0, 0.0]], "32")
+
+    with pytest.raises(ValueError):
+        AemAttitude(aem).quaternions([0], direction="A2C")
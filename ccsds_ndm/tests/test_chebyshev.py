@@ -0,0 +1,121 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the Chebyshev polynomial representation of the OEMs.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.chebyshev import ChebyshevEphemeris
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.interpolation import OemInterpolator
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+
+
+@pytest.mark.parametrize("tolerance", [1e-3, 1e-6, 1e-9])
+def test_fit_tolerance(tolerance, data_path):
+    """Tests the fit errors at the state vectors against the tolerances."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    ephemeris = ChebyshevEphemeris.fit(oem, tolerance, tolerance * 1e-3)
+    assert len(ephemeris.coverage) == 3
+    assert ephemeris.degree == 15
+
+    for columns in message_columns(oem):
+        errors = ephemeris.states(columns.epochs_ns) - columns.states[:, :6]
+        assert np.linalg.norm(errors[:, :3], axis=1).max() <= tolerance
+        assert np.linalg.norm(errors[:, 3:], axis=1).max() <= tolerance * 1e-3
+
+    # tighter tolerances need more intervals
+    assert ephemeris.interval_count >= 3
+
+
+def test_evaluate(data_path):
+    """Tests the evaluation between the state vectors and outside coverage."""
+    oem_path = data_path(oem_file_path)
+    ephemeris = ChebyshevEphemeris.fit(oem_path, 1e-9, degree=9)
+    interpolator = OemInterpolator(NdmIo().from_path(oem_path))
+
+    start_ns, stop_ns = ephemeris.coverage[0]
+    epochs_ns = np.linspace(start_ns, stop_ns, 101).astype(np.int64)
+    np.testing.assert_allclose(
+        ephemeris(epochs_ns), interpolator(epochs_ns), rtol=0, atol=1e-6
+    )
+
+    # velocities are the derivatives of the positions
+    step_ns = 100_000_000
+    positions = ephemeris.states([epochs_ns[50] - step_ns, epochs_ns[50] + step_ns])
+    velocity = (positions[1, :3] - positions[0, :3]) / (2 * step_ns * 1e-9)
+    np.testing.assert_allclose(
+        velocity, ephemeris.states(epochs_ns[50:51])[0, 3:], rtol=0, atol=1e-7
+    )
+
+    states = ephemeris.states(["2009-02-28T00:00:00", "2009-02-28T01:13:00"])
+    assert np.all(np.isnan(states[0]))
+    assert not np.any(np.isnan(states[1]))
+
+
+def test_to_oem_save_load(tmp_path, data_path):
+    """Tests the regenerated OEM and the saved representation."""
+    oem_path = data_path(oem_file_path)
+    ephemeris = ChebyshevEphemeris.fit(oem_path)
+
+    out_path = tmp_path / "ephemeris.npz"
+    ephemeris.save(out_path)
+    loaded = ChebyshevEphemeris.load(out_path)
+    assert loaded.message == ephemeris.message
+    assert loaded.coverage == ephemeris.coverage
+    assert loaded.interval_count == ephemeris.interval_count
+
+    oem = loaded.to_oem(30.0, stop="2009-02-28T01:20:00")
+    segments = oem.body.segment
+    assert len(segments) == 2
+    assert segments[0].metadata.object_name == "MARS EXPRESS"
+    assert segments[1].metadata.stop_time == "2009-02-28T01:20:00.000000"
+    assert len(segments[0].data.state_vector) == 2
+    first_epochs = [
+        segments[1].data.state_vector[0].epoch,
+        segments[1].metadata.start_time,
+    ]
+    assert len(set(parse_epochs_ns(first_epochs))) == 1
+
+    # at the segment boundaries the states of the earlier segment are used
+    for columns in message_columns(oem):
+        np.testing.assert_array_equal(np.diff(columns.epochs_ns), 30_000_000_000)
+        np.testing.assert_allclose(
+            columns.states[:, :6],
+            ephemeris.states(columns.epochs_ns),
+            rtol=0,
+            atol=1e-9,
+        )
+
+    # written and read back
+    text = NdmIo().to_string(oem, NDMFileFormats.KVN)
+    assert NdmIo().from_string(text) == oem
+
+    with pytest.raises(ValueError):
+        loaded.to_oem(0.0)
+
+
+def test_invalid_input(tmp_path, data_path):
+    """Tests the invalid sources, parameters and files."""
+    oem_path = data_path(oem_file_path)
+    with pytest.raises(TypeError):
+        ChebyshevEphemeris.fit(data_path(aem_file_path))
+    with pytest.raises(ValueError):
+        ChebyshevEphemeris.fit(oem_path, tolerance=0.0)
+
+    bad_path = tmp_path / "bad.npz"
+    bad_path.write_bytes(b"not a numpy file")
+    with pytest.raises(ValueError):
+        ChebyshevEphemeris.load(bad_path)
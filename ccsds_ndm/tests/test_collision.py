@@ -0,0 +1,153 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the batch collision probability computation.
+
+"""
+
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.collision import (
+    cdm_encounters,
+    collision_probabilities,
+    encounter_plane,
+    probability_2d,
+)
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.ndm_io import NdmIo
+
+cdm_file_path = Path("data", "kvn", "cdm_example_section4.kvn")
+
+
+def _grid_probability(miss_vector, covariance, radius, n_points=1001):
+    """Probability integrated over a fine grid covering the circle."""
+    grid = np.linspace(-radius, radius, n_points)
+    x, z = np.meshgrid(grid, grid)
+    offsets = np.stack([x - miss_vector[0], z - miss_vector[1]], axis=-1)
+    exponents = np.einsum(
+        "...i,ij,...j->...", offsets, np.linalg.inv(covariance), offsets
+    )
+    densities = np.exp(-0.5 * exponents) / (
+        2 * np.pi * np.sqrt(np.linalg.det(covariance))
+    )
+    return np.sum(densities[x**2 + z**2 <= radius**2]) * (grid[1] - grid[0]) ** 2
+
+
+def test_probability_2d():
+    """Tests the probabilities against the analytical and grid solutions."""
+    # isotropic, zero miss distance
+    sigmas = np.array([1.0, 5.0, 20.0, 100.0])
+    probabilities = probability_2d(
+        np.zeros((4, 2)), sigmas[:, np.newaxis, np.newaxis] ** 2 * np.eye(2), 10.0
+    )
+    np.testing.assert_allclose(
+        probabilities, 1 - np.exp(-(10.0**2) / (2 * sigmas**2)), rtol=1e-11
+    )
+
+    rng = np.random.default_rng(42)
+    factors = (
+        rng.normal(size=(5, 2, 2))
+        * np.array([1.0, 10.0, 30.0, 3.0, 0.5])[:, np.newaxis, np.newaxis]
+    )
+    covariances = factors @ factors.transpose(0, 2, 1) + 0.1 * np.eye(2)
+    miss_vectors = rng.normal(size=(5, 2)) * 10.0
+    radii = np.array([5.0, 10.0, 20.0, 1.0, 10.0])
+
+    probabilities = probability_2d(miss_vectors, covariances, radii)
+    for n in range(5):
+        assert probabilities[n] == pytest.approx(
+            _grid_probability(miss_vectors[n], covariances[n], radii[n]), rel=1e-3
+        )
+
+    # thin covariance, converged quadrature
+    covariance = np.diag([0.1, 20.0]) ** 2
+    np.testing.assert_allclose(
+        probability_2d([[3.0, 15.0]], [covariance], 20.0),
+        probability_2d([[3.0, 15.0]], [covariance], 20.0, nodes=512),
+        rtol=1e-6,
+    )
+
+    # not computable
+    probabilities = probability_2d(
+        [[1.0, 1.0], [np.nan, 0.0], [1.0, 1.0]],
+        [np.eye(2), np.eye(2), -np.eye(2)],
+        [0.0, 1.0, 1.0],
+    )
+    assert np.isnan(probabilities).all()
+
+
+def test_encounter_plane():
+    """Tests the projection of the RTN covariances onto the encounter plane."""
+    # crossing orbits, the second object 100 m above (radial) at TCA
+    states1 = np.array([[7000.0, 0.0, 0.0, 0.0, 7.5, 0.0]])
+    states2 = np.array([[7000.1, 0.0, 0.0, 0.0, 0.0, 7.5]])
+    covariances1 = np.diag([100.0, 400.0, 900.0])[np.newaxis]
+    covariances2 = np.diag([1.0, 4.0, 9.0])[np.newaxis]
+
+    miss_vectors, covariances = encounter_plane(
+        states1, states2, covariances1, covariances2
+    )
+    np.testing.assert_allclose(miss_vectors, [[100.0, 0.0]], atol=1e-9)
+    # radial axis and the half of both along and cross track
+    np.testing.assert_allclose(
+        covariances[0],
+        [[101.0, 0.0], [0.0, (400.0 + 900.0 + 9.0 + 4.0) / 2]],
+        atol=1e-9,
+    )
+
+
+def test_cdm_file(data_path):
+    """Tests the arrays and the probabilities of the CDM file."""
+    cdm = NdmIo().from_path(data_path(cdm_file_path))
+    other = copy.deepcopy(cdm)
+    other.body.segment[1].data.additional_parameters.area_pc = None
+    other.body.relative_metadata_data.collision_probability = None
+
+    encounters = cdm_encounters([cdm, other, cdm])
+
+    assert list(encounters.tca_ns) == list(
+        parse_epochs_ns(["2010-03-13T22:37:52.618"]) * np.ones(3, dtype=np.int64)
+    )
+    assert encounters.ref_frames == ["EME2000"] * 3
+    assert encounters.states1[0, 0] == 2570.097065
+    assert encounters.states2[0, 3] == -2.8886125
+    assert encounters.covariances1.shape == (3, 9, 9)
+    np.testing.assert_allclose(
+        encounters.hard_body_radii[[0, 2]], np.sqrt(5.2 / np.pi) + np.sqrt(0.9 / np.pi)
+    )
+    assert np.isnan(encounters.hard_body_radii[1])
+    assert list(encounters.methods) == ["FOSTER-1992"] * 3
+    assert encounters.probabilities[0] == 4.835e-05
+    assert np.isnan(encounters.probabilities[1])
+
+    # miss distance of the file
+    miss_vectors, _ = encounter_plane(
+        encounters.states1,
+        encounters.states2,
+        encounters.covariances1[:, :3, :3],
+        encounters.covariances2[:, :3, :3],
+    )
+    np.testing.assert_allclose(np.linalg.norm(miss_vectors, axis=1), 715.0, atol=1.0)
+
+    probabilities = collision_probabilities(encounters)
+    assert probabilities[0] == probabilities[2] > 0.0
+    assert np.isnan(probabilities[1])
+
+    probabilities = collision_probabilities([cdm, other], [10.0, 20.0])
+    assert 0.0 < probabilities[0] < probabilities[1]
+    assert probabilities[0] == collision_probabilities(cdm, 10.0)[0]
+
+
+def test_invalid_input(data_path):
+    """Tests the objects in different reference frames."""
+    cdm = NdmIo().from_path(data_path(cdm_file_path))
+    cdm.body.segment[1].metadata.ref_frame = "ITRF"
+    with pytest.raises(ValueError):
+        cdm_encounters([cdm])
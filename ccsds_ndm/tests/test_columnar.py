@@ -0,0 +1,129 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the columnar views.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import (
+    AemColumns,
+    OemColumns,
+    TdmColumns,
+    clear_columns,
+    message_columns,
+    segment_columns,
+)
+from ccsds_ndm.ndm_io import NdmIo
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+tdm_file_path = Path("data", "kvn", "tdm_opt_data.kvn")
+opm_file_path = Path("data", "kvn", "502x0b2c1e2_fig3_4_opm.kvn")
+
+
+@pytest.mark.parametrize("numeric", ["decimal", "float", "raw"])
+def test_oem_columns(numeric, data_path):
+    """Tests the OEM columnar view against the object tree."""
+    oem = NdmIo().from_path(data_path(oem_file_path), numeric=numeric)
+
+    columns = message_columns(oem)
+    assert len(columns) == 3
+    assert all(isinstance(column, OemColumns) for column in columns)
+
+    seg_columns = columns[1]
+    state_vector = oem.body.segment[1].data.state_vector
+
+    assert len(seg_columns) == len(state_vector)
+    assert seg_columns.time_system == "TDB"
+    assert seg_columns.epoch_strings[0] == state_vector[0].epoch
+    assert seg_columns.epochs_datetime64[0] == np.datetime64(
+        "2009-02-28T01:13:06.50800003"
+    )
+    assert seg_columns.states.shape == (len(state_vector), 6)
+    assert seg_columns.states[-1, 4] == float(state_vector[-1].y_dot.value)
+    assert seg_columns.positions[0, 2] == float(state_vector[0].z.value)
+    assert seg_columns.accelerations[0, 0] == float(state_vector[0].x_ddot.value)
+
+    day, fraction = seg_columns.epochs_mjd
+    assert day[0] == 54890
+
+    # OEM epochs in TDB
+    tt_epochs = seg_columns.epochs_ns_in("TT")
+    assert abs(tt_epochs - seg_columns.epochs_ns).max() < 2_000_000
+    assert seg_columns.epochs_ns_in("TT") is tt_epochs
+
+
+def test_aem_columns(data_path):
+    """Tests the AEM columnar view against the object tree."""
+    aem = NdmIo().from_path(data_path(aem_file_path))
+
+    seg_columns = message_columns(aem)[0]
+    assert isinstance(seg_columns, AemColumns)
+    assert seg_columns.time_system == "TOD"
+    assert seg_columns.attitude_field == "euler_angle_rate"
+    assert seg_columns.names[0] == "rotation_angles.rotation1"
+    assert seg_columns.names[-1] == "rotation_rates.rotation3"
+
+    state = aem.body.segment[0].data.attitude_state[-1].euler_angle_rate
+    assert seg_columns.values.shape == (len(seg_columns), 6)
+    assert seg_columns.column("rotation_rates.rotation2")[-1] == float(
+        state.rotation_rates.rotation2.value
+    )
+
+    assert message_columns(aem)[1].names[:4] == [
+        "quaternion.qc",
+        "quaternion.q1",
+        "quaternion.q2",
+        "quaternion.q3",
+    ]
+
+
+def test_tdm_columns(data_path):
+    """Tests the TDM columnar view against the object tree."""
+    tdm = NdmIo().from_path(data_path(tdm_file_path))
+
+    seg_columns = message_columns(tdm)[2]
+    assert isinstance(seg_columns, TdmColumns)
+
+    observations = tdm.body.segment[2].data.observation
+    assert seg_columns.keywords[0] == "RANGE"
+    assert seg_columns.values[0] == float(observations[0].range)
+
+    # TDM epochs in UTC
+    gps_epochs = seg_columns.epochs_ns_in("GPS")
+    assert ((gps_epochs - seg_columns.epochs_ns) == 14_000_000_000).all()
+
+    epochs, values = seg_columns.select("range")
+    assert len(epochs) == len(values) == len(observations)
+    assert (np.diff(epochs) >= 0).all()
+
+
+def test_columns_cache(data_path):
+    """Tests the caching of the views and of the parsed epochs."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    segment = oem.body.segment[0]
+
+    seg_columns = segment_columns(segment)
+    epochs_ns = seg_columns.epochs_ns
+
+    assert segment_columns(segment) is seg_columns
+    assert segment_columns(segment).epochs_ns is epochs_ns
+
+    clear_columns(oem)
+    assert segment_columns(segment) is not seg_columns
+
+
+def test_unsupported_segment(data_path):
+    """Tests the error for the segments without a columnar view."""
+    opm = NdmIo().from_path(data_path(opm_file_path))
+
+    with pytest.raises(TypeError):
+        segment_columns(opm)
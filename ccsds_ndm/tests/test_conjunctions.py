@@ -0,0 +1,173 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the conjunction event store.
+
+"""
+
+import copy
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.conjunctions import ConjunctionStore
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.ndm_io import NdmIo
+
+cdm_file_path = Path("data", "kvn", "cdm_example_section4.kvn")
+
+
+def _cdm(template, objects, creation_date, tca, miss_distance, probability):
+    """Copy of the template CDM with the given values."""
+    cdm = copy.deepcopy(template)
+    for segment, designator in zip(cdm.body.segment, objects):
+        segment.metadata.object_designator = designator
+    cdm.header.creation_date = creation_date
+    relative = cdm.body.relative_metadata_data
+    relative.tca = tca
+    relative.miss_distance.value = Decimal(miss_distance)
+    relative.collision_probability = (
+        None if probability is None else Decimal(probability)
+    )
+    return cdm
+
+
+def _test_cdms(data_path):
+    """Updates of three events, one of them with the objects swapped."""
+    template = NdmIo().from_path(data_path(cdm_file_path))
+    return [
+        # event 0
+        _cdm(
+            template,
+            ("A", "B"),
+            "2021-01-01T00:00:00",
+            "2021-01-03T12:00:00",
+            "500",
+            "1e-5",
+        ),
+        # event 1, same objects, different orbit
+        _cdm(
+            template,
+            ("A", "B"),
+            "2021-01-01T00:00:00",
+            "2021-01-03T13:30:00",
+            "2000",
+            "1e-7",
+        ),
+        # event 2
+        _cdm(
+            template,
+            ("C", "D"),
+            "2021-01-01T06:00:00",
+            "2021-01-05T00:00:00",
+            "100",
+            None,
+        ),
+        # event 0 update, objects swapped
+        _cdm(
+            template,
+            ("B", "A"),
+            "2021-01-01T12:00:00",
+            "2021-01-03T12:00:05",
+            "150",
+            "3e-4",
+        ),
+        # event 0, older than the previous update
+        _cdm(
+            template,
+            ("A", "B"),
+            "2021-01-01T08:00:00",
+            "2021-01-03T12:00:02",
+            "300",
+            "1e-4",
+        ),
+    ]
+
+
+def test_events(data_path):
+    """Tests the grouping of the CDMs into events, and the queries."""
+    cdms = _test_cdms(data_path)
+    store = ConjunctionStore()
+    records = store.add(cdms[:3])
+    assert [record.event_id for record in records] == [0, 1, 2]
+    records = store.add(cdms[3:])
+    assert [record.event_id for record in records] == [0, 0]
+
+    assert len(store) == 3
+    event = store.event(0)
+    assert event.cdm_count == 3
+    assert event.tca_ns == parse_epochs_ns(["2021-01-03T12:00:05"])[0]
+    assert (event.object1, event.object2) == ("B", "A")
+    assert event.miss_distance == 150.0
+    assert event.probability == 3e-4
+    assert [record.cdm_id for record in store.history(0)] == [1, 5, 4]
+    assert np.isnan(store.event(2).probability)
+
+    # queries
+    assert [event.event_id for event in store.events()] == [0, 1, 2]
+    assert [
+        event.event_id
+        for event in store.events("2021-01-03T00:00:00", "2021-01-04T00:00:00")
+    ] == [0, 1]
+    t0_ns = parse_epochs_ns(["2021-01-02T00:00:00"])[0]
+    next_72h = t0_ns + 72 * 3600 * 10**9
+    assert [event.event_id for event in store.events(t0_ns, next_72h)] == [0, 1, 2]
+    assert [
+        event.event_id for event in store.events(t0_ns, next_72h, min_probability=1e-4)
+    ] == [0]
+    assert [event.event_id for event in store.events(min_probability=1e-8)] == [0, 1]
+    assert [
+        event.event_id
+        for event in store.events(max_miss_distance=1000.0, order_by="miss_distance")
+    ] == [2, 0]
+    events = store.events(order_by="probability")
+    assert [event.event_id for event in events] == [0, 1, 2]
+    assert store.events("2021-01-03T12:00:06", "2021-01-03T13:29:59") == []
+
+    # indexes rebuilt after new CDMs
+    store.add(
+        _cdm(
+            cdms[0],
+            ("C", "D"),
+            "2021-01-02T00:00:00",
+            "2021-01-05T00:01:00",
+            "10",
+            "1e-3",
+        )
+    )
+    assert [event.event_id for event in store.events(min_probability=1e-4)] == [0, 2]
+
+    # full CDMs on request
+    assert store.cdm(1) == cdms[0]
+    assert store.event_cdms(0) == [cdms[0], cdms[4], cdms[3]]
+    with pytest.raises(KeyError):
+        store.cdm(100)
+    with pytest.raises(ValueError):
+        store.events(order_by="message_id")
+
+
+def test_persistence(tmp_path, data_path):
+    """Tests the store saved to and opened from an SQLite file."""
+    cdms = _test_cdms(data_path)
+    db_path = tmp_path.joinpath("events.db")
+
+    with ConjunctionStore(db_path) as store:
+        store.add(cdms[:4])
+        events = store.events()
+
+    with ConjunctionStore(db_path) as store:
+        assert len(store) == 3
+        assert store.events()[:2] == events[:2]
+        assert np.isnan(store.events()[2].probability)
+
+        # new CDMs into the restored events
+        records = store.add(cdms[4:])
+        assert records[0].cdm_id == 5
+        assert records[0].event_id == 0
+        assert store.event(0).cdm_count == 3
+        assert store.event_cdms(2) == [cdms[2]]
@@ -0,0 +1,164 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the stacked covariance matrices.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.covariance import (
+    cdm_covariances,
+    covariance_blocks,
+    covariance_matrices,
+    is_positive_semidefinite,
+    oem_covariances,
+    opm_covariances,
+)
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import (
+    CdmCovarianceMatrixType,
+    OemCovarianceMatrixType,
+    OemData,
+    OpmCovarianceMatrixType,
+)
+from ccsds_ndm.ndm_io import NdmIo
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase6_abbrev.kvn")
+opm_file_path = Path("data", "kvn", "502x0b2c1e2_fig3_4_opm.kvn")
+cdm_file_path = Path("data", "kvn", "cdm_example_section4.kvn")
+
+
+def test_oem_covariances(data_path):
+    """Tests the OEM covariance matrices, and the conversion back."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    stack = oem_covariances(oem)
+    block = oem.body.segment[1].data.covariance_matrix[0]
+
+    assert stack.matrices.shape == (4, 6, 6)
+    assert stack.ref_frames == ["EME2000"] * 4
+    assert stack.epochs_ns[2] == parse_epochs_ns([block.epoch])[0]
+    assert (
+        stack.matrices[2, 3, 1]
+        == stack.matrices[2, 1, 3]
+        == float(block.cx_dot_y.value)
+    )
+    np.testing.assert_array_equal(stack.matrices, stack.matrices.transpose(0, 2, 1))
+
+    # single segment
+    np.testing.assert_array_equal(
+        oem_covariances(oem.body.segment[1]).matrices, stack.matrices[2:]
+    )
+
+    # test file has made up matrices, not all positive semi-definite
+    assert list(is_positive_semidefinite(stack.matrices)) == [False, True, True, False]
+
+    blocks = covariance_blocks(
+        stack.matrices, OemCovarianceMatrixType, stack.epochs_ns, "EME2000"
+    )
+    assert blocks[2].cx_dot_y == block.cx_dot_y
+    assert blocks[2].epoch == "2007-09-15T10:43:00.000000"
+    assert blocks[2].cov_ref_frame == "EME2000"
+    np.testing.assert_array_equal(covariance_matrices(blocks), stack.matrices)
+
+    # back into the OEM, as floats
+    oem.body.segment[1].data = OemData(
+        state_vector=oem.body.segment[1].data.state_vector,
+        covariance_matrix=covariance_blocks(
+            stack.matrices[2:],
+            OemCovarianceMatrixType,
+            stack.epochs_ns[2:],
+            numeric="float",
+        ),
+    )
+    assert isinstance(oem.body.segment[1].data.covariance_matrix[0].cx_x.value, float)
+    np.testing.assert_array_equal(oem_covariances(oem).matrices, stack.matrices)
+
+
+def test_opm_covariances(data_path):
+    """Tests the OPM covariance matrices."""
+    opm = NdmIo().from_path(data_path(opm_file_path))
+    stack = opm_covariances([opm, opm])
+    block = opm.body.segment.data.covariance_matrix
+
+    assert stack.matrices.shape == (2, 6, 6)
+    assert stack.ref_frames == ["RTN", "RTN"]
+    assert stack.epochs_ns[0] == parse_epochs_ns(["2006-06-03T00:00:00"])[0]
+    assert stack.matrices[0, 5, 4] == float(block.cz_dot_y_dot.value)
+    assert is_positive_semidefinite(stack.matrices[0])
+
+    blocks = covariance_blocks(stack.matrices[0], OpmCovarianceMatrixType, None, "RTN")
+    assert blocks == [block]
+
+    opm.body.segment.data.covariance_matrix = None
+    assert len(opm_covariances(opm).matrices) == 0
+
+
+def test_cdm_covariances(data_path):
+    """Tests the CDM covariance matrices with the optional rows."""
+    cdm = NdmIo().from_path(data_path(cdm_file_path))
+    stack = cdm_covariances([cdm, cdm], 1)
+    block = cdm.body.segment[1].data.covariance_matrix
+
+    assert stack.matrices.shape == (2, 9, 9)
+    assert stack.ref_frames == ["RTN", "RTN"]
+    assert stack.matrices[0, 1, 0] == float(block.ct_r.value)
+    assert np.isnan(stack.matrices[0, 6:]).all()
+    assert np.isnan(stack.matrices[0, :, 6:]).all()
+    # optional rows are ignored
+    assert is_positive_semidefinite(stack.matrices).all()
+
+    blocks = covariance_blocks(stack.matrices, CdmCovarianceMatrixType)
+    assert blocks[0].cdrg_r is None
+    assert blocks[0].ct_r.value == block.ct_r.value
+
+    # first object, single CDM
+    stack = cdm_covariances(cdm)
+    block = cdm.body.segment[0].data.covariance_matrix
+    assert stack.matrices.shape == (1, 9, 9)
+    assert stack.matrices[0, 5, 5] == float(block.cndot_ndot.value)
+
+
+def test_positive_semidefinite():
+    """Tests the positive semi-definiteness check."""
+    rng = np.random.default_rng(42)
+    factors = rng.normal(size=(100, 6, 6)) * np.r_[1.0, 1.0, 1.0, 1e-3, 1e-3, 1e-3]
+    matrices = factors @ factors.transpose(0, 2, 1)
+    assert is_positive_semidefinite(matrices).all()
+
+    # singular (rank 5)
+    factors[:, :, 5] = 0.0
+    singular = factors @ factors.transpose(0, 2, 1)
+    assert is_positive_semidefinite(singular).all()
+
+    # negative eigenvalue
+    eigenvalues, vectors = np.linalg.eigh(matrices)
+    eigenvalues[:, 0] = -1e-3 * eigenvalues[:, -1]
+    indefinite = vectors @ (eigenvalues[:, :, np.newaxis] * vectors.transpose(0, 2, 1))
+    assert not is_positive_semidefinite(indefinite).any()
+
+    # zero variance with non-zero covariances, and negative variance
+    matrix = np.diag([1.0, 1.0, 0.0])
+    assert is_positive_semidefinite(matrix)
+    matrix[2, 0] = matrix[0, 2] = 0.1
+    assert not is_positive_semidefinite(matrix)
+    assert not is_positive_semidefinite(np.diag([1.0, -1.0]))
+
+    # undefined elements within the defined rows
+    matrix = np.eye(3)
+    matrix[1, 0] = np.nan
+    assert not is_positive_semidefinite(matrix)
+
+
+def test_invalid_input():
+    """Tests the unsupported blocks and matrix sizes."""
+    with pytest.raises(TypeError):
+        covariance_blocks(np.eye(6), OemData)
+    with pytest.raises(ValueError):
+        covariance_blocks(np.eye(9), OemCovarianceMatrixType)
@@ -0,0 +1,90 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the sanity checks of the OEM and AEM data.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.ephemeris_checks import CHECKS, check_ephemeris
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_lazy import is_lazy
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+tdm_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+
+
+def _summary(violations):
+    """Check, segment and rows of the violations."""
+    return [(v.check, v.segment, v.rows.tolist()) for v in violations]
+
+
+def test_valid_oem(data_path):
+    """Tests the OEM with irregular steps in the later segments."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+
+    violations = check_ephemeris(oem)
+    assert [(v.check, v.segment) for v in violations] == [
+        ("irregular_step", 1),
+        ("irregular_step", 2),
+    ]
+    assert violations[0].rows.dtype == np.int64
+
+    checks = [check for check in CHECKS if check != "irregular_step"]
+    assert check_ephemeris(oem, checks) == []
+
+
+def test_epoch_errors(data_path):
+    """Tests the epoch errors, with their rows."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    segment = oem.body.segment[0]
+    state_vectors = segment.data.state_vector
+
+    # original rows 6 and 7 removed, 9 rows remaining
+    del state_vectors[6:8]
+    state_vectors[2].epoch = state_vectors[1].epoch
+    state_vectors[8].epoch = state_vectors[0].epoch
+    segment.metadata.start_time = state_vectors[1].epoch
+
+    violations = check_ephemeris(oem, step_tolerance=1e-3, gap_ratio=2.5)
+    assert _summary(violations) == [
+        ("non_increasing", 0, [8]),
+        ("duplicate_epoch", 0, [2]),
+        ("gap", 0, [6]),
+        ("irregular_step", 0, [3]),
+        ("outside_time_range", 0, [0, 8]),
+        ("coverage", 0, [7]),
+        ("irregular_step", 1, [1, 2, 3, 4, 6, 7, 8, 9]),
+        ("irregular_step", 2, [1, 2, 3, 4, 5, 7, 8, 9, 10, 11]),
+    ]
+    assert violations[2].message.startswith("1 step(s) longer than 2.5 times")
+
+
+def test_aem(data_path):
+    """Tests the AEM coverage and quaternion norms, read in lazy mode."""
+    aem_path = data_path(aem_file_path)
+    violations = check_ephemeris(aem_path)
+    assert _summary(violations) == [
+        ("coverage", 0, [0]),
+        ("quaternion_norm", 1, list(range(54))),
+    ]
+
+    aem = NdmIo().from_path(aem_path, lazy=True)
+    assert check_ephemeris(aem, ["quaternion_norm"], norm_tolerance=1.0) == []
+    assert is_lazy(aem)
+
+
+def test_invalid_input(data_path):
+    """Tests the invalid sources and check names."""
+    with pytest.raises(TypeError):
+        check_ephemeris(data_path(tdm_file_path))
+    with pytest.raises(ValueError):
+        check_ephemeris(data_path(oem_file_path), ["monotonic"])
@@ -0,0 +1,209 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the streaming splice, split and resampling of the OEMs and AEMs.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.ephemeris_stream import (
+    cut_ephemeris,
+    cut_metadata,
+    resample_ephemeris,
+    splice_ephemerides,
+    split_ephemeris,
+)
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.interpolation import OemInterpolator
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+tdm_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+
+
+def _window_columns(path, start_ns, stop_ns):
+    """Epochs and values of the data lines within the window, per segment."""
+    windows = []
+    for columns in message_columns(NdmIo().from_path(path)):
+        mask = (columns.epochs_ns >= start_ns) & (columns.epochs_ns <= stop_ns)
+        if mask.any():
+            windows.append((columns.epochs_ns[mask], columns.values[mask]))
+    return windows
+
+
+def _assert_same_window(path, source_path, start_ns, stop_ns):
+    """Checks all the data lines against the source lines within the window."""
+    int64 = np.iinfo(np.int64)
+    windows = _window_columns(path, int64.min, int64.max)
+    expected_windows = _window_columns(source_path, start_ns, stop_ns)
+    assert len(windows) == len(expected_windows)
+    for (epochs, values), (expected_epochs, expected_values) in zip(
+        windows, expected_windows
+    ):
+        np.testing.assert_array_equal(epochs, expected_epochs)
+        np.testing.assert_array_equal(values, expected_values)
+
+
+def _epochs_ns(path):
+    """Epochs of the data lines of all the segments of the file."""
+    return np.concatenate(
+        [columns.epochs_ns for columns in message_columns(NdmIo().from_path(path))]
+    )
+
+
+def test_cut(tmp_path, data_path):
+    """Tests the cut of the OEM in KVN and XML."""
+    oem_path = data_path(oem_file_path)
+    epochs_ns = np.unique(_epochs_ns(oem_path))
+    start, stop = "2009-02-28T01:13:00", "2009-02-28T01:20:00"
+    start_ns, stop_ns = parse_epochs_ns([start, stop])
+    expected = epochs_ns[(epochs_ns >= start_ns) & (epochs_ns <= stop_ns)]
+
+    for data_format in (NDMFileFormats.KVN, NDMFileFormats.XML):
+        out_path = tmp_path / f"cut.{data_format.name.lower()}"
+        cut_ephemeris(oem_path, out_path, start, stop, data_format=data_format)
+
+        oem = NdmIo().from_path(out_path)
+        # the touching segments with the same metadata are concatenated
+        assert len(oem.body.segment) == 1
+        metadata = oem.body.segment[0].metadata
+        assert metadata.object_name == "MARS EXPRESS"
+        assert parse_epochs_ns([metadata.start_time, metadata.stop_time]).tolist() == [
+            start_ns,
+            stop_ns,
+        ]
+        np.testing.assert_array_equal(_epochs_ns(out_path), expected)
+
+    # whole file, the duplicate boundary lines are removed
+    out_path = tmp_path / "all.kvn"
+    cut_ephemeris(NdmIo().from_path(oem_path), out_path)
+    np.testing.assert_array_equal(_epochs_ns(out_path), epochs_ns)
+
+    # empty time span
+    out_path = tmp_path / "empty.kvn"
+    with pytest.raises(ValueError):
+        cut_ephemeris(oem_path, out_path, "2020-01-01T00:00:00")
+    assert not out_path.exists()
+
+
+@pytest.mark.parametrize("source_format", ["kvn", "xml"])
+def test_cut_split_aem(source_format, tmp_path, data_path):
+    """Tests the cut and the split of the AEM, from and to KVN and XML."""
+    aem_path = data_path(aem_file_path.with_suffix(f".{source_format}"))
+    boundaries = ["2003-03-04T12:00:05", "2003-03-04T12:00:30", "2003-03-04T12:00:40"]
+    boundaries_ns = parse_epochs_ns(boundaries)
+
+    for data_format in (NDMFileFormats.KVN, NDMFileFormats.XML):
+        suffix = data_format.name.lower()
+
+        # cut across the two segments (different attitude types)
+        out_path = tmp_path / f"cut.{suffix}"
+        cut_ephemeris(
+            aem_path, out_path, boundaries[0], boundaries[1], data_format=data_format
+        )
+        aem = NdmIo().from_path(out_path)
+        assert [
+            segment.metadata.attitude_type.value for segment in aem.body.segment
+        ] == ["EULER_ANGLE/RATE", "QUATERNION/RATE"]
+        _assert_same_window(out_path, aem_path, *boundaries_ns[:2])
+
+        # split within the second segment
+        paths = [tmp_path / f"first.{suffix}", tmp_path / f"second.{suffix}"]
+        split_ephemeris(aem_path, boundaries, paths, data_format=data_format)
+        for path, start_ns, stop_ns in zip(
+            paths, boundaries_ns[:-1], boundaries_ns[1:]
+        ):
+            _assert_same_window(path, aem_path, start_ns, stop_ns)
+
+
+def test_split_splice(tmp_path, data_path):
+    """Tests the split of the OEM and the splice of the products."""
+    oem_path = data_path(oem_file_path)
+    epochs_ns = np.unique(_epochs_ns(oem_path))
+    boundaries = ["2009-02-28T01:12:00", "2009-02-28T01:15:00", "2009-02-28T01:30:00"]
+    boundaries_ns = parse_epochs_ns(boundaries)
+    paths = [tmp_path / "first.kvn", tmp_path / "second.kvn"]
+
+    split_ephemeris(oem_path, boundaries, paths)
+    for path, start_ns, stop_ns in zip(paths, boundaries_ns[:-1], boundaries_ns[1:]):
+        expected = epochs_ns[(epochs_ns >= start_ns) & (epochs_ns <= stop_ns)]
+        np.testing.assert_array_equal(_epochs_ns(path), expected)
+
+    with pytest.raises(ValueError):
+        split_ephemeris(oem_path, boundaries, paths[:1])
+
+    # each source after the end of the previous one
+    out_path = tmp_path / "splice.kvn"
+    splice_ephemerides([paths[0], oem_path], out_path)
+    np.testing.assert_array_equal(_epochs_ns(out_path), epochs_ns)
+
+    # splice epoch within the first product
+    splice_ns = parse_epochs_ns(["2009-02-28T01:14:00"])[0]
+    splice_ephemerides([paths[0], oem_path], out_path, [splice_ns])
+    np.testing.assert_array_equal(_epochs_ns(out_path), epochs_ns)
+
+    with pytest.raises(ValueError):
+        splice_ephemerides([paths[0], oem_path], out_path, [])
+    with pytest.raises(TypeError):
+        splice_ephemerides([oem_path, data_path(aem_file_path)], out_path)
+
+
+def test_resample(tmp_path, data_path):
+    """Tests the resampling of the OEM and the AEM."""
+    oem_path = data_path(oem_file_path)
+    out_path = tmp_path / "resampled.xml"
+    resample_ephemeris(oem_path, out_path, 30.0, data_format=NDMFileFormats.XML)
+
+    columns = message_columns(NdmIo().from_path(out_path))[0]
+    np.testing.assert_array_equal(np.diff(columns.epochs_ns), 30_000_000_000)
+    expected = OemInterpolator(NdmIo().from_path(oem_path)).states(columns.epochs_ns)
+    np.testing.assert_allclose(columns.states[:, :6], expected, rtol=0, atol=1e-9)
+
+    # Euler angles into quaternions
+    aem_path = data_path(aem_file_path)
+    out_path = tmp_path / "resampled.kvn"
+    resample_ephemeris(aem_path, out_path, 2.0, stop="2003-03-04T12:00:10")
+
+    aem = NdmIo().from_path(out_path)
+    assert len(aem.body.segment) == 1
+    metadata = aem.body.segment[0].metadata
+    assert metadata.attitude_type.value == "QUATERNION"
+    states = aem.body.segment[0].data.attitude_state
+    assert [state.quaternion_state.epoch[-15:] for state in states] == [
+        f"12:00:{second:02d}.000000" for second in range(2, 12, 2)
+    ]
+    quaternion = states[0].quaternion_state.quaternion
+    norm = float(quaternion.qc) ** 2 + float(quaternion.q1) ** 2
+    norm += float(quaternion.q2) ** 2 + float(quaternion.q3) ** 2
+    assert norm == pytest.approx(1.0)
+
+    with pytest.raises(ValueError):
+        resample_ephemeris(aem_path, out_path, 0.0)
+
+
+def test_cut_metadata(data_path):
+    """Tests the metadata times cut to a time range."""
+    aem = NdmIo().from_path(data_path(aem_file_path))
+    metadata = aem.body.segment[0].metadata
+
+    cut = cut_metadata(metadata, "2003-03-04T12:00:05", "2003-03-04T12:00:30")
+    assert cut.start_time == "2003-03-04T12:00:05.000000"
+    assert cut.stop_time == metadata.stop_time
+    assert cut.useable_start_time is None
+    assert cut_metadata(metadata) == metadata
+    assert metadata.start_time == "2003-03-04T12:00:00.0"
+
+
+def test_invalid_input(tmp_path, data_path):
+    """Tests the messages other than OEM and AEM."""
+    with pytest.raises(TypeError):
+        cut_ephemeris(data_path(tdm_file_path), tmp_path / "out.kvn")
@@ -0,0 +1,174 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the vectorised epoch parsing.
+
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.epochs import (
+    NS_PER_SECOND,
+    days_from_civil,
+    format_epochs_ns,
+    mjd_to_ns,
+    ns_to_mjd,
+    parse_epochs_mjd,
+    parse_epochs_ns,
+    to_epochs_ns,
+)
+
+
+def _ns(*args):
+    """Nanoseconds since 1970 of the `datetime` arguments."""
+    dt = datetime(*args).replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) * NS_PER_SECOND + dt.microsecond * 1000
+
+
+def test_parse_mixed_formats():
+    """Tests parsing calendar and day-of-year formats in the same array."""
+    epochs = [
+        "2020-12-29T03:57:59.406624",
+        "2007-075T16:50:01",
+        "  2009-02-28T01:12:34.24599999 ",
+        "2016-366T23:00:00Z",
+    ]
+
+    truth = [
+        _ns(2020, 12, 29, 3, 57, 59, 406624),
+        _ns(2007, 3, 16, 16, 50, 1),
+        _ns(2009, 2, 28, 1, 12, 34) + 245999990,
+        _ns(2016, 12, 31, 23),
+    ]
+
+    assert parse_epochs_ns(epochs).tolist() == truth
+
+
+def test_parse_time_zone_and_leap_second():
+    """Tests the UTC offsets (with day changes) and the leap seconds."""
+    epochs = [
+        "2020-01-01T00:30:00+01:00",
+        "2020-01-01T23:30:00-01:00",
+        "2016-12-31T23:59:60.5",
+    ]
+
+    truth = [
+        _ns(2019, 12, 31, 23, 30),
+        _ns(2020, 1, 2, 0, 30),
+        _ns(2016, 12, 31, 23, 59, 59) + 1_500_000_000,
+    ]
+
+    assert parse_epochs_ns(epochs).tolist() == truth
+
+    # leap second stays in its own day
+    day, fraction = parse_epochs_mjd(epochs[2:])
+    assert day[0] == 57753
+    assert fraction[0] > 1.0
+
+
+def test_parse_sub_ns_precision():
+    """Tests the digits beyond nanoseconds in the MJD output."""
+    epochs = ["2009-02-28T01:12:34.1234567891234", "2009-02-28T01:12:34.1234567896"]
+
+    assert parse_epochs_ns(epochs).tolist() == [
+        _ns(2009, 2, 28, 1, 12, 34) + 123456789,
+        _ns(2009, 2, 28, 1, 12, 34) + 123456790,
+    ]
+
+    day, fraction = parse_epochs_mjd(epochs[:1])
+    assert day[0] == 54890
+    assert fraction[0] * 86400 == pytest.approx(4354.1234567891234, abs=1e-10)
+
+
+def test_invalid_epochs():
+    """Tests the error message for the invalid epochs."""
+    epochs = [
+        "2020-13-01T00:00:00",
+        "2020-01-01T00:00:00",
+        "2020-01-01 00:00:00",
+        "2020-01-01T00:00:00x",
+    ]
+
+    with pytest.raises(ValueError, match=r"3 epoch\(s\).*\[0, 2, 3\]"):
+        parse_epochs_ns(epochs)
+
+    # day beyond the end of the month or year (leap years included)
+    epochs = [
+        "2020-02-29T00:00:00",
+        "2020-02-30T00:00:00",
+        "2021-02-29T00:00:00",
+        "2020-02-31T00:00:00",
+        "2021-04-31T00:00:00",
+        "2021-12-31T00:00:00",
+        "2020-366T00:00:00",
+        "2021-366T00:00:00",
+        "2000-02-29T00:00:00",
+        "1900-02-29T00:00:00",
+    ]
+
+    with pytest.raises(ValueError, match=r"6 epoch\(s\).*\[1, 2, 3, 4, 7\]"):
+        parse_epochs_ns(epochs)
+
+    # anything but whitespace after the epoch, hour 24 other than 24:00:00
+    epochs = [
+        "2020-01-01T00:00:00 junk",
+        "2020-01-01T00:00:00Z x",
+        "2020-01-01T00:00:00+01:00 1",
+        "2020-01-01T00:00:00.5 \t ",
+        "2020-01-01T24:30:00",
+        "2020-01-01T24:00:01",
+        "2020-01-01T24:00:00.001",
+        "2020-01-01T24:00:00.000",
+    ]
+
+    with pytest.raises(ValueError, match=r"6 epoch\(s\).*\[0, 1, 2, 4, 5\]"):
+        parse_epochs_ns(epochs)
+
+    assert parse_epochs_ns(["2020-001T24:00:00"])[0] == _ns(2020, 1, 2)
+
+
+@pytest.mark.parametrize("day_of_year", [False, True])
+def test_format_round_trip(day_of_year):
+    """Tests formatting and parsing back the epochs."""
+    epochs_ns = np.arange(1000, dtype=np.int64) * 7_654_321_987 + _ns(2016, 12, 20)
+
+    epoch_strings = format_epochs_ns(epochs_ns, 9, day_of_year=day_of_year)
+
+    assert (parse_epochs_ns(epoch_strings) == epochs_ns).all()
+
+
+def test_mjd_round_trip():
+    """Tests the conversion between nanoseconds and two-part MJD."""
+    epochs_ns = np.arange(1000, dtype=np.int64) * 987_654_321_123 - _ns(1999, 1, 1)
+
+    assert (mjd_to_ns(*ns_to_mjd(epochs_ns)) == epochs_ns).all()
+
+
+def test_to_epochs_ns():
+    """Tests converting the strings, `datetime64` values and nanoseconds."""
+    truth = np.array(
+        [_ns(2020, 12, 29, 3, 57, 59, 406624), _ns(2007, 3, 16, 16, 50, 1)]
+    )
+
+    strings = ["2020-12-29T03:57:59.406624", "2007-075T16:50:01"]
+    dt64 = np.array(["2020-12-29T03:57:59.406624", "2007-03-16T16:50:01"], "M8[us]")
+
+    assert (to_epochs_ns(strings) == truth).all()
+    assert (to_epochs_ns(dt64) == truth).all()
+    assert (to_epochs_ns(truth) == truth).all()
+
+
+def test_days_from_civil():
+    """Tests the calendar date to day conversion."""
+    dates = np.array(["1600-02-29", "1970-01-01", "2000-03-01", "2100-12-31"])
+    year, month, day = np.array([date.split("-") for date in dates], int).T
+
+    truth = dates.astype("datetime64[D]").astype(np.int64)
+
+    assert (days_from_civil(year, month, day) == truth).all()
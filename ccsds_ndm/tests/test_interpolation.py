@@ -0,0 +1,157 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the OEM interpolation.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import clear_columns, segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.interpolation import InterpolationMethod, OemInterpolator
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+
+_POLY_OEM = """CCSDS_OEM_VERS = 2.0
+CREATION_DATE  = 2021-01-01T00:00:00
+ORIGINATOR     = TEST
+"""
+
+_POLY_METADATA = """
+META_START
+OBJECT_NAME          = TEST SAT
+OBJECT_ID            = 2021-001A
+CENTER_NAME          = EARTH
+REF_FRAME            = EME2000
+TIME_SYSTEM          = UTC
+START_TIME           = 2021-01-01T00:{start:02d}:00
+USEABLE_START_TIME   = 2021-01-01T00:{useable_start:02d}:00
+USEABLE_STOP_TIME    = 2021-01-01T00:{useable_stop:02d}:00
+STOP_TIME            = 2021-01-01T00:{stop:02d}:00
+INTERPOLATION        = {method}
+INTERPOLATION_DEGREE = {degree}
+META_STOP
+
+"""
+
+
+def _poly_state(t, scale=1.0):
+    """State on a cubic trajectory at `t` seconds."""
+    pos = scale * np.array([1 + 2 * t - 1e-3 * t**3, 3 - t + 1e-4 * t**2, 5e-5 * t**3])
+    vel = scale * np.array([2 - 3e-3 * t**2, -1 + 2e-4 * t, 1.5e-4 * t**2])
+    return np.concatenate([pos, vel])
+
+
+def _poly_oem(method, degree):
+    """OEM with two segments (of 0-10 and 10-20 minutes) on cubic trajectories,
+    a different one for each segment."""
+    text = [_POLY_OEM]
+    for minute_start, scale in [(0, 1.0), (10, 2.0)]:
+        text.append(
+            _POLY_METADATA.format(
+                start=minute_start,
+                useable_start=minute_start + 1,
+                useable_stop=minute_start + 10,
+                stop=minute_start + 10,
+                method=method,
+                degree=degree,
+            )
+        )
+        for second in range(minute_start * 60, (minute_start + 10) * 60 + 1, 30):
+            state = _poly_state(second, scale)
+            text.append(
+                f"2021-01-01T00:{second // 60:02d}:{second % 60:02d} "
+                + " ".join(f"{value:.12f}" for value in state)
+                + "\n"
+            )
+    return NdmKvnIo().from_string("".join(text))
+
+
+@pytest.mark.parametrize(
+    "method, degree", [("LAGRANGE", 3), ("HERMITE", 3), ("Hermite", 5)]
+)
+def test_polynomial(method, degree):
+    """Tests the exact interpolation of the cubic trajectories."""
+    interpolator = OemInterpolator(_poly_oem(method, degree))
+    t0_ns = parse_epochs_ns(["2021-01-01T00:00:00"])[0]
+
+    seconds = np.r_[np.linspace(60.0, 600.0, 501), np.linspace(660.0, 1200.0, 501)]
+    states = interpolator(t0_ns + (seconds * 1e9).astype(np.int64))
+
+    truth = np.array([_poly_state(t, 1.0 if t <= 600 else 2.0) for t in seconds])
+    np.testing.assert_allclose(states, truth, rtol=1e-9, atol=1e-9)
+
+
+def test_useable_range():
+    """Tests the segment boundaries and the useable ranges."""
+    interpolator = OemInterpolator(_poly_oem("LAGRANGE", 3))
+
+    assert interpolator.coverage == [
+        tuple(parse_epochs_ns(["2021-01-01T00:01:00", "2021-01-01T00:10:00"])),
+        tuple(parse_epochs_ns(["2021-01-01T00:11:00", "2021-01-01T00:20:00"])),
+    ]
+
+    states = interpolator(
+        [
+            "2021-01-01T00:00:30",
+            "2021-01-01T00:10:00",
+            "2021-01-01T00:10:30",
+            "2021-01-01T00:20:00.000001",
+        ]
+    )
+    assert np.isnan(states[[0, 2, 3]]).all()
+    # boundary of the segments, the first segment is used
+    np.testing.assert_allclose(states[1], _poly_state(600.0), atol=1e-9)
+
+
+def test_oem_file(data_path):
+    """Tests the interpolation of the OEM file with the metadata settings."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    interpolator = OemInterpolator(oem)
+    columns = segment_columns(oem.body.segment[0])
+
+    # sample states are reproduced
+    np.testing.assert_allclose(
+        interpolator(columns.epochs_ns), columns.states, rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        interpolator(columns.epochs_datetime64[:3]), columns.states[:3], rtol=1e-12
+    )
+
+    # Hermite and Lagrange agree between the states
+    epochs_ns = (columns.epochs_ns[:-1] + columns.epochs_ns[1:]) // 2
+    lagrange = OemInterpolator(oem, InterpolationMethod.LAGRANGE, 5)
+    np.testing.assert_allclose(
+        interpolator(epochs_ns), lagrange(epochs_ns), rtol=1e-5, atol=1e-5
+    )
+    linear = OemInterpolator(oem, "linear")(epochs_ns)
+    np.testing.assert_allclose(
+        linear, (columns.states[:-1] + columns.states[1:]) / 2, rtol=1e-12
+    )
+
+
+def test_invalid_input(data_path):
+    """Tests the unsupported methods and epochs."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+
+    with pytest.raises(ValueError):
+        OemInterpolator(oem, "spline")
+
+    segment = oem.body.segment[0]
+    segment.data.state_vector[1].epoch = segment.data.state_vector[0].epoch
+    clear_columns(segment)
+    with pytest.raises(ValueError):
+        OemInterpolator([segment])
+
+    oem.body.segment[1].metadata.time_system = "UTC"
+    with pytest.raises(ValueError):
+        OemInterpolator(oem.body.segment[1:])
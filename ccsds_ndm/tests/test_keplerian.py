@@ -0,0 +1,217 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the batch Keplerian and Cartesian conversions.
+
+"""
+
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.keplerian import (
+    DEFAULT_GM,
+    KeplerianElements,
+    mean_to_true_anomaly,
+    omm_elements,
+    opm_elements,
+    opm_states,
+    to_cartesian,
+    to_keplerian,
+    true_to_mean_anomaly,
+)
+from ccsds_ndm.ndm_io import NdmIo
+
+opm_file_path = Path("data", "kvn", "502x0b2c1e2_fig3_4_opm.kvn")
+omm_file_path = Path("data", "kvn", "omm1_ct.kvn")
+
+
+def _angle_difference(angles1, angles2):
+    """Differences of the angles, within [-180, 180) degrees."""
+    return (np.asarray(angles1) - angles2 + 180.0) % 360.0 - 180.0
+
+
+def _random_elements(count, rng):
+    """Random elliptic and hyperbolic orbits, with the mean anomaly."""
+    hyperbolic = rng.random(count) < 0.2
+    return KeplerianElements(
+        np.zeros(count, dtype=np.int64),
+        np.where(
+            hyperbolic, -rng.uniform(7e3, 5e4, count), rng.uniform(6.6e3, 5e4, count)
+        ),
+        np.where(
+            hyperbolic, rng.uniform(1.01, 5.0, count), rng.uniform(0, 0.99, count)
+        ),
+        rng.uniform(0.0, 180.0, count),
+        rng.uniform(0.0, 360.0, count),
+        rng.uniform(0.0, 360.0, count),
+        np.full(count, np.nan),
+        # within the asymptotes of the hyperbolic orbits
+        np.where(
+            hyperbolic, rng.uniform(-200.0, 200.0, count), rng.uniform(0, 360, count)
+        ),
+        np.full(count, DEFAULT_GM),
+    )
+
+
+def test_opm(data_path):
+    """Tests the elements and the states of the OPM."""
+    opm = NdmIo().from_path(data_path(opm_file_path))
+    elements = opm_elements([opm, opm])
+    keplerian = opm.body.segment.data.keplerian_elements
+
+    assert list(elements.epochs_ns) == list(
+        parse_epochs_ns(["2006-06-03T00:00:00"] * 2)
+    )
+    assert elements.semi_major_axis[0] == 41399.5123
+    assert elements.inclination[1] == 0.117746
+    assert np.isnan(elements.mean_anomaly).all()
+    assert elements.gm[0] == float(keplerian.gm.value)
+
+    states = opm_states(opm)
+    assert states.states[0, 3] == 3.11548208
+    assert states.gm[0] == float(keplerian.gm.value)
+
+    # the anomaly of the test file matches the mean anomaly of the state
+    osculating = to_keplerian(states)
+    assert osculating.semi_major_axis[0] == pytest.approx(41399.5123, rel=1e-7)
+    assert osculating.eccentricity[0] == pytest.approx(0.020842611, abs=1e-6)
+    for name in ["inclination", "ra_of_asc_node", "arg_of_pericenter"]:
+        assert getattr(osculating, name)[0] == pytest.approx(
+            getattr(elements, name)[0], abs=1e-4
+        )
+    assert osculating.mean_anomaly[0] == pytest.approx(41.922339, abs=1e-4)
+
+    elements = elements._replace(
+        true_anomaly=np.full(2, np.nan), mean_anomaly=elements.true_anomaly
+    )
+    np.testing.assert_allclose(
+        to_cartesian(elements).states, np.repeat(states.states, 2, axis=0), atol=1e-3
+    )
+
+    # no Keplerian elements
+    opm.body.segment.data.keplerian_elements = None
+    assert np.isnan(opm_elements(opm).semi_major_axis).all()
+    assert opm_states(opm, 1.0).gm[0] == 1.0
+
+
+def test_omm(data_path):
+    """Tests the elements of the OMMs and of the catalogue table."""
+    omm = NdmIo().from_path(data_path(omm_file_path))
+    elements = omm_elements([omm, omm])
+
+    mean_motion = 15.27990594 * 2 * np.pi / 86400.0
+    np.testing.assert_allclose(
+        elements.semi_major_axis, (DEFAULT_GM / mean_motion**2) ** (1 / 3)
+    )
+    assert elements.mean_anomaly[0] == 15.7307
+    assert elements.epochs_ns[0] == parse_epochs_ns(["2020-12-29T11:59:56.951808"])[0]
+
+    states = to_cartesian(elements)
+    radii = np.linalg.norm(states.states[:, :3], axis=1)
+    assert np.all(np.abs(radii - elements.semi_major_axis) < 0.0014 * 6860.0)
+
+    # OMM without mean elements
+    no_elements = deepcopy(omm)
+    no_elements.body.segment.data.mean_elements = None
+    with pytest.raises(ValueError, match=r"indices: \[1\]"):
+        omm_elements([omm, no_elements])
+
+    # catalogue table
+    pytest.importorskip("pyarrow")
+    from ccsds_ndm.ndm_arrow import to_arrow
+
+    table_elements = omm_elements(to_arrow([omm, omm], "omm"))
+    for values, table_values in zip(elements, table_elements):
+        np.testing.assert_array_equal(values, table_values)
+
+
+def test_conversions():
+    """Tests the conversions back and forth, with the singular cases."""
+    rng = np.random.default_rng(42)
+    elements = _random_elements(2000, rng)
+
+    states = to_cartesian(elements)
+    osculating = to_keplerian(states)
+
+    np.testing.assert_allclose(
+        osculating.semi_major_axis, elements.semi_major_axis, rtol=1e-10
+    )
+    np.testing.assert_allclose(
+        osculating.eccentricity, elements.eccentricity, atol=1e-10
+    )
+    for name in ["inclination", "ra_of_asc_node", "arg_of_pericenter", "mean_anomaly"]:
+        np.testing.assert_allclose(
+            _angle_difference(getattr(osculating, name), getattr(elements, name)),
+            0.0,
+            atol=1e-7,
+        )
+
+    # true anomaly, back to the same states
+    np.testing.assert_allclose(
+        to_cartesian(osculating._replace(mean_anomaly=np.full(2000, np.nan))).states,
+        states.states,
+        rtol=1e-9,
+        atol=1e-6,
+    )
+
+    # circular, equatorial and both
+    singular = KeplerianElements(
+        np.zeros(3, dtype=np.int64),
+        np.full(3, 7000.0),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([50.0, 0.0, 0.0]),
+        np.array([30.0, 0.0, 0.0]),
+        np.array([0.0, 40.0, 0.0]),
+        np.array([20.0, 20.0, 60.0]),
+        np.full(3, np.nan),
+        np.full(3, DEFAULT_GM),
+    )
+    osculating = to_keplerian(to_cartesian(singular))
+    np.testing.assert_allclose(osculating.ra_of_asc_node, [30.0, 0.0, 0.0], atol=1e-8)
+    np.testing.assert_allclose(
+        osculating.arg_of_pericenter, [0.0, 40.0, 0.0], atol=1e-8
+    )
+    np.testing.assert_allclose(osculating.true_anomaly, [20.0, 20.0, 60.0], atol=1e-8)
+
+
+def test_hyperbolic_conversions():
+    """Tests the conversions back and forth of a hyperbolic orbit."""
+    elements = KeplerianElements(
+        np.zeros(1, dtype=np.int64),
+        np.array([-20000.0]),
+        np.array([2.0]),
+        np.array([30.0]),
+        np.array([40.0]),
+        np.array([50.0]),
+        np.full(1, np.nan),
+        np.array([-100.0]),
+        np.full(1, DEFAULT_GM),
+    )
+
+    osculating = to_keplerian(to_cartesian(elements))
+    np.testing.assert_allclose(osculating.semi_major_axis, [-20000.0], rtol=1e-10)
+    np.testing.assert_allclose(osculating.eccentricity, [2.0], rtol=1e-10)
+    np.testing.assert_allclose(osculating.mean_anomaly, [-100.0], rtol=1e-9)
+
+
+def test_anomalies():
+    """Tests the conversions between the mean and the true anomalies."""
+    eccentricity = np.array([0.0, 0.5, 0.99, 0.999999, 1.5, 10.0])
+    mean_anomaly = np.array([0.3, 3.1, -0.01, 1e-4, 5.0, -30.0])
+
+    true_anomaly = mean_to_true_anomaly(mean_anomaly, eccentricity)
+    assert true_anomaly[0] == pytest.approx(0.3)
+    np.testing.assert_allclose(
+        true_to_mean_anomaly(true_anomaly, eccentricity), mean_anomaly, rtol=1e-9
+    )
+
+    # parabolic orbits
+    assert np.isnan(mean_to_true_anomaly(1.0, 1.0))
+    assert np.isnan(true_to_mean_anomaly(1.0, 1.0))
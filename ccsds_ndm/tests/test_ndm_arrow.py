@@ -0,0 +1,189 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the Arrow, Parquet and Arrow IPC converters.
+
+"""
+
+import io
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Oem, Omm
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_lazy import is_lazy
+from ccsds_ndm.numeric_backend import RawNumber
+
+pa = pytest.importorskip("pyarrow")
+
+from ccsds_ndm.ndm_arrow import (  # noqa: E402
+    from_arrow,
+    read_ipc,
+    read_parquet,
+    record_batches,
+    record_schema,
+    to_arrow,
+    write_ipc,
+    write_parquet,
+)
+
+file_paths = {
+    "AEM": (Path("data", "kvn", "adm-testcase04a_multi.kvn"), "aem_attitude_state"),
+    "OEM": (Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"), "oem_state_vector"),
+    "OEM_COV": (
+        Path("data", "kvn", "odmv2-testcase6_abbrev.kvn"),
+        "oem_covariance_matrix",
+    ),
+    "TDM": (Path("data", "kvn", "tdm_opt_data.kvn"), "tdm_observation"),
+}
+
+
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_round_trip(ndm_key, data_path):
+    """Tests the conversion to Arrow tables and back."""
+    path, record_type = file_paths[ndm_key]
+    ndm = NdmIo().from_path(data_path(path))
+
+    table = to_arrow(ndm, record_type)
+    ndm_back = from_arrow(table)
+
+    assert len(ndm_back) == 1
+    assert ndm_back[0].header == ndm.header
+    segments = [
+        segment
+        for segment in ndm.body.segment
+        if getattr(segment.data, record_type.split("_", 1)[1])
+    ]
+    assert len(ndm_back[0].body.segment) == len(segments)
+    assert ndm_back[0].body.segment[-1].metadata == segments[-1].metadata
+    assert table.num_rows == sum(
+        len(getattr(segment.data, record_type.split("_", 1)[1])) for segment in segments
+    )
+
+    # epochs are normalised, the rest of the table should be identical
+    assert to_arrow(ndm_back, record_type).equals(table)
+
+
+def test_oem_values(data_path):
+    """Tests the OEM state vector and covariance columns."""
+    oem = NdmIo().from_path(data_path(file_paths["OEM_COV"][0]))
+    states = [sv for segment in oem.body.segment for sv in segment.data.state_vector]
+
+    tables = {
+        record_type: to_arrow(oem, record_type)
+        for record_type in ["oem_state_vector", "oem_covariance_matrix"]
+    }
+    table = tables["oem_state_vector"]
+
+    assert table.column("x").to_pylist() == [float(sv.x.value) for sv in states]
+    assert table.schema.field("x").metadata == {b"units": b"km"}
+    assert table.schema.field("x_dot").metadata == {b"units": b"km/s"}
+    assert table.column("epoch").cast(pa.int64()).to_pylist() == list(
+        parse_epochs_ns([sv.epoch for sv in states])
+    )
+    assert pa.types.is_dictionary(table.schema.field("metadata.object_name").type)
+    assert table.column("metadata.object_name").unique().to_pylist() == [
+        oem.body.segment[0].metadata.object_name
+    ]
+
+    # state vectors and covariances combined into the same messages
+    oem_back = from_arrow(tables, numeric="decimal")[0]
+    data = oem_back.body.segment[0].data
+    truth = oem.body.segment[0].data
+    assert len(data.state_vector) == len(truth.state_vector)
+    assert len(data.covariance_matrix) == len(truth.covariance_matrix)
+    assert data.covariance_matrix[0].cx_x.value == truth.covariance_matrix[0].cx_x.value
+    assert isinstance(data.state_vector[0].x.value, Decimal)
+
+    assert isinstance(from_arrow(table, "float")[0], Oem)
+    data = from_arrow(table, "float")[0].body.segment[0].data
+    assert isinstance(data.state_vector[0].x.value, float)
+    data = from_arrow(table, "raw")[0].body.segment[0].data
+    assert isinstance(data.state_vector[0].x.value, RawNumber)
+
+
+def test_omm(data_path):
+    """Tests the OMM records within a combined NDM."""
+    ndm = NdmIo().from_path(data_path(Path("data", "xml", "omm_combined.xml")))
+
+    table = to_arrow(ndm, "omm")
+    omms = from_arrow(table)
+
+    # messages without data are skipped
+    truths = [omm for omm in ndm.omm if omm.body.segment.data is not None]
+    assert table.num_rows == len(omms) == len(truths)
+    assert table.column("message").to_pylist()[0] == ndm.omm.index(truths[0])
+    assert all(isinstance(omm, Omm) for omm in omms)
+    for omm, truth in zip(omms, truths):
+        assert omm.header == truth.header
+        assert omm.body.segment.metadata == truth.body.segment.metadata
+        mean_elements = omm.body.segment.data.mean_elements
+        truth_elements = truth.body.segment.data.mean_elements
+        assert mean_elements.inclination == truth_elements.inclination
+        assert parse_epochs_ns([mean_elements.epoch]) == parse_epochs_ns(
+            [truth_elements.epoch]
+        )
+        assert omm.body.segment.data.tle_parameters == (
+            truth.body.segment.data.tle_parameters
+        )
+
+
+def test_streaming(tmp_path, data_path):
+    """Tests the batched output of the lazy NDM objects to Parquet and IPC."""
+    path, record_type = file_paths["OEM"]
+    truth = to_arrow(NdmIo().from_path(data_path(path)), record_type)
+
+    def _lazy_ndms():
+        for _ in range(3):
+            ndm = NdmIo().from_path(data_path(path), lazy=True)
+            yield ndm
+            # data is parsed for the output, but not kept in the message
+            assert is_lazy(ndm)
+
+    batches = list(record_batches(_lazy_ndms(), record_type, batch_size=10))
+    assert [batch.num_rows for batch in batches[:-1]] == [10] * (len(batches) - 1)
+    assert sum(batch.num_rows for batch in batches) == 3 * truth.num_rows
+    assert batches[-1].column(0).to_pylist()[-1] == 2
+
+    parquet_path = tmp_path.joinpath("test.parquet")
+    write_parquet(_lazy_ndms(), parquet_path, record_type, batch_size=10)
+    assert len(read_parquet(parquet_path)) == 3
+
+    sink = io.BytesIO()
+    write_ipc(_lazy_ndms(), sink, record_type, batch_size=10)
+    ndms = read_ipc(sink.getvalue())
+    assert len(ndms) == 3
+    assert (
+        to_arrow(ndms[2], record_type)
+        .drop_columns(["message"])
+        .equals(truth.drop_columns(["message"]))
+    )
+
+    ipc_path = tmp_path.joinpath("test.arrows")
+    write_ipc(_lazy_ndms(), ipc_path, record_type)
+    assert len(read_ipc(ipc_path)) == 3
+
+
+def test_invalid_input(data_path):
+    """Tests the unknown record types and tables."""
+    with pytest.raises(ValueError):
+        record_schema("opm")
+
+    with pytest.raises(ValueError):
+        from_arrow(pa.table({"x": [1.0]}))
+
+    oem = NdmIo().from_path(data_path(file_paths["OEM"][0]))
+    tdm = NdmIo().from_path(data_path(file_paths["TDM"][0]))
+    with pytest.raises(ValueError):
+        from_arrow(
+            [to_arrow(oem, "oem_state_vector"), to_arrow(tdm, "tdm_observation")]
+        )
+
+    assert to_arrow(oem, "tdm_observation").num_rows == 0
+    assert from_arrow([]) == []
@@ -0,0 +1,100 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the on-disk parse cache.
+
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.ndm_cache import ParseCache
+from ccsds_ndm.ndm_io import NdmIo
+
+file_paths = {
+    "CDMv2": Path("data", "kvn", "cdm_example_section4.kvn"),
+    "OEMv2_1": Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"),
+    "OEMv2_2": Path("data", "xml", "ndmxml-1.0-oem-2.0-single.xml"),
+    "OMMv2": Path("data", "xml", "omm_combined.xml"),
+    "TDMv2": Path("data", "kvn", "tdm_opt_data.kvn"),
+}
+
+
+def _cached_read(cache_dir, path):
+    """Reads the file through the cache (for the multi-process test)."""
+    return NdmIo().from_path(path, cache=ParseCache(cache_dir))
+
+
+@pytest.mark.parametrize("numeric", ["decimal", "raw"])
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_cached_read(tmp_path, ndm_key, numeric, data_path):
+    """Tests the cache hits against the parsed object trees."""
+    path = data_path(file_paths[ndm_key])
+    cache = ParseCache(tmp_path)
+    key = ParseCache.key(path.read_bytes(), numeric)
+
+    truth = NdmIo().from_path(path, numeric=numeric)
+
+    assert cache.get(key) is None
+    assert NdmIo().from_path(path, numeric=numeric, cache=cache) == truth
+    assert cache.get(key) == truth
+    assert NdmIo().from_path(path, numeric=numeric, cache=cache) == truth
+
+
+def test_keys(data_path):
+    """Tests that the keys depend on the contents and the options."""
+    data = data_path(file_paths["OEMv2_1"]).read_bytes()
+
+    assert ParseCache.key(data) == ParseCache.key(data, "DECIMAL")
+    assert ParseCache.key(data) != ParseCache.key(data, "float")
+    assert ParseCache.key(data) != ParseCache.key(data + b"\n")
+
+
+def test_eviction(tmp_path):
+    """Tests the least recently used entries are evicted first."""
+    cache = ParseCache(tmp_path, max_size=10_000)
+
+    cache.put("aa01", "x" * 4000)
+    cache.put("aa02", "x" * 4000)
+    os.utime(cache._entry_path("aa01"), ns=(1, 1))
+    os.utime(cache._entry_path("aa02"), ns=(2, 2))
+
+    # use the older entry, then add a third one
+    assert cache.get("aa01") == "x" * 4000
+    cache.put("bb03", "x" * 4000)
+
+    assert cache.get("aa02") is None
+    assert cache.get("aa01") is not None
+    assert cache.get("bb03") is not None
+    assert cache.size() <= 10_000
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_broken_entry(tmp_path):
+    """Tests that broken entries are discarded."""
+    cache = ParseCache(tmp_path)
+    cache.put("cc01", [1, 2, 3])
+    cache._entry_path("cc01").write_bytes(b"broken")
+
+    assert cache.get("cc01") is None
+    assert not cache._entry_path("cc01").exists()
+
+
+def test_multi_process(tmp_path, data_path):
+    """Tests several processes reading through the same cache."""
+    paths = [data_path(path) for path in file_paths.values()] * 3
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_cached_read, [tmp_path] * len(paths), paths))
+
+    for path, result in zip(paths, results):
+        assert result == NdmIo().from_path(path)
+    assert not list(tmp_path.glob("*/*.tmp"))
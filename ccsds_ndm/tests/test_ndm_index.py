@@ -0,0 +1,184 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the sidecar byte offset index.
+
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.ndm_index import NdmIndex, index_path_for, open_index
+from ccsds_ndm.ndm_io import NdmIo
+
+file_paths = {
+    "AEM": Path("data", "kvn", "adm-testcase04a_multi.kvn"),
+    "OEM_1": Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"),
+    "OEM_2": Path("data", "kvn", "odmv2-testcase6_abbrev.kvn"),
+    "TDM": Path("data", "kvn", "tdm_opt_data.kvn"),
+}
+
+
+def _copy_to(data_path, tmp_path, ndm_key):
+    """Copies the test file to the temporary directory."""
+    file_path = tmp_path.joinpath(file_paths[ndm_key].name)
+    shutil.copy(data_path(file_paths[ndm_key]), file_path)
+    return file_path
+
+
+def _window_values(ndm_obj, start_ns, stop_ns):
+    """Epochs and values of all data lines within the window."""
+    epochs = []
+    values = []
+    for segment in ndm_obj.body.segment:
+        columns = segment_columns(segment)
+        mask = (columns.epochs_ns >= start_ns) & (columns.epochs_ns <= stop_ns)
+        epochs.append(columns.epochs_ns[mask])
+        data = columns.states if hasattr(columns, "states") else columns.values
+        values.append(data[mask].ravel())
+    return np.concatenate(epochs), np.concatenate(values)
+
+
+@pytest.mark.parametrize("step", [1, 3, 100])
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_read_window(ndm_key, step, data_path):
+    """Tests the data lines read within the windows against the full read."""
+    path = data_path(file_paths[ndm_key])
+
+    index = NdmIndex.build(path, step)
+    ndm = NdmIo().from_path(path)
+
+    all_epochs = np.concatenate(
+        [segment_columns(segment).epochs_ns for segment in ndm.body.segment]
+    )
+    assert index.line_counts.sum() == len(all_epochs)
+
+    for start, stop in [(0, -1), (1, 2), (len(all_epochs) // 3, -3), (-1, -1)]:
+        start_ns, stop_ns = all_epochs[start], all_epochs[stop]
+        window = index.read_window(start_ns, stop_ns)
+
+        truth_epochs, truth_values = _window_values(ndm, start_ns, stop_ns)
+        epochs, values = _window_values(window, start_ns, stop_ns)
+
+        np.testing.assert_array_equal(epochs, truth_epochs)
+        np.testing.assert_array_equal(values, truth_values)
+
+
+def test_read_window_strings(data_path):
+    """Tests the window with epoch strings, within a single segment."""
+    index = NdmIndex.build(data_path(file_paths["OEM_1"]), 4)
+
+    window = index.read_window("2009-02-28T01:12:40", "2009-02-28T01:12:50")
+
+    assert len(window.body.segment) == 1
+    assert window.header.originator == "ESOC"
+    state_vectors = window.body.segment[0].data.state_vector
+    assert [sv.epoch for sv in state_vectors] == [
+        "2009-02-28T01:12:40.69839998",
+        "2009-02-28T01:12:43.92459993",
+        "2009-02-28T01:12:47.15079992",
+    ]
+    assert not index.read_window(
+        "2030-01-01T00:00:00", "2031-01-01T00:00:00"
+    ).body.segment
+
+
+def test_read_window_empty_first_segment(tmp_path, data_path):
+    """Tests the windows outside the data, with an empty first segment."""
+    lines = data_path(file_paths["OEM_1"]).read_text().splitlines(keepends=True)
+    # keep the first segment without data lines and the second segment
+    file_path = tmp_path.joinpath("empty_first_segment.kvn")
+    file_path.write_text("".join(lines[:19] + lines[32:57]))
+
+    index = NdmIndex.build(file_path, 2)
+    assert index.segment_count == 2
+    assert index.line_counts.tolist() == [0, 10]
+
+    window = index.read_window("2030-01-01T00:00:00", "2031-01-01T00:00:00")
+    assert not window.body.segment
+    assert window.header.originator == "ESOC"
+    assert window.header.creation_date == "2009-03-11T13:58:24"
+
+    window = index.read_window("2009-02-28T01:13:00", "2009-02-28T01:15:00")
+    assert len(window.body.segment) == 1
+    assert len(window.body.segment[0].data.state_vector) == 3
+
+
+def test_open_index(tmp_path, data_path):
+    """Tests saving and loading the index, next to the file or in a cache dir."""
+    file_path = _copy_to(data_path, tmp_path, "TDM")
+
+    index = open_index(file_path, step=10)
+    index_path = index_path_for(file_path)
+
+    assert index_path == tmp_path.joinpath("tdm_opt_data.kvn.ndmidx")
+    assert index_path.exists()
+
+    loaded = open_index(file_path, step=10)
+    assert loaded.fingerprint == index.fingerprint
+    np.testing.assert_array_equal(loaded.entry_offsets, index.entry_offsets)
+    np.testing.assert_array_equal(loaded.entry_epochs_ns, index.entry_epochs_ns)
+
+    cache_dir = tmp_path.joinpath("cache")
+    open_index(file_path, step=10, cache_dir=cache_dir)
+    assert index_path_for(file_path, cache_dir).parent == cache_dir
+    assert index_path_for(file_path, cache_dir).exists()
+
+
+def test_append_and_modify(tmp_path, data_path):
+    """Tests the incremental update after appending and the rebuild."""
+    file_path = _copy_to(data_path, tmp_path, "OEM_1")
+    text = file_path.read_text()
+    last_segment = text[text.rindex("META_START") :]
+
+    index = open_index(file_path, step=2)
+    assert index.segment_count == 3
+
+    # add a copy of the last segment
+    with open(file_path, "a") as f:
+        f.write("\n" + last_segment)
+
+    assert not index.is_valid()
+    with pytest.raises(RuntimeError):
+        index.read_window(0, 1)
+
+    updated = open_index(file_path, step=2)
+    truth = NdmIndex.build(file_path, step=2)
+
+    assert updated.segment_count == 4
+    assert updated.is_valid()
+    np.testing.assert_array_equal(updated.segment_blocks, truth.segment_blocks)
+    np.testing.assert_array_equal(updated.entry_offsets, truth.entry_offsets)
+    np.testing.assert_array_equal(updated.entry_epochs_ns, truth.entry_epochs_ns)
+
+    # rewrite the file with different contents
+    file_path.write_text(text.replace("ESOC", "XXXX"))
+    assert not updated.is_valid()
+
+    rebuilt = open_index(file_path, step=2)
+    assert rebuilt.segment_count == 3
+    assert rebuilt.read_window(0, 2**62).header.originator == "XXXX"
+
+    # same size and modification time, detected by the fingerprint
+    file_path.write_text(text.replace("ESOC", "YYYY"))
+    os.utime(file_path, ns=(rebuilt.mtime_ns, rebuilt.mtime_ns))
+    assert not rebuilt.is_valid()
+
+
+def test_unsupported(tmp_path, data_path):
+    """Tests the unsupported files."""
+    with pytest.raises(ValueError):
+        NdmIndex.build(data_path(Path("data", "kvn", "omm1_st.kvn")))
+
+    index_path = tmp_path.joinpath("broken.ndmidx")
+    index_path.write_bytes(b"not an index")
+    with pytest.raises(ValueError):
+        NdmIndex.load(index_path, tmp_path.joinpath("broken"))
@@ -7,6 +7,10 @@
 Tests for the NDM File I/O Operations for the top level wrapper.
 
 """
+import ast
+import pickle
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -113,6 +117,41 @@ def test_write_kvn_string():
     assert kvn_text_truth == kvn_text
 
 
+@pytest.mark.parametrize("quaternion_type", ["FIRST", "LAST"])
+def test_write_aem_quaternion_derivative(quaternion_type):
+    """Tests writing the AEM quaternion derivative lines in KVN."""
+    kvn_text = "\n".join(
+        [
+            "CCSDS_AEM_VERS = 1.0",
+            "CREATION_DATE = 2021-01-01T00:00:00",
+            "ORIGINATOR = TEST",
+            "META_START",
+            "OBJECT_NAME = TEST SAT",
+            "OBJECT_ID = 2021-001A",
+            "REF_FRAME_A = EME2000",
+            "REF_FRAME_B = SC_BODY",
+            "ATTITUDE_DIR = A2B",
+            "TIME_SYSTEM = UTC",
+            "START_TIME = 2021-01-01T00:00:00",
+            "STOP_TIME = 2021-01-01T00:00:10",
+            "ATTITUDE_TYPE = QUATERNION/DERIVATIVE",
+            f"QUATERNION_TYPE = {quaternion_type}",
+            "META_STOP",
+            "DATA_START",
+            "2021-01-01T00:00:00 0.1 0.2 0.3 0.927 0.001 0.002 0.003 0.004",
+            "2021-01-01T00:00:10 0.2 0.3 0.4 0.843 0.005 0.006 0.007 0.008",
+            "DATA_STOP",
+            "",
+        ]
+    )
+    aem = NdmIo().from_string(kvn_text)
+
+    out_text = NdmIo().to_string(aem, NDMFileFormats.KVN)
+    out_lines = [line.split() for line in out_text.splitlines()]
+    assert kvn_text.splitlines()[-2].split() in out_lines
+    assert NdmIo().from_string(out_text) == aem
+
+
 def test_write_json_string():
     """Tests writing JSON data as string."""
     with pytest.raises(NotImplementedError):
@@ -135,3 +174,45 @@ def test_write_json_string():
 
         # compare strings
         assert kvn_text_truth == kvn_text
+
+
+def test_lazy_imports():
+    """Tests the backends and the NDM classes imported on first use."""
+    script = (
+        "import sys\n"
+        "import ccsds_ndm.ndm_io\n"
+        "print(sorted(m for m in sys.modules if m.startswith(('ccsds', 'xsdata'))))\n"
+        "from ccsds_ndm.models.ndmxml2 import OmmType\n"
+        "print(sorted(m for m in sys.modules if '.ndmxml_' in m))\n"
+        "from ccsds_ndm.models.ndmxml2 import Omm\n"
+        "print(sum('.ndmxml_' in m for m in sys.modules))\n"
+    )
+    # fresh interpreter, run from the repository root
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    assert ast.literal_eval(output[0]) == ["ccsds_ndm", "ccsds_ndm.ndm_io"]
+    assert [module.rsplit(".", 1)[1] for module in ast.literal_eval(output[1])] == [
+        "ndmxml_2_0_0_common_2_0",
+        "ndmxml_2_0_0_omm_2_0",
+    ]
+    # the root element classes load the master module and all the message types
+    assert int(output[2]) == 11
+
+    # public names unchanged
+    from ccsds_ndm.models import ndmxml2
+    from ccsds_ndm.models.ndmxml2 import Omm, ndmxml_2_0_0_master_2_0
+    from ccsds_ndm.ndm_io import NdmXmlIo
+    from ccsds_ndm.ndm_xml_io import NdmXmlIo as xml_io_class
+
+    assert NdmXmlIo is xml_io_class
+    assert Omm is ndmxml_2_0_0_master_2_0.Omm
+    assert pickle.loads(pickle.dumps(Omm)) is Omm
+    assert Omm.Meta.name == "omm"
+    assert {"Omm", "OmmType", "TdmSegment"} <= set(dir(ndmxml2))
+    with pytest.raises(AttributeError):
+        ndmxml2.Xyz
@@ -12,6 +12,7 @@ from pathlib import Path
 
 import pytest
 
+from ccsds_ndm.columnar import clear_columns, message_columns
 from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
 from ccsds_ndm.ndm_kvn_io import NdmKvnIo
 
@@ -183,3 +184,13 @@ def _text_to_list(text):
 
     # clean up runaway empty lines
     return [line for line in txt_list if line[0].strip() != ""]
+
+
+def test_write_with_cached_columns(data_path):
+    """Tests that the cached columnar views are not written to KVN."""
+    oem = NdmIo().from_path(data_path(kvn_xml_file_paths["OEMv2_2"]))
+    text = NdmIo().to_string(oem, NDMFileFormats.KVN)
+
+    message_columns(oem)
+    assert NdmIo().to_string(oem, NDMFileFormats.KVN) == text
+    clear_columns(oem)
@@ -0,0 +1,141 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the lazy materialisation of the data blocks.
+
+"""
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.models.ndmxml2 import OemData
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+from ccsds_ndm.ndm_lazy import is_lazy, materialise
+from ccsds_ndm.ndm_xml_io import NdmXmlIo
+
+lazy_file_paths = {
+    "AEM_KVN": Path("data", "kvn", "adm-testcase04a_multi.kvn"),
+    "AEM_XML": Path("data", "kvn", "adm-testcase04a_multi.xml"),
+    "OEM_KVN": Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"),
+    "OEM_XML": Path("data", "xml", "ndmxml-1.0-oem-2.0-single.xml"),
+    "TDM_KVN": Path("data", "kvn", "tdm_opt_data.kvn"),
+    "TDM_XML": Path("data", "xml", "tdm-testcase01a-fordocument.xml"),
+}
+
+eager_file_paths = {
+    "CDM_KVN": Path("data", "kvn", "cdm_example_section4.kvn"),
+    "OMM_XML": Path("data", "xml", "ndmxml-1.0-omm-2.0.xml"),
+    "NDM_XML": Path("data", "xml", "omm_combined.xml"),
+}
+
+
+@pytest.mark.parametrize("from_path", [True, False])
+@pytest.mark.parametrize("ndm_key", lazy_file_paths.keys())
+def test_lazy_read(ndm_key, from_path, data_path):
+    """Tests the lazy read against the full read."""
+    path = data_path(lazy_file_paths[ndm_key])
+    ndm_full = NdmIo().from_path(path)
+
+    if from_path:
+        ndm_lazy = NdmIo().from_path(path, lazy=True)
+    else:
+        ndm_lazy = NdmIo().from_string(path.read_text(), lazy=True)
+
+    # header and metadata are available, data is not parsed yet
+    assert is_lazy(ndm_lazy)
+    assert ndm_lazy.header == ndm_full.header
+    for segment, segment_full in zip(ndm_lazy.body.segment, ndm_full.body.segment):
+        assert segment.metadata == segment_full.metadata
+    assert "not loaded" in repr(ndm_lazy.body.segment[0].data)
+
+    assert ndm_lazy == ndm_full
+    assert not is_lazy(ndm_lazy)
+
+
+@pytest.mark.parametrize(
+    "ndm_key", [ndm_key for ndm_key in lazy_file_paths if ndm_key.endswith("XML")]
+)
+def test_lazy_xml_from_bytes(ndm_key, data_path):
+    """Tests the lazy read of XML bytes with the XML reader."""
+    path = data_path(lazy_file_paths[ndm_key])
+    ndm_full = NdmXmlIo().from_path(path)
+
+    ndm_lazy = NdmXmlIo().from_bytes(path.read_bytes(), lazy=True)
+    assert is_lazy(ndm_lazy)
+    assert ndm_lazy == ndm_full
+
+
+def test_lazy_single_segment(data_path):
+    """Tests that only the accessed segment is parsed."""
+    path = data_path(lazy_file_paths["OEM_KVN"])
+    oem_full = NdmIo().from_path(path)
+    oem = NdmIo().from_path(path, lazy=True)
+
+    data = oem.body.segment[1].data
+    assert isinstance(data, OemData)
+    assert "not loaded" in repr(data)
+
+    state_vector = data.state_vector
+    assert type(data) is OemData
+    assert state_vector == oem_full.body.segment[1].data.state_vector
+
+    assert "not loaded" in repr(oem.body.segment[0].data)
+    assert is_lazy(oem)
+
+    # columnar views work on lazy data
+    assert segment_columns(oem.body.segment[2]).states.shape == (12, 6)
+
+    materialise(oem)
+    assert not is_lazy(oem)
+
+
+@pytest.mark.parametrize("data_format", [NDMFileFormats.XML, NDMFileFormats.KVN])
+def test_lazy_write(data_format, data_path):
+    """Tests writing the lazy objects without accessing the data."""
+    path = data_path(lazy_file_paths["TDM_KVN"])
+
+    out_full = NdmIo().to_string(NdmIo().from_path(path), data_format)
+    out_lazy = NdmIo().to_string(NdmIo().from_path(path, lazy=True), data_format)
+
+    assert out_lazy == out_full
+
+
+def test_lazy_numeric_and_pickle(data_path):
+    """Tests the numeric backend and pickling of the lazy objects."""
+    path = data_path(lazy_file_paths["OEM_XML"])
+    oem = NdmIo().from_path(path, numeric="float", lazy=True)
+
+    oem_copy = pickle.loads(pickle.dumps(oem))
+
+    assert type(oem_copy.body.segment[0].data) is OemData
+    assert isinstance(oem_copy.body.segment[0].data.state_vector[0].x.value, float)
+    assert oem_copy == oem
+
+
+@pytest.mark.parametrize("ndm_key", eager_file_paths.keys())
+def test_lazy_unsupported(ndm_key, data_path):
+    """Tests the fallback to full read for the unsupported types."""
+    path = data_path(eager_file_paths[ndm_key])
+
+    ndm = NdmIo().from_path(path, lazy=True)
+
+    assert not is_lazy(ndm)
+    assert ndm == NdmIo().from_path(path)
+
+
+def test_lazy_modified_file(tmp_path, data_path):
+    """Tests the error when the file is modified before the data is loaded."""
+    path = tmp_path.joinpath("oem.kvn")
+    path.write_text(data_path(lazy_file_paths["OEM_KVN"]).read_text())
+
+    oem = NdmIo().from_path(path, lazy=True)
+    path.write_text(path.read_text() + "\n")
+
+    with pytest.raises(RuntimeError):
+        materialise(oem)
@@ -0,0 +1,130 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the parallel parsing of the NDM files.
+
+"""
+
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.models.ndmxml2 import Ndm, Oem, Omm, Opm
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_kvn_io import _split_kvn_segments
+from ccsds_ndm.ndm_parallel import (
+    chunk_ranges,
+    iter_ndm_members,
+    read_kvn_parallel,
+    read_ndm_parallel,
+)
+from ccsds_ndm.ndm_xml_io import _split_ndm_members
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+oem_cov_file_path = Path("data", "kvn", "odmv2-testcase6_abbrev.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+tdm_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+opm_file_path = Path("data", "kvn", "502x0b2c1e2_fig3_2_opm.kvn")
+omm_combined_file_path = Path("data", "xml", "omm_combined.xml")
+odm_combined_file_path = Path("data", "xml", "ndmxml-1.0-odm.xml")
+omm_single_file_path = Path("data", "xml", "omm_single_ndm.xml")
+oem_xml_file_path = Path("data", "xml", "ndmxml-1.0-oem-2.0-single.xml")
+
+
+@pytest.mark.parametrize(
+    "file_path", [oem_file_path, oem_cov_file_path, aem_file_path, tdm_file_path]
+)
+@pytest.mark.parametrize("numeric", ["decimal", "float"])
+def test_segments_parallel(file_path, numeric, data_path):
+    """Tests the segments parsed in separate workers against the full parse."""
+    file_path = data_path(file_path)
+    ndm = read_kvn_parallel(file_path, numeric=numeric, workers=2, chunk_size=1)
+    assert ndm == NdmIo().from_path(file_path, numeric=numeric)
+
+
+def test_fallback(data_path):
+    """Tests the sequential parsing of the small and unsupported files."""
+    for file_path in [oem_file_path, opm_file_path]:
+        file_path = data_path(file_path)
+        expected = NdmIo().from_path(file_path)
+        assert read_kvn_parallel(file_path, workers=2) == expected
+        assert NdmIo().from_path(file_path, workers=None) == expected
+
+
+def test_chunk_ranges(data_path):
+    """Tests the grouping of the segments into byte ranges."""
+    buffer = data_path(oem_file_path).read_bytes()
+    _, segment_blocks = _split_kvn_segments(buffer)
+    starts = [block[0] for block in segment_blocks]
+
+    chunks = chunk_ranges(segment_blocks, 1)
+    assert [start for start, _ in chunks] == starts
+    assert chunks[-1][1] == len(buffer)
+
+    # contiguous ranges, first segment alone
+    first_size = segment_blocks[0][3] - segment_blocks[0][0]
+    chunks = chunk_ranges(segment_blocks, first_size)
+    assert chunks == [(starts[0], starts[1]), (starts[1], len(buffer))]
+    assert chunk_ranges(segment_blocks, len(buffer)) == [(starts[0], len(buffer))]
+
+
+@pytest.mark.parametrize(
+    "file_path",
+    [
+        omm_combined_file_path,
+        odm_combined_file_path,
+        omm_single_file_path,
+        oem_xml_file_path,
+    ],
+)
+def test_ndm_parallel(file_path, data_path):
+    """Tests the combined NDM members parsed in separate workers."""
+    file_path = data_path(file_path)
+    expected = NdmIo().from_path(file_path)
+    assert read_ndm_parallel(file_path, workers=2, chunk_size=1) == expected
+    assert NdmIo().from_path(file_path, workers=2) == expected
+
+
+def test_ndm_members(data_path):
+    """Tests the members of the combined NDM, with their order and classes."""
+    file_path = data_path(odm_combined_file_path)
+    ndm = read_ndm_parallel(file_path, workers=2, chunk_size=1)
+    assert isinstance(ndm, Ndm)
+    assert ndm.comment == ["This instantiation is compatible with NDM/XML R2.0"]
+
+    members = list(iter_ndm_members(file_path, workers=2, chunk_size=1))
+    assert [type(member) for member in members] == [Opm, Opm, Oem]
+    assert members == ndm.opm + ndm.oem
+    assert list(iter_ndm_members(file_path)) == members
+
+    # lazy iteration, stopped early
+    members = iter_ndm_members(
+        data_path(omm_combined_file_path), workers=2, chunk_size=1
+    )
+    first = next(members)
+    members.close()
+    assert type(first) is Omm
+
+    # not a combined NDM
+    file_path = data_path(oem_xml_file_path)
+    assert list(iter_ndm_members(file_path)) == [NdmIo().from_path(file_path)]
+
+
+def test_split_ndm_members():
+    """Tests the member boundaries and the namespaces of the combined NDM."""
+    buffer = (
+        b'<?xml version="1.0"?>\n<ndm xmlns:xsi="http://x" a="1">'
+        b"<MESSAGE_ID>x</MESSAGE_ID><omm/><opm id='a'>\n<omm_x/></opm></ndm>"
+    )
+    namespaces, members = _split_ndm_members(buffer)
+    assert namespaces == b' xmlns:xsi="http://x"'
+    assert [(buffer[start:end], clazz) for start, end, clazz in members] == [
+        (b"<omm/>", Omm),
+        (b"<opm id='a'>\n<omm_x/></opm>", Opm),
+    ]
+
+    assert _split_ndm_members(b"<omm></omm>") is None
+    assert _split_ndm_members(b"<ndm><omm></ndm>") is None
@@ -0,0 +1,85 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the header and metadata scan.
+
+"""
+
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_scan import _records_from_object, scan_path, scan_string
+
+fast_scan_paths = {
+    "AEM_KVN": Path("data", "kvn", "adm-testcase04a_multi.kvn"),
+    "AEM_XML": Path("data", "kvn", "adm-testcase04a_multi.xml"),
+    "OEM_KVN": Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"),
+    "OEM_XML": Path("data", "kvn", "odmv2-testcase7a_xxx.xml"),
+    "OEM_XML_2": Path("data", "xml", "ndmxml-1.0-oem-2.0-single.xml"),
+}
+
+
+@pytest.mark.parametrize("ndm_key", fast_scan_paths.keys())
+def test_scan_against_full_read(ndm_key, data_path):
+    """Tests the scan results against the fully parsed object."""
+    path = data_path(fast_scan_paths[ndm_key])
+
+    records = scan_path(path)
+    truth = _records_from_object(NdmIo().from_path(path))
+
+    assert len(records) == len(truth)
+    for record, truth_record in zip(records, truth):
+        assert record._replace(offset=None) == truth_record
+
+
+@pytest.mark.parametrize("ndm_key", fast_scan_paths.keys())
+def test_scan_offsets(ndm_key, data_path):
+    """Tests the segment offsets in the source."""
+    path = data_path(fast_scan_paths[ndm_key])
+    text = path.read_text()
+
+    records = scan_string(text)
+
+    assert records == scan_path(path)
+    for record in records:
+        assert text[record.offset :].lstrip().startswith(("META_START", "<segment"))
+
+
+def test_scan_tdm(data_path):
+    """Tests the scan of TDM files, values are kept as in the source."""
+    records = scan_path(data_path(Path("data", "kvn", "tdm_opt_data.kvn")))
+
+    assert [record.index for record in records] == [0, 1, 2]
+    assert records[0].ndm_type == "TDM"
+    assert records[0].version == "1.0"
+    assert records[0].header["ORIGINATOR"] == "JPL"
+    assert records[1].metadata["PATH"] == "1,2,1"
+    assert records[1].metadata["TRANSMIT_DELAY_1"] == "7.7e-05"
+    assert "COMMENT" not in records[1].metadata
+
+
+def test_scan_full_parse_fallback(data_path):
+    """Tests the scan of the message types without bulk data."""
+    opm_records = scan_path(
+        data_path(Path("data", "kvn", "502x0b2c1e2_fig3_4_opm.kvn"))
+    )
+    cdm_records = scan_path(data_path(Path("data", "xml", "cdm_example_section4.xml")))
+    ndm_records = scan_path(data_path(Path("data", "xml", "omm_combined.xml")))
+
+    assert len(opm_records) == 1
+    assert opm_records[0].offset is None
+    assert opm_records[0].metadata["OBJECT_NAME"] == "EUTELSAT W4"
+    assert opm_records[0].header["ORIGINATOR"] == "GSOC"
+
+    assert [record.metadata["OBJECT"] for record in cdm_records] == [
+        "OBJECT1",
+        "OBJECT2",
+    ]
+
+    assert len(ndm_records) == 20
+    assert {record.ndm_type for record in ndm_records} == {"OMM"}
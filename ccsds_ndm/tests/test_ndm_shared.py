@@ -0,0 +1,95 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the parallel reading of the columnar sections in shared memory.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.covariance import oem_covariances
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_shared import read_columns_parallel
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+oem_cov_file_path = Path("data", "kvn", "odmv2-testcase6_abbrev.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+tdm_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+opm_file_path = Path("data", "kvn", "502x0b2c1e2_fig3_2_opm.kvn")
+
+
+@pytest.mark.parametrize(
+    "file_path", [oem_file_path, oem_cov_file_path, aem_file_path, tdm_file_path]
+)
+def test_shared_columns(file_path, data_path):
+    """Tests the shared arrays against the columnar views of the full parse."""
+    file_path = data_path(file_path)
+    ndm = NdmIo().from_path(file_path, numeric="float")
+
+    with read_columns_parallel(file_path, workers=2, chunk_size=1) as shared:
+        assert shared.header == ndm.header
+        assert len(shared) == len(ndm.body.segment)
+        for section, columns in zip(shared, message_columns(ndm)):
+            assert section.metadata == columns.metadata
+            np.testing.assert_array_equal(
+                section.arrays["epochs_ns"], columns.epochs_ns
+            )
+            if "states" in section.arrays:
+                np.testing.assert_array_equal(section.arrays["states"], columns.states)
+            elif "keywords" in section.arrays:
+                keywords = np.array(section.labels["keywords"])
+                assert keywords[section.arrays["keywords"]].tolist() == list(
+                    columns.keywords
+                )
+                np.testing.assert_array_equal(section.arrays["values"], columns.values)
+            else:
+                assert section.labels["values"] == columns.names
+                np.testing.assert_array_equal(section.arrays["values"], columns.values)
+        del section
+
+
+def test_covariances(data_path):
+    """Tests the OEM covariance sections, in the current process."""
+    file_path = data_path(oem_cov_file_path)
+    stack = oem_covariances(NdmIo().from_path(file_path, numeric="float"))
+
+    with read_columns_parallel(file_path, workers=1) as shared:
+        arrays = shared[0].arrays
+        labels = shared[0].labels
+        np.testing.assert_array_equal(arrays["covariances"], stack.matrices[:2])
+        np.testing.assert_array_equal(
+            arrays["covariance_epochs_ns"], stack.epochs_ns[:2]
+        )
+        assert labels["covariance_ref_frames"] == ["EME2000"]
+        assert "accelerations" not in arrays
+        del arrays
+
+
+def test_release(data_path):
+    """Tests the release of the shared memory with referenced arrays."""
+    file_path = data_path(oem_file_path)
+    shared = read_columns_parallel(file_path, workers=2, chunk_size=1)
+    states = shared[0].arrays["states"].copy()
+    epochs_ns = shared[2].arrays["epochs_ns"]
+
+    with pytest.raises(BufferError):
+        shared.close()
+    assert len(shared) == 0
+
+    # released once the arrays are not referenced
+    del epochs_ns
+    shared.close()
+    assert states.shape == (11, 6)
+
+
+def test_invalid_input(data_path):
+    """Tests the message types without columnar sections."""
+    with pytest.raises(TypeError):
+        read_columns_parallel(data_path(opm_file_path))
@@ -0,0 +1,131 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the binary snapshot format.
+
+"""
+
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+from ccsds_ndm.ndm_lazy import is_lazy, materialise
+from ccsds_ndm.ndm_snapshot import (
+    _PREFIX,
+    from_snapshot,
+    load_snapshot,
+    save_snapshot,
+    to_snapshot,
+)
+
+file_paths = {
+    "AEM": Path("data", "kvn", "adm-testcase04a_multi.kvn"),
+    "APM": Path("data", "kvn", "504x0b1c1_fig3_8_apm.xml"),
+    "CDM": Path("data", "kvn", "cdm_example_section4.kvn"),
+    "OEM_1": Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"),
+    "OEM_2": Path("data", "xml", "ndmxml-1.0-oem-2.0-single.xml"),
+    "OMM": Path("data", "xml", "omm_combined.xml"),
+    "OPM": Path("data", "kvn", "502x0b2c1e2_fig3_4_opm.kvn"),
+    "RDM": Path("data", "kvn", "508x1b1_figc_2_rdm.kvn"),
+    "TDM": Path("data", "kvn", "tdm_opt_data.kvn"),
+}
+
+
+def _assert_same_tree(value, truth):
+    """Checks the values and their exact types throughout the tree."""
+    assert type(value) is type(truth)
+    if isinstance(truth, list):
+        assert len(value) == len(truth)
+        for item, truth_item in zip(value, truth):
+            _assert_same_tree(item, truth_item)
+    elif hasattr(truth, "__dataclass_fields__"):
+        assert vars(value).keys() == vars(truth).keys()
+        for name, truth_item in vars(truth).items():
+            _assert_same_tree(getattr(value, name), truth_item)
+    else:
+        # compare the strings as well, e.g. for the Decimal exponents
+        assert value == truth or value != value
+        assert str(value) == str(truth)
+
+
+@pytest.mark.parametrize("numeric", ["decimal", "float", "raw"])
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_round_trip(ndm_key, numeric, data_path):
+    """Tests the object trees restored from the snapshots."""
+    truth = NdmIo().from_path(data_path(file_paths[ndm_key]), numeric=numeric)
+
+    snapshot = to_snapshot(truth)
+
+    _assert_same_tree(from_snapshot(snapshot), truth)
+    lazy_ndm = from_snapshot(bytearray(snapshot), lazy=True)
+    _assert_same_tree(materialise(lazy_ndm), truth)
+
+
+@pytest.mark.parametrize("ndm_key", ["AEM", "OEM_1", "TDM"])
+def test_lazy_load(tmp_path, ndm_key, data_path):
+    """Tests the lazy load of the memory mapped snapshot file."""
+    path = data_path(file_paths[ndm_key])
+    truth = NdmIo().from_path(path)
+    snapshot_path = tmp_path.joinpath("test.ndmsnap")
+    save_snapshot(truth, snapshot_path)
+
+    ndm = load_snapshot(snapshot_path, lazy=True)
+
+    assert is_lazy(ndm)
+    assert ndm.header == truth.header
+    assert ndm.body.segment[0].metadata == truth.body.segment[0].metadata
+    assert ndm.body.segment[-1].data == truth.body.segment[-1].data
+    assert NdmIo().to_string(ndm, NDMFileFormats.KVN) == NdmIo().to_string(
+        truth, NDMFileFormats.KVN
+    )
+    assert not is_lazy(ndm)
+
+    _assert_same_tree(load_snapshot(snapshot_path), truth)
+
+
+def test_column_types(data_path):
+    """Tests the columns with missing values and unusual values."""
+    oem = NdmIo().from_path(data_path(file_paths["OEM_1"]))
+    state_vectors = oem.body.segment[0].data.state_vector
+    state_vectors[0].x.value = Decimal("-0E-9")
+    state_vectors[1].x.value = Decimal("1.234567890123456789012345")
+    state_vectors[2].x.value = Decimal("1.5E+12")
+    state_vectors[1].y.value = Decimal("NaN")
+    state_vectors[0].x_ddot = state_vectors[0].x_dot
+    state_vectors[2].epoch = "2009-02-28T01:12:47.15 (Üç)"
+    state_vectors[3].y_dot = None
+
+    _assert_same_tree(from_snapshot(to_snapshot(oem)), oem)
+
+
+def test_invalid_snapshots(tmp_path, data_path):
+    """Tests the contents that are not valid snapshots."""
+    header = NdmIo().from_path(data_path(file_paths["OPM"])).header
+    snapshot = to_snapshot(header)
+
+    with pytest.raises(ValueError):
+        from_snapshot(b"not a snapshot")
+
+    with pytest.raises(ValueError):
+        from_snapshot(snapshot[:8] + (999).to_bytes(4, "little") + snapshot[12:])
+
+    # class outside the models package
+    magic, version, flags, header_size = _PREFIX.unpack_from(snapshot)
+    contents = json.loads(snapshot[_PREFIX.size : _PREFIX.size + header_size])
+    contents["root"]["$class"] = "os.system"
+    header_bytes = json.dumps(contents).encode()
+    with pytest.raises(ValueError):
+        from_snapshot(
+            _PREFIX.pack(magic, version, flags, len(header_bytes)) + header_bytes
+        )
+
+    empty_path = tmp_path.joinpath("empty.ndmsnap")
+    empty_path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        load_snapshot(empty_path)
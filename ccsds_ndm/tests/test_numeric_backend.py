@@ -0,0 +1,148 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the selectable numeric backends.
+
+"""
+
+from dataclasses import fields, is_dataclass
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.ndm_io import NDMFileFormats, NdmIo
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+from ccsds_ndm.ndm_xml_io import NdmXmlIo
+from ccsds_ndm.numeric_backend import NumericBackend, RawNumber
+
+file_paths = {
+    "AEMv2": Path("data", "kvn", "adm-testcase04a_multi.kvn"),
+    "CDMv2": Path("data", "kvn", "cdm_example_section4.kvn"),
+    "OEMv2_1": Path("data", "kvn", "odmv2-testcase7a_xxx.kvn"),
+    "OEMv2_2": Path("data", "xml", "ndmxml-1.0-oem-2.0-single.xml"),
+    "OMMv2": Path("data", "kvn", "omm1_st.kvn"),
+    "OPMv2": Path("data", "kvn", "502x0b2c1e2_fig3_4_opm.kvn"),
+    "TDMv2_1": Path("data", "kvn", "tdm_opt_data.kvn"),
+    "TDMv2_2": Path("data", "xml", "tdm-testcase01a-fordocument.xml"),
+}
+
+numeric_types = {
+    "decimal": Decimal,
+    "float": float,
+    "raw": RawNumber,
+}
+
+
+def _numeric_values(ndm_obj):
+    """Collects all numeric values in the object tree in a flat list."""
+    if isinstance(ndm_obj, list):
+        return [value for item in ndm_obj for value in _numeric_values(item)]
+    if is_dataclass(ndm_obj):
+        return [
+            value
+            for fld in fields(ndm_obj)
+            for value in _numeric_values(getattr(ndm_obj, fld.name))
+        ]
+    if isinstance(ndm_obj, (Decimal, float, RawNumber)):
+        return [ndm_obj]
+    return []
+
+
+@pytest.mark.parametrize("numeric", ["decimal", "float", "raw"])
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_numeric_types(ndm_key, numeric, data_path):
+    """Tests the type of the parsed values for each backend."""
+    ndm = NdmIo().from_path(data_path(file_paths[ndm_key]), numeric=numeric)
+
+    values = _numeric_values(ndm)
+
+    assert values
+    assert all(type(value) is numeric_types[numeric] for value in values)
+
+
+@pytest.mark.parametrize("numeric", ["float", "raw"])
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_numeric_values(ndm_key, numeric, data_path):
+    """Tests the parsed values against the `Decimal` backend."""
+    path = data_path(file_paths[ndm_key])
+
+    truth = _numeric_values(NdmIo().from_path(path))
+    values = _numeric_values(NdmIo().from_path(path, numeric=numeric))
+
+    assert [float(value) for value in values] == [float(value) for value in truth]
+
+
+@pytest.mark.parametrize("data_format", [NDMFileFormats.XML, NDMFileFormats.KVN])
+@pytest.mark.parametrize("numeric", ["float", "raw"])
+@pytest.mark.parametrize("ndm_key", file_paths.keys())
+def test_round_trip(ndm_key, numeric, data_format, data_path):
+    """Tests writing and reading back the data for each backend."""
+    path = data_path(file_paths[ndm_key])
+
+    ndm = NdmIo().from_path(path, numeric=numeric)
+
+    out_text = NdmIo().to_string(ndm, data_format)
+    ndm_read_back = NdmIo().from_string(out_text, numeric=numeric)
+
+    assert _numeric_values(ndm_read_back) == _numeric_values(ndm)
+
+
+def test_raw_output_is_source_text(data_path):
+    """Tests that the raw backend writes the values exactly as they were read."""
+    path = data_path(file_paths["TDMv2_1"])
+
+    kvn_text = NdmKvnIo().to_string(NdmKvnIo().from_path(path, numeric="raw"))
+
+    assert "7.7e-05" in kvn_text
+    assert "68470.40883159501" in kvn_text
+
+
+def test_raw_number():
+    """Tests the lazy conversion and arithmetic of the raw numbers."""
+    value = RawNumber("1.50")
+
+    assert "_decimal" not in vars(value)
+    assert value + 1 == Decimal("2.50")
+    assert "_decimal" in vars(value)
+
+    assert value * 2.0 == 3.0
+    assert 3 - value == Decimal("1.5")
+    assert value == 1.5
+    assert value == RawNumber("1.5")
+    assert value != "1.50"
+    assert value < 2
+    assert float(value) == 1.5
+    assert str(value) == "1.50"
+
+    assert value // 1 == Decimal(1)
+    assert 4 // value == Decimal(2)
+    assert value % 1 == Decimal("0.50")
+    assert 4 % value == Decimal("1.00")
+    assert value % 1.0 == 0.5
+    assert 2**value == Decimal(2) ** Decimal("1.50")
+    assert round(value) == 2
+    assert round(RawNumber("1.2345"), 2) == Decimal("1.23")
+
+    # hash consistent with the equality, by numeric value
+    assert RawNumber("1.0") == Decimal(1)
+    assert hash(RawNumber("1.0")) == hash(Decimal(1))
+    assert len({RawNumber("1.0"), RawNumber("1.00"), Decimal(1), 1.0}) == 1
+    assert RawNumber("1.0") in {Decimal(1)}
+    assert RawNumber("1.0") != "1.0"
+    assert RawNumber("1.0") not in {"1.0"}
+
+    # not a number, by text
+    assert RawNumber("abc") == "abc"
+    assert RawNumber("abc") in {"abc"}
+
+
+def test_unknown_backend(data_path):
+    """Tests the unknown backend error."""
+    assert NumericBackend.find_element("FLOAT") is NumericBackend.FLOAT
+
+    with pytest.raises(ValueError):
+        NdmXmlIo().from_path(data_path(file_paths["OEMv2_2"]), numeric="int")
@@ -0,0 +1,164 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the streaming merge of the TDM observations.
+
+"""
+
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import message_columns
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_lazy import is_lazy
+from ccsds_ndm.tdm_merge import merge_tdms
+
+tdm_kvn_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+tdm_xml_file_path = Path("data", "xml", "tdm-testcase01a-fordocument.xml")
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+
+_TDM = """CCSDS_TDM_VERS = 1.0
+CREATION_DATE  = 2021-01-01T00:00:00
+ORIGINATOR     = TEST
+"""
+
+_SEGMENT = """
+META_START
+TIME_SYSTEM   = {time_system}
+START_TIME    = 2021-01-01T00:{start:02d}:00
+STOP_TIME     = 2021-01-01T00:59:59
+PARTICIPANT_1 = {station}
+PARTICIPANT_2 = TEST SAT
+MODE          = SEQUENTIAL
+PATH          = 1,2
+DATA_TYPES    = RANGE, ANGLE_1
+META_STOP
+
+DATA_START
+{data}
+DATA_STOP
+"""
+
+
+def _test_tdm(segments, time_system="UTC"):
+    """TDM with the (station, start minute, observation seconds) segments."""
+    text = [_TDM]
+    for station, start, seconds in segments:
+        data = []
+        for second in seconds:
+            epoch = f"2021-01-01T00:{second // 60:02d}:{second % 60:02d}"
+            data.append(f"RANGE   = {epoch} {second}.5")
+            data.append(f"ANGLE_1 = {epoch} {second % 90}")
+        text.append(
+            _SEGMENT.format(
+                time_system=time_system,
+                start=start,
+                station=station,
+                data="\n".join(data),
+            )
+        )
+    return NdmIo().from_string("".join(text), lazy=True)
+
+
+def test_merge():
+    """Tests the merged observations against the sorted observations."""
+    rng = np.random.default_rng(42)
+    tdms = [
+        _test_tdm(
+            [
+                ("DSS-25", 0, np.sort(rng.integers(0, 1200, 50))),
+                ("DSS-54", 10, np.sort(rng.integers(600, 2400, 50))),
+            ]
+        ),
+        # not in time order
+        _test_tdm([("DSS-25", 5, rng.integers(300, 900, 50))]),
+        _test_tdm([("'DSS-65'", 30, np.sort(rng.integers(1800, 3600, 50)))]),
+    ]
+
+    merged = list(merge_tdms(tdms))
+    assert len(merged) == 400
+
+    expected = []
+    for source_index, tdm in enumerate(tdms):
+        for segment_index, columns in enumerate(message_columns(tdm)):
+            for row in range(len(columns)):
+                expected.append(
+                    (
+                        int(columns.epochs_ns[row]),
+                        source_index,
+                        segment_index,
+                        str(columns.keywords[row]),
+                        float(columns.values[row]),
+                    )
+                )
+    expected.sort(key=lambda item: item[:3])
+    assert [
+        (obs.epoch_ns, obs.source_index, obs.segment_index, obs.keyword, obs.value)
+        for obs in merged
+    ] == expected
+
+    observation = merged[0]
+    segment = tdms[observation.source_index].body.segment[observation.segment_index]
+    assert observation.metadata is segment.metadata
+    assert float(observation.observation.range) == observation.value
+
+    # filters
+    merged = list(merge_tdms(tdms, keywords=["angle_1"], participants=["DSS-65"]))
+    assert len(merged) == 50
+    assert {obs.keyword for obs in merged} == {"ANGLE_1"}
+    assert {obs.source_index for obs in merged} == {2}
+    assert list(merge_tdms(tdms, keywords=["DOPPLER_INSTANTANEOUS"])) == []
+
+
+def test_lazy_files(data_path):
+    """Tests the merge of the KVN and XML files read in lazy mode."""
+    tdm = NdmIo().from_path(data_path(tdm_kvn_file_path), lazy=True)
+    sources = [tdm, data_path(tdm_xml_file_path)]
+
+    # streaming, the XML file starts earlier
+    first = list(islice(merge_tdms(sources), 3))
+    assert [(obs.source_index, obs.segment_index) for obs in first] == [(1, 0)] * 3
+    assert first[0].keyword == "TRANSMIT_FREQ_1"
+
+    merged = list(merge_tdms(sources))
+    assert len(merged) == 434
+    epochs_ns = np.array([obs.epoch_ns for obs in merged])
+    assert np.all(np.diff(epochs_ns) >= 0)
+    # the data blocks are not kept in the TDMs
+    assert is_lazy(tdm)
+
+    merged = list(merge_tdms(sources, participants=["DSS-25"]))
+    assert {obs.source_index for obs in merged} == {1}
+
+
+def test_time_systems():
+    """Tests the merge of the segments in different time systems."""
+    utc = _test_tdm([("DSS-25", 0, [0, 20, 40])])
+    tai = _test_tdm([("DSS-54", 0, [0, 20, 40, 60])], time_system="TAI")
+
+    with pytest.raises(ValueError):
+        list(merge_tdms([utc, tai]))
+
+    # TAI - UTC = 37 s
+    merged = list(merge_tdms([utc, tai], keywords=["RANGE"], time_system="TAI"))
+    assert [(obs.source_index, obs.value) for obs in merged] == [
+        (1, 0.5),
+        (1, 20.5),
+        (0, 0.5),
+        (1, 40.5),
+        (0, 20.5),
+        (1, 60.5),
+        (0, 40.5),
+    ]
+
+
+def test_invalid_input(data_path):
+    """Tests the messages other than TDM."""
+    with pytest.raises(TypeError):
+        list(merge_tdms([data_path(oem_file_path)]))
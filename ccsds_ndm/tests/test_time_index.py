@@ -0,0 +1,160 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the time index of the OEM and AEM segments.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.epochs import parse_epochs_ns
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.ndm_kvn_io import NdmKvnIo
+from ccsds_ndm.ndm_lazy import is_lazy
+from ccsds_ndm.time_index import TimeIndex, clear_time_index, time_index
+
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+tdm_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+
+_OEM = """CCSDS_OEM_VERS = 2.0
+CREATION_DATE  = 2021-01-01T00:00:00
+ORIGINATOR     = TEST
+"""
+
+_METADATA = """
+META_START
+OBJECT_NAME          = TEST SAT
+OBJECT_ID            = 2021-001A
+CENTER_NAME          = EARTH
+REF_FRAME            = EME2000
+TIME_SYSTEM          = UTC
+START_TIME           = 2021-01-01T00:{start:02d}:00
+USEABLE_START_TIME   = 2021-01-01T00:{useable_start:02d}:00
+USEABLE_STOP_TIME    = 2021-01-01T00:{useable_stop:02d}:00
+STOP_TIME            = 2021-01-01T00:{stop:02d}:00
+META_STOP
+
+"""
+
+_SEGMENTS = [(0, 1, 8, 10), (5, 5, 20, 20), (25, 25, 30, 30), (26, 26, 28, 28)]
+"""Start, useable start, useable stop and stop minutes of the test segments:
+overlapping, with a gap and fully inside another one."""
+
+
+def _test_oem():
+    """OEM with the test segments, with a state every minute."""
+    text = [_OEM]
+    for start, useable_start, useable_stop, stop in _SEGMENTS:
+        text.append(
+            _METADATA.format(
+                start=start,
+                useable_start=useable_start,
+                useable_stop=useable_stop,
+                stop=stop,
+            )
+        )
+        for minute in range(start, stop + 1):
+            text.append(f"2021-01-01T00:{minute:02d}:00 1 2 3 4 5 6\n")
+    return NdmKvnIo().from_string("".join(text))
+
+
+def test_locate():
+    """Tests the batch and single lookups against a scan of the segments."""
+    oem = _test_oem()
+    index = TimeIndex(oem)
+    t0_ns = parse_epochs_ns(["2021-01-01T00:00:00"])[0]
+    minute = 60 * 10**9
+
+    assert index.span == (t0_ns + minute, t0_ns + 30 * minute)
+
+    rng = np.random.default_rng(42)
+    epochs_ns = np.r_[
+        t0_ns + np.arange(-1, 33) * minute,
+        t0_ns + rng.integers(-minute, 32 * minute, 1000),
+    ]
+    segment_ids, rows = index.locate(epochs_ns)
+
+    for epoch_ns, seg_id, row in zip(epochs_ns, segment_ids, rows):
+        # first segment with the epoch in its useable range
+        expected = next(
+            (
+                n
+                for n, (_, start, stop, _) in enumerate(_SEGMENTS)
+                if t0_ns + start * minute <= epoch_ns <= t0_ns + stop * minute
+            ),
+            -1,
+        )
+        assert seg_id == expected
+        if expected < 0:
+            assert row == -1
+        else:
+            assert row == (epoch_ns - t0_ns) // minute - _SEGMENTS[expected][0]
+        assert index.locate_epoch(int(epoch_ns)) == (seg_id, row)
+
+    # boundaries of the overlapping segments, the earlier segment is used
+    assert index.locate_epoch("2021-01-01T00:08:00") == (0, 8)
+    assert index.locate_epoch("2021-01-01T00:08:00.000001") == (1, 3)
+    assert index.locate_epoch("2021-01-01T00:27:00") == (2, 2)
+    assert index.locate_epoch("2021-01-01T00:22:00") == (-1, -1)
+
+
+def test_overlapping():
+    """Tests the segments used within time windows."""
+    index = TimeIndex(_test_oem())
+
+    assert index.overlapping("2021-01-01T00:00:00", "2021-01-01T00:00:30") == []
+    assert index.overlapping("2021-01-01T00:00:00", "2021-01-01T00:01:00") == [0]
+    assert index.overlapping("2021-01-01T00:02:00", "2021-01-01T00:08:00") == [0]
+    assert index.overlapping("2021-01-01T00:07:00", "2021-01-01T00:09:00") == [0, 1]
+    assert index.overlapping("2021-01-01T00:21:00", "2021-01-01T00:24:00") == []
+    assert index.overlapping("2021-01-01T00:12:00", "2021-01-01T00:40:00") == [1, 2]
+
+
+def test_files(data_path):
+    """Tests the lookups in the files, and the lazily read segments."""
+    aem = NdmIo().from_path(data_path(aem_file_path), lazy=True)
+    index = time_index(aem)
+
+    assert time_index(aem) is index
+    assert is_lazy(aem)
+
+    # first segment only
+    segment_ids, rows = index.locate(
+        ["2003-03-04T12:00:00", "2003-03-04T12:00:20.9", "2003-03-04T12:00:21"]
+    )
+    assert list(segment_ids) == [0, 0, 0]
+    # data starts at 12:00:00.5, every 0.5 s
+    assert list(rows[:2]) == [-1, 40]
+    assert is_lazy(aem.body.segment[1])
+
+    assert index.locate_epoch("2003-03-04T12:00:47.5")[0] == 1
+    assert not is_lazy(aem)
+
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    index = time_index(oem)
+    segment_ids, rows = index.locate(
+        np.array(["2009-02-28T01:13:06.50800003", "2009-02-28T01:27:00"])
+    )
+    assert list(segment_ids) == [0, 2]
+
+    clear_time_index(oem)
+    assert time_index(oem) is not index
+
+
+def test_invalid_input(data_path):
+    """Tests the unsupported messages and time systems."""
+    tdm = NdmIo().from_path(data_path(tdm_file_path))
+    with pytest.raises(TypeError):
+        TimeIndex(tdm)
+
+    oem = _test_oem()
+    oem.body.segment[1].metadata.time_system = "TAI"
+    with pytest.raises(ValueError):
+        TimeIndex(oem)
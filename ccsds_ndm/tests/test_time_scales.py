@@ -0,0 +1,156 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the time scale conversions.
+
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import NS_PER_SECOND, parse_epochs_ns
+from ccsds_ndm.models.ndmxml2.ndmxml_2_0_0_common_2_0 import TimeSystemType
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.time_scales import (
+    LeapSecondTable,
+    TimeScale,
+    convert_epochs_ns,
+    get_leap_second_table,
+    set_leap_second_table,
+)
+
+utc_epochs = parse_epochs_ns(
+    [
+        "1972-01-01T00:00:00",
+        "1999-01-01T00:00:00",
+        "2016-12-31T23:59:59.5",
+        "2017-01-01T00:00:00",
+        "2021-06-01T12:00:00",
+    ]
+)
+
+
+def test_utc_to_tai():
+    """Tests the leap second lookup."""
+    tai_minus_utc = convert_epochs_ns(utc_epochs, "UTC", "TAI") - utc_epochs
+
+    assert (tai_minus_utc // NS_PER_SECOND).tolist() == [10, 32, 36, 37, 37]
+
+
+@pytest.mark.parametrize(
+    "time_scale, offset_s",
+    [("TAI", 37), ("TT", 69.184), ("GPS", 18), (TimeSystemType.TAI, 37)],
+)
+def test_fixed_offsets(time_scale, offset_s):
+    """Tests the fixed offsets after the last leap second."""
+    converted = convert_epochs_ns(utc_epochs[-1:], TimeSystemType.UTC, time_scale)
+
+    assert converted[0] - utc_epochs[-1] == round(offset_s * NS_PER_SECOND)
+
+
+def test_tdb():
+    """Tests the TDB - TT difference at J2000 and its bounds."""
+    tt_epochs = parse_epochs_ns(["2000-01-01T12:00:00"])
+    tdb_minus_tt = convert_epochs_ns(tt_epochs, "TT", "TDB") - tt_epochs
+
+    # reference value from the full series: -73.9 microseconds
+    assert tdb_minus_tt[0] == pytest.approx(-73_900, abs=5_000)
+
+    tt_epochs = utc_epochs[-1] + np.arange(400, dtype=np.int64) * 86400 * NS_PER_SECOND
+    tdb_minus_tt = convert_epochs_ns(tt_epochs, "TT", "TDB") - tt_epochs
+    assert np.abs(tdb_minus_tt).max() < 1_700_000
+
+
+@pytest.mark.parametrize("time_scale", ["UTC", "TAI", "TT", "GPS", "TDB"])
+def test_round_trip(time_scale):
+    """Tests converting to the time scale and back."""
+    # skip the start of the leap second table, not valid in all time scales
+    epochs = utc_epochs[1:]
+    for from_scale in TimeScale:
+        converted = convert_epochs_ns(epochs, from_scale, time_scale)
+        assert (convert_epochs_ns(converted, time_scale, from_scale) == epochs).all()
+
+
+def test_errors():
+    """Tests the unsupported time scales and epochs."""
+    with pytest.raises(ValueError, match="Unsupported time scale"):
+        convert_epochs_ns(utc_epochs, TimeSystemType.UT1, "TAI")
+
+    with pytest.raises(ValueError, match="before the start of the leap second"):
+        convert_epochs_ns(parse_epochs_ns(["1971-12-31T23:59:59"]), "UTC", "TAI")
+
+
+def test_leap_second_table_update(tmp_path):
+    """Tests replacing the active leap second table."""
+    bundled = get_leap_second_table()
+    assert bundled.expires_ns > utc_epochs[-1]
+
+    # a hypothetical leap second at the start of 2021
+    table_text = (
+        "#@\t4000000000\n"
+        "3692217600\t37\t# 1 Jan 2017\n"
+        "3818448000\t38\t# 1 Jan 2021\n"
+    )
+    table_path = tmp_path.joinpath("leap-seconds.list")
+    table_path.write_text(table_text)
+
+    try:
+        set_leap_second_table(table_path)
+        tai_epochs = convert_epochs_ns(utc_epochs[-1:], "UTC", "TAI")
+        assert tai_epochs[0] - utc_epochs[-1] == 38 * NS_PER_SECOND
+    finally:
+        set_leap_second_table()
+
+    assert get_leap_second_table().tai_minus_utc_s[-1] == 37
+
+    # explicit table
+    table = LeapSecondTable.from_string(table_text)
+    tai_epochs = convert_epochs_ns(utc_epochs[-1:], "UTC", "TAI", leap_seconds=table)
+    assert tai_epochs[0] - utc_epochs[-1] == 38 * NS_PER_SECOND
+
+
+def test_expired_table():
+    """Tests the warning for the epochs after the expiry of the table."""
+    table = LeapSecondTable.from_string(
+        "#@\t3818448000\n3692217600\t37\t# 1 Jan 2017\n"
+    )
+    expires_ns = table.expires_ns
+    assert expires_ns == parse_epochs_ns(["2021-01-01T00:00:00"])[0]
+
+    epochs = np.array([expires_ns - NS_PER_SECOND, expires_ns])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        convert_epochs_ns(epochs, "UTC", "TAI", leap_seconds=table)
+
+    later_epochs = epochs + 2 * NS_PER_SECOND
+    with pytest.warns(UserWarning, match="expiry date of the leap second table"):
+        tai_epochs = convert_epochs_ns(later_epochs, "UTC", "TAI", leap_seconds=table)
+    assert (tai_epochs - later_epochs == 37 * NS_PER_SECOND).all()
+
+    with pytest.warns(UserWarning, match="expiry date") as records:
+        convert_epochs_ns(tai_epochs, "TAI", "UTC", leap_seconds=table)
+    assert records[0].filename == __file__
+
+
+def test_expired_table_caller(data_path):
+    """Tests the warning location, for the conversions within the package."""
+    # table from 1972, expired before the UTC epochs of the OEM
+    table = LeapSecondTable.from_string(
+        "#@\t3313526400\n2272060800\t10\t# 1 Jan 1972\n"
+    )
+    oem = NdmIo().from_path(data_path("data", "kvn", "odmv2-testcase6_abbrev.kvn"))
+    columns = segment_columns(oem.body.segment[0])
+
+    try:
+        set_leap_second_table(table)
+        with pytest.warns(UserWarning, match="expiry date") as records:
+            columns.epochs_ns_in("TAI")
+    finally:
+        set_leap_second_table()
+    assert records[0].filename == __file__
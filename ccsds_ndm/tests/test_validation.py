@@ -0,0 +1,104 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Tests for the validation of the NDM object trees.
+
+"""
+
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from ccsds_ndm.models.ndmxml2 import QuaternionType
+from ccsds_ndm.ndm_io import NdmIo
+from ccsds_ndm.numeric_backend import RawNumber
+from ccsds_ndm.validation import _compiled_pattern, _rules, validate
+
+oem_file_path = Path("data", "kvn", "odmv2-testcase7a_xxx.kvn")
+aem_file_path = Path("data", "kvn", "adm-testcase04a_multi.kvn")
+tdm_file_path = Path("data", "kvn", "tdm-testcase01b.kvn")
+cdm_file_path = Path("data", "xml", "cdm_example_section4.xml")
+omm_combined_file_path = Path("data", "xml", "omm_combined.xml")
+
+
+@pytest.mark.parametrize(
+    "file_path", [oem_file_path, aem_file_path, tdm_file_path, cdm_file_path]
+)
+@pytest.mark.parametrize("numeric", ["decimal", "float", "raw"])
+def test_valid_files(file_path, numeric, data_path):
+    """Tests the valid files."""
+    ndm = NdmIo().from_path(data_path(file_path), numeric=numeric)
+    assert validate(ndm) == []
+
+
+def test_oem_errors(data_path):
+    """Tests the errors in the OEM, with their positions."""
+    oem = NdmIo().from_path(data_path(oem_file_path), lazy=True)
+    state_vectors = oem.body.segment[1].data.state_vector
+    state_vectors[3].epoch = "2009-02-28 01:15:00"
+    state_vectors[7].x = None
+    oem.body.segment[2].metadata.start_time = "yesterday"
+    oem.header.originator = None
+
+    issues = validate(oem)
+    assert [(issue.path, issue.keyword, issue.value) for issue in issues] == [
+        ("header.originator", "ORIGINATOR", None),
+        ("body.segment[2].metadata.start_time", "START_TIME", "yesterday"),
+        ("body.segment[1].data.state_vector[3].epoch", "EPOCH", "2009-02-28 01:15:00"),
+        ("body.segment[1].data.state_vector[7].x", "X", None),
+    ]
+    assert issues[0].message == "required value missing"
+    assert issues[1].message.startswith("does not match the pattern")
+
+    # segment only
+    issues = validate(oem.body.segment[1])
+    assert [issue.path for issue in issues] == [
+        "data.state_vector[3].epoch",
+        "data.state_vector[7].x",
+    ]
+
+
+@pytest.mark.parametrize("to_number", [Decimal, float, RawNumber])
+def test_bounds(to_number):
+    """Tests the numeric bounds with the numeric backends."""
+    quaternion = QuaternionType(
+        qc=to_number("1.5"), q1=to_number("-1.0"), q2=to_number("0.1"), q3=None
+    )
+    issues = validate(quaternion)
+    assert [(issue.path, issue.message) for issue in issues] == [
+        ("qc", "greater than 1.0"),
+        ("q3", "required value missing"),
+    ]
+
+    # invalid value of the numeric field, not accepted by the type checkers
+    setattr(quaternion, "qc", "abc")
+    assert [issue.message for issue in validate(quaternion)][0] == "not a number"
+
+
+def test_combined_ndm(data_path):
+    """Tests the required elements within the combined NDM."""
+    ndm = NdmIo().from_path(data_path(omm_combined_file_path))
+    issues = validate(ndm)
+    assert [(issue.path, issue.keyword) for issue in issues] == [
+        ("omm[0].body.segment.metadata", "metadata"),
+        ("omm[0].body.segment.data", "data"),
+    ]
+
+
+def test_cached_rules(data_path):
+    """Tests that the rules and the patterns are built only once."""
+    oem = NdmIo().from_path(data_path(oem_file_path))
+    validate(oem)
+    rules = _rules(type(oem.body.segment[0].data.state_vector[0]))
+    epoch_rule = next(rule for rule in rules if rule.name == "epoch")
+
+    assert _rules(type(oem.body.segment[0].data.state_vector[0])) is rules
+    assert _compiled_pattern(epoch_rule.pattern.pattern) is epoch_rule.pattern
+    assert any(
+        rule.name == "start_time" and rule.pattern is epoch_rule.pattern
+        for rule in _rules(type(oem.body.segment[0].metadata))
+    )
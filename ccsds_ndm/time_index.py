@@ -0,0 +1,367 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Time index of the OEM and AEM segments, for finding the segment and the data
+lines around any epoch.
+
+Each segment is valid within its useable time range (`USEABLE_START_TIME` and
+`USEABLE_STOP_TIME`, or the start and stop times if not defined), taken from
+the metadata only. Where the ranges of the segments overlap or meet, the
+earlier segment is used, as in the interpolators.
+
+The ranges are split into elementary intervals, each assigned to a single
+segment, so that a query epoch is mapped to its segment with a single binary
+search over the sorted interval boundaries. The data line is then found with
+a second binary search over the epochs of that segment. Batch lookups process
+all the query epochs together as `numpy` arrays.
+
+The data of a segment is accessed only when a query epoch falls within its
+range, lazily read segments (see :mod:`ccsds_ndm.ndm_lazy`) that are not
+queried are not parsed.
+
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from typing import List, Tuple
+
+import numpy as np
+
+from ccsds_ndm.columnar import segment_columns
+from ccsds_ndm.epochs import parse_epochs_ns, to_epochs_ns
+from ccsds_ndm.models.ndmxml2 import Aem, Oem
+
+_TIME_INDEX_ATTR = "_ccsds_ndm_time_index"
+"""Instance attribute of the message holding its cached time index."""
+
+SegmentRows = namedtuple("SegmentRows", ["segment", "row"])
+SegmentRows.__doc__ = """\
+Segments and data lines of the query epochs.
+
+`segment` is the index of the segment in the message and `row` the index of
+the last data line of the segment at or before the epoch. Both are `-1` for
+the epochs outside all the segments, `row` is also `-1` for the epochs before
+the first data line of their segment.
+"""
+
+
+class TimeIndex:
+    """
+    Time index of the segments of an OEM or AEM.
+
+    The query epochs are in the time system of the message, all segments
+    should share the same time system. The index does not track any changes
+    to the segment list or the metadata, use :func:`clear_time_index` after
+    modifying them. The data lines are always looked up in the current
+    columnar views (see :func:`.clear_columns`).
+
+    Parameters
+    ----------
+    ndm_obj : Oem or Aem
+        OEM or AEM object
+
+    Raises
+    ------
+    TypeError
+        Message type not supported.
+    ValueError
+        Segments with different time systems.
+    """
+
+    def __init__(self, ndm_obj):
+        if not isinstance(ndm_obj, (Oem, Aem)):
+            raise TypeError(
+                f"Time index not available for {type(ndm_obj).__name__}, "
+                f"only for OEM and AEM messages."
+            )
+
+        segments = ndm_obj.body.segment if ndm_obj.body else []
+        time_systems = {segment.metadata.time_system for segment in segments}
+        if len(time_systems) > 1:
+            raise ValueError(
+                f"Segments with different time systems cannot be indexed "
+                f"together: {', '.join(map(str, time_systems))}"
+            )
+
+        self.segments = list(segments)
+        self.ranges = _segment_ranges(self.segments)
+
+        self._bounds, self._point_owners, self._interval_owners = _partition(
+            self.ranges
+        )
+        self._bound_list = self._bounds.tolist()
+
+    def __len__(self):
+        return len(self.segments)
+
+    @property
+    def span(self):
+        """First and last epochs covered by the segments, in `int64`
+        nanoseconds since 1970-01-01T00:00:00 (`None` if no segments)."""
+        if not self._bound_list:
+            return None
+        return self._bound_list[0], self._bound_list[-1]
+
+    def segment_indices(self, epochs):
+        """
+        Finds the segments of the query epochs.
+
+        Parameters
+        ----------
+        epochs : numpy.ndarray or list
+            query epochs as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch strings
+
+        Returns
+        -------
+        numpy.ndarray
+            `int64` array of segment indices, `-1` for the epochs outside
+            all the segments
+        """
+        epochs_ns = to_epochs_ns(epochs)
+        if not self._bound_list:
+            return np.full(len(epochs_ns), -1, dtype=np.int64)
+
+        positions = np.searchsorted(self._bounds, epochs_ns)
+        clipped = np.minimum(positions, len(self._bounds) - 1)
+        on_bound = self._bounds[clipped] == epochs_ns
+        return np.where(
+            on_bound,
+            self._point_owners[clipped],
+            self._interval_owners[positions],
+        )
+
+    def locate(self, epochs):
+        """
+        Finds the segments and the data lines of the query epochs.
+
+        Parameters
+        ----------
+        epochs : numpy.ndarray or list
+            query epochs as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch strings
+
+        Returns
+        -------
+        SegmentRows
+            `int64` arrays of segment and data line indices
+        """
+        epochs_ns = to_epochs_ns(epochs)
+        owners = self.segment_indices(epochs_ns)
+        rows = np.full(len(epochs_ns), -1, dtype=np.int64)
+
+        # group the queries by segment
+        order = np.argsort(owners, kind="stable")
+        sorted_owners = owners[order]
+        first = np.searchsorted(sorted_owners, 0)
+        seg_ids, starts = np.unique(sorted_owners[first:], return_index=True)
+        ends = np.r_[starts[1:], len(sorted_owners) - first]
+        for seg_id, start, end in zip(seg_ids, starts + first, ends + first):
+            selection = order[start:end]
+            rows[selection] = (
+                np.searchsorted(
+                    self._epochs_ns(seg_id), epochs_ns[selection], side="right"
+                )
+                - 1
+            )
+
+        return SegmentRows(owners, rows)
+
+    def locate_epoch(self, epoch):
+        """
+        Finds the segment and the data line of a single epoch.
+
+        Parameters
+        ----------
+        epoch : int or numpy.datetime64 or str
+            query epoch as `int64` nanoseconds since 1970-01-01T00:00:00,
+            `datetime64` or CCSDS epoch string
+
+        Returns
+        -------
+        (int, int)
+            segment and data line indices (see :class:`SegmentRows`)
+        """
+        epoch_ns = int(to_epochs_ns([epoch])[0])
+        position = bisect_left(self._bound_list, epoch_ns)
+        if position < len(self._bound_list) and self._bound_list[position] == epoch_ns:
+            seg_id = int(self._point_owners[position])
+        else:
+            seg_id = int(self._interval_owners[position])
+
+        if seg_id < 0:
+            return -1, -1
+        epochs_ns = self._epochs_ns(seg_id)
+        return seg_id, int(np.searchsorted(epochs_ns, epoch_ns, side="right")) - 1
+
+    def overlapping(self, start, stop):
+        """
+        Finds the segments used within a time window.
+
+        Parameters
+        ----------
+        start : int or numpy.datetime64 or str
+            start epoch of the window
+        stop : int or numpy.datetime64 or str
+            stop epoch of the window
+
+        Returns
+        -------
+        list
+            indices of the segments, in order
+        """
+        start_ns, stop_ns = (int(epoch) for epoch in to_epochs_ns([start, stop]))
+        bounds = self._bound_list
+
+        # boundaries within the window, and the intervals around them
+        owners = set(
+            self._point_owners[
+                bisect_left(bounds, start_ns) : bisect_right(bounds, stop_ns)
+            ].tolist()
+        )
+        owners.update(
+            self._interval_owners[
+                bisect_right(bounds, start_ns) : bisect_left(bounds, stop_ns) + 1
+            ].tolist()
+        )
+        owners.discard(-1)
+        return sorted(owners)
+
+    def _epochs_ns(self, seg_id):
+        """Epochs of the data lines of the segment."""
+        return segment_columns(self.segments[seg_id]).epochs_ns
+
+
+def time_index(ndm_obj):
+    """
+    Gets the time index of the OEM or AEM.
+
+    The index is created on the first call and cached on the message.
+
+    Parameters
+    ----------
+    ndm_obj : Oem or Aem
+        OEM or AEM object
+
+    Returns
+    -------
+    TimeIndex
+        time index of the message
+    """
+    index = ndm_obj.__dict__.get(_TIME_INDEX_ATTR)
+    if index is None:
+        index = TimeIndex(ndm_obj)
+        ndm_obj.__dict__[_TIME_INDEX_ATTR] = index
+    return index
+
+
+def clear_time_index(ndm_obj):
+    """
+    Clears the cached time index, e.g. after modifying the segments.
+
+    Parameters
+    ----------
+    ndm_obj : Oem or Aem
+        OEM or AEM object
+    """
+    ndm_obj.__dict__.pop(_TIME_INDEX_ATTR, None)
+
+
+def _segment_ranges(segments):
+    """
+    Useable time ranges of the segments, from their metadata.
+
+    The data epochs are used only if the metadata does not define the range.
+
+    Parameters
+    ----------
+    segments : list
+        OEM or AEM segments
+
+    Returns
+    -------
+    list
+        (start, stop) epoch pairs of the segments
+    """
+    starts = [
+        segment.metadata.useable_start_time or segment.metadata.start_time
+        for segment in segments
+    ]
+    stops = [
+        segment.metadata.useable_stop_time or segment.metadata.stop_time
+        for segment in segments
+    ]
+    if not all(starts) or not all(stops):
+        return [
+            _data_range(segment, start, stop)
+            for segment, start, stop in zip(segments, starts, stops)
+        ]
+
+    # parse all the epochs together
+    epochs_ns = parse_epochs_ns(starts + stops).tolist()
+    return list(zip(epochs_ns[: len(segments)], epochs_ns[len(segments) :]))
+
+
+def _data_range(segment, start, stop):
+    """Time range of the segment, with the data epochs replacing the
+    undefined start or stop epochs."""
+    epochs_ns = segment_columns(segment).epochs_ns
+    start_ns = parse_epochs_ns([start])[0] if start else epochs_ns[0]
+    stop_ns = parse_epochs_ns([stop])[0] if stop else epochs_ns[-1]
+    return int(start_ns), int(stop_ns)
+
+
+def _partition(ranges):
+    """
+    Splits the time ranges of the segments into elementary intervals.
+
+    Parameters
+    ----------
+    ranges : list
+        (start, stop) epoch pairs of the segments
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        sorted unique boundaries of the ranges (`M` epochs), the segments
+        used at each boundary (`M` indices) and within each interval
+        before, between and after the boundaries (`M + 1` indices), `-1`
+        where no segment is used
+    """
+    if not ranges:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.full(1, -1, dtype=np.int64)
+
+    starts, stops = np.array(ranges, dtype=np.int64).T
+    bounds = np.unique(np.r_[starts, stops])
+    firsts = np.searchsorted(bounds, starts).tolist()
+    lasts = np.searchsorted(bounds, stops).tolist()
+
+    # sweep over the boundaries, with the segments covering them in a heap
+    # by index, so that the first covering segment is used
+    point_owners = np.full(len(bounds), -1, dtype=np.int64)
+    interval_owners = np.full(len(bounds) + 1, -1, dtype=np.int64)
+    order = sorted(range(len(firsts)), key=firsts.__getitem__)
+    active: List[Tuple[int, int]] = []
+    next_start = 0
+    for bound in range(len(bounds)):
+        while next_start < len(order) and firsts[order[next_start]] == bound:
+            segment = order[next_start]
+            heapq.heappush(active, (segment, lasts[segment]))
+            next_start += 1
+
+        # ended segments, up to the boundary and then up to the next one
+        while active and active[0][1] < bound:
+            heapq.heappop(active)
+        if active:
+            point_owners[bound] = active[0][0]
+        while active and active[0][1] <= bound:
+            heapq.heappop(active)
+        if active:
+            interval_owners[bound + 1] = active[0][0]
+
+    return bounds, point_owners, interval_owners
@@ -0,0 +1,407 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Vectorised conversion of epoch arrays between the common time scales.
+
+The epochs are handled as `int64` nanoseconds since 1970-01-01T00:00:00 of
+the respective time scale (see :mod:`ccsds_ndm.epochs`). The supported time
+scales are UTC, TAI, TT, GPS and TDB. All conversions go through TAI:
+
+- UTC: TAI - UTC from the leap second table
+- GPS: TAI - 19 s
+- TT: TAI + 32.184 s
+- TDB: TT plus the main periodic terms (accurate to about 30 microseconds)
+
+The leap second table is bundled with the package, in the IETF/NIST
+`leap-seconds.list` format. A newer table can be loaded with
+:meth:`LeapSecondTable.from_file` and activated with
+:func:`set_leap_second_table`. The UTC conversions of the epochs after the
+expiry date of the table raise a warning, as a leap second may be missing.
+
+In the nanoseconds representation, an epoch within a leap second
+(`23:59:60.x`) cannot be told apart from the first second of the next day,
+therefore it is converted as the latter.
+
+"""
+
+import sys
+import warnings
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+from ccsds_ndm.epochs import NS_PER_DAY, NS_PER_SECOND, days_from_civil
+
+_NTP_UNIX_OFFSET_S = 2208988800
+"""Seconds between the NTP epoch (1900-01-01) and 1970-01-01."""
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+"""Directory of the package, to find the callers outside of it."""
+
+_BUNDLED_LEAP_SECONDS = Path(__file__).parent.joinpath("data", "leap-seconds.list")
+"""Path of the bundled leap second table."""
+
+_TAI_MINUS_GPS_NS = 19 * NS_PER_SECOND
+"""TAI - GPS offset."""
+
+_TT_MINUS_TAI_NS = 32_184_000_000
+"""TT - TAI offset."""
+
+_J2000_TT_NS = int(days_from_civil(2000, 1, 1)) * NS_PER_DAY + 12 * 3600 * NS_PER_SECOND
+"""J2000 epoch (2000-01-01T12:00:00 TT) in nanoseconds since 1970."""
+
+
+class TimeScale(Enum):
+    """
+    Time scales supported by the conversions.
+    """
+
+    UTC = "UTC"
+    TAI = "TAI"
+    TT = "TT"
+    GPS = "GPS"
+    TDB = "TDB"
+
+    @staticmethod
+    def find_element(time_scale):
+        """
+        Finds the time scale corresponding to the requested id.
+
+        Parameters
+        ----------
+        time_scale : str or TimeScale or TimeSystemType
+            time scale id, e.g. `UTC`, or the `TIME_SYSTEM` of the metadata
+
+        Returns
+        -------
+        TimeScale
+            correct `TimeScale` enum corresponding to the id
+
+        Raises
+        ------
+        ValueError
+            Time scale not supported.
+        """
+        if isinstance(time_scale, TimeScale):
+            return time_scale
+
+        # `TimeSystemType` or similar enums
+        time_scale = getattr(time_scale, "value", time_scale)
+
+        for scale in TimeScale:
+            if scale.value == str(time_scale).strip().upper():
+                return scale
+
+        raise ValueError(
+            f"Unsupported time scale: {time_scale} "
+            f"(supported time scales: UTC, TAI, TT, GPS or TDB)"
+        )
+
+
+class LeapSecondTable:
+    """
+    Leap second table (TAI - UTC as a function of the epoch).
+
+    Parameters
+    ----------
+    start_ns : numpy.ndarray
+        UTC epochs (ns since 1970) from which each offset applies, in order
+    tai_minus_utc_s : numpy.ndarray
+        TAI - UTC offsets in seconds
+    expires_ns : int or None
+        UTC epoch (ns since 1970) after which the table may be incomplete
+    """
+
+    def __init__(self, start_ns, tai_minus_utc_s, expires_ns=None):
+        self.start_ns = np.asarray(start_ns, dtype=np.int64)
+        self.tai_minus_utc_s = np.asarray(tai_minus_utc_s, dtype=np.int64)
+        self.expires_ns = expires_ns
+
+        if len(self.start_ns) == 0 or len(self.start_ns) != len(self.tai_minus_utc_s):
+            raise ValueError("Leap second table should have matching, non-empty rows.")
+        if (np.diff(self.start_ns) <= 0).any():
+            raise ValueError("Leap second table epochs should be increasing.")
+
+        # same boundaries in TAI, for the inverse lookup
+        self._offsets_ns = self.tai_minus_utc_s * NS_PER_SECOND
+        self._start_tai_ns = self.start_ns + self._offsets_ns
+        self._expires_tai_ns = (
+            None if expires_ns is None else expires_ns + int(self._offsets_ns[-1])
+        )
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Parses the leap second table in the IETF/NIST `leap-seconds.list` format.
+
+        Parameters
+        ----------
+        text : str
+            contents of the `leap-seconds.list` file
+
+        Returns
+        -------
+        LeapSecondTable
+            leap second table
+        """
+        ntp_starts = []
+        offsets = []
+        expires_ns = None
+        for line in text.splitlines():
+            if line.startswith("#@"):
+                expires_ns = (
+                    int(line[2:].split()[0]) - _NTP_UNIX_OFFSET_S
+                ) * NS_PER_SECOND
+                continue
+
+            data = line.split("#", 1)[0].split()
+            if data:
+                ntp_starts.append(int(data[0]))
+                offsets.append(int(data[1]))
+
+        start_ns = (np.array(ntp_starts, dtype=np.int64) - _NTP_UNIX_OFFSET_S) * (
+            NS_PER_SECOND
+        )
+        return cls(start_ns, offsets, expires_ns)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """
+        Reads the leap second table in the IETF/NIST `leap-seconds.list` format.
+
+        Parameters
+        ----------
+        file_path : Path or AnyStr
+            path of the `leap-seconds.list` file
+
+        Returns
+        -------
+        LeapSecondTable
+            leap second table
+        """
+        return cls.from_string(Path(file_path).read_text())
+
+    def tai_minus_utc(self, utc_ns):
+        """
+        Computes TAI - UTC for the UTC epochs.
+
+        Parameters
+        ----------
+        utc_ns : numpy.ndarray
+            UTC epochs as `int64` nanoseconds since 1970
+
+        Returns
+        -------
+        numpy.ndarray
+            TAI - UTC offsets in nanoseconds (`int64`)
+
+        Raises
+        ------
+        ValueError
+            Some epochs are before the start of the table.
+
+        Warns
+        -----
+        UserWarning
+            Some epochs are after the expiry date of the table.
+        """
+        return self._lookup(self.start_ns, self.expires_ns, utc_ns)
+
+    def tai_minus_utc_from_tai(self, tai_ns):
+        """
+        Computes TAI - UTC for the TAI epochs.
+
+        Parameters
+        ----------
+        tai_ns : numpy.ndarray
+            TAI epochs as `int64` nanoseconds since 1970
+
+        Returns
+        -------
+        numpy.ndarray
+            TAI - UTC offsets in nanoseconds (`int64`)
+
+        Raises
+        ------
+        ValueError
+            Some epochs are before the start of the table.
+
+        Warns
+        -----
+        UserWarning
+            Some epochs are after the expiry date of the table.
+        """
+        return self._lookup(self._start_tai_ns, self._expires_tai_ns, tai_ns)
+
+    def _lookup(self, starts_ns, expires_ns, epochs_ns):
+        """
+        Finds the offsets for the epochs, with the table boundaries `starts_ns`
+        and the expiry date `expires_ns` in the same time scale.
+        """
+        indexes = np.searchsorted(starts_ns, epochs_ns, side="right") - 1
+        if (indexes < 0).any():
+            raise ValueError(
+                "UTC conversions before the start of the leap second table "
+                f"({np.datetime64(int(starts_ns[0]), 'ns')}) are not supported."
+            )
+        if expires_ns is not None and (np.asarray(epochs_ns) > expires_ns).any():
+            _warn_caller(
+                "UTC conversions after the expiry date of the leap second table "
+                f"({np.datetime64(int(expires_ns), 'ns')}) may miss leap seconds, "
+                "load a newer table with `set_leap_second_table()`."
+            )
+        return self._offsets_ns[indexes]
+
+
+def _warn_caller(message):
+    """
+    Warns, pointing at the first caller outside the package (the tests count
+    as callers), whichever the path through the package.
+    """
+    frame = sys._getframe(1)
+    stacklevel = 2
+    while frame.f_back is not None and _is_package_file(frame.f_code.co_filename):
+        frame = frame.f_back
+        stacklevel += 1
+    warnings.warn(message, stacklevel=stacklevel)
+
+
+def _is_package_file(file_name):
+    """Whether the source file is in the package (but not in its tests)."""
+    path = Path(file_name).resolve()
+    return _PACKAGE_DIR in path.parents and _PACKAGE_DIR / "tests" not in path.parents
+
+
+_leap_second_table = None
+"""Active leap second table (loaded from the bundled file on first use)."""
+
+
+def get_leap_second_table():
+    """
+    Gets the active leap second table.
+
+    Returns
+    -------
+    LeapSecondTable
+        active leap second table (the bundled table, unless replaced)
+    """
+    global _leap_second_table
+    if _leap_second_table is None:
+        _leap_second_table = LeapSecondTable.from_file(_BUNDLED_LEAP_SECONDS)
+    return _leap_second_table
+
+
+def set_leap_second_table(table=None):
+    """
+    Sets the active leap second table, e.g. after a new leap second is announced.
+
+    Parameters
+    ----------
+    table : LeapSecondTable or Path or AnyStr or None
+        new leap second table, or the path of a `leap-seconds.list` file,
+        `None` to revert to the bundled table
+    """
+    global _leap_second_table
+    if table is not None and not isinstance(table, LeapSecondTable):
+        table = LeapSecondTable.from_file(table)
+    _leap_second_table = table
+
+
+def convert_epochs_ns(epochs_ns, from_scale, to_scale, leap_seconds=None):
+    """
+    Converts the epochs from one time scale to another.
+
+    Parameters
+    ----------
+    epochs_ns : numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00 of `from_scale`
+    from_scale : str or TimeScale or TimeSystemType
+        time scale of the input epochs
+    to_scale : str or TimeScale or TimeSystemType
+        time scale of the output epochs
+    leap_seconds : LeapSecondTable or None
+        leap second table, `None` for the active table
+
+    Returns
+    -------
+    numpy.ndarray
+        epochs as `int64` nanoseconds since 1970-01-01T00:00:00 of `to_scale`
+
+    Raises
+    ------
+    ValueError
+        Time scale not supported or UTC epoch before the leap second table.
+    """
+    from_scale = TimeScale.find_element(from_scale)
+    to_scale = TimeScale.find_element(to_scale)
+    epochs_ns = np.asarray(epochs_ns, dtype=np.int64)
+
+    if from_scale is to_scale:
+        return epochs_ns.copy()
+
+    if leap_seconds is None and TimeScale.UTC in (from_scale, to_scale):
+        leap_seconds = get_leap_second_table()
+
+    return _from_tai(
+        _to_tai(epochs_ns, from_scale, leap_seconds), to_scale, leap_seconds
+    )
+
+
+def _to_tai(epochs_ns, time_scale, leap_seconds):
+    """Converts the epochs in `time_scale` to TAI."""
+    if time_scale is TimeScale.TAI:
+        return epochs_ns
+    if time_scale is TimeScale.UTC:
+        return epochs_ns + leap_seconds.tai_minus_utc(epochs_ns)
+    if time_scale is TimeScale.GPS:
+        return epochs_ns + _TAI_MINUS_GPS_NS
+    if time_scale is TimeScale.TT:
+        return epochs_ns - _TT_MINUS_TAI_NS
+
+    # TDB: invert TDB - TT, evaluated at TDB (the error is negligible)
+    tt_ns = epochs_ns - _tdb_minus_tt_ns(epochs_ns)
+    tt_ns = epochs_ns - _tdb_minus_tt_ns(tt_ns)
+    return tt_ns - _TT_MINUS_TAI_NS
+
+
+def _from_tai(tai_ns, time_scale, leap_seconds):
+    """Converts the TAI epochs to `time_scale`."""
+    if time_scale is TimeScale.TAI:
+        return tai_ns
+    if time_scale is TimeScale.UTC:
+        return tai_ns - leap_seconds.tai_minus_utc_from_tai(tai_ns)
+    if time_scale is TimeScale.GPS:
+        return tai_ns - _TAI_MINUS_GPS_NS
+
+    tt_ns = tai_ns + _TT_MINUS_TAI_NS
+    if time_scale is TimeScale.TT:
+        return tt_ns
+
+    # TDB
+    return tt_ns + _tdb_minus_tt_ns(tt_ns)
+
+
+def _tdb_minus_tt_ns(tt_ns):
+    """
+    TDB - TT with the two main periodic terms (accurate to about 30 microseconds).
+
+    Parameters
+    ----------
+    tt_ns : numpy.ndarray
+        TT epochs as `int64` nanoseconds since 1970
+
+    Returns
+    -------
+    numpy.ndarray
+        TDB - TT in nanoseconds (`int64`)
+    """
+    days = (tt_ns - _J2000_TT_NS) / NS_PER_DAY
+    mean_anomaly = np.radians(357.53 + 0.98560028 * days)
+    tdb_minus_tt = 0.001657 * np.sin(mean_anomaly) + 0.00001385 * np.sin(
+        2 * mean_anomaly
+    )
+    return np.rint(tdb_minus_tt * NS_PER_SECOND).astype(np.int64)
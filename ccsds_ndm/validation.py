@@ -0,0 +1,340 @@
+# CCSDS-NDM: CCSDS Navigation Data Messages Read/Write Library
+#
+# Copyright (C) 2021 Egemen Imre
+#
+# Licensed under GNU GPL v3.0. See LICENSE.rst for more info.
+"""
+Validation of the NDM object trees against the constraints of the models.
+
+The field metadata of the :mod:`ccsds_ndm.models.ndmxml2` models define the
+`required` fields, the minimum number of list items (`min_occurs`), the
+`pattern` of the string fields (e.g. the epochs) and the bounds of the
+numeric fields (`min_inclusive`, `max_exclusive` etc.). These rules are
+collected once for each class, with each distinct pattern compiled only once.
+
+The object tree is then validated column by column rather than object by
+object: the values of a field are collected for all the objects of the same
+class at the same position of the tree (e.g. the `EPOCH` of all the state
+vectors of a segment) and checked together:
+
+- the strings of a column are checked with a single regular expression match
+  over the whole column, the invalid rows are looked for only if it fails
+- the numeric values are compared with the bounds as a `numpy` array
+
+All the errors are reported, each with the position of the element in the
+tree (e.g. `body.segment[0].data.state_vector[12].epoch`). The positions are
+generated only for the invalid elements.
+
+"""
+
+import re
+import typing
+from bisect import bisect_right
+from collections import namedtuple
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from itertools import accumulate, chain
+from operator import attrgetter
+
+import numpy as np
+
+ValidationIssue = namedtuple("ValidationIssue", ["path", "keyword", "value", "message"])
+ValidationIssue.__doc__ = """\
+Validation error of a single element of the NDM object tree.
+
+`path` is the position of the element in the tree as attribute names and list
+indices (e.g. `body.segment[0].data.state_vector[12].epoch`), `keyword` the
+KVN or XML name of the element (e.g. `EPOCH`), `value` the invalid value
+(`None` if missing) and `message` the description of the error.
+"""
+
+_BOUNDS = {
+    "min_inclusive": (np.less, "less than"),
+    "min_exclusive": (np.less_equal, "not greater than"),
+    "max_inclusive": (np.greater, "greater than"),
+    "max_exclusive": (np.greater_equal, "not less than"),
+}
+"""Bound constraints with the `numpy` comparison of the invalid values."""
+
+_Pattern = namedtuple("_Pattern", ["pattern", "value_regex", "column_regex"])
+"""Compiled pattern, for single values and for newline separated columns."""
+
+_Rule = namedtuple(
+    "_Rule",
+    [
+        "name",
+        "keyword",
+        "required",
+        "min_occurs",
+        "pattern",
+        "bounds",
+        "is_list",
+        "child",
+    ],
+)
+"""Validation rule of a single field of a class."""
+
+_patterns: typing.Dict[str, _Pattern] = {}
+"""Compiled patterns, by the pattern strings."""
+
+_class_rules: typing.Dict[type, typing.Tuple[_Rule, ...]] = {}
+"""Validation rules of the fields, by class."""
+
+
+def validate(ndm_obj):
+    """
+    Validates the NDM object tree against the constraints of the models.
+
+    Any object of the models (e.g. a message, a segment or a data block) can
+    be validated. The lazy data blocks (see :mod:`ccsds_ndm.ndm_lazy`) are
+    parsed.
+
+    Parameters
+    ----------
+    ndm_obj
+        NDM object tree
+
+    Returns
+    -------
+    list
+        `ValidationIssue` for each error, in the order of the fields of the
+        classes (empty if the tree is valid)
+    """
+    issues: typing.List[ValidationIssue] = []
+    _validate_column(type(ndm_obj), [ndm_obj], lambda row: "", issues)
+    return issues
+
+
+def _validate_column(cls, objects, path, issues):
+    """
+    Validates the objects of the same class.
+
+    Parameters
+    ----------
+    cls : type
+        dataclass of the objects
+    objects : list
+        objects to validate (not `None`)
+    path : Callable
+        position of the object in the tree, called with its index
+    issues : list
+        list of the errors, extended in place
+    """
+    for rule in _rules(cls):
+        values = list(map(attrgetter(rule.name), objects))
+        field_path = _field_path(path, rule.name)
+
+        if rule.is_list:
+            if rule.min_occurs:
+                for row in _short_lists(values, rule.min_occurs):
+                    issues.append(
+                        ValidationIssue(
+                            field_path(row),
+                            rule.keyword,
+                            values[row],
+                            f"at least {rule.min_occurs} item(s) required",
+                        )
+                    )
+            lengths = [len(items) for items in values if items is not None]
+            if not any(lengths):
+                continue
+            owners = [row for row, items in enumerate(values) if items is not None]
+            item_path = _item_path(field_path, owners, lengths)
+            values = list(chain.from_iterable(v for v in values if v is not None))
+            if rule.child is None:
+                _check_values(rule, values, item_path, issues)
+            else:
+                _validate_column(rule.child, values, item_path, issues)
+            continue
+
+        # identity check, the comparisons may be costly (e.g. `RawNumber`)
+        missing = [row for row, value in enumerate(values) if value is None]
+        if missing:
+            if rule.required:
+                for row in missing:
+                    issues.append(
+                        ValidationIssue(
+                            field_path(row),
+                            rule.keyword,
+                            None,
+                            "required value missing",
+                        )
+                    )
+            if len(missing) == len(values):
+                continue
+            present = [row for row, value in enumerate(values) if value is not None]
+            values = [values[row] for row in present]
+            field_path = _subset_path(field_path, present)
+
+        if rule.child is None:
+            _check_values(rule, values, field_path, issues)
+        else:
+            _validate_column(rule.child, values, field_path, issues)
+
+
+def _check_values(rule, values, path, issues):
+    """Checks the pattern and the bounds of the leaf values."""
+    if rule.pattern is not None:
+        strings = [str(value).strip() for value in values]
+        for row in _unmatched_rows(rule.pattern, strings):
+            issues.append(
+                ValidationIssue(
+                    path(row),
+                    rule.keyword,
+                    values[row],
+                    f"does not match the pattern {rule.pattern.pattern}",
+                )
+            )
+
+    if rule.bounds:
+        numbers, invalid = _numbers(values)
+        for row in invalid:
+            issues.append(
+                ValidationIssue(path(row), rule.keyword, values[row], "not a number")
+            )
+        for bound, (compare, description) in rule.bounds:
+            for row in np.flatnonzero(compare(numbers, float(bound))).tolist():
+                issues.append(
+                    ValidationIssue(
+                        path(row),
+                        rule.keyword,
+                        values[row],
+                        f"{description} {bound}",
+                    )
+                )
+
+
+def _unmatched_rows(pattern, strings):
+    """Indices of the strings not matching the pattern."""
+    # the whole column at once, unless a string spans multiple lines
+    column = "\n".join(strings) + "\n"
+    if column.count("\n") == len(strings) and pattern.column_regex.fullmatch(column):
+        return []
+    return [
+        row
+        for row, string in enumerate(strings)
+        if not pattern.value_regex.fullmatch(string)
+    ]
+
+
+def _numbers(values):
+    """Values as a `float` array (`NaN` if not numeric) and the non-numeric rows."""
+    try:
+        return np.array(values, dtype=np.float64), []
+    except (TypeError, ValueError):
+        pass
+
+    numbers = np.full(len(values), np.nan)
+    invalid = []
+    for row, value in enumerate(values):
+        try:
+            numbers[row] = float(value)
+        except (TypeError, ValueError):
+            invalid.append(row)
+    return numbers, invalid
+
+
+def _short_lists(values, min_occurs):
+    """Indices of the lists with less than `min_occurs` items."""
+    return [
+        row
+        for row, items in enumerate(values)
+        if items is None or len(items) < min_occurs
+    ]
+
+
+def _field_path(path, name):
+    """Position of the field of the object at each row."""
+
+    def field_path(row):
+        parent = path(row)
+        return f"{parent}.{name}" if parent else name
+
+    return field_path
+
+
+def _item_path(path, owners, lengths):
+    """Position of the list items, flattened over the owner objects."""
+    ends = list(accumulate(lengths))
+
+    def item_path(row):
+        owner = bisect_right(ends, row)
+        start = ends[owner - 1] if owner else 0
+        return f"{path(owners[owner])}[{row - start}]"
+
+    return item_path
+
+
+def _subset_path(path, rows):
+    """Position of the objects selected from the rows."""
+    return lambda row: path(rows[row])
+
+
+def _rules(cls):
+    """Validation rules of the fields of the dataclass (cached)."""
+    rules = _class_rules.get(cls)
+    if rules is None:
+        rules = _class_rules[cls] = tuple(_build_rules(cls))
+    return rules
+
+
+def _build_rules(cls):
+    """Builds the validation rules of the fields of the dataclass."""
+    if not is_dataclass(cls):
+        return
+
+    type_hints = typing.get_type_hints(cls)
+    for fld in fields(cls):
+        metadata = fld.metadata
+        field_type = type_hints.get(fld.name)
+        is_list = typing.get_origin(field_type) in (list, typing.List)
+
+        # unwrap the `List` and `Optional` types
+        while typing.get_origin(field_type) in (list, typing.List, typing.Union):
+            field_type = next(
+                arg for arg in typing.get_args(field_type) if arg is not type(None)
+            )
+
+        # the classes without any rules are not visited
+        child = field_type if is_dataclass(field_type) and _rules(field_type) else None
+        pattern = metadata.get("pattern")
+        bounds = tuple(
+            (metadata[name], bound)
+            for name, bound in _BOUNDS.items()
+            if name in metadata
+        )
+        required = bool(metadata.get("required"))
+        min_occurs = metadata.get("min_occurs", 0)
+
+        if (
+            child is None
+            and pattern is None
+            and not bounds
+            and not required
+            and not min_occurs
+        ):
+            continue
+        if isinstance(field_type, type) and issubclass(field_type, Enum):
+            # enumerations are checked by the parsers
+            pattern = None
+
+        yield _Rule(
+            fld.name,
+            metadata.get("name", fld.name),
+            required,
+            min_occurs,
+            None if pattern is None else _compiled_pattern(pattern),
+            bounds,
+            is_list,
+            child,
+        )
+
+
+def _compiled_pattern(pattern):
+    """Compiled pattern (cached)."""
+    compiled = _patterns.get(pattern)
+    if compiled is None:
+        compiled = _patterns[pattern] = _Pattern(
+            pattern, re.compile(f"(?:{pattern})"), re.compile(f"(?:(?:{pattern})\n)*")
+        )
+    return compiled